@@ -48,12 +48,22 @@ def create_app(config_name):
     app = Flask(__name__)
     # Memuat konfigurasi dari objek berdasarkan nama yang diberikan
     app.config.from_object(config[config_name])
+    # File unggahan divalidasi dan dibatasi ukurannya selama body request dibaca
+    from .services.upload_stream import UploadRequest
+    app.request_class = UploadRequest
 
     # Mengimpor dan menginisialisasi filter kustom untuk template Jinja
     from .utils.text_filters import init_profanity_filter, markdown_to_html
     init_profanity_filter(app)
     app.jinja_env.filters['markdown'] = markdown_to_html
 
+    # Helper template untuk menampilkan turunan foto ulasan dengan srcset
+    from .services.image_pipeline import foto_sources
+    app.jinja_env.globals['foto_sources'] = foto_sources
+    # Helper template untuk URL file unggahan (layout folder bertingkat maupun lama)
+    from .services.upload_store import upload_url
+    app.jinja_env.globals['upload_url'] = upload_url
+
     # Menginisialisasi ekstensi dengan instance aplikasi
     db.init_app(app)
     login_manager.init_app(app)
@@ -63,6 +73,9 @@ def create_app(config_name):
 
     # Menerapkan header keamanan pada setiap respons setelah request selesai
     app.after_request(apply_security_headers)
+    # File unggahan berbasis konten dapat di-cache tanpa batas oleh browser dan CDN
+    from .services.upload_store import upload_cache_headers
+    app.after_request(upload_cache_headers)
 
     # Konfigurasi logging untuk lingkungan produksi
     if not app.debug and not app.testing:
@@ -97,6 +110,10 @@ def create_app(config_name):
     # Mendaftarkan semua blueprint rute ke aplikasi
     register_blueprints(app)
 
+    # Mendaftarkan perintah CLI (misalnya `flask email send-outbox`)
+    from .commands import register_commands
+    register_commands(app)
+
     @app.context_processor
     def inject_now():
         """Menyuntikkan variabel 'now' ke dalam semua konteks template.
@@ -0,0 +1,263 @@
+import click
+from flask.cli import AppGroup
+
+# Grup perintah CLI untuk pengelolaan email: `flask email ...`
+email_cli = AppGroup('email', help='Perintah pengelolaan pengiriman email.')
+
+# Grup perintah CLI untuk pengelolaan file unggahan: `flask uploads ...`
+uploads_cli = AppGroup('uploads', help='Perintah pengelolaan file unggahan.')
+
+@email_cli.command('send-outbox')
+@click.option('--once', is_flag=True, help='Berhenti setelah outbox tidak memiliki email yang siap dikirim.')
+@click.option('--batch-size', type=int, default=None, help='Jumlah email per kelompok klaim.')
+@click.option('--interval', type=float, default=5.0, show_default=True, help='Jeda saat outbox kosong (detik).')
+def send_outbox(once, batch_size, interval):
+    """Mengirim email dari outbox persisten secara berkelompok.
+
+    Beberapa proses pengirim dapat berjalan bersamaan karena setiap email
+    diklaim dengan lease. Email dari pengirim yang mati akan diklaim ulang
+    setelah lease-nya berakhir.
+
+    Args:
+        once (bool): Berhenti setelah outbox kosong.
+        batch_size (int | None): Jumlah email per kelompok klaim.
+        interval (float): Jeda saat outbox kosong (detik).
+    """
+    from flask import current_app
+    from app.services.email_outbox import run_outbox_sender
+
+    if batch_size:
+        current_app.config['MAIL_OUTBOX_BATCH_SIZE'] = batch_size
+    try:
+        totals = run_outbox_sender(interval=interval, once=once)
+    except KeyboardInterrupt:
+        return
+    click.echo(f"Terkirim: {totals['sent']}, dicoba ulang: {totals['retry']}, dead-letter: {totals['dead']}")
+
+@email_cli.command('reconfirm')
+@click.option('--base-url', required=True, help='URL dasar situs untuk tautan konfirmasi, misalnya https://lelana.my.id.')
+@click.option('--chunk-size', type=int, default=200, show_default=True, help='Jumlah pengguna yang dirender per kelompok.')
+@click.option('--dry-run', is_flag=True, help='Hanya menghitung pengguna yang belum terkonfirmasi.')
+def reconfirm(base_url, chunk_size, dry_run):
+    """Mengirim ulang email konfirmasi ke semua pengguna yang belum terkonfirmasi.
+
+    Email dikirim melalui koneksi SMTP yang dipakai ulang dan dibatasi lajunya
+    sesuai `MAIL_BULK_PER_CONNECTION` dan `MAIL_BULK_RATE`.
+
+    Args:
+        base_url (str): URL dasar situs untuk tautan konfirmasi.
+        chunk_size (int): Jumlah pengguna yang dirender per kelompok.
+        dry_run (bool): Hanya menghitung tanpa mengirim email.
+    """
+    from flask import current_app
+    from app.models.user import User
+    from app.services.email_bulk import BulkSender
+    from app.services.email_handler import build_messages
+
+    query = User.query.filter_by(is_confirmed=False).order_by(User.id)
+    if dry_run:
+        click.echo(f"Pengguna belum terkonfirmasi: {query.count()}")
+        return
+
+    app = current_app._get_current_object()
+    with BulkSender.from_config() as sender:
+        last_id = 0
+        while True:
+            users = query.filter(User.id > last_id).limit(chunk_size).all()
+            if not users:
+                break
+            last_id = users[-1].id
+            # Konteks request dibutuhkan agar url_for(_external=True) memakai base_url
+            with app.test_request_context(base_url=base_url):
+                messages = build_messages(
+                    'Selangkah lagi! Konfirmasi akun Lelana.id kamu 🌿', 'auth/email/confirm',
+                    [(user.email, {'user': user, 'token': user.generate_confirmation_token()}) for user in users],
+                )
+            sender.send_many(messages)
+        stats = sender.stats()
+    click.echo(f"Terkirim: {stats['sent']}, gagal: {stats['failed']}, koneksi SMTP: {stats['connections']}")
+
+@uploads_cli.command('backfill-derivatives')
+@click.option('--batch-size', type=int, default=100, show_default=True, help='Jumlah file yang diproses per commit.')
+@click.option('--force', is_flag=True, help='Membuat ulang turunan untuk semua foto, termasuk yang sudah memilikinya.')
+def backfill_derivatives(batch_size, force):
+    """Membuat turunan (thumbnail) untuk foto ulasan yang belum memilikinya.
+
+    Setiap file dirender sekali dan hasilnya dipakai untuk semua foto yang
+    merujuknya. File diproses berkelompok berdasarkan nama dan setiap
+    kelompok di-commit sehingga perintah dapat dihentikan dan dijalankan
+    ulang kapan saja.
+
+    Args:
+        batch_size (int): Jumlah file yang diproses per commit.
+        force (bool): Membuat ulang turunan untuk semua foto.
+    """
+    from app import db
+    from app.models.foto_ulasan import FotoUlasan
+    from app.services.image_pipeline import generate_derivatives
+
+    query = db.session.query(FotoUlasan.nama_file).distinct()
+    if not force:
+        query = query.filter(FotoUlasan.varian.is_(None))
+
+    processed = failed = 0
+    last = ''
+    while True:
+        names = [name for (name,) in query.filter(FotoUlasan.nama_file > last)
+                 .order_by(FotoUlasan.nama_file).limit(batch_size)]
+        if not names:
+            break
+        last = names[-1]
+        for name in names:
+            try:
+                varian = ','.join(generate_derivatives(name))
+            except ValueError as e:
+                failed += 1
+                click.echo(f"Gagal memproses {name}: {e}", err=True)
+                continue
+            FotoUlasan.query.filter_by(nama_file=name).update({'varian': varian}, synchronize_session=False)
+            processed += 1
+        db.session.commit()
+    click.echo(f"Diproses: {processed}, gagal: {failed}")
+
+@uploads_cli.command('backfill-placeholders')
+@click.option('--batch-size', type=int, default=100, show_default=True, help='Jumlah file yang diproses per commit.')
+def backfill_placeholders(batch_size):
+    """Menghitung dimensi dan placeholder (LQIP) untuk foto ulasan yang belum memilikinya.
+
+    Setiap file dibaca sekali dan hasilnya dipakai untuk semua foto yang
+    merujuknya. File diproses berkelompok berdasarkan nama dan setiap
+    kelompok di-commit sehingga perintah dapat dihentikan dan dijalankan
+    ulang kapan saja.
+
+    Args:
+        batch_size (int): Jumlah file yang diproses per commit.
+    """
+    from app import db
+    from app.models.foto_ulasan import FotoUlasan
+    from app.services.image_pipeline import inspect_stored_image
+    from app.services.storage import get_storage
+
+    storage = get_storage()
+    processed = failed = 0
+    last = ''
+    while True:
+        names = [name for (name,) in db.session.query(FotoUlasan.nama_file).distinct()
+                 .filter(FotoUlasan.placeholder.is_(None), FotoUlasan.nama_file > last)
+                 .order_by(FotoUlasan.nama_file).limit(batch_size)]
+        if not names:
+            break
+        last = names[-1]
+        for name in names:
+            try:
+                details = inspect_stored_image(storage, name)
+            except (ValueError, OSError) as e:
+                failed += 1
+                click.echo(f"Gagal memproses {name}: {e}", err=True)
+                continue
+            FotoUlasan.query.filter_by(nama_file=name).update(details, synchronize_session=False)
+            processed += 1
+        db.session.commit()
+    click.echo(f"Diproses: {processed}, gagal: {failed}")
+
+@uploads_cli.command('process-images')
+@click.option('--retry-failed', is_flag=True, help='Mengulang job yang sudah berstatus gagal.')
+@click.option('--timeout', type=float, default=600, show_default=True, help='Batas waktu menunggu pool selesai (detik).')
+def process_images(retry_failed, timeout):
+    """Memproses job foto yang masih tertunda, misalnya setelah proses web berhenti.
+
+    Job diserahkan ke process pool sebanyak kapasitasnya, lalu perintah
+    menunggu hingga pool kosong sebelum menyerahkan kelompok berikutnya.
+
+    Args:
+        retry_failed (bool): Mengulang job yang sudah berstatus gagal.
+        timeout (float): Batas waktu menunggu setiap kelompok selesai (detik).
+    """
+    from app import db
+    from app.models.image_job import ImageJob
+    from app.services.image_worker import get_image_processor
+
+    if retry_failed:
+        ImageJob.query.filter_by(status=ImageJob.FAILED) \
+            .update({'status': ImageJob.PENDING, 'attempts': 0, 'tanggal_selesai': None})
+        db.session.commit()
+
+    processor = get_image_processor()
+    last_id = 0
+    try:
+        while True:
+            jobs = ImageJob.query.filter(ImageJob.status == ImageJob.PENDING, ImageJob.id > last_id) \
+                .order_by(ImageJob.id).limit(processor.max_pending).all()
+            if not jobs:
+                break
+            last_id = jobs[-1].id
+            for job in jobs:
+                processor.submit(job.id, job.foto.nama_file)
+            processor.join(timeout)
+            db.session.expire_all()
+    finally:
+        processor.shutdown()
+    metrics = processor.metrics()
+    click.echo(f"Selesai: {metrics['completed']}, gagal: {metrics['failed']}, dicoba ulang: {metrics['retried']}")
+
+@uploads_cli.command('gc')
+@click.option('--grace', type=int, default=None, help='Masa tenggang dalam detik (default UPLOAD_GC_GRACE).')
+@click.option('--dry-run', is_flag=True, help='Hanya melaporkan file yatim tanpa mengubah apa pun.')
+@click.option('--rate', type=float, default=None, help='Batas file yang diproses per detik (default UPLOAD_GC_RATE).')
+@click.option('--batch-size', type=int, default=500, show_default=True, help='Jumlah file per query referensi.')
+@click.option('--delete', 'force_delete', is_flag=True, help='Langsung menghapus meski karantina dikonfigurasi.')
+def gc_uploads(grace, dry_run, rate, batch_size, force_delete):
+    """Membersihkan file unggahan yang tidak lagi dirujuk oleh foto ulasan mana pun.
+
+    File yatim dikarantina jika `UPLOAD_QUARANTINE` diatur, atau langsung
+    dihapus jika tidak.
+
+    Args:
+        grace (int | None): Masa tenggang sebelum file tanpa referensi diproses (detik).
+        dry_run (bool): Hanya melaporkan file yatim tanpa mengubah apa pun.
+        rate (float | None): Batas file yang diproses per detik.
+        batch_size (int): Jumlah file per query referensi.
+        force_delete (bool): Langsung menghapus tanpa karantina.
+    """
+    from app.services.upload_store import collect_garbage
+
+    try:
+        report = collect_garbage(grace_seconds=grace, dry_run=dry_run, batch_size=batch_size, rate=rate,
+                                 quarantine=False if force_delete else None)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    for name in report['orphans']:
+        click.echo(name)
+    action = 'dikarantina' if report['quarantine'] else 'dihapus'
+    click.echo(f"Diperiksa: {report['scanned']}, {'akan ' if dry_run else ''}{action}: "
+               f"{len(report['orphans'])} ({report['bytes'] / (1024 * 1024):.1f} MB)")
+    if report['purged']:
+        click.echo(f"Dihapus permanen dari karantina: {report['purged']}")
+
+@uploads_cli.command('shard')
+@click.option('--batch-size', type=int, default=100, show_default=True, help='Jumlah file yang dipindahkan per commit.')
+def shard_uploads(batch_size):
+    """Memindahkan file unggahan lama ke layout folder bertingkat (dua level hex).
+
+    Dapat dijalankan saat aplikasi tetap melayani request.
+
+    Args:
+        batch_size (int): Jumlah file yang dipindahkan per commit.
+    """
+    from app.services.upload_store import migrate_to_shards
+
+    try:
+        totals = migrate_to_shards(batch_size=batch_size)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Dipindahkan: {totals['moved']}, tidak ditemukan: {totals['missing']}, "
+               f"dilewati: {totals['skipped']}")
+
+def register_commands(app):
+    """Mendaftarkan perintah CLI aplikasi.
+
+    Args:
+        app (Flask): Instance aplikasi Flask tempat perintah akan didaftarkan.
+    """
+    app.cli.add_command(email_cli)
+    app.cli.add_command(uploads_cli)
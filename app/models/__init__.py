@@ -4,4 +4,6 @@ from .event import Event
 from .review import Review
 from .paket_wisata import PaketWisata
 from .foto_ulasan import FotoUlasan
-from .itinerari import Itinerari
\ No newline at end of file
+from .itinerari import Itinerari
+from .email_outbox import EmailOutbox
+from .image_job import ImageJob
\ No newline at end of file
@@ -0,0 +1,65 @@
+from app import db
+from datetime import datetime, timezone
+
+class EmailOutbox(db.Model):
+    """Model untuk antrean email persisten (transactional outbox).
+
+    Setiap baris adalah satu email yang sudah dirender dan ditulis dalam
+    transaksi yang sama dengan perubahan data pemicunya (misalnya pendaftaran
+    pengguna). Proses pengirim mengklaim baris secara berkelompok dengan lease,
+    mengirimkannya, dan mencoba ulang dengan backoff hingga batas percobaan.
+
+    Attributes:
+        id (int): Primary key unik untuk setiap email.
+        recipient (str): Alamat email penerima.
+        sender (str): Alamat pengirim dalam format header email.
+        subject (str): Subjek email.
+        html (str): Isi email dalam format HTML.
+        status (str): Status email: 'pending', 'sending', 'sent', atau 'dead'.
+        attempts (int): Jumlah percobaan pengiriman yang sudah diklaim.
+        next_attempt_at (datetime): Waktu paling awal email boleh diklaim (UTC).
+        lease_token (str | None): Token pengirim yang sedang memegang email.
+        lease_until (datetime | None): Batas waktu lease; setelah lewat email dapat diklaim ulang.
+        last_error (str | None): Pesan error terakhir saat pengiriman gagal.
+        tanggal_dibuat (datetime): Timestamp saat email dimasukkan ke outbox (UTC).
+        tanggal_terkirim (datetime | None): Timestamp saat email berhasil dikirim (UTC).
+    """
+    __tablename__ = 'email_outbox'
+
+    # Status yang dipakai oleh proses pengirim
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    DEAD = 'dead'
+
+    # Mendefinisikan kolom-kolom pada tabel 'email_outbox'
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    sender = db.Column(db.String(200), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+
+    # Kolom untuk status pengiriman, percobaan ulang, dan lease
+    status = db.Column(db.String(10), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    lease_token = db.Column(db.String(32), nullable=True, index=True)
+    lease_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    # Kolom untuk mencatat waktu pembuatan dan pengiriman
+    tanggal_dibuat = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    tanggal_terkirim = db.Column(db.DateTime, nullable=True)
+
+    # Indeks gabungan untuk query klaim berdasarkan status dan jadwal
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        """Mengembalikan representasi string dari objek EmailOutbox untuk debugging.
+
+        Returns:
+            str: Representasi string dari objek.
+        """
+        return f'<EmailOutbox {self.id} {self.status} {self.recipient}>'
@@ -22,7 +22,7 @@ class Event(db.Model):
     # Mendefinisikan kolom-kolom pada tabel 'event'
     id = db.Column(db.Integer, primary_key=True)
     nama = db.Column(db.String(150), nullable=False, index=True)
-    tanggal = db.Column(db.DateTime, nullable=False)
+    tanggal = db.Column(db.DateTime, nullable=False, index=True)
     lokasi = db.Column(db.String(200), nullable=False)
     deskripsi = db.Column(db.Text, nullable=False)
     penyelenggara = db.Column(db.String(100))
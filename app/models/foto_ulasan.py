@@ -8,20 +8,52 @@ class FotoUlasan(db.Model):
 
     Attributes:
         id (int): Primary key unik untuk setiap foto.
-        nama_file (str): Nama file gambar yang disimpan di server.
+        nama_file (str): Nama file gambar berbasis hash konten yang disimpan di server.
+        varian (str | None): Nama varian turunan yang tersedia, dipisah koma (misal: 'thumb,medium').
+        ukuran_asli (int | None): Ukuran file saat diunggah (byte).
+        ukuran_file (int | None): Ukuran file setelah dinormalkan (byte).
+        durasi_normalisasi_ms (int | None): Waktu normalisasi file (milidetik).
+        lebar (int | None): Lebar intrinsik gambar (piksel).
+        tinggi (int | None): Tinggi intrinsik gambar (piksel).
+        placeholder (str | None): Placeholder buram berupa data URI kecil (LQIP).
         review_id (int): Foreign key yang menunjuk ke ulasan induknya.
     """
     __tablename__ = 'foto_ulasan'
 
     # Mendefinisikan kolom-kolom pada tabel 'foto_ulasan'
     id = db.Column(db.Integer, primary_key=True)
-    # Kolom untuk menyimpan nama file unik dari gambar yang diunggah
-    nama_file = db.Column(db.String(100), nullable=False)
+    # Kolom untuk menyimpan nama file berbasis konten; beberapa foto dapat merujuk file yang sama
+    nama_file = db.Column(db.String(100), nullable=False, index=True)
+    # Kolom untuk mencatat varian turunan (thumbnail) yang sudah dibuat
+    varian = db.Column(db.String(100), nullable=True)
+    # Statistik normalisasi; kosong jika konten dipakai ulang dari unggahan sebelumnya
+    ukuran_asli = db.Column(db.Integer, nullable=True)
+    ukuran_file = db.Column(db.Integer, nullable=True)
+    durasi_normalisasi_ms = db.Column(db.Integer, nullable=True)
+    # Dimensi dan placeholder agar galeri dapat digambar sebelum foto selesai diunduh
+    lebar = db.Column(db.Integer, nullable=True)
+    tinggi = db.Column(db.Integer, nullable=True)
+    placeholder = db.Column(db.Text, nullable=True)
 
     # Foreign Key yang menghubungkan foto ini ke sebuah review spesifik
     # Setiap foto harus terkait dengan satu review
     review_id = db.Column(db.Integer, db.ForeignKey('reviews.id'), nullable=False)
 
+    def catat_normalisasi(self, stats):
+        """Mencatat hasil normalisasi file unggahan beserta dimensi dan placeholdernya.
+
+        Args:
+            stats (dict): Hasil `image_pipeline.normalize_upload`, atau `inspect_image`
+                jika normalisasi dimatikan.
+        """
+        self.lebar = stats['lebar']
+        self.tinggi = stats['tinggi']
+        self.placeholder = stats['placeholder']
+        if 'ukuran_asli' in stats:
+            self.ukuran_asli = stats['ukuran_asli']
+            self.ukuran_file = stats['ukuran_file']
+            self.durasi_normalisasi_ms = round(stats['durasi'] * 1000)
+
     def __repr__(self):
         """Mengembalikan representasi string dari objek FotoUlasan untuk debugging.
 
@@ -0,0 +1,49 @@
+from app import db
+from datetime import datetime, timezone
+
+class ImageJob(db.Model):
+    """Model untuk status pemrosesan turunan sebuah foto ulasan.
+
+    Setiap foto yang diunggah saat `IMAGE_PROCESSING_MODE` bernilai 'pool'
+    mendapat satu job. Job dikerjakan oleh process pool di luar thread request
+    dan dicoba ulang hingga `IMAGE_JOB_MAX_ATTEMPTS` kali jika gagal.
+
+    Attributes:
+        id (int): Primary key unik untuk setiap job.
+        foto_id (int): Foreign key ke foto ulasan yang diproses.
+        status (str): Status job: 'pending', 'done', atau 'failed'.
+        attempts (int): Jumlah percobaan pemrosesan yang sudah selesai.
+        last_error (str | None): Pesan error terakhir saat pemrosesan gagal.
+        lease_token (str | None): Token proses web yang mengklaim ulang job tertinggal.
+        lease_until (datetime | None): Batas waktu lease; setelah lewat job dapat diklaim ulang.
+        tanggal_dibuat (datetime): Timestamp saat job dibuat (UTC).
+        tanggal_selesai (datetime | None): Timestamp saat job selesai atau gagal permanen (UTC).
+    """
+    __tablename__ = 'image_jobs'
+
+    # Status yang dipakai oleh process pool
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    # Mendefinisikan kolom-kolom pada tabel 'image_jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    foto_id = db.Column(db.Integer, db.ForeignKey('foto_ulasan.id'), nullable=False, unique=True)
+    status = db.Column(db.String(10), nullable=False, default=PENDING, index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    lease_token = db.Column(db.String(32), nullable=True, index=True)
+    lease_until = db.Column(db.DateTime, nullable=True)
+    tanggal_dibuat = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    tanggal_selesai = db.Column(db.DateTime, nullable=True)
+
+    # Relasi one-to-one ke foto; job ikut terhapus bersama fotonya
+    foto = db.relationship('FotoUlasan', backref=db.backref('job', uselist=False, cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        """Mengembalikan representasi string dari objek ImageJob untuk debugging.
+
+        Returns:
+            str: Representasi string dari objek.
+        """
+        return f'<ImageJob {self.id} foto={self.foto_id} {self.status}>'
@@ -31,7 +31,7 @@ class PaketWisata(db.Model):
     harga = db.Column(db.Integer, nullable=False)
 
     # Kolom boolean untuk menandai paket sebagai promosi atau unggulan
-    is_promoted = db.Column(db.Boolean, default=False, nullable=False)
+    is_promoted = db.Column(db.Boolean, default=False, nullable=False, index=True)
 
     # Kolom untuk mencatat waktu pembuatan, default ke waktu UTC saat ini
     tanggal_dibuat = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -25,7 +25,7 @@ class Wisata(db.Model):
     # Mendefinisikan kolom-kolom pada tabel 'wisata'
     id = db.Column(db.Integer, primary_key=True)
     nama = db.Column(db.String(100), nullable=False, index=True)
-    kategori = db.Column(db.String(50), nullable=False)
+    kategori = db.Column(db.String(50), nullable=False, index=True)
     lokasi = db.Column(db.String(200), nullable=False)
     deskripsi = db.Column(db.Text, nullable=False)
     gambar_url = db.Column(db.String(255), nullable=True)
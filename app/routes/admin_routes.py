@@ -1,6 +1,6 @@
 import json
 from datetime import datetime, timedelta, timezone
-from flask import Blueprint, render_template, abort, flash, redirect, url_for, request
+from flask import Blueprint, render_template, abort, flash, redirect, url_for, request, jsonify, current_app
 from flask_login import login_required, current_user
 from app.utils.decorators import admin_required
 from app import db, limiter
@@ -9,6 +9,9 @@ from app.models.user import User
 from app.models.event import Event
 from app.models.paket_wisata import PaketWisata
 from app.forms import AdminEditUserForm
+from app.services.email_outbox import outbox_stats
+from app.services.email_queue import get_email_queue
+from app.services.email_renderer import get_email_renderer
 from flask_wtf import FlaskForm
 from sqlalchemy import func
 
@@ -272,3 +275,20 @@ def manage_paket_wisata():
                          daftar_paket=pagination.items, 
                          pagination=pagination,
                          delete_form=delete_form)
+
+@admin.route('/admin/api/email/metrics')
+@login_required
+@admin_required
+def email_metrics():
+    """Endpoint API untuk memantau antrean pengiriman email (khusus admin).
+
+    Returns:
+        Response: Objek JSON berisi mode pengiriman, kedalaman antrean, latensi pengiriman,
+                  jumlah email outbox per status, dan statistik renderer email.
+    """
+    return jsonify({
+        'mode': current_app.config.get('MAIL_DELIVERY_MODE', 'queue'),
+        'queue': get_email_queue().metrics(),
+        'outbox': outbox_stats(),
+        'renderer': get_email_renderer().stats(),
+    })
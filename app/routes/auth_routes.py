@@ -8,6 +8,16 @@ from app.services.email_handler import send_email
 # Membuat Blueprint untuk rute-rute terkait autentikasi
 auth = Blueprint('auth', __name__)
 
+def _send_confirmation(user, token):
+    """Mengirim email konfirmasi akun untuk pengguna yang baru mendaftar.
+
+    Args:
+        user (User): Pengguna baru.
+        token (str): Token konfirmasi akun.
+    """
+    send_email(user.email, 'Konfirmasi Akun Lelana.id Anda',
+               'auth/email/confirm', user=user, token=token)
+
 @auth.route('/register', methods=['GET', 'POST'])
 @limiter.limit("5 per hour") # Batasi pendaftaran 5 kali per jam per IP
 def register():
@@ -37,15 +47,21 @@ def register():
         # Menyetel password (akan di-hash oleh setter di model)
         user.password = form.password.data
 
-        # Menambahkan dan menyimpan pengguna ke database
+        # Menambahkan pengguna ke sesi; flush agar ID tersedia untuk token
         db.session.add(user)
-        db.session.commit()
-        current_app.logger.info('User baru "%s" (%s) telah terdaftar.', user.username, user.email)
+        db.session.flush()
 
-        # Membuat token dan mengirim email konfirmasi
         token = user.generate_confirmation_token()
-        send_email(user.email, 'Konfirmasi Akun Lelana.id Anda', 
-                   'auth/email/confirm', user=user, token=token)
+        if current_app.config.get('MAIL_DELIVERY_MODE', 'queue') == 'outbox':
+            # Baris outbox ditulis dalam transaksi yang sama dengan pengguna baru
+            _send_confirmation(user, token)
+            db.session.commit()
+        else:
+            # Email langsung keluar saat dikirim, sehingga pengguna disimpan lebih dulu
+            # agar email tidak pernah terkirim untuk pendaftaran yang gagal di-commit
+            db.session.commit()
+            _send_confirmation(user, token)
+        current_app.logger.info('User baru "%s" (%s) telah terdaftar.', user.username, user.email)
         
         # Langsung login pengguna setelah registrasi
         login_user(user)
@@ -125,6 +141,7 @@ def resend_confirmation():
     token = current_user.generate_confirmation_token()
     send_email(current_user.email, 'Selangkah lagi! Konfirmasi akun Lelana.id kamu 🌿', 
                'auth/email/confirm', user=current_user, token=token)
+    db.session.commit()
     
     flash('Email konfirmasi baru telah dikirimkan.', 'success')
     return redirect(url_for('main.index'))
@@ -186,6 +203,7 @@ def password_reset_request():
             send_email(user.email, 'Reset Password Akun Lelana.id Anda',
                        'auth/email/reset_password',
                        user=user, token=token)
+            db.session.commit()
             
             current_app.logger.info('Email reset password dikirim ke %s.', user.email)
         # Pesan yang ditampilkan sama baik email ada atau tidak, untuk keamanan
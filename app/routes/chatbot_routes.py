@@ -1,17 +1,44 @@
-from flask import Blueprint, request, jsonify
-from flask_login import login_required
-from app.services.chatbot_handler import get_bot_response
+import json
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
+from flask_login import login_required, current_user
+from app.services.chatbot_handler import StreamInterrupted, get_bot_response, stream_bot_response
+from app.services.chatbot_cache import get_response_cache
+from app.services.chatbot_executor import get_chatbot_executor, ExecutorSaturated, DeadlineExceeded
+from app.services.singleflight import get_singleflight
+from app.services.circuit_breaker import get_gemini_breaker
+from app.services.catalog_index import get_catalog_index
+from app.services.conversation_store import get_conversation_store
+from app.utils.decorators import admin_required
 
 # Membuat Blueprint untuk rute-rute terkait chatbot
 chatbot = Blueprint('chatbot', __name__)
 
+# Pesan ramah untuk kondisi chatbot sedang penuh, terlalu lama merespons, atau jawabannya terputus
+BUSY_MESSAGE = "Putri lagi melayani banyak pertanyaan nih. Coba tanya lagi sebentar lagi ya! 🙏"
+TIMEOUT_MESSAGE = "Maaf, Putri butuh waktu terlalu lama untuk menjawab. Coba tanya lagi ya! 😢"
+STREAM_INTERRUPTED_MESSAGE = "Maaf, jawaban Putri terputus di tengah jalan. Coba tanya lagi ya! 😢"
+
+def _busy_response(e):
+    """Membuat respons 503 cepat ketika kapasitas chatbot penuh.
+
+    Args:
+        e (ExecutorSaturated): Exception penolakan dari executor.
+
+    Returns:
+        tuple[Response, int, dict]: Objek JSON, status 503, dan header Retry-After.
+    """
+    current_app.logger.warning('Permintaan chatbot user %s ditolak: %s', current_user.id, str(e))
+    return jsonify({'error': str(e), 'response': BUSY_MESSAGE}), 503, {'Retry-After': '5'}
+
 @chatbot.route('/api/chatbot/ask', methods=['POST'])
 @login_required
 def ask_putri():
     """Endpoint API untuk menerima dan merespons pertanyaan ke chatbot.
 
     Menerima pertanyaan pengguna dalam format JSON, memanggil layanan chatbot
-    untuk mendapatkan jawaban, dan mengembalikannya dalam format JSON.
+    melalui executor terbatas untuk mendapatkan jawaban, dan mengembalikannya
+    dalam format JSON. Mengembalikan 503 jika kapasitas penuh dan 504 jika
+    jawaban melewati batas waktu.
 
     Returns:
         Response: Objek JSON berisi jawaban dari chatbot atau pesan error.
@@ -26,9 +53,78 @@ def ask_putri():
         # Mengembalikan respons error jika tidak ada pertanyaan
         return jsonify({'error': 'Pertanyaan tidak boleh kosong.'}), 400
 
-    # Memanggil fungsi dari service layer untuk mendapatkan respons bot
-    bot_response = get_bot_response(user_query)
-    print(bot_response)
+    # Menjalankan layanan chatbot di executor terbatas agar worker WSGI tidak tertahan
+    try:
+        bot_response = get_chatbot_executor().run(get_bot_response, user_query, current_user.id, user_id=current_user.id)
+    except ExecutorSaturated as e:
+        return _busy_response(e)
+    except DeadlineExceeded as e:
+        current_app.logger.error('Permintaan chatbot user %s melewati batas waktu: %s', current_user.id, str(e))
+        return jsonify({'error': str(e), 'response': TIMEOUT_MESSAGE}), 504
     
     # Mengembalikan respons dari bot dalam format JSON
     return jsonify({'response': bot_response})
+
+@chatbot.route('/api/chatbot/ask/stream', methods=['POST'])
+@login_required
+def ask_putri_stream():
+    """Endpoint API streaming (Server-Sent Events) untuk pertanyaan ke chatbot.
+
+    Menerima pertanyaan dalam format JSON yang sama dengan `ask_putri`, lalu
+    meneruskan potongan jawaban ke browser sebagai event `data` berisi JSON
+    `{"delta": "..."}` dan diakhiri dengan event `done`, atau event `error` berisi
+    JSON `{"error": "..."}` jika jawaban terputus di tengah jalan. Endpoint `ask_putri`
+    tetap tersedia sebagai fallback untuk klien yang tidak mendukung streaming.
+
+    Returns:
+        Response: Stream `text/event-stream` berisi potongan jawaban atau pesan error JSON.
+    """
+    data = request.get_json(silent=True) or {}
+    user_query = data.get('query')
+
+    if not user_query:
+        return jsonify({'error': 'Pertanyaan tidak boleh kosong.'}), 400
+
+    # Stream juga memakai slot kapasitas executor agar batas global dan per pengguna berlaku
+    executor = get_chatbot_executor()
+    user_id = current_user.id
+    try:
+        executor.acquire(user_id)
+    except ExecutorSaturated as e:
+        return _busy_response(e)
+
+    @stream_with_context
+    def generate():
+        # Setiap potongan dikirim sebagai JSON agar baris baru tetap aman di format SSE
+        try:
+            for chunk in stream_bot_response(user_query, user_id):
+                yield f"data: {json.dumps({'delta': chunk})}\n\n"
+        except StreamInterrupted:
+            yield f"event: error\ndata: {json.dumps({'error': STREAM_INTERRUPTED_MESSAGE})}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
+
+    # Menonaktifkan cache dan buffering proxy agar token langsung sampai ke browser
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    response = Response(generate(), mimetype='text/event-stream', headers=headers)
+    # Slot dilepas ketika stream selesai atau koneksi ditutup oleh klien
+    response.call_on_close(lambda: executor.release(user_id))
+    return response
+
+@chatbot.route('/api/chatbot/metrics')
+@login_required
+@admin_required
+def chatbot_metrics():
+    """Endpoint API untuk memantau statistik layanan chatbot (khusus admin).
+
+    Returns:
+        Response: Objek JSON berisi statistik cache, executor, single-flight, circuit breaker, indeks katalog, dan riwayat percakapan.
+    """
+    return jsonify({
+        'cache': get_response_cache().stats(),
+        'executor': get_chatbot_executor().metrics(),
+        'singleflight': get_singleflight().stats(),
+        'breaker': get_gemini_breaker().stats(),
+        'retrieval': get_catalog_index().stats(),
+        'conversations': get_conversation_store().stats(),
+    })
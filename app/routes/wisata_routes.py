@@ -4,9 +4,13 @@ from app import db, limiter
 from app.models.wisata import Wisata
 from app.models.review import Review
 from app.models.foto_ulasan import FotoUlasan
+from app.models.image_job import ImageJob
 from app.forms import WisataForm, ReviewForm
 from app.utils.decorators import admin_required
 from app.services.file_handler import save_pictures
+from app.services.image_pipeline import generate_derivatives
+from app.services.image_worker import submit_jobs
+from app.services.upload_store import discard_uploads
 from sqlalchemy.orm import joinedload, subqueryload
 from sqlalchemy.exc import SQLAlchemyError
 from flask_wtf import FlaskForm
@@ -71,19 +75,54 @@ def detail_wisata(id):
             wisata_reviewed=w
         )
         db.session.add(review_baru)
+        image_jobs = []
+        # File yang ditulis request ini, untuk dibatalkan jika transaksi gagal
+        written = []
 
         # Memeriksa apakah ada file foto yang diunggah
         if form.foto.data and form.foto.data[0].filename:
             try:
                 # Menyimpan gambar menggunakan file handler dan mendapatkan nama filenya
-                filenames = save_pictures(form.foto.data)
-                # Membuat objek FotoUlasan untuk setiap file yang disimpan
+                # Foto yang sama dalam satu ulasan hanya disimpan sekali
+                upload_stats = {}
+                filenames = list(dict.fromkeys(save_pictures(form.foto.data, written, upload_stats)))
+                # Konten yang sudah pernah diunggah memakai ulang turunan yang sudah ada
+                known_variants = dict(
+                    db.session.query(FotoUlasan.nama_file, FotoUlasan.varian)
+                    .filter(FotoUlasan.nama_file.in_(filenames), FotoUlasan.varian.isnot(None))
+                )
+                # Dimensi dan placeholder juga dipakai ulang karena file tidak dinormalkan lagi
+                known_details = {
+                    row.nama_file: row for row in
+                    db.session.query(FotoUlasan.nama_file, FotoUlasan.lebar, FotoUlasan.tinggi, FotoUlasan.placeholder)
+                    .filter(FotoUlasan.nama_file.in_(filenames), FotoUlasan.placeholder.isnot(None))
+                }
+                # Membuat objek FotoUlasan untuk setiap file yang disimpan. Pada mode 'pool'
+                # turunan dibuat oleh process pool setelah commit; pada mode 'sync' langsung di sini.
+                use_pool = current_app.config.get('IMAGE_PROCESSING_MODE', 'pool') == 'pool'
                 for filename in filenames:
                     foto_baru = FotoUlasan(nama_file=filename, review=review_baru)
+                    if filename in upload_stats:
+                        foto_baru.catat_normalisasi(upload_stats[filename])
+                    elif filename in known_details:
+                        known = known_details[filename]
+                        foto_baru.lebar, foto_baru.tinggi, foto_baru.placeholder = \
+                            known.lebar, known.tinggi, known.placeholder
+                    if filename in known_variants:
+                        foto_baru.varian = known_variants[filename]
+                    elif use_pool:
+                        image_jobs.append(ImageJob(foto=foto_baru))
+                    else:
+                        try:
+                            foto_baru.varian = ','.join(generate_derivatives(filename))
+                        except ValueError as e:
+                            # Foto tetap ditampilkan dari file asli jika turunan gagal dibuat
+                            current_app.logger.warning('Gagal membuat turunan foto %s: %s', filename, e)
                     db.session.add(foto_baru)
             except ValueError as e:
                 # Rollback jika terjadi error validasi file (misal: bukan gambar)
                 db.session.rollback()
+                discard_uploads(written)
                 current_app.logger.warning('User %s gagal unggah foto ulasan: %s', 
                     current_user.username, str(e), exc_info=True
                 )
@@ -92,6 +131,7 @@ def detail_wisata(id):
             except SQLAlchemyError as e:
                 # Rollback jika terjadi error saat menyimpan ke database
                 db.session.rollback()
+                discard_uploads(written)
                 current_app.logger.error('Database error saat menyimpan foto ulasan untuk user %s: %s', 
                     current_user.username, str(e), exc_info=True
                 )
@@ -100,6 +140,7 @@ def detail_wisata(id):
             except Exception as e:
                 # Rollback untuk error tak terduga lainnya
                 db.session.rollback()
+                discard_uploads(written)
                 current_app.logger.critical('Error tidak terduga saat user %s mengunggah foto: %s', 
                     current_user.username, str(e), exc_info=True
                 )
@@ -107,7 +148,15 @@ def detail_wisata(id):
                 return redirect(url_for('wisata.detail_wisata', id=w.id))
 
         # Menyimpan semua perubahan (review dan foto) ke database
-        db.session.commit()
+        try:
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            discard_uploads(written)
+            raise
+        # Turunan foto diproses di luar request setelah foto tersimpan
+        if image_jobs:
+            submit_jobs(image_jobs)
         flash('Terima kasih! Review Anda telah ditambahkan.', 'success')
         return redirect(url_for('wisata.detail_wisata', id=w.id))
     
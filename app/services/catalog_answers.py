@@ -0,0 +1,262 @@
+import calendar
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models.wisata import Wisata
+from app.models.event import Event
+from app.models.paket_wisata import PaketWisata
+from app.services.chatbot_cache import normalize_query
+
+# Nama bulan dalam Bahasa Indonesia untuk format tanggal jawaban
+NAMA_BULAN = [
+    'Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+    'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember'
+]
+
+def _words(*phrases):
+    """Menormalisasi daftar kata kunci dengan aturan yang sama seperti pertanyaan.
+
+    Args:
+        *phrases (str): Kata atau frasa kunci.
+
+    Returns:
+        set[str]: Kumpulan token yang sudah dinormalisasi.
+    """
+    return {token for phrase in phrases for token in normalize_query(phrase).split()}
+
+# Kata pengisi yang tidak mengubah maksud pertanyaan
+FILLER_WORDS = _words(
+    'apa', 'apa aja', 'saja', 'ada', 'yang', 'yg', 'di', 'ini', 'itu', 'dong', 'deh', 'kak', 'sih',
+    'nih', 'ya', 'putri', 'mau', 'tau', 'tahu', 'info', 'informasi', 'daftar', 'list', 'tolong',
+    'kasih', 'berikan', 'sebutkan', 'apakah', 'lagi', 'aku', 'saya', 'mana', 'punya', 'lelana',
+    'tampilkan', 'lihat', 'cari', 'ga', 'gak', 'nggak', 'kah', 'untuk', 'buat'
+)
+
+EVENT_WORDS = _words('event', 'acara', 'festival', 'agenda', 'kegiatan')
+PAKET_WORDS = _words('paket', 'paket wisata')
+PROMO_WORDS = _words('promo', 'promosi', 'unggulan', 'rekomendasi', 'spesial')
+WISATA_WORDS = _words('wisata', 'destinasi', 'tempat', 'objek')
+KATEGORI_WORDS = _words('kategori', 'jenis', 'tipe')
+
+# Frasa waktu untuk intent event beserta nama jendela waktunya
+TIME_PHRASES = [
+    ('hari ini', 'hari_ini'),
+    ('minggu ini', 'minggu_ini'),
+    ('pekan ini', 'minggu_ini'),
+    ('akhir pekan', 'akhir_pekan'),
+    ('weekend', 'akhir_pekan'),
+    ('bulan ini', 'bulan_ini'),
+    ('mendatang', 'mendatang'),
+    ('terdekat', 'mendatang'),
+    ('akan datang', 'mendatang'),
+]
+TIME_WORDS = _words(*(phrase for phrase, _ in TIME_PHRASES))
+
+def _format_tanggal(value):
+    """Memformat tanggal menjadi teks Bahasa Indonesia, misalnya '17 Agustus 2025'.
+
+    Args:
+        value (datetime): Tanggal yang akan diformat.
+
+    Returns:
+        str: Tanggal dalam format teks.
+    """
+    return f"{value.day} {NAMA_BULAN[value.month - 1]} {value.year}"
+
+def _format_harga(value):
+    """Memformat harga menjadi format Rupiah, misalnya 'Rp150.000'.
+
+    Args:
+        value (int): Harga dalam Rupiah.
+
+    Returns:
+        str: Harga dalam format teks.
+    """
+    return 'Rp' + f"{value:,}".replace(',', '.')
+
+def _confidence(tokens, vocabulary):
+    """Menghitung proporsi token pertanyaan yang dikenali oleh sebuah intent.
+
+    Args:
+        tokens (list[str]): Token dari pertanyaan yang sudah dinormalisasi.
+        vocabulary (set[str]): Token yang dikenali intent beserta kata pengisi.
+
+    Returns:
+        float: Nilai keyakinan antara 0 dan 1.
+    """
+    if not tokens:
+        return 0.0
+    return sum(1 for token in tokens if token in vocabulary or token in FILLER_WORDS) / len(tokens)
+
+def _event_window(name, now):
+    """Menentukan rentang waktu [mulai, selesai) untuk jendela waktu event.
+
+    Args:
+        name (str): Nama jendela waktu dari `TIME_PHRASES`.
+        now (datetime): Waktu saat ini.
+
+    Returns:
+        tuple[datetime, datetime | None, str]: Awal, akhir (None = tanpa batas), dan label jawaban.
+    """
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if name == 'hari_ini':
+        return today, today + timedelta(days=1), 'hari ini'
+    if name == 'minggu_ini':
+        return today, today + timedelta(days=7 - today.weekday()), 'minggu ini'
+    if name == 'akhir_pekan':
+        # Pada hari Minggu, akhir pekan yang dimaksud adalah hari ini saja
+        if today.weekday() == 6:
+            return today, today + timedelta(days=1), 'akhir pekan ini'
+        saturday = today + timedelta(days=5 - today.weekday())
+        return saturday, saturday + timedelta(days=2), 'akhir pekan ini'
+    if name == 'bulan_ini':
+        last_day = calendar.monthrange(today.year, today.month)[1]
+        return today, today.replace(day=last_day) + timedelta(days=1), 'bulan ini'
+    return today, None, 'dalam waktu dekat'
+
+def _answer_event(query_text, tokens, limit, now):
+    """Intent: daftar event dalam jendela waktu tertentu.
+
+    Args:
+        query_text (str): Pertanyaan yang sudah dinormalisasi.
+        tokens (list[str]): Token pertanyaan.
+        limit (int): Jumlah maksimal item dalam jawaban.
+        now (datetime): Waktu saat ini.
+
+    Returns:
+        tuple[float, callable] | None: Nilai keyakinan dan fungsi penyusun jawaban,
+        atau None jika tidak cocok.
+    """
+    if not EVENT_WORDS.intersection(tokens):
+        return None
+
+    window = 'mendatang'
+    for phrase, name in TIME_PHRASES:
+        if normalize_query(phrase) in query_text:
+            window = name
+            break
+
+    def build_reply():
+        start, end, label = _event_window(window, now)
+        # Memanfaatkan indeks pada kolom Event.tanggal
+        query = Event.query.filter(Event.tanggal >= start)
+        if end is not None:
+            query = query.filter(Event.tanggal < end)
+        events = query.order_by(Event.tanggal).limit(limit).all()
+
+        if not events:
+            return f"Belum ada event yang terjadwal {label} di Lelana.id nih. Cek lagi nanti ya! 😊"
+        lines = [f"Ini event {label} di Lelana.id yaa:"]
+        lines += [f"- **{e.nama}** — {_format_tanggal(e.tanggal)}, {e.lokasi}" for e in events]
+        return '\n'.join(lines)
+
+    return _confidence(tokens, EVENT_WORDS | TIME_WORDS), build_reply
+
+def _answer_paket_promosi(query_text, tokens, limit, now):
+    """Intent: daftar paket wisata yang sedang dipromosikan.
+
+    Args:
+        query_text (str): Pertanyaan yang sudah dinormalisasi.
+        tokens (list[str]): Token pertanyaan.
+        limit (int): Jumlah maksimal item dalam jawaban.
+        now (datetime): Waktu saat ini.
+
+    Returns:
+        tuple[float, callable] | None: Nilai keyakinan dan fungsi penyusun jawaban,
+        atau None jika tidak cocok.
+    """
+    if not PAKET_WORDS.intersection(tokens) or not PROMO_WORDS.intersection(tokens):
+        return None
+
+    def build_reply():
+        # Memanfaatkan indeks pada kolom PaketWisata.is_promoted
+        pakets = PaketWisata.query.filter(PaketWisata.is_promoted.is_(True)) \
+            .order_by(PaketWisata.tanggal_dibuat.desc()).limit(limit).all()
+
+        if not pakets:
+            return "Saat ini belum ada paket wisata yang sedang dipromosikan di Lelana.id. 😊"
+        lines = ["Paket wisata yang lagi dipromosikan di Lelana.id:"]
+        lines += [f"- **{p.nama}** — mulai {_format_harga(p.harga)}" for p in pakets]
+        lines.append("Ingat ya, Lelana.id hanya menampilkan info paket, bukan tempat booking. 😉")
+        return '\n'.join(lines)
+
+    return _confidence(tokens, PAKET_WORDS | PROMO_WORDS | WISATA_WORDS), build_reply
+
+def _answer_wisata_kategori(query_text, tokens, limit, now):
+    """Intent: daftar tempat wisata berdasarkan kategori.
+
+    Args:
+        query_text (str): Pertanyaan yang sudah dinormalisasi.
+        tokens (list[str]): Token pertanyaan.
+        limit (int): Jumlah maksimal item dalam jawaban.
+        now (datetime): Waktu saat ini.
+
+    Returns:
+        tuple[float, callable] | None: Nilai keyakinan dan fungsi penyusun jawaban,
+        atau None jika tidak cocok.
+    """
+    if not WISATA_WORDS.intersection(tokens):
+        return None
+
+    # Mencocokkan kategori yang benar-benar ada di database (kolom terindeks)
+    kategori_list = [row[0] for row in db.session.query(Wisata.kategori).distinct()]
+    matched = None
+    for kategori in kategori_list:
+        kategori_tokens = normalize_query(kategori).split()
+        if kategori_tokens and all(token in tokens for token in kategori_tokens):
+            matched = kategori
+            break
+    if matched is None:
+        return None
+
+    def build_reply():
+        daftar = Wisata.query.filter(Wisata.kategori == matched).order_by(Wisata.nama).limit(limit).all()
+        lines = [f"Ini beberapa wisata kategori **{matched}** di Lelana.id:"]
+        lines += [f"- **{w.nama}** — {w.lokasi}" for w in daftar]
+        return '\n'.join(lines)
+
+    vocabulary = WISATA_WORDS | KATEGORI_WORDS | set(normalize_query(matched).split())
+    return _confidence(tokens, vocabulary), build_reply
+
+# Urutan intent yang dicoba oleh router
+INTENT_HANDLERS = (
+    ('event', _answer_event),
+    ('paket_promosi', _answer_paket_promosi),
+    ('wisata_kategori', _answer_wisata_kategori),
+)
+
+def answer_from_catalog(user_query: str):
+    """Mencoba menjawab pertanyaan faktual langsung dari data katalog.
+
+    Router mencocokkan pertanyaan dengan intent sederhana (event per jendela
+    waktu, paket promosi, wisata per kategori). Jawaban hanya dipakai jika
+    keyakinan intent mencapai `CHATBOT_INTENT_MIN_CONFIDENCE`; selain itu
+    pertanyaan diteruskan ke Gemini.
+
+    Args:
+        user_query (str): Pertanyaan mentah dari pengguna.
+
+    Returns:
+        str | None: Jawaban dari katalog, atau None jika tidak ada intent yang cocok.
+    """
+    query_text = normalize_query(user_query)
+    tokens = query_text.split()
+    if not tokens:
+        return None
+
+    min_confidence = current_app.config.get('CHATBOT_INTENT_MIN_CONFIDENCE', 0.85)
+    limit = current_app.config.get('CHATBOT_INTENT_MAX_ITEMS', 5)
+    now = datetime.now()
+
+    for name, handler in INTENT_HANDLERS:
+        result = handler(query_text, tokens, limit, now)
+        if result is None:
+            continue
+
+        confidence, build_reply = result
+        if confidence >= min_confidence:
+            current_app.logger.info("Kueri chatbot dijawab dari katalog (intent %s, keyakinan %.2f).", name, confidence)
+            return build_reply()
+        current_app.logger.info("Intent %s cocok dengan keyakinan rendah (%.2f), diteruskan ke Gemini.", name, confidence)
+
+    return None
@@ -0,0 +1,187 @@
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.models.wisata import Wisata
+from app.models.event import Event
+from app.models.paket_wisata import PaketWisata
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - fcntl tidak tersedia di Windows
+    fcntl = None
+
+# Model-model yang dianggap sebagai konten katalog
+CATALOG_MODELS = (Wisata, Event, PaketWisata)
+
+# Daftar callback yang dipanggil setiap kali konten katalog berubah
+_subscribers = []
+
+# Kunci pengaman saat membuat catatan versi milik aplikasi pertama kali
+_init_lock = threading.Lock()
+
+# Jumlah versi terakhir yang ditulis proses ini dan masih diingat
+_OWN_VERSIONS = 64
+
+def subscribe(callback):
+    """Mendaftarkan callback yang dipanggil setelah perubahan katalog di-commit.
+
+    Callback menerima daftar perubahan berupa tuple `(operasi, nama_tabel, id)`,
+    misalnya `('update', 'wisata', 3)`, dan dijalankan di dalam konteks aplikasi.
+    Dapat dipakai sebagai dekorator.
+
+    Args:
+        callback (callable): Fungsi yang menerima daftar perubahan.
+
+    Returns:
+        callable: Callback yang sama, agar dapat dipakai sebagai dekorator.
+    """
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+    return callback
+
+def catalog_version():
+    """Membaca versi katalog bersama dari `CATALOG_VERSION_FILE`.
+
+    Versi berupa token acak yang diganti setiap kali ada perubahan katalog
+    di-commit oleh worker mana pun, sehingga worker lain dapat mengetahui
+    bahwa cache atau indeks miliknya sudah usang.
+
+    Returns:
+        str | None: Token versi saat ini, atau None jika file versi tidak dipakai atau belum ada.
+    """
+    path = current_app.config.get('CATALOG_VERSION_FILE')
+    if not path:
+        return None
+    try:
+        with open(path, encoding='ascii') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def _own_versions():
+    """Mengambil catatan versi yang ditulis oleh proses ini untuk aplikasi saat ini.
+
+    Returns:
+        tuple[OrderedDict, threading.Lock]: Peta `versi baru -> versi sebelumnya` dan kuncinya.
+    """
+    app = current_app._get_current_object()
+    own = app.extensions.get('catalog_versions')
+    if own is None:
+        with _init_lock:
+            own = app.extensions.get('catalog_versions')
+            if own is None:
+                own = (OrderedDict(), threading.Lock())
+                app.extensions['catalog_versions'] = own
+    return own
+
+def _bump_version():
+    """Mengganti token versi katalog bersama dan mencatatnya sebagai milik proses ini."""
+    path = current_app.config.get('CATALOG_VERSION_FILE')
+    if not path:
+        return
+
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    version = uuid.uuid4().hex
+    # Membaca versi lama dan menulis versi baru tanpa diselingi worker lain
+    with open(path + '.lock', 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            previous = catalog_version()
+            fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.catalog-', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='ascii') as f:
+                    f.write(version)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    versions, lock = _own_versions()
+    with lock:
+        versions[version] = previous
+        while len(versions) > _OWN_VERSIONS:
+            versions.popitem(last=False)
+
+def changed_elsewhere(seen, current):
+    """Menentukan apakah katalog diubah worker lain sejak versi `seen`.
+
+    Perubahan dari proses ini sudah diteruskan langsung ke subscriber, sehingga
+    hanya perubahan dari worker lain yang mengharuskan cache atau indeks
+    dimuat ulang seluruhnya.
+
+    Args:
+        seen (str | None): Versi terakhir yang sudah diselaraskan pemanggil.
+        current (str | None): Versi saat ini hasil `catalog_version`.
+
+    Returns:
+        bool: True jika ada perubahan dari worker lain di antara kedua versi.
+    """
+    versions, lock = _own_versions()
+    with lock:
+        version = current
+        while version != seen and version in versions:
+            version = versions[version]
+    return version != seen
+
+def _make_recorder(operation):
+    """Membuat listener mapper yang mencatat perubahan baris ke `session.info`.
+
+    Args:
+        operation (str): Jenis operasi ('insert', 'update', atau 'delete').
+
+    Returns:
+        callable: Listener untuk event mapper SQLAlchemy.
+    """
+    def record(mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault('catalog_changes', []).append(
+                (operation, target.__tablename__, target.id)
+            )
+    return record
+
+# Mencatat setiap insert, update, dan delete pada model katalog
+for _model in CATALOG_MODELS:
+    for _operation in ('insert', 'update', 'delete'):
+        event.listen(_model, f'after_{_operation}', _make_recorder(_operation))
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch_catalog_changes(session):
+    """Meneruskan perubahan katalog yang sudah di-commit ke semua subscriber.
+
+    Args:
+        session (Session): Sesi SQLAlchemy yang baru saja melakukan commit.
+    """
+    changes = session.info.pop('catalog_changes', None)
+    if not changes or not has_app_context():
+        return
+
+    try:
+        _bump_version()
+    except OSError as e:
+        current_app.logger.error('Gagal memperbarui versi katalog bersama: %s', str(e))
+
+    for callback in list(_subscribers):
+        try:
+            callback(changes)
+        except Exception as e:
+            current_app.logger.error('Gagal memproses perubahan katalog: %s', str(e), exc_info=True)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_changes(session):
+    """Membuang catatan perubahan katalog ketika transaksi dibatalkan.
+
+    Args:
+        session (Session): Sesi SQLAlchemy yang melakukan rollback.
+    """
+    session.info.pop('catalog_changes', None)
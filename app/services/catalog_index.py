@@ -0,0 +1,411 @@
+import math
+import threading
+import time
+from collections import Counter
+import numpy as np
+from flask import current_app
+from app.models.wisata import Wisata
+from app.models.event import Event
+from app.models.paket_wisata import PaketWisata
+from app.services.catalog_events import catalog_version, changed_elsewhere, subscribe
+from app.services.chatbot_cache import normalize_query
+from app.services.catalog_answers import FILLER_WORDS, _format_tanggal, _format_harga
+
+# Kunci pengaman saat membuat instance indeks pertama kali
+_init_lock = threading.Lock()
+
+# Kata umum yang tidak membantu membedakan dokumen katalog
+STOP_WORDS = FILLER_WORDS | {
+    'dan', 'atau', 'dengan', 'dari', 'ke', 'pada', 'dalam', 'juga', 'akan', 'bisa', 'dapat',
+    'para', 'oleh', 'sebagai', 'serta', 'karena', 'agar', 'bagi', 'tentang', 'seperti', 'the', 'of',
+}
+
+def tokenize(text: str):
+    """Memecah teks menjadi token yang sudah dinormalisasi untuk indeks pencarian.
+
+    Args:
+        text (str): Teks mentah (deskripsi katalog atau pertanyaan pengguna).
+
+    Returns:
+        list[str]: Token tanpa kata umum dan token satu huruf.
+    """
+    return [token for token in normalize_query(text).split() if len(token) > 1 and token not in STOP_WORDS]
+
+def estimate_tokens(text: str):
+    """Memperkirakan jumlah token model dari panjang teks (sekitar 4 karakter per token).
+
+    Args:
+        text (str): Teks yang akan diperkirakan.
+
+    Returns:
+        int: Perkiraan jumlah token.
+    """
+    return (len(text) + 3) // 4
+
+class CatalogIndex:
+    """Indeks BM25 dalam memori untuk deskripsi wisata, event, dan paket wisata.
+
+    Setiap dokumen menempati satu slot. Posting list per token disimpan sebagai
+    daftar slot dan frekuensi yang diubah menjadi array NumPy saat pencarian,
+    sehingga skor seluruh dokumen dihitung secara tervektorisasi. Dokumen yang
+    diubah atau dihapus cukup ditandai tidak aktif (tombstone) lalu ditambahkan
+    ulang; indeks dibangun ulang penuh jika tombstone terlalu banyak atau indeks
+    sudah melewati `max_age`.
+
+    Attributes:
+        k1 (float): Parameter saturasi frekuensi token BM25.
+        b (float): Parameter normalisasi panjang dokumen BM25.
+        max_age (float): Umur maksimal indeks sebelum dibangun ulang penuh (detik).
+        version (str | None): Versi katalog bersama saat indeks terakhir diselaraskan.
+    """
+
+    def __init__(self, k1=1.5, b=0.75, max_age=600, clock=time.monotonic):
+        """Menginisialisasi indeks kosong yang belum pernah dibangun.
+
+        Args:
+            k1 (float): Parameter saturasi frekuensi token BM25.
+            b (float): Parameter normalisasi panjang dokumen BM25.
+            max_age (float): Umur maksimal indeks (detik).
+            clock (callable): Sumber waktu monotonic, dapat diganti saat pengujian.
+        """
+        self.k1 = k1
+        self.b = b
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.RLock()
+        # Mencegah beberapa thread memuat ulang data dari database bersamaan
+        self.sync_lock = threading.Lock()
+        self._dirty = set()
+        self.version = None
+        self._built_at = None
+        self._rebuilds = 0
+        self._updates = 0
+        self._searches = 0
+        self._search_time = 0.0
+        self._reset()
+
+    def _reset(self):
+        """Mengosongkan seluruh isi indeks."""
+        self._slots = {}
+        self._keys = []
+        self._snippets = []
+        self._doc_terms = []
+        self._lengths = np.zeros(64)
+        self._active = np.zeros(64, dtype=bool)
+        self._postings = {}
+        self._df = Counter()
+        self._active_count = 0
+        self._total_length = 0
+
+    def rebuild(self, documents):
+        """Membangun ulang indeks dari seluruh dokumen katalog.
+
+        Args:
+            documents (Iterable[tuple]): Tuple `(kunci, teks, snippet)` untuk setiap dokumen.
+        """
+        with self._lock:
+            self._reset()
+            for key, text, snippet in documents:
+                self._add(key, text, snippet)
+            self._built_at = self._clock()
+            self._rebuilds += 1
+
+    def upsert(self, key, text, snippet):
+        """Menambahkan dokumen baru atau mengganti dokumen yang sudah ada.
+
+        Args:
+            key (tuple): Kunci dokumen `(nama_tabel, id)`.
+            text (str): Teks yang diindeks.
+            snippet (str): Cuplikan yang disisipkan ke prompt.
+        """
+        with self._lock:
+            self._remove(key)
+            self._add(key, text, snippet)
+            self._updates += 1
+
+    def remove(self, key):
+        """Menghapus dokumen dari indeks jika ada.
+
+        Args:
+            key (tuple): Kunci dokumen `(nama_tabel, id)`.
+        """
+        with self._lock:
+            self._remove(key)
+            self._updates += 1
+
+    def _add(self, key, text, snippet):
+        """Menambahkan dokumen ke slot baru (pemanggil memegang `_lock`)."""
+        terms = Counter(tokenize(text))
+        slot = len(self._keys)
+        if slot >= len(self._lengths):
+            grow = len(self._lengths)
+            self._lengths = np.concatenate([self._lengths, np.zeros(grow)])
+            self._active = np.concatenate([self._active, np.zeros(grow, dtype=bool)])
+
+        self._slots[key] = slot
+        self._keys.append(key)
+        self._snippets.append(snippet)
+        self._doc_terms.append(tuple(terms))
+        length = sum(terms.values())
+        self._lengths[slot] = length
+        self._active[slot] = True
+        self._active_count += 1
+        self._total_length += length
+
+        for term, tf in terms.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = [[], [], None]
+            posting[0].append(slot)
+            posting[1].append(tf)
+            # Array NumPy dibuat ulang pada pencarian berikutnya
+            posting[2] = None
+            self._df[term] += 1
+
+    def _remove(self, key):
+        """Menandai slot dokumen sebagai tidak aktif (pemanggil memegang `_lock`)."""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        self._active[slot] = False
+        self._active_count -= 1
+        self._total_length -= int(self._lengths[slot])
+        for term in self._doc_terms[slot]:
+            self._df[term] -= 1
+        self._doc_terms[slot] = ()
+        self._snippets[slot] = None
+
+    def mark_dirty(self, keys):
+        """Menandai dokumen yang perlu dimuat ulang sebelum pencarian berikutnya.
+
+        Args:
+            keys (Iterable[tuple]): Kunci dokumen `(nama_tabel, id)`.
+        """
+        with self._lock:
+            self._dirty.update(keys)
+
+    def take_dirty(self):
+        """Mengambil dan mengosongkan daftar dokumen yang perlu dimuat ulang.
+
+        Returns:
+            set[tuple]: Kunci dokumen yang berubah sejak sinkronisasi terakhir.
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            return dirty
+
+    def needs_rebuild(self):
+        """Menentukan apakah indeks perlu dibangun ulang penuh.
+
+        Returns:
+            bool: True jika indeks belum pernah dibangun, kedaluwarsa, atau penuh tombstone.
+        """
+        with self._lock:
+            if self._built_at is None or self._clock() - self._built_at > self.max_age:
+                return True
+            tombstones = len(self._keys) - self._active_count
+            return tombstones > max(1024, self._active_count)
+
+    def search(self, query, k=3):
+        """Mencari dokumen paling relevan untuk sebuah pertanyaan dengan skor BM25.
+
+        Args:
+            query (str): Pertanyaan pengguna.
+            k (int): Jumlah dokumen teratas yang dikembalikan.
+
+        Returns:
+            list[tuple]: Tuple `(kunci, skor, snippet)` terurut dari skor tertinggi.
+        """
+        terms = set(tokenize(query))
+        started = time.perf_counter()
+        with self._lock:
+            size = len(self._keys)
+            if not terms or not self._active_count or k <= 0:
+                return []
+
+            n = self._active_count
+            avgdl = self._total_length / n or 1.0
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[:size] / avgdl)
+            scores = np.zeros(size)
+            for term in terms:
+                df = self._df.get(term, 0)
+                if df <= 0:
+                    continue
+                slots, tfs = self._posting_arrays(term)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                scores[slots] += idf * tfs * (self.k1 + 1) / (tfs + norm[slots])
+
+            scores[~self._active[:size]] = 0.0
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+            ranked = candidates[np.argsort(-scores[candidates], kind='stable')]
+            results = [(self._keys[slot], float(scores[slot]), self._snippets[slot]) for slot in ranked]
+
+            self._searches += 1
+            self._search_time += time.perf_counter() - started
+            return results
+
+    def _posting_arrays(self, term):
+        """Mengambil posting list token sebagai array NumPy (pemanggil memegang `_lock`)."""
+        posting = self._postings[term]
+        if posting[2] is None:
+            posting[2] = (np.asarray(posting[0], dtype=np.int64), np.asarray(posting[1], dtype=np.float64))
+        return posting[2]
+
+    def stats(self):
+        """Mengembalikan statistik indeks.
+
+        Returns:
+            dict: Jumlah dokumen, token, tombstone, pembangunan ulang, pembaruan, dan waktu pencarian.
+        """
+        with self._lock:
+            return {
+                'documents': self._active_count,
+                'terms': sum(1 for count in self._df.values() if count > 0),
+                'tombstones': len(self._keys) - self._active_count,
+                'rebuilds': self._rebuilds,
+                'incremental_updates': self._updates,
+                'searches': self._searches,
+                'avg_search_ms': round(self._search_time / self._searches * 1000, 3) if self._searches else 0.0,
+            }
+
+def _document(row):
+    """Mengubah baris katalog menjadi dokumen indeks.
+
+    Args:
+        row (Wisata | Event | PaketWisata): Baris katalog.
+
+    Returns:
+        tuple: Tuple `(kunci, teks, snippet)`.
+    """
+    if isinstance(row, Wisata):
+        header = f"[Wisata] {row.nama} ({row.kategori}, {row.lokasi})"
+        text = f"{row.nama} {row.kategori} {row.lokasi} {row.deskripsi}"
+    elif isinstance(row, Event):
+        header = f"[Event] {row.nama} ({_format_tanggal(row.tanggal)}, {row.lokasi})"
+        text = f"{row.nama} {row.lokasi} {row.deskripsi}"
+    else:
+        header = f"[Paket] {row.nama} (mulai {_format_harga(row.harga)})"
+        text = f"{row.nama} {row.deskripsi}"
+    return (row.__tablename__, row.id), text, f"{header}: {' '.join(row.deskripsi.split())}"
+
+# Model katalog berdasarkan nama tabel untuk pemuatan ulang inkremental
+_MODELS_BY_TABLE = {model.__tablename__: model for model in (Wisata, Event, PaketWisata)}
+
+def _sync(index):
+    """Menyelaraskan indeks dengan database sebelum pencarian.
+
+    Indeks dibangun penuh jika diperlukan atau jika worker lain mengubah katalog
+    (terdeteksi dari versi katalog bersama); selain itu hanya baris yang berubah
+    sejak sinkronisasi terakhir yang dimuat ulang.
+
+    Args:
+        index (CatalogIndex): Indeks yang akan diselaraskan.
+    """
+    # Versi dibaca sebelum memuat data agar perubahan selama pemuatan tetap terdeteksi
+    version = catalog_version()
+    with index.sync_lock:
+        if index.needs_rebuild() or changed_elsewhere(index.version, version):
+            index.take_dirty()
+            documents = [_document(row) for model in _MODELS_BY_TABLE.values() for row in model.query.all()]
+            index.rebuild(documents)
+            index.version = version
+            current_app.logger.info('Indeks katalog chatbot dibangun dengan %d dokumen.', len(documents))
+            return
+
+        index.version = version
+
+        dirty = index.take_dirty()
+        if not dirty:
+            return
+
+        ids_by_table = {}
+        for table, row_id in dirty:
+            ids_by_table.setdefault(table, set()).add(row_id)
+
+        found = set()
+        for table, ids in ids_by_table.items():
+            model = _MODELS_BY_TABLE[table]
+            for row in model.query.filter(model.id.in_(ids)).all():
+                key, text, snippet = _document(row)
+                index.upsert(key, text, snippet)
+                found.add(key)
+        for key in dirty - found:
+            index.remove(key)
+
+def get_catalog_index():
+    """Mengambil indeks katalog chatbot milik aplikasi saat ini.
+
+    Returns:
+        CatalogIndex: Instance indeks untuk aplikasi saat ini.
+    """
+    app = current_app._get_current_object()
+    index = app.extensions.get('catalog_index')
+    if index is None:
+        with _init_lock:
+            index = app.extensions.get('catalog_index')
+            if index is None:
+                index = CatalogIndex(max_age=app.config.get('CHATBOT_INDEX_MAX_AGE', 600))
+                app.extensions['catalog_index'] = index
+    return index
+
+def _truncate(text, max_chars):
+    """Memotong teks pada batas kata terdekat sebelum `max_chars`.
+
+    Args:
+        text (str): Teks yang akan dipotong.
+        max_chars (int): Panjang maksimal.
+
+    Returns:
+        str: Teks yang sudah dipotong.
+    """
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(' ', 1)[0]
+    return cut.rstrip(' ,.;:') + '…'
+
+def retrieve_context(user_query: str):
+    """Mengambil cuplikan katalog yang relevan untuk disisipkan ke prompt Gemini.
+
+    Cuplikan diambil dari `CHATBOT_CONTEXT_TOP_K` dokumen teratas, masing-masing
+    dipotong hingga `CHATBOT_CONTEXT_SNIPPET_CHARS` karakter, dan ditambahkan
+    selama total perkiraan token tidak melebihi `CHATBOT_CONTEXT_TOKEN_BUDGET`.
+
+    Args:
+        user_query (str): Pertanyaan dari pengguna.
+
+    Returns:
+        list[str]: Cuplikan katalog terurut dari yang paling relevan.
+    """
+    config = current_app.config
+    budget = config.get('CHATBOT_CONTEXT_TOKEN_BUDGET', 400)
+    top_k = config.get('CHATBOT_CONTEXT_TOP_K', 3)
+    max_chars = config.get('CHATBOT_CONTEXT_SNIPPET_CHARS', 320)
+    if budget <= 0 or top_k <= 0:
+        return []
+
+    index = get_catalog_index()
+    _sync(index)
+
+    snippets = []
+    used = 0
+    for _, _, snippet in index.search(user_query, k=top_k):
+        snippet = _truncate(snippet, max_chars)
+        cost = estimate_tokens(snippet)
+        if used + cost > budget:
+            break
+        snippets.append(snippet)
+        used += cost
+    return snippets
+
+@subscribe
+def _mark_changed_documents(changes):
+    """Menandai dokumen katalog yang berubah agar dimuat ulang oleh indeks.
+
+    Args:
+        changes (list[tuple]): Daftar perubahan katalog yang sudah di-commit.
+    """
+    index = current_app.extensions.get('catalog_index')
+    if index is not None:
+        index.mark_dirty((table, row_id) for _, table, row_id in changes)
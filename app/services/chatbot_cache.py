@@ -0,0 +1,196 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from app.services.catalog_events import catalog_version, changed_elsewhere, subscribe
+
+# Kunci pengaman saat membuat instance cache pertama kali
+_init_lock = threading.Lock()
+
+def normalize_query(text: str) -> str:
+    """Menormalisasi pertanyaan pengguna menjadi kunci cache.
+
+    Menyamakan huruf besar/kecil, pengulangan huruf, tanda baca, dan spasi
+    sehingga 'Wisata alam di Bali apa ajaa??' dan 'wisata alam di bali apa aja'
+    menghasilkan kunci yang sama. Pengulangan angka tidak dilipat agar
+    'paket 100 ribu' dan 'paket 10 ribu' tetap menjadi kunci yang berbeda.
+
+    Args:
+        text (str): Pertanyaan mentah dari pengguna.
+
+    Returns:
+        str: Kunci cache yang sudah dinormalisasi.
+    """
+    text = re.sub(r'([^\W\d_])\1+', r'\1', text.lower())
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+class ResponseCache:
+    """Cache LRU berbatas ukuran dengan TTL untuk jawaban chatbot.
+
+    Semua operasi aman dipanggil dari banyak thread sekaligus. Ukuran maksimal
+    0 berarti cache dinonaktifkan.
+
+    Attributes:
+        max_size (int): Jumlah entri maksimal sebelum entri terlama dibuang.
+        ttl (float): Masa berlaku setiap entri (detik).
+        hits (int): Jumlah pencarian yang ditemukan di cache.
+        misses (int): Jumlah pencarian yang tidak ditemukan atau sudah kedaluwarsa.
+        invalidations (int): Jumlah pengosongan cache karena perubahan katalog.
+        version (str | None): Versi katalog bersama yang sesuai dengan isi cache.
+    """
+
+    def __init__(self, max_size=512, ttl=3600, clock=time.monotonic):
+        """Menginisialisasi cache kosong.
+
+        Args:
+            max_size (int): Jumlah entri maksimal.
+            ttl (float): Masa berlaku entri (detik).
+            clock (callable): Sumber waktu monotonic, dapat diganti saat pengujian.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.version = None
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Mengambil jawaban dari cache jika ada dan belum kedaluwarsa.
+
+        Args:
+            key (str): Kunci cache hasil `normalize_query`.
+
+        Returns:
+            str | None: Jawaban yang tersimpan, atau None jika tidak ada.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            # Menandai entri sebagai yang paling baru dipakai
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key):
+        """Mengambil jawaban dari cache tanpa mengubah statistik maupun urutan LRU.
+
+        Args:
+            key (str): Kunci cache hasil `normalize_query`.
+
+        Returns:
+            str | None: Jawaban yang tersimpan dan belum kedaluwarsa, atau None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                return None
+            return entry[1]
+
+    def set(self, key, value):
+        """Menyimpan jawaban ke cache dan membuang entri terlama jika penuh.
+
+        Args:
+            key (str): Kunci cache hasil `normalize_query`.
+            value (str): Jawaban chatbot yang akan disimpan.
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Mengosongkan seluruh isi cache."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def set_version(self, version, clear=False):
+        """Mencatat versi katalog bersama yang sesuai dengan isi cache.
+
+        Args:
+            version (str | None): Versi katalog hasil `catalog_version`.
+            clear (bool): Mengosongkan cache jika versi berubah.
+        """
+        with self._lock:
+            if version == self.version:
+                return
+            if clear:
+                self._entries.clear()
+                self.invalidations += 1
+            self.version = version
+
+    def stats(self):
+        """Mengembalikan statistik pemakaian cache.
+
+        Returns:
+            dict: Ukuran, kapasitas, TTL, serta penghitung hit, miss, dan invalidasi.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self.invalidations,
+            }
+
+def get_response_cache():
+    """Mengambil cache jawaban chatbot milik aplikasi saat ini.
+
+    Cache dibuat sekali per aplikasi dan disimpan di `app.extensions`. Setiap
+    pengambilan memeriksa versi katalog bersama sehingga perubahan katalog yang
+    di-commit worker lain juga mengosongkan cache di worker ini.
+
+    Returns:
+        ResponseCache: Instance cache untuk aplikasi saat ini.
+    """
+    app = current_app._get_current_object()
+    cache = app.extensions.get('chatbot_cache')
+    if cache is None:
+        with _init_lock:
+            cache = app.extensions.get('chatbot_cache')
+            if cache is None:
+                cache = ResponseCache(
+                    max_size=app.config.get('CHATBOT_CACHE_SIZE', 512),
+                    ttl=app.config.get('CHATBOT_CACHE_TTL', 3600),
+                )
+                cache.set_version(catalog_version())
+                app.extensions['chatbot_cache'] = cache
+
+    version = catalog_version()
+    if version != cache.version:
+        cache.set_version(version, clear=changed_elsewhere(cache.version, version))
+    return cache
+
+@subscribe
+def _invalidate_on_catalog_change(changes):
+    """Mengosongkan cache saat wisata, event, atau paket wisata berubah.
+
+    Args:
+        changes (list[tuple]): Daftar perubahan katalog yang sudah di-commit.
+    """
+    cache = current_app.extensions.get('chatbot_cache')
+    if cache is not None:
+        cache.clear()
+        current_app.logger.info('Cache chatbot dikosongkan karena %d perubahan katalog.', len(changes))
@@ -0,0 +1,222 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from flask import current_app
+
+# Kunci pengaman saat membuat instance executor pertama kali
+_init_lock = threading.Lock()
+
+class ExecutorSaturated(Exception):
+    """Dilempar ketika kapasitas chatbot (global atau per pengguna) sedang penuh."""
+
+class DeadlineExceeded(Exception):
+    """Dilempar ketika tugas chatbot tidak selesai sebelum batas waktu request."""
+
+class ChatbotExecutor:
+    """Thread pool berbatas untuk menjalankan panggilan chatbot di luar worker WSGI.
+
+    Executor membatasi jumlah tugas yang sedang berjalan atau mengantre
+    (`max_in_flight`) dan jumlah tugas bersamaan per pengguna (`per_user_limit`).
+    Permintaan yang melebihi batas langsung ditolak sehingga worker WSGI tidak
+    ikut tertahan, dan setiap tugas memiliki batas waktu (`deadline`).
+
+    Attributes:
+        max_workers (int): Jumlah thread yang memproses tugas chatbot.
+        max_in_flight (int): Jumlah maksimal tugas yang berjalan atau mengantre.
+        per_user_limit (int): Jumlah maksimal tugas bersamaan per pengguna.
+        deadline (float): Batas waktu tunggu hasil setiap tugas (detik).
+    """
+
+    def __init__(self, max_workers=4, max_in_flight=16, per_user_limit=2, deadline=40):
+        """Menginisialisasi thread pool dan penghitung metrik.
+
+        Args:
+            max_workers (int): Jumlah thread pemroses.
+            max_in_flight (int): Batas tugas yang berjalan atau mengantre.
+            per_user_limit (int): Batas tugas bersamaan per pengguna.
+            deadline (float): Batas waktu setiap tugas (detik).
+        """
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.per_user_limit = per_user_limit
+        self.deadline = deadline
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chatbot')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queued = 0
+        self._per_user = {}
+
+        # Penghitung metrik
+        self._started = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self, user_id=None):
+        """Memesan satu slot kapasitas untuk pengguna.
+
+        Args:
+            user_id (int | None): ID pengguna pemilik tugas.
+
+        Raises:
+            ExecutorSaturated: Jika kapasitas global atau per pengguna sudah penuh.
+        """
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self._rejected += 1
+                raise ExecutorSaturated('Kapasitas chatbot sedang penuh.')
+            if user_id is not None and self._per_user.get(user_id, 0) >= self.per_user_limit:
+                self._rejected += 1
+                raise ExecutorSaturated('Terlalu banyak pertanyaan bersamaan dari pengguna ini.')
+
+            self._in_flight += 1
+            if user_id is not None:
+                self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+
+    def release(self, user_id=None):
+        """Melepaskan slot kapasitas yang sebelumnya dipesan dengan `acquire`.
+
+        Args:
+            user_id (int | None): ID pengguna pemilik tugas.
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if user_id is not None:
+                remaining = self._per_user.get(user_id, 1) - 1
+                if remaining > 0:
+                    self._per_user[user_id] = remaining
+                else:
+                    self._per_user.pop(user_id, None)
+
+    def run(self, fn, *args, user_id=None):
+        """Menjalankan fungsi di thread pool dan menunggu hasilnya hingga batas waktu.
+
+        Fungsi dijalankan di dalam konteks aplikasi yang sama dengan pemanggil.
+        Slot kapasitas baru dilepas ketika tugas benar-benar selesai, sehingga
+        tugas yang melewati batas waktu tetap dihitung sampai berhenti.
+
+        Args:
+            fn (callable): Fungsi yang akan dijalankan.
+            *args: Argumen untuk fungsi tersebut.
+            user_id (int | None): ID pengguna pemilik tugas.
+
+        Returns:
+            Any: Nilai kembalian dari `fn`.
+
+        Raises:
+            ExecutorSaturated: Jika kapasitas sedang penuh.
+            DeadlineExceeded: Jika tugas tidak selesai sebelum batas waktu.
+        """
+        self.acquire(user_id)
+        app = current_app._get_current_object()
+
+        with self._lock:
+            self._queued += 1
+        enqueued_at = time.monotonic()
+
+        try:
+            future = self._pool.submit(self._execute, app, enqueued_at, fn, args)
+        except RuntimeError:
+            with self._lock:
+                self._queued -= 1
+            self.release(user_id)
+            raise
+        future.add_done_callback(lambda f: self._on_done(f, user_id))
+
+        try:
+            return future.result(timeout=self.deadline)
+        except FuturesTimeoutError:
+            # Membatalkan tugas yang belum sempat dijalankan agar tidak membuang kapasitas
+            future.cancel()
+            with self._lock:
+                self._timeouts += 1
+            raise DeadlineExceeded(f'Tugas chatbot melebihi batas waktu {self.deadline} detik.')
+
+    def _execute(self, app, enqueued_at, fn, args):
+        """Menjalankan tugas di thread pool sambil mencatat waktu tunggu antrean.
+
+        Args:
+            app (Flask): Instance aplikasi untuk konteks eksekusi.
+            enqueued_at (float): Waktu monotonic saat tugas masuk antrean.
+            fn (callable): Fungsi yang akan dijalankan.
+            args (tuple): Argumen untuk fungsi tersebut.
+
+        Returns:
+            Any: Nilai kembalian dari `fn`.
+        """
+        waited = time.monotonic() - enqueued_at
+        with self._lock:
+            self._queued -= 1
+            self._started += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        with app.app_context():
+            return fn(*args)
+
+    def _on_done(self, future, user_id):
+        """Callback saat tugas selesai, gagal, atau dibatalkan.
+
+        Args:
+            future (Future): Future milik tugas.
+            user_id (int | None): ID pengguna pemilik tugas.
+        """
+        with self._lock:
+            if future.cancelled():
+                self._queued -= 1
+            else:
+                self._completed += 1
+        self.release(user_id)
+
+    def metrics(self):
+        """Mengembalikan metrik antrean dan kapasitas executor.
+
+        Returns:
+            dict: Kedalaman antrean, tugas berjalan, penolakan, timeout, dan waktu tunggu.
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_in_flight': self.max_in_flight,
+                'in_flight': self._in_flight,
+                'queue_depth': self._queued,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': round(self._wait_total / self._started * 1000, 2) if self._started else 0.0,
+                'max_wait_ms': round(self._wait_max * 1000, 2),
+            }
+
+    def shutdown(self, wait=True):
+        """Menghentikan thread pool.
+
+        Args:
+            wait (bool): Menunggu tugas yang sedang berjalan selesai terlebih dahulu.
+        """
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+def get_chatbot_executor():
+    """Mengambil executor chatbot milik aplikasi saat ini.
+
+    Executor dibuat sekali per aplikasi dan disimpan di `app.extensions`.
+
+    Returns:
+        ChatbotExecutor: Instance executor untuk aplikasi saat ini.
+    """
+    app = current_app._get_current_object()
+    executor = app.extensions.get('chatbot_executor')
+    if executor is None:
+        with _init_lock:
+            executor = app.extensions.get('chatbot_executor')
+            if executor is None:
+                executor = ChatbotExecutor(
+                    max_workers=app.config.get('CHATBOT_EXECUTOR_WORKERS', 4),
+                    max_in_flight=app.config.get('CHATBOT_MAX_IN_FLIGHT', 16),
+                    per_user_limit=app.config.get('CHATBOT_PER_USER_LIMIT', 2),
+                    deadline=app.config.get('CHATBOT_DEADLINE', 40),
+                )
+                app.extensions['chatbot_executor'] = executor
+    return executor
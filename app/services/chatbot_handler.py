@@ -1,11 +1,72 @@
+import json
+import time
 from flask import current_app
 import requests
+from sqlalchemy.exc import SQLAlchemyError
+from app.services.gemini_client import get_session, get_timeout
+from app.services.circuit_breaker import CircuitOpenError, get_gemini_breaker
+from app.services.chatbot_cache import get_response_cache, normalize_query
+from app.services.catalog_answers import answer_from_catalog
+from app.services.singleflight import get_singleflight
+from app.services.catalog_index import retrieve_context
+from app.services.conversation_store import get_conversation_store
+
+# Pesan yang ditampilkan ketika Gemini gagal memberikan jawaban
+FALLBACK_MESSAGE = "Maaf, sepertinya Putri sedang mengalami sedikit kendala teknis. Coba lagi beberapa saat lagi ya! 😢"
+
+# Kata yang menandakan pertanyaan merujuk ke percakapan sebelumnya
+FOLLOW_UP_WORDS = frozenset({
+    'itu', 'tersebut', 'tadi', 'sana', 'situ', 'sini', 'dia', 'mereka',
+    'lagi', 'lainnya', 'selain', 'juga', 'terus', 'trus', 'lalu', 'kalau', 'kalo',
+    'sebelumnya', 'barusan',
+})
+
+class StreamInterrupted(Exception):
+    """Dilempar `stream_bot_response` ketika streaming terputus setelah sebagian jawaban terkirim."""
+
+def _gemini_url(method: str, api_key: str, **params):
+    """Membangun URL endpoint Gemini API untuk metode tertentu.
+
+    Alamat dasar diambil dari `GEMINI_API_BASE_URL` sehingga dapat diarahkan ke
+    server Gemini tiruan saat pengujian beban.
+
+    Args:
+        method (str): Nama metode model, misalnya 'generateContent'.
+        api_key (str): Kunci API Gemini.
+        **params: Query parameter tambahan (misalnya `alt='sse'`).
+
+    Returns:
+        str: URL lengkap endpoint Gemini API.
+    """
+    base_url = current_app.config.get('GEMINI_API_BASE_URL', 'https://generativelanguage.googleapis.com/v1beta').rstrip('/')
+    query = ''.join(f"{name}={value}&" for name, value in params.items())
+    return f"{base_url}/models/gemini-3-flash-preview:{method}?{query}key={api_key}"
+
+def _is_outage(error):
+    """Menentukan apakah sebuah error menandakan Gemini sedang bermasalah.
+
+    Error 4xx selain 429 disebabkan oleh permintaan itu sendiri (misalnya prompt
+    ditolak), sehingga tidak dihitung sebagai kegagalan oleh circuit breaker.
+
+    Args:
+        error (Exception): Error yang terjadi saat memanggil Gemini.
+
+    Returns:
+        bool: True jika error dihitung sebagai kegagalan dependensi.
+    """
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return True
 
 def call_gemini(prompt: str):
     """Mengirim prompt ke Google Gemini API dan mengambil respons teks.
 
     Fungsi ini memanggil model `gemini-1.5-flash-preview` untuk menghasilkan konten
-    berdasarkan prompt yang diberikan.
+    berdasarkan prompt yang diberikan. Permintaan dikirim melalui sesi HTTP
+    bersama (connection pool keep-alive) dengan timeout dan retry terbatas.
+    Jika circuit breaker Gemini sedang terbuka, permintaan langsung dibatalkan
+    tanpa menunggu timeout.
 
     Args:
         prompt (str): Teks prompt yang akan dikirim ke model Gemini.
@@ -21,48 +82,361 @@ def call_gemini(prompt: str):
         return "Error: Kunci API Gemini belum dikonfigurasi."
 
     # Membangun URL endpoint Gemini API
-    gemini_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-3-flash-preview:generateContent?key={gemini_api_key}"
-    headers = {"Content-Type": "application/json"}
+    gemini_url = _gemini_url('generateContent', gemini_api_key)
     # Membentuk body permintaan sesuai dengan format yang dibutuhkan API
     body = {"contents": [{"parts": [{"text": prompt}]}]}
 
+    # Gagal cepat selama Gemini dianggap sedang gangguan
+    breaker = get_gemini_breaker()
+    if not breaker.allow():
+        current_app.logger.warning("Circuit breaker Gemini terbuka, memakai jawaban fallback.")
+        return None
+
+    started = time.monotonic()
+    # Error tak terduga juga dihitung gagal agar slot uji coba half-open selalu dilepas
+    outage = True
     try:
-        # Mengirim permintaan POST ke Gemini API
-        resp = requests.post(gemini_url, headers=headers, json=body)
+        # Mengirim permintaan POST ke Gemini API melalui connection pool bersama
+        resp = get_session().post(gemini_url, json=body, timeout=get_timeout())
         # Memeriksa status respons
         resp.raise_for_status()
         j = resp.json()
 
         # Mengekstrak konten teks dari struktur JSON respons
-        return j["candidates"][0]["content"]["parts"][0]["text"]
-    except (requests.exceptions.RequestException, KeyError, IndexError) as e:
-        # Menangani error jaringan atau error parsing JSON
+        text = j["candidates"][0]["content"]["parts"][0]["text"]
+        outage = False
+    except (requests.exceptions.RequestException, KeyError, IndexError, TypeError) as e:
+        # Menangani error jaringan atau error parsing JSON (misalnya `candidates` bernilai null)
+        outage = _is_outage(e)
         current_app.logger.error('Error saat memanggil Gemini: %s', str(e), exc_info=True)
         return None
-    
-def get_bot_response(user_query: str):
+    finally:
+        # Dicatat tepat sekali untuk setiap panggilan yang diizinkan breaker
+        if outage:
+            breaker.record_failure(time.monotonic() - started)
+        else:
+            breaker.record_success(time.monotonic() - started)
+
+    return text
+
+def stream_gemini(prompt: str):
+    """Mengirim prompt ke Gemini API dan menghasilkan potongan teks secara bertahap.
+
+    Memakai endpoint `streamGenerateContent` dengan format Server-Sent Events
+    sehingga token pertama dapat diteruskan ke pengguna sebelum jawaban selesai.
+    Koneksi ditutup segera jika pemanggil berhenti mengiterasi generator.
+    Latensi yang dicatat circuit breaker adalah waktu hingga potongan pertama.
+
+    Args:
+        prompt (str): Teks prompt yang akan dikirim ke model Gemini.
+
+    Yields:
+        str: Potongan teks jawaban sesuai urutan dari model.
+
+    Raises:
+        requests.exceptions.RequestException: Jika terjadi error jaringan atau status HTTP.
+        RuntimeError: Jika kunci API Gemini belum dikonfigurasi.
+        CircuitOpenError: Jika circuit breaker Gemini sedang terbuka.
     """
-    Menghasilkan respons chatbot dengan langsung memanggil model AI Gemini
-    berdasarkan kueri dari pengguna.
+    gemini_api_key = current_app.config.get('GEMINI_API_KEY')
+    if not gemini_api_key:
+        raise RuntimeError("Kunci API Gemini belum dikonfigurasi.")
+
+    gemini_url = _gemini_url('streamGenerateContent', gemini_api_key, alt='sse')
+    body = {"contents": [{"parts": [{"text": prompt}]}]}
+
+    breaker = get_gemini_breaker()
+    if not breaker.allow():
+        raise CircuitOpenError("Circuit breaker Gemini sedang terbuka.")
+
+    started = time.monotonic()
+    first_chunk_after = None
+    outage = False
+    try:
+        with get_session().post(gemini_url, json=body, timeout=get_timeout(), stream=True) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines(decode_unicode=True):
+                # Setiap event SSE dari Gemini berisi satu potongan GenerateContentResponse
+                if not line or not line.startswith('data:'):
+                    continue
+                try:
+                    chunk = json.loads(line[len('data:'):])
+                    parts = chunk["candidates"][0]["content"]["parts"]
+                except (ValueError, KeyError, IndexError):
+                    continue
+                for part in parts:
+                    if part.get("text"):
+                        if first_chunk_after is None:
+                            first_chunk_after = time.monotonic() - started
+                        yield part["text"]
+    except requests.exceptions.RequestException as e:
+        outage = _is_outage(e)
+        raise
+    finally:
+        # Dicatat tepat sekali, termasuk saat pemanggil berhenti lebih awal (GeneratorExit)
+        if outage:
+            breaker.record_failure(time.monotonic() - started)
+        else:
+            breaker.record_success(first_chunk_after if first_chunk_after is not None else time.monotonic() - started)
+
+def _catalog_context(user_query: str):
+    """Menyusun blok konteks katalog yang relevan untuk prompt.
+
+    Args:
+        user_query (str): Pertanyaan dari pengguna.
+
+    Returns:
+        str: Blok konteks berisi cuplikan katalog, atau string kosong jika tidak ada.
+    """
+    try:
+        snippets = retrieve_context(user_query)
+    except SQLAlchemyError as e:
+        # Prompt tetap dikirim tanpa konteks agar chatbot tidak ikut gagal
+        current_app.logger.error('Gagal mengambil konteks katalog: %s', str(e), exc_info=True)
+        return ''
+    if not snippets:
+        return ''
+    lines = '\n'.join(f"- {snippet}" for snippet in snippets)
+    return (
+        f"Data katalog Lelana.id yang relevan (gunakan jika membantu, jangan mengarang di luar data ini):\n"
+        f"{lines}\n"
+    )
+
+def _history_context(summary, turns):
+    """Menyusun blok riwayat percakapan untuk prompt.
+
+    Args:
+        summary (list[str]): Baris ringkasan giliran lama.
+        turns (list[tuple[str, str]]): Giliran terakhir `(pertanyaan, jawaban)`.
+
+    Returns:
+        str: Blok riwayat percakapan, atau string kosong jika belum ada riwayat.
     """
-    current_app.logger.info("Memproses kueri chatbot via Gemini API.")
-    
-    prompt = (
+    block = ''
+    if summary:
+        block += "Ringkasan percakapan sebelumnya:\n" + '\n'.join(f"- {line}" for line in summary) + "\n"
+    if turns:
+        block += "Percakapan terakhir:\n" + ''.join(f"Pengguna: {q}\nPutri: {a}\n" for q, a in turns)
+    return block
+
+def _build_prompt(user_query: str, summary=(), turns=()):
+    """Menyusun prompt persona Putri untuk pertanyaan pengguna.
+
+    Cuplikan katalog yang paling relevan disisipkan sebelum pertanyaan agar
+    jawaban tentang destinasi, event, atau paket tertentu lebih spesifik,
+    diikuti riwayat percakapan pengguna jika ada.
+
+    Args:
+        user_query (str): Pertanyaan dari pengguna.
+        summary (list[str]): Ringkasan giliran lama dari riwayat percakapan.
+        turns (list[tuple[str, str]]): Giliran terakhir dari riwayat percakapan.
+
+    Returns:
+        str: Prompt lengkap yang siap dikirim ke Gemini.
+    """
+    return (
         f"Kamu adalah Putri, asisten AI Lelana.id yang ramah, manis, dan manja tapi tetap informatif. "
         f"Gaya bicaramu hangat, santai, dan natural seperti cewek Indonesia yang friendly, bukan formal dan bukan kaku seperti robot. "
         f"Jawaban harus singkat, jelas, tidak bertele-tele "
         f"Fokus hanya pada hal-hal yang berkaitan dengan Lelana.id seperti informasi wisata, event budaya, paket promosi non-transaksional, ulasan, dan fitur itinerari. "
         f"Ingat, Lelana.id bukan platform booking atau pembayaran. "
         f"Kalau pertanyaan di luar konteks Lelana.id atau tidak berhubungan dengan wisata dan fitur platform, jawab dengan sopan dan manis bahwa kamu hanya bisa membantu seputar Lelana.id dan minta pengguna bertanya sesuai topik yaa. "
+        f"{_catalog_context(user_query)}"
+        f"{_history_context(summary, turns)}"
         f"Pertanyaan pengguna: \"{user_query}\""
     )
 
-    # Memanggil model AI dengan prompt yang sudah disiapkan
-    answer = call_gemini(prompt)
+def _is_follow_up(user_query: str) -> bool:
+    """Menebak apakah pertanyaan merupakan lanjutan dari percakapan sebelumnya.
+
+    Pertanyaan yang sangat pendek, memuat kata rujukan ('itu', 'tadi', 'lagi',
+    ...), atau kata berakhiran '-nya' ('tiketnya', 'lokasinya') dianggap
+    bergantung pada riwayat. Salah tebak ke arah lanjutan hanya berarti cache
+    dilewati, sehingga heuristik sengaja dibuat longgar.
+
+    Args:
+        user_query (str): Pertanyaan dari pengguna.
+
+    Returns:
+        bool: True jika pertanyaan perlu dijawab dengan riwayat percakapan.
+    """
+    words = normalize_query(user_query).split()
+    if len(words) <= 2:
+        return True
+    return any(word in FOLLOW_UP_WORDS or (len(word) > 5 and word.endswith('nya')) for word in words)
+
+def _load_history(user_id):
+    """Mengambil riwayat percakapan pengguna jika ada.
+
+    Args:
+        user_id (int | None): ID pengguna, atau None untuk percakapan tanpa riwayat.
+
+    Returns:
+        tuple[list[str], list[tuple[str, str]]]: Ringkasan dan giliran terakhir.
+    """
+    if user_id is None:
+        return [], []
+    return get_conversation_store().history(user_id)
+
+def _remember(user_id, user_query, answer):
+    """Menyimpan satu giliran ke riwayat percakapan pengguna.
+
+    Args:
+        user_id (int | None): ID pengguna, atau None jika riwayat tidak disimpan.
+        user_query (str): Pertanyaan pengguna.
+        answer (str): Jawaban chatbot.
+    """
+    if user_id is not None:
+        get_conversation_store().append(user_id, user_query, answer)
+
+def get_bot_response(user_query: str, user_id=None):
+    """
+    Menghasilkan respons chatbot dengan langsung memanggil model AI Gemini
+    berdasarkan kueri dari pengguna.
+
+    Pertanyaan faktual yang dapat dijawab dari katalog (event, paket promosi,
+    wisata per kategori) dijawab langsung dari database tanpa Gemini. Jawaban
+    untuk pertanyaan yang sama (setelah dinormalisasi) diambil dari cache
+    sehingga tidak perlu memanggil Gemini berulang kali, dan pertanyaan sama
+    yang datang bersamaan digabung menjadi satu panggilan Gemini.
+
+    Jika `user_id` diberikan, jawaban dicatat ke riwayat percakapan pengguna.
+    Riwayat hanya disertakan ke prompt untuk pertanyaan lanjutan (lihat
+    `_is_follow_up`); pertanyaan tersebut tidak memakai cache bersama, sedangkan
+    pertanyaan mandiri tetap memakai cache dan penggabungan panggilan.
+    """
+    summary, turns = _load_history(user_id)
+    if not _is_follow_up(user_query):
+        summary, turns = [], []
+
+    # Menjawab langsung dari katalog jika pertanyaan cocok dengan intent faktual
+    catalog_answer = answer_from_catalog(user_query)
+    if catalog_answer is not None:
+        _remember(user_id, user_query, catalog_answer)
+        return catalog_answer
+
+    if summary or turns:
+        current_app.logger.info("Memproses kueri chatbot via Gemini API dengan riwayat percakapan.")
+        answer = call_gemini(_build_prompt(user_query, summary, turns))
+        if answer is None:
+            return FALLBACK_MESSAGE
+        answer = answer.strip()
+        _remember(user_id, user_query, answer)
+        return answer
+
+    # Memeriksa cache terlebih dahulu menggunakan kunci pertanyaan yang dinormalisasi
+    cache = get_response_cache()
+    cache_key = normalize_query(user_query)
+    cached_answer = cache.get(cache_key)
+    if cached_answer is not None:
+        current_app.logger.info("Kueri chatbot dijawab dari cache.")
+        _remember(user_id, user_query, cached_answer)
+        return cached_answer
+
+    def ask_gemini():
+        # Leader memeriksa ulang cache karena leader sebelumnya mungkin baru saja selesai
+        cached = cache.peek(cache_key)
+        if cached is not None:
+            return cached
+
+        current_app.logger.info("Memproses kueri chatbot via Gemini API.")
+        # Memanggil model AI dengan prompt yang sudah disiapkan
+        answer = call_gemini(_build_prompt(user_query))
+        if answer is None:
+            return None
+
+        # Menyimpan jawaban ke cache untuk pertanyaan serupa berikutnya
+        answer = answer.strip()
+        cache.set(cache_key, answer)
+        return answer
+
+    # Pertanyaan sama yang datang bersamaan menunggu hasil dari satu panggilan Gemini
+    answer = get_singleflight().do(cache_key, ask_gemini)
 
     # Memberikan respons fallback jika terjadi kegagalan pada API
     if answer is None:
-        return "Maaf, sepertinya Putri sedang mengalami sedikit kendala teknis. Coba lagi beberapa saat lagi ya! 😢"
-    
+        return FALLBACK_MESSAGE
+
+    _remember(user_id, user_query, answer)
     # Mengembalikan teks mentah agar dapat di-parse oleh client-side (marked.js)
-    return answer.strip()
+    return answer
+
+def stream_bot_response(user_query: str, user_id=None):
+    """Menghasilkan respons chatbot secara bertahap (streaming) dari Gemini.
+
+    Jawaban dari katalog atau cache langsung dikirim utuh. Jika tidak ada, potongan
+    teks dari Gemini diteruskan satu per satu dan dihentikan ketika panjang
+    jawaban melebihi `CHATBOT_STREAM_MAX_CHARS`. Jawaban lengkap disimpan ke
+    cache setelah streaming selesai, kecuali jika prompt memuat riwayat percakapan
+    (hanya untuk pertanyaan lanjutan, lihat `_is_follow_up`).
+
+    Args:
+        user_query (str): Pertanyaan dari pengguna.
+        user_id (int | None): ID pengguna untuk riwayat percakapan.
+
+    Yields:
+        str: Potongan teks jawaban chatbot.
+
+    Raises:
+        StreamInterrupted: Jika Gemini gagal setelah sebagian jawaban terkirim.
+    """
+    summary, turns = _load_history(user_id)
+    if not _is_follow_up(user_query):
+        summary, turns = [], []
+
+    catalog_answer = answer_from_catalog(user_query)
+    if catalog_answer is not None:
+        _remember(user_id, user_query, catalog_answer)
+        yield catalog_answer
+        return
+
+    cache = get_response_cache()
+    cache_key = normalize_query(user_query)
+    with_history = bool(summary or turns)
+    cached_answer = None if with_history else cache.get(cache_key)
+    if cached_answer is not None:
+        current_app.logger.info("Kueri chatbot (stream) dijawab dari cache.")
+        _remember(user_id, user_query, cached_answer)
+        yield cached_answer
+        return
+
+    current_app.logger.info("Memproses kueri chatbot via Gemini API (stream).")
+    max_chars = current_app.config.get('CHATBOT_STREAM_MAX_CHARS', 4000)
+    received = []
+    length = 0
+    truncated = False
+    errored = False
+
+    try:
+        for chunk in stream_gemini(_build_prompt(user_query, summary, turns)):
+            # Memotong jawaban yang terlalu panjang agar tidak menahan worker
+            if length + len(chunk) > max_chars:
+                chunk = chunk[:max_chars - length]
+                truncated = True
+            if chunk:
+                received.append(chunk)
+                length += len(chunk)
+                yield chunk
+            if truncated:
+                current_app.logger.warning("Jawaban chatbot (stream) dipotong pada %d karakter.", max_chars)
+                break
+    except CircuitOpenError:
+        errored = True
+        current_app.logger.warning("Circuit breaker Gemini terbuka, memakai jawaban fallback (stream).")
+    except (requests.exceptions.RequestException, RuntimeError) as e:
+        errored = True
+        current_app.logger.error('Error saat streaming dari Gemini: %s', str(e), exc_info=True)
+
+    if not received:
+        yield FALLBACK_MESSAGE
+        return
+    # Jawaban yang terputus di tengah jalan tidak dicatat sebagai jawaban utuh
+    if errored:
+        raise StreamInterrupted('Jawaban terputus sebelum selesai.')
+
+    # Hanya jawaban lengkap tanpa riwayat yang disimpan ke cache bersama
+    answer = ''.join(received).strip()
+    if answer:
+        _remember(user_id, user_query, answer)
+    if not truncated and answer and not with_history:
+        cache.set(cache_key, answer)
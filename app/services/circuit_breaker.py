@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import deque
+from flask import current_app, has_app_context
+
+# Kunci pengaman saat membuat instance circuit breaker pertama kali
+_init_lock = threading.Lock()
+
+class CircuitOpenError(RuntimeError):
+    """Dilempar ketika panggilan ditolak karena circuit breaker sedang terbuka."""
+
+class CircuitBreaker:
+    """Circuit breaker berbasis sliding window untuk dependensi eksternal.
+
+    Breaker mencatat hasil dan latensi setiap panggilan dalam jendela waktu
+    `window`. Jika jumlah panggilan mencapai `min_calls` dan rasio gagal atau
+    rasio lambat melewati ambang batas, breaker terbuka (`open`) dan semua
+    panggilan langsung ditolak selama `open_duration`. Setelah itu breaker
+    setengah terbuka (`half_open`) dan mengizinkan sejumlah panggilan uji coba;
+    jika berhasil breaker kembali tertutup (`closed`), jika gagal terbuka lagi.
+
+    Attributes:
+        name (str): Nama dependensi untuk keperluan log.
+        state (str): Status breaker saat ini ('closed', 'open', atau 'half_open').
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, window=60, min_calls=10, failure_rate=0.5, slow_call_duration=10.0,
+                 slow_call_rate=0.8, open_duration=30, half_open_max_calls=1, clock=time.monotonic):
+        """Menginisialisasi breaker dalam status tertutup.
+
+        Args:
+            name (str): Nama dependensi untuk keperluan log.
+            window (float): Panjang sliding window (detik).
+            min_calls (int): Jumlah panggilan minimal sebelum rasio dievaluasi.
+            failure_rate (float): Rasio gagal (0-1) yang membuka breaker.
+            slow_call_duration (float): Durasi panggilan yang dianggap lambat (detik).
+            slow_call_rate (float): Rasio panggilan lambat (0-1) yang membuka breaker.
+            open_duration (float): Lama breaker terbuka sebelum uji coba (detik).
+            half_open_max_calls (int): Jumlah panggilan uji coba bersamaan saat setengah terbuka.
+            clock (callable): Sumber waktu monotonic, dapat diganti saat pengujian.
+        """
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls = deque()
+        self._opened_at = None
+        self._probes = 0
+        self._rejected = 0
+        self._transitions = 0
+
+    def allow(self):
+        """Menentukan apakah panggilan boleh diteruskan ke dependensi.
+
+        Returns:
+            bool: True jika panggilan boleh dilakukan, False jika harus gagal cepat.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if self._clock() - self._opened_at < self.open_duration:
+                    self._rejected += 1
+                    return False
+                self._transition(self.HALF_OPEN)
+
+            if self.state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    self._rejected += 1
+                    return False
+                self._probes += 1
+
+            return True
+
+    def record_success(self, duration):
+        """Mencatat panggilan yang berhasil beserta durasinya.
+
+        Args:
+            duration (float): Durasi panggilan (detik).
+        """
+        self._record(True, duration)
+
+    def record_failure(self, duration):
+        """Mencatat panggilan yang gagal beserta durasinya.
+
+        Args:
+            duration (float): Durasi panggilan (detik).
+        """
+        self._record(False, duration)
+
+    def _record(self, ok, duration):
+        """Mencatat hasil panggilan dan mengevaluasi perubahan status breaker.
+
+        Args:
+            ok (bool): Apakah panggilan berhasil.
+            duration (float): Durasi panggilan (detik).
+        """
+        slow = duration >= self.slow_call_duration
+        with self._lock:
+            now = self._clock()
+
+            if self.state == self.HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if ok and not slow:
+                    self._calls.clear()
+                    self._transition(self.CLOSED)
+                else:
+                    self._open(now)
+                return
+
+            if self.state == self.OPEN:
+                return
+
+            self._calls.append((now, ok, slow))
+            while self._calls and self._calls[0][0] < now - self.window:
+                self._calls.popleft()
+
+            total = len(self._calls)
+            if total < self.min_calls:
+                return
+            failures = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+            slow_calls = sum(1 for _, _, call_slow in self._calls if call_slow)
+            if failures / total >= self.failure_rate or slow_calls / total >= self.slow_call_rate:
+                self._open(now)
+
+    def _open(self, now):
+        """Membuka breaker dan mengosongkan jendela panggilan.
+
+        Args:
+            now (float): Waktu monotonic saat breaker dibuka.
+        """
+        self._opened_at = now
+        self._probes = 0
+        self._calls.clear()
+        self._transition(self.OPEN)
+
+    def _transition(self, state):
+        """Mengubah status breaker dan mencatatnya ke log aplikasi.
+
+        Args:
+            state (str): Status baru breaker.
+        """
+        previous, self.state = self.state, state
+        self._transitions += 1
+        if has_app_context():
+            log = current_app.logger.warning if state == self.OPEN else current_app.logger.info
+            log('Circuit breaker %s berubah dari %s ke %s.', self.name, previous, state)
+
+    def stats(self):
+        """Mengembalikan status dan statistik breaker.
+
+        Returns:
+            dict: Status, isi sliding window, jumlah penolakan, dan jumlah perubahan status.
+        """
+        with self._lock:
+            total = len(self._calls)
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            slow_calls = sum(1 for _, _, slow in self._calls if slow)
+            return {
+                'name': self.name,
+                'state': self.state,
+                'window_calls': total,
+                'window_failure_rate': round(failures / total, 4) if total else 0.0,
+                'window_slow_rate': round(slow_calls / total, 4) if total else 0.0,
+                'rejected': self._rejected,
+                'transitions': self._transitions,
+            }
+
+def get_gemini_breaker():
+    """Mengambil circuit breaker untuk Gemini API milik aplikasi saat ini.
+
+    Returns:
+        CircuitBreaker: Instance breaker untuk aplikasi saat ini.
+    """
+    app = current_app._get_current_object()
+    breaker = app.extensions.get('gemini_breaker')
+    if breaker is None:
+        with _init_lock:
+            breaker = app.extensions.get('gemini_breaker')
+            if breaker is None:
+                config = app.config
+                breaker = CircuitBreaker(
+                    'gemini',
+                    window=config.get('GEMINI_BREAKER_WINDOW', 60),
+                    min_calls=config.get('GEMINI_BREAKER_MIN_CALLS', 10),
+                    failure_rate=config.get('GEMINI_BREAKER_FAILURE_RATE', 0.5),
+                    slow_call_duration=config.get('GEMINI_BREAKER_SLOW_CALL', 10.0),
+                    slow_call_rate=config.get('GEMINI_BREAKER_SLOW_RATE', 0.8),
+                    open_duration=config.get('GEMINI_BREAKER_OPEN_DURATION', 30),
+                )
+                app.extensions['gemini_breaker'] = breaker
+    return breaker
@@ -0,0 +1,227 @@
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from flask import current_app
+from app.services.catalog_index import estimate_tokens
+
+# Kunci pengaman saat membuat instance penyimpanan percakapan pertama kali
+_init_lock = threading.Lock()
+
+def _first_sentence(text, max_chars):
+    """Mengambil kalimat pertama dari teks tanpa format markdown.
+
+    Args:
+        text (str): Teks jawaban.
+        max_chars (int): Panjang maksimal hasil.
+
+    Returns:
+        str: Kalimat pertama yang sudah dipotong.
+    """
+    text = ' '.join(re.sub(r'[*_#`>]', '', text).split())
+    sentence = re.split(r'(?<=[.!?])\s', text, maxsplit=1)[0]
+    if len(sentence) > max_chars:
+        sentence = sentence[:max_chars].rsplit(' ', 1)[0] + '…'
+    return sentence
+
+def summarize_turn(question, answer):
+    """Meringkas satu giliran tanya jawab menjadi satu baris ringkasan (ekstraktif).
+
+    Args:
+        question (str): Pertanyaan pengguna.
+        answer (str): Jawaban chatbot.
+
+    Returns:
+        str: Ringkasan singkat giliran tersebut.
+    """
+    return f"Pengguna bertanya \"{_first_sentence(question, 120)}\", Putri menjawab: {_first_sentence(answer, 160)}"
+
+class _Conversation:
+    """Riwayat percakapan satu pengguna: giliran terakhir dan ringkasan giliran lama."""
+
+    __slots__ = ('turns', 'summary', 'size', 'last_used')
+
+    def __init__(self, now):
+        self.turns = deque()
+        self.summary = deque()
+        self.size = 0
+        self.last_used = now
+
+class ConversationStore:
+    """Penyimpanan riwayat percakapan chatbot per pengguna di memori server.
+
+    Setiap pengguna menyimpan paling banyak `max_turns` giliran terakhir. Jika
+    perkiraan token riwayat melebihi `token_budget`, giliran terlama diringkas
+    menjadi satu baris ringkasan sehingga ukuran prompt tetap terbatas.
+    Percakapan yang lama tidak dipakai dibuang dengan urutan LRU ketika jumlah
+    percakapan atau total ukurannya melewati batas, atau ketika melewati `idle_ttl`.
+    Riwayat disimpan per proses worker; `max_turns` 0 menonaktifkan riwayat.
+
+    Attributes:
+        max_turns (int): Jumlah giliran utuh maksimal per pengguna.
+        token_budget (int): Batas perkiraan token riwayat (giliran + ringkasan).
+        max_conversations (int): Jumlah percakapan maksimal yang disimpan.
+        max_bytes (int): Batas total ukuran teks seluruh percakapan (byte).
+        idle_ttl (float): Lama percakapan boleh tidak dipakai sebelum dibuang (detik).
+    """
+
+    def __init__(self, max_turns=6, token_budget=600, max_conversations=2000, max_bytes=8 * 1024 * 1024,
+                 idle_ttl=1800, clock=time.monotonic):
+        """Menginisialisasi penyimpanan kosong.
+
+        Args:
+            max_turns (int): Jumlah giliran utuh maksimal per pengguna.
+            token_budget (int): Batas perkiraan token riwayat per pengguna.
+            max_conversations (int): Jumlah percakapan maksimal.
+            max_bytes (int): Batas total ukuran teks (byte).
+            idle_ttl (float): Batas waktu percakapan tidak aktif (detik).
+            clock (callable): Sumber waktu monotonic, dapat diganti saat pengujian.
+        """
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.max_conversations = max_conversations
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conversations = OrderedDict()
+        self._bytes = 0
+        self._compactions = 0
+        self._evictions = 0
+
+    def history(self, user_id):
+        """Mengambil ringkasan dan giliran terakhir milik pengguna.
+
+        Args:
+            user_id (int): ID pengguna.
+
+        Returns:
+            tuple[list[str], list[tuple[str, str]]]: Baris ringkasan dan giliran `(pertanyaan, jawaban)`.
+        """
+        with self._lock:
+            conversation = self._get(user_id)
+            if conversation is None:
+                return [], []
+            return list(conversation.summary), list(conversation.turns)
+
+    def append(self, user_id, question, answer):
+        """Menambahkan satu giliran ke riwayat pengguna lalu memadatkan jika perlu.
+
+        Args:
+            user_id (int): ID pengguna.
+            question (str): Pertanyaan pengguna.
+            answer (str): Jawaban chatbot.
+        """
+        if self.max_turns <= 0:
+            return
+
+        # Satu giliran dibatasi setengah anggaran token (sekitar 4 karakter per token)
+        max_chars = self.token_budget * 2
+        question, answer = question[:max_chars], answer[:max_chars]
+
+        now = self._clock()
+        with self._lock:
+            conversation = self._get(user_id)
+            if conversation is None:
+                conversation = self._conversations[user_id] = _Conversation(now)
+            conversation.last_used = now
+
+            conversation.turns.append((question, answer))
+            self._resize(conversation, _text_size(question, answer))
+            self._compact(conversation)
+            self._evict()
+
+    def clear(self, user_id):
+        """Menghapus riwayat percakapan pengguna.
+
+        Args:
+            user_id (int): ID pengguna.
+        """
+        with self._lock:
+            conversation = self._conversations.pop(user_id, None)
+            if conversation is not None:
+                self._bytes -= conversation.size
+
+    def _get(self, user_id):
+        """Mengambil percakapan yang masih aktif dan menandainya baru dipakai (pemanggil memegang `_lock`)."""
+        conversation = self._conversations.get(user_id)
+        if conversation is None:
+            return None
+        if self._clock() - conversation.last_used > self.idle_ttl:
+            del self._conversations[user_id]
+            self._bytes -= conversation.size
+            self._evictions += 1
+            return None
+        self._conversations.move_to_end(user_id)
+        return conversation
+
+    def _resize(self, conversation, delta):
+        """Memperbarui ukuran percakapan dan total ukuran penyimpanan."""
+        conversation.size += delta
+        self._bytes += delta
+
+    def _compact(self, conversation):
+        """Meringkas giliran terlama sampai riwayat memenuhi batas giliran dan token."""
+        def tokens():
+            return sum(estimate_tokens(q) + estimate_tokens(a) for q, a in conversation.turns) + \
+                sum(estimate_tokens(line) for line in conversation.summary)
+
+        while len(conversation.turns) > 1 and (len(conversation.turns) > self.max_turns or tokens() > self.token_budget):
+            question, answer = conversation.turns.popleft()
+            line = summarize_turn(question, answer)
+            conversation.summary.append(line)
+            self._resize(conversation, _text_size(line) - _text_size(question, answer))
+            self._compactions += 1
+
+        # Ringkasan sendiri dibatasi sepertiga anggaran token, baris terlama dibuang
+        summary_budget = self.token_budget // 3
+        while conversation.summary and sum(estimate_tokens(line) for line in conversation.summary) > summary_budget:
+            self._resize(conversation, -_text_size(conversation.summary.popleft()))
+
+    def _evict(self):
+        """Membuang percakapan yang paling lama tidak dipakai sampai batas terpenuhi."""
+        while self._conversations and (len(self._conversations) > self.max_conversations or self._bytes > self.max_bytes):
+            _, conversation = self._conversations.popitem(last=False)
+            self._bytes -= conversation.size
+            self._evictions += 1
+
+    def stats(self):
+        """Mengembalikan statistik penyimpanan percakapan.
+
+        Returns:
+            dict: Jumlah percakapan, total ukuran, jumlah pemadatan, dan jumlah percakapan yang dibuang.
+        """
+        with self._lock:
+            return {
+                'conversations': len(self._conversations),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'compactions': self._compactions,
+                'evictions': self._evictions,
+            }
+
+def _text_size(*texts):
+    """Menghitung ukuran teks dalam byte UTF-8."""
+    return sum(len(text.encode('utf-8')) for text in texts)
+
+def get_conversation_store():
+    """Mengambil penyimpanan percakapan chatbot milik aplikasi saat ini.
+
+    Returns:
+        ConversationStore: Instance penyimpanan untuk aplikasi saat ini.
+    """
+    app = current_app._get_current_object()
+    store = app.extensions.get('chatbot_conversations')
+    if store is None:
+        with _init_lock:
+            store = app.extensions.get('chatbot_conversations')
+            if store is None:
+                store = ConversationStore(
+                    max_turns=app.config.get('CHATBOT_HISTORY_TURNS', 6),
+                    token_budget=app.config.get('CHATBOT_HISTORY_TOKEN_BUDGET', 600),
+                    max_conversations=app.config.get('CHATBOT_HISTORY_MAX_CONVERSATIONS', 2000),
+                    max_bytes=app.config.get('CHATBOT_HISTORY_MAX_BYTES', 8 * 1024 * 1024),
+                    idle_ttl=app.config.get('CHATBOT_HISTORY_IDLE_TTL', 1800),
+                )
+                app.extensions['chatbot_conversations'] = store
+    return store
@@ -0,0 +1,178 @@
+import smtplib
+import time
+from flask import current_app
+from app import mail
+
+# Error yang menandakan koneksi SMTP tidak dapat dipakai lagi
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+# Error per pesan; koneksi tetap sehat karena smtplib sudah mengirim RSET
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+class BulkSender:
+    """Mengirim banyak email melalui satu koneksi SMTP yang dipakai ulang.
+
+    `mail.send` membuka sesi SMTP baru (handshake TLS dan AUTH) untuk setiap
+    pesan. BulkSender memakai satu koneksi `mail.connect()` untuk banyak pesan,
+    merotasi koneksi setelah `max_per_connection` pesan atau saat terjadi error
+    koneksi, dan membatasi laju pengiriman agar sesuai batas penyedia email.
+
+    Attributes:
+        max_per_connection (int): Jumlah pesan sebelum koneksi dirotasi (0 = tanpa batas).
+        rate (float): Laju maksimal pengiriman (pesan per detik, 0 = tanpa batas).
+    """
+
+    def __init__(self, max_per_connection=100, rate=0.0, clock=time.monotonic, sleep=time.sleep):
+        """Menginisialisasi pengirim tanpa langsung membuka koneksi.
+
+        Args:
+            max_per_connection (int): Jumlah pesan per koneksi sebelum dirotasi.
+            rate (float): Laju maksimal pengiriman (pesan per detik).
+            clock (callable): Sumber waktu monotonic, dapat diganti saat pengujian.
+            sleep (callable): Fungsi jeda, dapat diganti saat pengujian.
+        """
+        self.max_per_connection = max_per_connection
+        self.rate = rate
+        self._clock = clock
+        self._sleep = sleep
+        self._connection = None
+        self._on_connection = 0
+        self._next_slot = None
+
+        # Penghitung metrik
+        self.sent = 0
+        self.failed = 0
+        self.connections = 0
+        self.rotations = 0
+        self.throttled_s = 0.0
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Membuat pengirim berdasarkan konfigurasi aplikasi.
+
+        Args:
+            config (dict | None): Konfigurasi aplikasi (default konfigurasi aplikasi saat ini).
+
+        Returns:
+            BulkSender: Instance pengirim.
+        """
+        config = current_app.config if config is None else config
+        return cls(
+            max_per_connection=config.get('MAIL_BULK_PER_CONNECTION', 100),
+            rate=config.get('MAIL_BULK_RATE', 0.0),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def _open(self):
+        """Membuka koneksi SMTP baru yang sudah terautentikasi."""
+        connection = mail.connect()
+        connection.__enter__()
+        self._connection = connection
+        self._on_connection = 0
+        self.connections += 1
+
+    def close(self):
+        """Menutup koneksi SMTP yang sedang dipakai (jika ada)."""
+        connection, self._connection = self._connection, None
+        if connection is None or connection.host is None:
+            return
+        try:
+            connection.host.quit()
+        except (smtplib.SMTPException, OSError):
+            # Server sudah memutus koneksi; cukup tutup socket di sisi kita
+            connection.host.close()
+
+    def _throttle(self):
+        """Menunggu giliran pengiriman berikutnya sesuai `rate`."""
+        if not self.rate:
+            return
+        now = self._clock()
+        if self._next_slot is not None and self._next_slot > now:
+            delay = self._next_slot - now
+            self.throttled_s += delay
+            self._sleep(delay)
+            now = self._next_slot
+        self._next_slot = now + 1.0 / self.rate
+
+    def send(self, message):
+        """Mengirim satu pesan melalui koneksi yang sedang dipakai.
+
+        Koneksi dibuka saat dibutuhkan dan dirotasi setelah `max_per_connection`
+        pesan. Jika koneksi lama ternyata sudah diputus server, pesan dicoba
+        sekali lagi melalui koneksi baru.
+
+        Args:
+            message (flask_mail.Message): Pesan yang akan dikirim.
+
+        Raises:
+            Exception: Error SMTP jika pesan gagal dikirim.
+        """
+        self._throttle()
+        if self._connection is not None and self.max_per_connection \
+                and self._on_connection >= self.max_per_connection:
+            self.close()
+            self.rotations += 1
+
+        for attempt in (1, 2):
+            reused = self._connection is not None and self._on_connection > 0
+            try:
+                if self._connection is None:
+                    self._open()
+                self._connection.send(message)
+            except _MESSAGE_ERRORS:
+                self.failed += 1
+                raise
+            except _CONNECTION_ERRORS:
+                self.close()
+                self.rotations += 1
+                if attempt == 1 and reused:
+                    continue
+                self.failed += 1
+                raise
+            except Exception:
+                # Status sesi SMTP tidak diketahui, koneksi diganti agar pesan berikutnya aman
+                self.close()
+                self.rotations += 1
+                self.failed += 1
+                raise
+            self._on_connection += 1
+            self.sent += 1
+            return
+
+    def send_many(self, messages):
+        """Mengirim banyak pesan dan melanjutkan meskipun sebagian gagal.
+
+        Args:
+            messages (Iterable[flask_mail.Message]): Pesan yang akan dikirim.
+
+        Returns:
+            list[tuple[flask_mail.Message, Exception]]: Pesan yang gagal beserta error-nya.
+        """
+        errors = []
+        for message in messages:
+            try:
+                self.send(message)
+            except Exception as e:
+                current_app.logger.error("Gagal mengirim email massal ke %s. Error: %s",
+                                         ', '.join(message.recipients), e)
+                errors.append((message, e))
+        return errors
+
+    def stats(self):
+        """Mengembalikan metrik pengiriman massal.
+
+        Returns:
+            dict: Jumlah pesan terkirim/gagal, koneksi yang dibuka, rotasi, dan waktu tunggu throttle.
+        """
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'connections': self.connections,
+            'rotations': self.rotations,
+            'throttled_s': round(self.throttled_s, 3),
+        }
@@ -1,37 +1,92 @@
-from flask import render_template, current_app
+from flask import current_app
 from flask_mail import Message
 from app import mail
+from app.services.email_outbox import enqueue_outbox
+from app.services.email_queue import EmailQueueFull, get_email_queue
+from app.services.email_renderer import get_email_renderer
 
-def send_email(to, subject, template, **kwargs):
-    """Merender dan mengirim email HTML secara langsung (synchronous).
+def build_message(to, subject, template, **kwargs):
+    """Membuat pesan email dengan isi HTML hasil render template.
 
-    Fungsi ini membuat pesan, merender template dari Jinja2, dan langsung
-    mengirimkannya. Proses ini akan memblokir request utama hingga email
-    selesai terkirim.
+    Template email yang terdaftar di `EMAIL_TEMPLATE_FIELDS` dirender dari
+    kerangka yang sudah dikompilasi; template lain dirender lewat Jinja.
 
     Args:
         to (str): Alamat email penerima.
         subject (str): Subjek email.
         template (str): Path ke file template (tanpa ekstensi .html).
         **kwargs: Variabel konteks untuk dilewatkan ke template Jinja2.
+
+    Returns:
+        flask_mail.Message: Pesan yang siap dikirim.
     """
-    # Mendapatkan instance aplikasi saat ini untuk mengakses konfigurasi
-    app = current_app._get_current_object()
-    
     # Membuat objek pesan email dengan subjek, pengirim, dan penerima
     msg = Message(
         subject,
-        sender=app.config['MAIL_SENDER'],
+        sender=current_app.config['MAIL_SENDER'],
         recipients=[to]
     )
-    
+
     # Merender template HTML dan menyetelnya sebagai isi email
-    msg.html = render_template(template + '.html', **kwargs)
-    
+    msg.html = get_email_renderer().render(template, **kwargs)
+    return msg
+
+def build_messages(subject, template, recipients):
+    """Membuat banyak pesan email dari satu template sekaligus.
+
+    Args:
+        subject (str): Subjek email.
+        template (str): Path ke file template (tanpa ekstensi .html).
+        recipients (Iterable[tuple[str, dict]]): Pasangan alamat penerima dan variabel konteks template.
+
+    Returns:
+        list[flask_mail.Message]: Pesan yang siap dikirim, sesuai urutan penerima.
+    """
+    recipients = list(recipients)
+    sender = current_app.config['MAIL_SENDER']
+    bodies = get_email_renderer().render_many(template, [context for _, context in recipients])
+    return [Message(subject, sender=sender, recipients=[to], html=html)
+            for (to, _), html in zip(recipients, bodies)]
+
+def send_email(to, subject, template, **kwargs):
+    """Merender email HTML lalu mengirimkannya sesuai `MAIL_DELIVERY_MODE`.
+
+    Template selalu dirender di dalam request agar `url_for` dan variabel
+    konteks tersedia. Pada mode 'queue' (default) pesan dimasukkan ke antrean
+    dan dikirim oleh worker latar belakang sehingga request tidak menunggu
+    SMTP. Pada mode 'outbox' pesan ditulis ke tabel outbox pada sesi database
+    saat ini dan ikut tersimpan saat pemanggil melakukan commit, lalu dikirim
+    oleh perintah `flask email send-outbox`. Pada mode 'sync' email dikirim
+    langsung dan memblokir request hingga selesai. Jika antrean penuh, email
+    dikirim langsung sebagai cadangan.
+
+    Args:
+        to (str): Alamat email penerima.
+        subject (str): Subjek email.
+        template (str): Path ke file template (tanpa ekstensi .html).
+        **kwargs: Variabel konteks untuk dilewatkan ke template Jinja2.
+    """
+    # Mendapatkan instance aplikasi saat ini untuk mengakses konfigurasi
+    app = current_app._get_current_object()
+
+    msg = build_message(to, subject, template, **kwargs)
+
+    mode = app.config.get('MAIL_DELIVERY_MODE', 'queue')
+    if mode == 'outbox':
+        enqueue_outbox(msg)
+        return
+
+    if mode == 'queue':
+        try:
+            get_email_queue().enqueue(msg)
+            return
+        except EmailQueueFull:
+            app.logger.warning(f"Antrean email penuh, email ke {to} dikirim langsung.")
+
     # Mengirim email secara langsung dan mencatat hasilnya
     try:
         mail.send(msg)
         app.logger.info(f"Email untuk '{subject}' berhasil dikirim ke {to}")
     except Exception as e:
         app.logger.error(f"Gagal mengirim email ke {to}. Subjek: '{subject}'. Error: {e}")
-        # raise e
\ No newline at end of file
+        # raise e
@@ -0,0 +1,211 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import formataddr
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import and_, func, or_, update
+from app import db, mail
+from app.models.email_outbox import EmailOutbox
+from app.services.email_bulk import BulkSender
+from app.services.email_queue import is_transient_error
+
+def _utcnow():
+    """Mengembalikan waktu UTC saat ini.
+
+    Returns:
+        datetime: Waktu UTC saat ini.
+    """
+    return datetime.now(timezone.utc)
+
+def enqueue_outbox(message):
+    """Menambahkan email yang sudah dirender ke outbox pada sesi database saat ini.
+
+    Baris outbox tidak di-commit di sini; pemanggil melakukan commit sehingga
+    email tersimpan dalam transaksi yang sama dengan data pemicunya.
+
+    Args:
+        message (flask_mail.Message): Pesan yang sudah dirender.
+
+    Returns:
+        list[EmailOutbox]: Baris outbox untuk setiap penerima.
+    """
+    sender = formataddr(message.sender) if isinstance(message.sender, tuple) else message.sender
+    rows = [
+        EmailOutbox(recipient=recipient, sender=sender, subject=message.subject, html=message.html)
+        for recipient in message.recipients
+    ]
+    db.session.add_all(rows)
+    return rows
+
+def claim_batch(batch_size=50, lease_seconds=120):
+    """Mengklaim sekelompok email yang siap dikirim dengan lease.
+
+    Klaim dilakukan dengan satu pernyataan UPDATE sehingga dua proses pengirim
+    tidak mengambil email yang sama. Email berstatus 'sending' yang lease-nya
+    sudah lewat (pengirim sebelumnya mati) ikut diklaim ulang, kecuali jika
+    sudah mencapai `MAIL_OUTBOX_MAX_ATTEMPTS`; email seperti itu dipindahkan ke
+    dead-letter agar email yang selalu membuat pengirim mati tidak diklaim terus.
+
+    Args:
+        batch_size (int): Jumlah email maksimal yang diklaim.
+        lease_seconds (float): Lama lease sebelum email boleh diklaim proses lain (detik).
+
+    Returns:
+        list[EmailOutbox]: Email yang berhasil diklaim oleh proses ini.
+    """
+    now = _utcnow()
+    token = uuid.uuid4().hex
+    max_attempts = current_app.config.get('MAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    expired = (EmailOutbox.status == EmailOutbox.SENDING) & (EmailOutbox.lease_until < now)
+
+    db.session.execute(
+        update(EmailOutbox)
+        .where(expired, EmailOutbox.attempts >= max_attempts)
+        .values(status=EmailOutbox.DEAD, lease_token=None, lease_until=None,
+                last_error='Lease habis setelah batas percobaan tercapai')
+        .execution_options(synchronize_session=False)
+    )
+    claimable = and_(
+        EmailOutbox.attempts < max_attempts,
+        or_((EmailOutbox.status == EmailOutbox.PENDING) & (EmailOutbox.next_attempt_at <= now), expired),
+    )
+    candidate_ids = db.session.query(EmailOutbox.id).filter(claimable) \
+        .order_by(EmailOutbox.next_attempt_at).limit(batch_size).scalar_subquery()
+
+    db.session.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(candidate_ids), claimable)
+        .values(status=EmailOutbox.SENDING, lease_token=token,
+                lease_until=now + timedelta(seconds=lease_seconds),
+                attempts=EmailOutbox.attempts + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return EmailOutbox.query.filter_by(lease_token=token, status=EmailOutbox.SENDING) \
+        .order_by(EmailOutbox.id).all()
+
+def _backoff(attempts):
+    """Menghitung jeda sebelum percobaan berikutnya dengan backoff eksponensial.
+
+    Args:
+        attempts (int): Jumlah percobaan yang sudah dilakukan.
+
+    Returns:
+        timedelta: Jeda sebelum email boleh diklaim lagi.
+    """
+    base = current_app.config.get('MAIL_OUTBOX_BACKOFF', 30)
+    cap = current_app.config.get('MAIL_OUTBOX_MAX_BACKOFF', 3600)
+    return timedelta(seconds=min(cap, base * 2 ** (attempts - 1)))
+
+def _to_message(row):
+    """Mengubah baris outbox menjadi pesan Flask-Mail.
+
+    Args:
+        row (EmailOutbox): Baris outbox.
+
+    Returns:
+        flask_mail.Message: Pesan yang siap dikirim.
+    """
+    return Message(row.subject, sender=row.sender, recipients=[row.recipient], html=row.html)
+
+def deliver(rows, send=None):
+    """Mengirim email yang sudah diklaim dan mencatat hasilnya ke outbox.
+
+    Setiap hasil di-commit segera agar kemajuan tidak hilang jika proses mati.
+    Email yang gagal dijadwalkan ulang dengan backoff, atau dipindahkan ke
+    status 'dead' setelah `MAIL_OUTBOX_MAX_ATTEMPTS` percobaan atau error permanen.
+
+    Args:
+        rows (list[EmailOutbox]): Email hasil `claim_batch`.
+        send (callable | None): Fungsi pengirim pesan (default `mail.send`).
+
+    Returns:
+        dict: Jumlah email terkirim, dijadwalkan ulang, dan dead-letter.
+    """
+    send = send or mail.send
+    max_attempts = current_app.config.get('MAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    result = {'sent': 0, 'retry': 0, 'dead': 0}
+
+    for row in rows:
+        try:
+            send(_to_message(row))
+        except Exception as e:
+            row.last_error = str(e)[:1000]
+            row.lease_token = None
+            row.lease_until = None
+            if is_transient_error(e) and row.attempts < max_attempts:
+                row.status = EmailOutbox.PENDING
+                row.next_attempt_at = _utcnow() + _backoff(row.attempts)
+                result['retry'] += 1
+                current_app.logger.warning("Email outbox %d ke %s gagal (percobaan %d), dicoba ulang: %s",
+                                           row.id, row.recipient, row.attempts, e)
+            else:
+                row.status = EmailOutbox.DEAD
+                result['dead'] += 1
+                current_app.logger.error("Email outbox %d ke %s dipindahkan ke dead-letter setelah %d percobaan: %s",
+                                         row.id, row.recipient, row.attempts, e)
+        else:
+            row.status = EmailOutbox.SENT
+            row.tanggal_terkirim = _utcnow()
+            row.lease_token = None
+            row.lease_until = None
+            row.last_error = None
+            result['sent'] += 1
+        db.session.commit()
+
+    return result
+
+def process_outbox(batch_size=None, lease_seconds=None):
+    """Mengklaim dan mengirim satu kelompok email dari outbox.
+
+    Seluruh email dalam satu kelompok dikirim melalui satu koneksi SMTP
+    yang dipakai ulang (lihat `BulkSender`).
+
+    Args:
+        batch_size (int | None): Jumlah email per kelompok (default `MAIL_OUTBOX_BATCH_SIZE`).
+        lease_seconds (float | None): Lama lease (default `MAIL_OUTBOX_LEASE`).
+
+    Returns:
+        dict: Jumlah email yang diklaim, terkirim, dijadwalkan ulang, dan dead-letter.
+    """
+    config = current_app.config
+    rows = claim_batch(
+        batch_size or config.get('MAIL_OUTBOX_BATCH_SIZE', 50),
+        lease_seconds or config.get('MAIL_OUTBOX_LEASE', 120),
+    )
+    with BulkSender.from_config() as sender:
+        result = deliver(rows, send=sender.send)
+    result['claimed'] = len(rows)
+    return result
+
+def run_outbox_sender(interval=5.0, once=False):
+    """Menjalankan loop pengirim outbox sampai dihentikan.
+
+    Args:
+        interval (float): Jeda saat outbox kosong (detik).
+        once (bool): Berhenti setelah outbox tidak lagi memiliki email yang siap dikirim.
+
+    Returns:
+        dict: Total email terkirim, dijadwalkan ulang, dan dead-letter.
+    """
+    totals = {'claimed': 0, 'sent': 0, 'retry': 0, 'dead': 0}
+    while True:
+        result = process_outbox()
+        for key in totals:
+            totals[key] += result[key]
+        if result['claimed']:
+            continue
+        if once:
+            return totals
+        time.sleep(interval)
+
+def outbox_stats():
+    """Menghitung jumlah email di outbox per status.
+
+    Returns:
+        dict: Jumlah email untuk setiap status.
+    """
+    counts = dict(db.session.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all())
+    return {status: counts.get(status, 0)
+            for status in (EmailOutbox.PENDING, EmailOutbox.SENDING, EmailOutbox.SENT, EmailOutbox.DEAD)}
@@ -0,0 +1,263 @@
+import atexit
+import heapq
+import itertools
+import smtplib
+import threading
+import time
+from flask import current_app
+from app import mail
+
+# Kunci pengaman saat membuat instance antrean email pertama kali
+_init_lock = threading.Lock()
+
+class EmailQueueFull(Exception):
+    """Dilempar ketika antrean email sudah mencapai kapasitas maksimal."""
+
+def is_transient_error(error):
+    """Menentukan apakah kegagalan SMTP layak dicoba ulang.
+
+    Error 4xx dari server SMTP dan gangguan koneksi bersifat sementara,
+    sedangkan penerima yang ditolak atau error 5xx bersifat permanen.
+
+    Args:
+        error (Exception): Error yang terjadi saat mengirim email.
+
+    Returns:
+        bool: True jika pengiriman layak dicoba ulang.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPException, OSError))
+
+class _Job:
+    """Satu email di dalam antrean beserta status percobaannya."""
+
+    __slots__ = ('message', 'attempts', 'enqueued_at')
+
+    def __init__(self, message, enqueued_at):
+        self.message = message
+        self.attempts = 0
+        self.enqueued_at = enqueued_at
+
+class EmailQueue:
+    """Antrean email dalam memori yang dikirim oleh thread latar belakang.
+
+    Route cukup memasukkan pesan yang sudah dirender lalu langsung kembali,
+    sementara worker mengirimkannya lewat SMTP. Kegagalan sementara dicoba ulang
+    dengan backoff eksponensial, dan saat proses berhenti antrean dikuras
+    (graceful drain) hingga batas waktu `drain_timeout`.
+
+    Attributes:
+        max_size (int): Jumlah email maksimal yang boleh mengantre.
+        max_retries (int): Jumlah percobaan ulang untuk kegagalan sementara.
+        backoff (float): Jeda dasar sebelum percobaan ulang pertama (detik).
+        drain_timeout (float): Batas waktu menguras antrean saat berhenti (detik).
+    """
+
+    def __init__(self, app, max_size=1000, max_retries=3, backoff=2.0, drain_timeout=10):
+        """Menginisialisasi antrean tanpa langsung menjalankan worker.
+
+        Args:
+            app (Flask): Instance aplikasi untuk konteks pengiriman.
+            max_size (int): Kapasitas antrean.
+            max_retries (int): Jumlah percobaan ulang maksimal.
+            backoff (float): Jeda dasar percobaan ulang (detik).
+            drain_timeout (float): Batas waktu menguras antrean (detik).
+        """
+        self.app = app
+        self.max_size = max_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.drain_timeout = drain_timeout
+
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._thread = None
+        self._closing = False
+        self._in_progress = 0
+
+        # Penghitung metrik
+        self._sent = 0
+        self._failed = 0
+        self._retried = 0
+        self._rejected = 0
+        self._send_total = 0.0
+        self._send_max = 0.0
+        self._wait_total = 0.0
+
+    def enqueue(self, message):
+        """Memasukkan pesan ke antrean untuk dikirim oleh worker.
+
+        Args:
+            message (flask_mail.Message): Pesan yang sudah dirender.
+
+        Raises:
+            EmailQueueFull: Jika antrean penuh atau sedang dihentikan.
+        """
+        with self._cond:
+            if self._closing or len(self._heap) >= self.max_size:
+                self._rejected += 1
+                raise EmailQueueFull('Antrean email sedang penuh.')
+            now = time.monotonic()
+            heapq.heappush(self._heap, (now, next(self._seq), _Job(message, now)))
+            self._ensure_worker()
+            self._cond.notify()
+
+    def _ensure_worker(self):
+        """Menjalankan thread worker jika belum berjalan (pemanggil memegang `_cond`)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='email-queue', daemon=True)
+            self._thread.start()
+
+    def _next_job(self):
+        """Menunggu email berikutnya yang siap dikirim.
+
+        Returns:
+            _Job | None: Email berikutnya, atau None jika antrean ditutup dan kosong.
+        """
+        with self._cond:
+            while True:
+                if self._heap:
+                    ready_at = self._heap[0][0]
+                    delay = ready_at - time.monotonic()
+                    # Saat dihentikan, jadwal backoff diabaikan agar antrean cepat terkuras
+                    if delay <= 0 or self._closing:
+                        _, _, job = heapq.heappop(self._heap)
+                        self._in_progress += 1
+                        return job
+                    self._cond.wait(delay)
+                elif self._closing:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        """Loop worker: mengirim email dari antrean sampai antrean ditutup."""
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                with self.app.app_context():
+                    self._deliver(job)
+            finally:
+                with self._cond:
+                    self._in_progress -= 1
+                    self._cond.notify_all()
+
+    def _deliver(self, job):
+        """Mengirim satu email dan menjadwalkan ulang jika gagal sementara.
+
+        Args:
+            job (_Job): Email yang akan dikirim.
+        """
+        job.attempts += 1
+        started = time.monotonic()
+        try:
+            mail.send(job.message)
+        except Exception as e:
+            retry = is_transient_error(e) and job.attempts <= self.max_retries and not self._closing
+            with self._cond:
+                if retry:
+                    self._retried += 1
+                    ready_at = time.monotonic() + self.backoff * (2 ** (job.attempts - 1))
+                    heapq.heappush(self._heap, (ready_at, next(self._seq), job))
+                else:
+                    self._failed += 1
+            level = current_app.logger.warning if retry else current_app.logger.error
+            level("Gagal mengirim email ke %s (percobaan %d%s). Subjek: '%s'. Error: %s",
+                  ', '.join(job.message.recipients), job.attempts, ', dicoba ulang' if retry else '',
+                  job.message.subject, e)
+            return
+
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._sent += 1
+            self._send_total += elapsed
+            self._send_max = max(self._send_max, elapsed)
+            self._wait_total += started - job.enqueued_at
+        current_app.logger.info("Email untuk '%s' berhasil dikirim ke %s", job.message.subject,
+                                ', '.join(job.message.recipients))
+
+    def join(self, timeout=None):
+        """Menunggu sampai antrean kosong dan tidak ada email yang sedang dikirim.
+
+        Args:
+            timeout (float | None): Batas waktu menunggu (detik).
+
+        Returns:
+            bool: True jika antrean sudah kosong sebelum batas waktu.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._heap or self._in_progress:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def shutdown(self, timeout=None):
+        """Menutup antrean dan menguras email yang tersisa.
+
+        Args:
+            timeout (float | None): Batas waktu menguras (default `drain_timeout`).
+        """
+        timeout = self.drain_timeout if timeout is None else timeout
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            if self._heap:
+                self.app.logger.error('%d email belum terkirim saat antrean dihentikan.', len(self._heap))
+
+    def metrics(self):
+        """Mengembalikan metrik antrean email.
+
+        Returns:
+            dict: Kedalaman antrean, email terkirim/gagal/dicoba ulang/ditolak, dan latensi pengiriman.
+        """
+        with self._cond:
+            return {
+                'queue_depth': len(self._heap),
+                'in_progress': self._in_progress,
+                'max_size': self.max_size,
+                'sent': self._sent,
+                'failed': self._failed,
+                'retried': self._retried,
+                'rejected': self._rejected,
+                'avg_send_ms': round(self._send_total / self._sent * 1000, 2) if self._sent else 0.0,
+                'max_send_ms': round(self._send_max * 1000, 2),
+                'avg_queue_wait_ms': round(self._wait_total / self._sent * 1000, 2) if self._sent else 0.0,
+            }
+
+def get_email_queue():
+    """Mengambil antrean email milik aplikasi saat ini.
+
+    Antrean dibuat sekali per aplikasi dan dikuras otomatis saat proses berhenti.
+
+    Returns:
+        EmailQueue: Instance antrean untuk aplikasi saat ini.
+    """
+    app = current_app._get_current_object()
+    queue = app.extensions.get('email_queue')
+    if queue is None:
+        with _init_lock:
+            queue = app.extensions.get('email_queue')
+            if queue is None:
+                queue = EmailQueue(
+                    app,
+                    max_size=app.config.get('MAIL_QUEUE_SIZE', 1000),
+                    max_retries=app.config.get('MAIL_MAX_RETRIES', 3),
+                    backoff=app.config.get('MAIL_RETRY_BACKOFF', 2.0),
+                    drain_timeout=app.config.get('MAIL_DRAIN_TIMEOUT', 10),
+                )
+                app.extensions['email_queue'] = queue
+                atexit.register(queue.shutdown)
+    return queue
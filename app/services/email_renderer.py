@@ -0,0 +1,294 @@
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+from urllib.parse import quote
+from flask import current_app, has_request_context, render_template, request
+from jinja2 import StrictUndefined, UndefinedError
+from markupsafe import escape
+
+# Kunci pengaman saat membuat instance renderer pertama kali
+_init_lock = threading.Lock()
+
+# Field per-pengguna untuk setiap template email yang boleh dikompilasi.
+# 'text' di-escape sebagai HTML, 'url' dienkode seperti segmen path `url_for`
+# lalu di-escape sebagai HTML.
+EMAIL_TEMPLATE_FIELDS = {
+    'auth/email/confirm': {'user.username': 'text', 'token': 'url'},
+    'auth/email/reset_password': {'user.username': 'text', 'token': 'url'},
+}
+
+# Karakter yang tidak dienkode oleh konverter path bawaan Werkzeug
+_URL_SAFE = "!$&'()*+,/:;=@"
+
+def _encode(value, kind):
+    """Mengenkode nilai field sesuai posisinya di template.
+
+    Args:
+        value: Nilai field.
+        kind (str): Jenis field: 'text' atau 'url'.
+
+    Returns:
+        str: Nilai yang siap disisipkan ke HTML.
+    """
+    value = str(value)
+    if kind == 'url':
+        value = quote(value, safe=_URL_SAFE)
+    return str(escape(value))
+
+def _lookup(context, path):
+    """Mengambil nilai field bertitik (misalnya 'user.username') dari konteks.
+
+    Args:
+        context (dict): Variabel konteks template.
+        path (str): Nama field bertitik.
+
+    Returns:
+        Nilai field.
+    """
+    head, *rest = path.split('.')
+    value = context[head]
+    for attr in rest:
+        value = value[attr] if isinstance(value, dict) else getattr(value, attr)
+    return value
+
+def _build_context(values):
+    """Menyusun konteks template dari nilai field bertitik.
+
+    Args:
+        values (dict): Pemetaan nama field bertitik ke nilai.
+
+    Returns:
+        dict: Konteks dengan objek bertingkat untuk field bertitik.
+    """
+    context = {}
+    for path, value in values.items():
+        head, *rest = path.split('.')
+        if not rest:
+            context[head] = value
+            continue
+        target = context.setdefault(head, SimpleNamespace())
+        for attr in rest[:-1]:
+            if not hasattr(target, attr):
+                setattr(target, attr, SimpleNamespace())
+            target = getattr(target, attr)
+        setattr(target, rest[-1], value)
+    return context
+
+class CompiledEmail:
+    """Template email yang sudah dirender menjadi kerangka statis.
+
+    Kerangka berisi potongan HTML statis yang diselingi field per-pengguna,
+    sehingga render berikutnya cukup menggabungkan string tanpa melewati
+    loader dan evaluasi Jinja.
+
+    Attributes:
+        segments (list[str]): Potongan HTML statis.
+        fields (list[tuple[str, str]]): Field (nama, jenis) di antara potongan.
+    """
+
+    __slots__ = ('segments', 'fields')
+
+    def __init__(self, segments, fields):
+        self.segments = segments
+        self.fields = fields
+
+    def render(self, context):
+        """Merender email untuk satu penerima.
+
+        Args:
+            context (dict): Variabel konteks template.
+
+        Returns:
+            str: HTML email.
+        """
+        parts = [self.segments[0]]
+        for (path, kind), segment in zip(self.fields, self.segments[1:]):
+            parts.append(_encode(_lookup(context, path), kind))
+            parts.append(segment)
+        return ''.join(parts)
+
+class EmailRenderer:
+    """Renderer email yang mengompilasi template sekali lalu memakai ulang kerangkanya.
+
+    Template dirender sekali dengan penanda unik di setiap field per-pengguna,
+    lalu hasilnya dipecah di posisi penanda. Kerangka diverifikasi dengan
+    membandingkannya terhadap render Jinja biasa; template yang tidak lolos
+    verifikasi (misalnya field diubah oleh filter) selalu dirender lewat Jinja.
+    Kerangka disimpan per URL dasar karena `url_for(_external=True)` ikut dirender;
+    URL dasar berasal dari header Host sehingga cache dibatasi secara LRU.
+
+    Template dikompilasi dengan `StrictUndefined`: variabel yang dipakai template
+    tetapi tidak terdaftar sebagai field membuat kompilasi gagal dengan error,
+    bukan diam-diam dirender kosong untuk semua penerima.
+
+    Attributes:
+        templates (dict): Pemetaan nama template ke field per-pengguna.
+        max_entries (int): Jumlah kerangka maksimal yang disimpan.
+        hits (int): Jumlah render yang memakai kerangka tersimpan.
+        misses (int): Jumlah kompilasi kerangka.
+        fallbacks (int): Jumlah render yang memakai Jinja biasa.
+    """
+
+    def __init__(self, templates=None, max_entries=32):
+        """Menginisialisasi renderer dengan cache kosong.
+
+        Args:
+            templates (dict | None): Field per template (default `EMAIL_TEMPLATE_FIELDS`).
+            max_entries (int): Jumlah kerangka maksimal (pasangan template dan URL dasar).
+        """
+        self.templates = EMAIL_TEMPLATE_FIELDS if templates is None else templates
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+        self._strict_env = None
+
+    def _render_strict(self, template, context):
+        """Merender template seperti `render_template`, tetapi gagal pada variabel yang tidak ada.
+
+        Args:
+            template (str): Path template (tanpa ekstensi .html).
+            context (dict): Variabel konteks template.
+
+        Returns:
+            str: HTML hasil render.
+        """
+        if self._strict_env is None:
+            # Tanpa cache sendiri, overlay dapat mengembalikan template milik environment asal
+            self._strict_env = current_app.jinja_env.overlay(undefined=StrictUndefined, cache_size=0)
+        context = dict(context)
+        current_app.update_template_context(context)
+        return self._strict_env.get_template(template + '.html').render(context)
+
+    def _compile(self, template):
+        """Mengompilasi template menjadi kerangka statis.
+
+        Args:
+            template (str): Path template (tanpa ekstensi .html).
+
+        Returns:
+            CompiledEmail | None: Kerangka, atau None jika template tidak dapat dikompilasi.
+
+        Raises:
+            ValueError: Jika template memakai variabel yang tidak terdaftar sebagai field.
+        """
+        fields = self.templates[template]
+        nonce = secrets.token_hex(4)
+        markers = {f'lelanafield{i}x{nonce}': path for i, path in enumerate(fields)}
+        try:
+            html = self._render_strict(template, _build_context({path: m for m, path in markers.items()}))
+        except UndefinedError as e:
+            raise ValueError(f"Template email '{template}' memakai variabel yang tidak terdaftar "
+                             f"di EMAIL_TEMPLATE_FIELDS: {e}") from e
+
+        pattern = re.compile('|'.join(re.escape(marker) for marker in markers))
+        compiled = CompiledEmail(
+            pattern.split(html),
+            [(markers[m], fields[markers[m]]) for m in pattern.findall(html)],
+        )
+
+        # Verifikasi dengan nilai yang membutuhkan escape agar kerangka terbukti setara dengan Jinja
+        sample = {path: 'Uji <&> "Lelana"' if kind == 'text' else 'uji.Token-_9' for path, kind in fields.items()}
+        sample_context = _build_context(sample)
+        if compiled.render(sample_context) != render_template(template + '.html', **sample_context):
+            current_app.logger.warning("Template email '%s' tidak dapat dikompilasi, memakai render Jinja.", template)
+            return None
+        return compiled
+
+    def render(self, template, **context):
+        """Merender template email, memakai kerangka tersimpan bila tersedia.
+
+        Args:
+            template (str): Path template (tanpa ekstensi .html).
+            **context: Variabel konteks template.
+
+        Returns:
+            str: HTML email.
+        """
+        return self.render_many(template, [context])[0]
+
+    def render_many(self, template, contexts):
+        """Merender satu template email untuk banyak penerima sekaligus.
+
+        Args:
+            template (str): Path template (tanpa ekstensi .html).
+            contexts (Iterable[dict]): Variabel konteks untuk setiap penerima.
+
+        Returns:
+            list[str]: HTML email untuk setiap penerima, sesuai urutan konteks.
+        """
+        contexts = list(contexts)
+        compiled = self._get_compiled(template)
+        if compiled is None:
+            with self._lock:
+                self.fallbacks += len(contexts)
+            return [render_template(template + '.html', **context) for context in contexts]
+        with self._lock:
+            self.hits += len(contexts)
+        return [compiled.render(context) for context in contexts]
+
+    def _get_compiled(self, template):
+        """Mengambil kerangka template dari cache atau mengompilasinya.
+
+        Args:
+            template (str): Path template (tanpa ekstensi .html).
+
+        Returns:
+            CompiledEmail | None: Kerangka, atau None jika harus memakai Jinja.
+        """
+        # Saat auto-reload aktif (mode debug) template dapat berubah kapan saja
+        if template not in self.templates or current_app.jinja_env.auto_reload:
+            return None
+        key = (template, request.url_root if has_request_context() else None)
+        with self._lock:
+            if key in self._compiled:
+                self._compiled.move_to_end(key)
+                return self._compiled[key]
+        compiled = self._compile(template)
+        with self._lock:
+            self.misses += 1
+            self._compiled[key] = compiled
+            while len(self._compiled) > self.max_entries:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        """Mengosongkan semua kerangka tersimpan."""
+        with self._lock:
+            self._compiled.clear()
+
+    def stats(self):
+        """Mengembalikan statistik renderer.
+
+        Returns:
+            dict: Jumlah kerangka tersimpan, hit, kompilasi, dan render lewat Jinja.
+        """
+        with self._lock:
+            return {
+                'compiled': sum(1 for c in self._compiled.values() if c is not None),
+                'hits': self.hits,
+                'misses': self.misses,
+                'fallbacks': self.fallbacks,
+            }
+
+def get_email_renderer():
+    """Mengambil renderer email milik aplikasi saat ini.
+
+    Renderer dibuat sekali per aplikasi dan disimpan di `app.extensions`.
+
+    Returns:
+        EmailRenderer: Instance renderer untuk aplikasi saat ini.
+    """
+    app = current_app._get_current_object()
+    renderer = app.extensions.get('email_renderer')
+    if renderer is None:
+        with _init_lock:
+            renderer = app.extensions.get('email_renderer')
+            if renderer is None:
+                renderer = EmailRenderer()
+                app.extensions['email_renderer'] = renderer
+    return renderer
@@ -1,61 +1,182 @@
-import uuid
-import os
-import magic
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from flask import current_app
+from app.services.image_pipeline import inspect_image, normalize_settings, normalize_upload
+from app.services.storage import get_storage
+from app.services.upload_store import MIME_EXTENSIONS, discard_uploads, store_stream
+from app.services.upload_stream import SNIFF_BYTES, StreamingUpload, detect_mime
 
-def save_pictures(form_pictures):
+# Kunci pengaman saat membuat thread pool dan pembatas decode pertama kali
+_init_lock = threading.Lock()
+
+def get_save_executor():
+    """Mengambil thread pool penyimpanan file unggahan milik aplikasi saat ini.
+
+    Returns:
+        ThreadPoolExecutor: Pool dengan paling banyak `UPLOAD_SAVE_WORKERS` thread.
+    """
+    app = current_app._get_current_object()
+    executor = app.extensions.get('upload_save_executor')
+    if executor is None:
+        with _init_lock:
+            executor = app.extensions.get('upload_save_executor')
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=app.config.get('UPLOAD_SAVE_WORKERS', 4),
+                                              thread_name_prefix='upload-save')
+                app.extensions['upload_save_executor'] = executor
+    return executor
+
+def get_decode_slots():
+    """Mengambil pembatas jumlah foto yang di-decode bersamaan milik aplikasi saat ini.
+
+    Decode foto membutuhkan memori sebesar resolusinya, sehingga jumlah decode
+    bersamaan di satu proses dibatasi `UPLOAD_DECODE_CONCURRENCY`, berapa pun
+    jumlah request dan foto per request.
+
+    Returns:
+        threading.BoundedSemaphore: Semaphore yang dipegang selama foto di-decode.
+    """
+    app = current_app._get_current_object()
+    slots = app.extensions.get('upload_decode_slots')
+    if slots is None:
+        with _init_lock:
+            slots = app.extensions.get('upload_decode_slots')
+            if slots is None:
+                slots = threading.BoundedSemaphore(app.config.get('UPLOAD_DECODE_CONCURRENCY', 2))
+                app.extensions['upload_decode_slots'] = slots
+    return slots
+
+def _store_picture(storage, picture, ext, mime, settings, max_pixels=None, slots=None):
+    """Menormalkan dan menyimpan satu file yang sudah divalidasi ke backend penyimpanan.
+
+    Returns:
+        tuple: Pasangan (nama file, penanda versi) dan hasil `normalize_upload`, atau
+            hanya dimensi dan placeholder jika normalisasi dimatikan (None jika konten
+            dipakai ulang).
+    """
+    stats = {}
+
+    def prepare(path):
+        with slots or nullcontext():
+            if settings is None:
+                stats.update(inspect_image(path, max_pixels))
+            else:
+                stats.update(normalize_upload(path, mime, max_pixels=max_pixels, **settings))
+    if isinstance(picture.stream, StreamingUpload):
+        result = picture.stream.commit(ext, storage, prepare)
+    else:
+        result = store_stream(picture.stream, ext, storage, prepare)
+    return result, stats or None
+
+def save_pictures(form_pictures, written=None, stats=None):
     """Memvalidasi dan menyimpan file gambar yang diunggah dengan aman.
 
     Fungsi ini memproses daftar file yang diunggah, melakukan validasi keamanan
-    berbasis tipe MIME, menghasilkan nama file unik menggunakan UUID, dan
-    menyimpannya ke `UPLOAD_FOLDER` yang telah dikonfigurasi.
+    berbasis tipe MIME, lalu menyimpannya ke `UPLOAD_FOLDER` dengan nama
+    berdasarkan hash SHA-256 kontennya. Foto dengan konten yang sama hanya
+    disimpan sekali (lihat `upload_store.store_stream`).
+
+    File dari request biasa sudah divalidasi dan di-hash saat body diterima
+    (lihat `upload_stream.UploadRequest`), sehingga di sini cukup dipindahkan
+    ke lokasi akhirnya. Sebelum disimpan, file baru dinormalkan: sisi
+    terpanjang dibatasi, metadata (termasuk lokasi GPS) dibuang, dan gambar
+    di-encode ulang (lihat `image_pipeline.normalize_upload`). Beberapa file
+    disimpan bersamaan lewat thread pool;
+    isi setiap file di-fsync sebelum rename, lalu folder tujuan di-fsync
+    sekali untuk semua file. Jika salah satu file gagal disimpan, file lain
+    yang sudah ditulis oleh pemanggilan ini dihapus kembali.
 
     Args:
         form_pictures (list[FileStorage]): Daftar objek file (`FileStorage`)
             dari formulir Flask-WTF.
+        written (list | None): Jika diberikan, diisi pasangan (nama file, penanda versi)
+            agar pemanggil dapat membatalkan penyimpanan dengan `discard_uploads`
+            saat transaksi database gagal.
+        stats (dict | None): Jika diberikan, diisi statistik normalisasi, dimensi,
+            dan placeholder per nama file yang baru disimpan (lihat `normalize_upload`).
 
     Returns:
-        list[str]: Daftar nama file unik yang berhasil disimpan di server.
+        list[str]: Daftar nama file berbasis konten yang tersimpan di server.
 
     Raises:
         ValueError: Jika salah satu file yang diunggah bukan gambar dengan
-                    tipe MIME yang diizinkan ('image/jpeg', 'image/png', 'image/gif').
+                    tipe MIME yang diizinkan ('image/jpeg', 'image/png', 'image/gif')
+                    atau melebihi batas ukuran unggahan, atau jika gambar
+                    tidak dapat dibaca saat dinormalkan atau resolusinya
+                    melebihi `UPLOAD_MAX_PIXELS`.
     """
     saved_filenames = []
 
     # Mendefinisikan tipe MIME yang diizinkan untuk mencegah unggahan file berbahaya
-    allowed_mimes = ['image/jpeg', 'image/png', 'image/gif']
-
-    # Menginisialisasi pustaka python-magic untuk mendeteksi tipe file dari kontennya
-    mime_checker = magic.Magic(mime=True)
+    allowed_mimes = list(MIME_EXTENSIONS)
 
-    # Melakukan iterasi pada setiap file yang diunggah
+    # Langkah 1: Validasi Konten File (MIME Type) untuk keamanan.
+    # Semua file divalidasi lebih dulu agar tidak ada file yang tersimpan jika salah satunya ditolak.
+    detected_mimes = []
     for picture in form_pictures:
-        # Langkah 1: Validasi Konten File (MIME Type) untuk keamanan.
+        stream = picture.stream
+        if isinstance(stream, StreamingUpload):
+            # Tipe MIME dan batas ukuran sudah diperiksa saat body request diterima
+            stream.seek(0)
+            if stream.error:
+                raise ValueError(stream.error)
+            detected_mimes.append(stream.mime)
+            continue
+
         # Membaca beberapa byte pertama dari file untuk mendeteksi tipe aslinya.
-        file_head = picture.stream.read(2048)
+        file_head = stream.read(SNIFF_BYTES)
         # Mengembalikan pointer stream ke awal file setelah membaca.
-        picture.stream.seek(0)
+        stream.seek(0)
 
-        # Mendeteksi tipe MIME dari buffer (konten file)
-        detected_mime = mime_checker.from_buffer(file_head)
+        # Mendeteksi tipe MIME dari buffer (konten file) dengan detektor bersama
+        detected_mime = detect_mime(file_head)
 
         # Memeriksa apakah tipe MIME yang terdeteksi ada dalam daftar yang diizinkan
         if detected_mime not in allowed_mimes:
             raise ValueError(f'Tipe file tidak valid: terdeteksi {detected_mime}. Hanya gambar yang diizinkan.')
-        
-        # Langkah 2: Proses Penyimpanan File yang Aman.
-        # Mendapatkan ekstensi file asli
-        _, f_ext = os.path.splitext(picture.filename)
-        # Menghasilkan nama file acak menggunakan UUID untuk mencegah tabrakan nama dan tebakan nama file
-        picture_fn = str(uuid.uuid4()) + f_ext
-
-        # Menggabungkan path folder upload dengan nama file baru yang aman
-        picture_path = os.path.join(current_app.config['UPLOAD_FOLDER'], picture_fn)
-
-        # Menyimpan file ke path yang telah ditentukan
-        picture.save(picture_path)
-        # Menambahkan nama file yang baru ke dalam daftar untuk dikembalikan
-        saved_filenames.append(picture_fn)
+        detected_mimes.append(detected_mime)
+
+    # Langkah 2: Proses Penyimpanan File yang Aman.
+    # Nama file diambil dari hash konten dan ekstensi dari tipe MIME yang terdeteksi,
+    # sehingga file yang sama selalu mendapat nama yang sama apa pun nama aslinya
+    storage = get_storage()
+    settings = normalize_settings()
+    # Resolusi diperiksa dari header dan jumlah decode bersamaan dibatasi agar memori tetap terkendali
+    limits = (current_app.config.get('UPLOAD_MAX_PIXELS'), get_decode_slots())
+    jobs = [(picture, MIME_EXTENSIONS[mime], mime) for picture, mime in zip(form_pictures, detected_mimes)]
+    outcomes, errors = [], []
+    if len(jobs) == 1:
+        try:
+            outcomes.append(_store_picture(storage, *jobs[0], settings, *limits))
+        except Exception as e:
+            errors.append(e)
+    else:
+        # Setiap file disimpan di thread terpisah; semua ditunggu agar rollback lengkap
+        executor = get_save_executor()
+        for future in [executor.submit(_store_picture, storage, *job, settings, *limits) for job in jobs]:
+            try:
+                outcomes.append(future.result())
+            except Exception as e:
+                errors.append(e)
+    results = [result for result, _ in outcomes]
+    if errors:
+        discard_uploads(results, storage)
+        raise errors[0]
+
+    storage.sync([name for name, token in results if token is not None])
+    for (name, _), normalized in outcomes:
+        if normalized is None:
+            continue
+        if 'ukuran_asli' in normalized:
+            current_app.logger.info('Foto %s dinormalisasi: %d -> %d byte dalam %.0f ms.', name,
+                                    normalized['ukuran_asli'], normalized['ukuran_file'],
+                                    normalized['durasi'] * 1000)
+        if stats is not None:
+            stats.setdefault(name, normalized)
+    if written is not None:
+        written.extend(results)
+    # Menambahkan nama file yang baru ke dalam daftar untuk dikembalikan
+    saved_filenames.extend(name for name, _ in results)
 
     return saved_filenames
@@ -0,0 +1,100 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import current_app
+
+# Status HTTP dari Gemini yang layak dicoba ulang (rate limit dan gangguan server)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Sesi HTTP bersama untuk seluruh proses beserta kunci pengamannya
+_session = None
+_session_key = None
+_session_lock = threading.Lock()
+
+def _build_session(pool_size, max_retries, backoff_factor, backoff_jitter):
+    """Membuat `requests.Session` dengan connection pool dan kebijakan retry.
+
+    Args:
+        pool_size (int): Jumlah maksimal koneksi keep-alive yang disimpan.
+        max_retries (int): Batas percobaan ulang untuk error koneksi dan status 429/5xx.
+        backoff_factor (float): Faktor backoff eksponensial antar percobaan (detik).
+        backoff_jitter (float): Jitter acak maksimal yang ditambahkan ke backoff (detik).
+
+    Returns:
+        requests.Session: Sesi HTTP yang siap dipakai ulang.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        # Read error tidak dicoba ulang agar latensi terburuk tetap terbatas
+        read=0,
+        status=max_retries,
+        status_forcelist=RETRY_STATUS_CODES,
+        # generateContent tidak mengubah state, sehingga aman dicoba ulang
+        allowed_methods=frozenset({'POST'}),
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_session():
+    """Mengambil sesi HTTP bersama untuk memanggil Gemini API.
+
+    Sesi dibuat sekali per proses dan dipakai ulang oleh semua request sehingga
+    koneksi TCP+TLS tetap terbuka (keep-alive). Sesi baru dibuat jika konfigurasi
+    pool berubah atau proses di-fork oleh server WSGI; sesi lama tidak ditutup
+    agar panggilan yang sedang memakainya di thread lain tetap selesai.
+
+    Returns:
+        requests.Session: Sesi HTTP bersama.
+    """
+    global _session, _session_key
+
+    config = current_app.config
+    key = (
+        os.getpid(),
+        config.get('GEMINI_POOL_SIZE', 10),
+        config.get('GEMINI_MAX_RETRIES', 2),
+        config.get('GEMINI_BACKOFF_FACTOR', 0.5),
+        config.get('GEMINI_BACKOFF_JITTER', 0.5),
+    )
+
+    with _session_lock:
+        if _session is None or _session_key != key:
+            # Sesi lama tidak ditutup karena thread lain mungkin masih memakainya;
+            # koneksinya dilepas oleh garbage collector setelah tidak dirujuk lagi
+            _session = _build_session(*key[1:])
+            _session_key = key
+        return _session
+
+def get_timeout():
+    """Mengambil pasangan timeout (connect, read) untuk panggilan Gemini.
+
+    Returns:
+        tuple[float, float]: Timeout koneksi dan timeout baca dalam detik.
+    """
+    config = current_app.config
+    return (
+        config.get('GEMINI_CONNECT_TIMEOUT', 3.05),
+        config.get('GEMINI_READ_TIMEOUT', 30),
+    )
+
+def close_session():
+    """Menutup sesi HTTP bersama beserta seluruh koneksi di dalam pool."""
+    global _session, _session_key
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_key = None
@@ -0,0 +1,413 @@
+import base64
+import io
+import os
+import tempfile
+import time
+from flask import current_app
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Atribut `sizes` untuk galeri foto ulasan (2/3/4 kolom sesuai lebar layar)
+GALLERY_SIZES = '(min-width: 768px) 25vw, (min-width: 640px) 33vw, 50vw'
+
+# Format turunan: ekstensi file dan format Pillow
+DERIVATIVE_FORMATS = (('webp', 'WEBP'), ('jpg', 'JPEG'))
+
+# Format Pillow untuk meng-encode ulang file asli per tipe MIME
+NORMALIZE_FORMATS = {'image/jpeg': 'JPEG', 'image/png': 'PNG', 'image/gif': 'GIF'}
+
+# Sisi terpanjang placeholder (piksel) yang disisipkan langsung di HTML
+PLACEHOLDER_SIZE = 20
+
+# Nilai EXIF Orientation yang memutar gambar 90° sehingga lebar dan tinggi tertukar
+_ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+# Kunci `Image.info` yang berisi metadata selain EXIF
+_METADATA_KEYS = ('xmp', 'XML:com.adobe.xmp', 'comment', 'Raw profile type exif')
+
+# Kunci `Image.info` yang dibutuhkan untuk menampilkan gambar dengan benar
+_RENDER_KEYS = ('transparency', 'background', 'icc_profile')
+
+def variant_name(nama_file, variant, ext):
+    """Membentuk nama file turunan dari nama file asli.
+
+    Args:
+        nama_file (str): Nama file asli di folder unggahan.
+        variant (str): Nama varian, misalnya 'thumb' atau 'medium'.
+        ext (str): Ekstensi file turunan ('webp' atau 'jpg').
+
+    Returns:
+        str: Nama file turunan, misalnya 'abc_thumb.webp'.
+    """
+    stem, _ = os.path.splitext(nama_file)
+    return f'{stem}_{variant}.{ext}'
+
+def derivative_settings():
+    """Mengambil pengaturan turunan dari konfigurasi aplikasi.
+
+    Pengaturan dikirim sebagai argumen biasa agar pemrosesan dapat berjalan di
+    proses worker yang tidak memiliki konteks aplikasi Flask.
+
+    Returns:
+        dict: Varian (terurut dari yang terkecil) dan kualitas encoding.
+    """
+    config = current_app.config
+    return {
+        'variants': sorted(config.get('IMAGE_VARIANTS', {}).items(), key=lambda item: item[1]),
+        'webp_quality': config.get('IMAGE_WEBP_QUALITY', 80),
+        'jpeg_quality': config.get('IMAGE_JPEG_QUALITY', 82),
+    }
+
+def _flatten(image):
+    """Mengubah gambar ke RGB; JPEG tidak mendukung transparansi sehingga latarnya dijadikan putih."""
+    if image.mode == 'RGB':
+        return image
+    if 'A' not in image.getbands() and 'transparency' not in image.info:
+        return image.convert('RGB')
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+def placeholder_data_uri(image, size=PLACEHOLDER_SIZE):
+    """Membuat placeholder kecil (LQIP) sebagai data URI JPEG.
+
+    Browser memperbesar gambar kecil ini sehingga tampak buram, cukup untuk
+    mengisi galeri sebelum foto sebenarnya selesai diunduh.
+
+    Args:
+        image (PIL.Image.Image): Gambar yang sudah diputar sesuai orientasinya.
+        size (int): Sisi terpanjang placeholder (piksel).
+
+    Returns:
+        str: Data URI 'data:image/jpeg;base64,...' (biasanya di bawah 1 KB).
+    """
+    scale = min(1, size / max(image.size))
+    small = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                         Image.BILINEAR, reducing_gap=2.0)
+    buffer = io.BytesIO()
+    _flatten(small).save(buffer, 'JPEG', quality=50, optimize=True)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def _describe(image):
+    """Dimensi dan placeholder gambar yang sudah diputar sesuai orientasinya."""
+    return {'lebar': image.width, 'tinggi': image.height, 'placeholder': placeholder_data_uri(image)}
+
+def _check_pixels(source, max_pixels):
+    """Menolak gambar yang resolusinya melebihi batas sebelum piksel di-decode.
+
+    `Image.open` hanya membaca header, sehingga pemeriksaan ini tidak memakan
+    memori sebesar gambarnya.
+
+    Args:
+        source (PIL.Image.Image): Gambar yang baru dibuka.
+        max_pixels (int | None): Jumlah piksel maksimal (None untuk batas bawaan Pillow).
+
+    Raises:
+        ValueError: Jika jumlah piksel melebihi `max_pixels`.
+    """
+    if max_pixels and source.width * source.height > max_pixels:
+        raise ValueError(f'Resolusi foto terlalu besar ({source.width}x{source.height} piksel); '
+                         f'maksimal {max_pixels / 1_000_000:g} megapiksel.')
+
+def inspect_image(path, max_pixels=None):
+    """Membaca dimensi intrinsik dan membuat placeholder dari file gambar.
+
+    Dimensi memperhitungkan orientasi EXIF, sama seperti yang ditampilkan browser.
+
+    Args:
+        path (str): Path file gambar.
+        max_pixels (int | None): Batas jumlah piksel yang boleh di-decode.
+
+    Returns:
+        dict: 'lebar' dan 'tinggi' (piksel) serta 'placeholder' (data URI).
+
+    Raises:
+        ValueError: Jika file tidak dapat dibaca sebagai gambar atau resolusinya melebihi batas.
+    """
+    try:
+        with Image.open(path) as source:
+            _check_pixels(source, max_pixels)
+            width, height = source.size
+            if source.getexif().get(0x0112) in _ROTATED_ORIENTATIONS:
+                width, height = height, width
+            # Placeholder cukup dibuat dari hasil decode JPEG yang sudah diperkecil
+            source.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+            details = _describe(ImageOps.exif_transpose(source))
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f'Gambar tidak dapat diproses: {e}') from e
+    details.update(lebar=width, tinggi=height)
+    return details
+
+def inspect_stored_image(storage, nama_file):
+    """Menjalankan `inspect_image` untuk file di backend penyimpanan mana pun.
+
+    Args:
+        storage (StorageBackend): Backend penyimpanan unggahan.
+        nama_file (str): Path relatif file asli.
+
+    Returns:
+        dict: Lihat `inspect_image`.
+
+    Raises:
+        ValueError: Jika file tidak dapat dibaca sebagai gambar.
+    """
+    if storage.local_folder is not None:
+        return inspect_image(os.path.join(storage.local_folder, *nama_file.split('/')))
+    with tempfile.TemporaryDirectory() as staging:
+        source = os.path.join(staging, 'asli')
+        storage.download(nama_file, source)
+        return inspect_image(source)
+
+def _encode(image, path, pillow_format, webp_quality, jpeg_quality):
+    """Menyimpan gambar turunan dengan pengaturan kualitas yang diberikan.
+
+    Args:
+        image (PIL.Image.Image): Gambar yang sudah diperkecil.
+        path (str): Path tujuan.
+        pillow_format (str): Format Pillow ('WEBP' atau 'JPEG').
+        webp_quality (int): Kualitas encoding WebP.
+        jpeg_quality (int): Kualitas encoding JPEG.
+    """
+    from app.services.upload_store import TEMP_PREFIX
+
+    # Turunan disajikan sebagai immutable, sehingga ditulis ke file sementara lalu
+    # dipindahkan secara atomik agar pembaca tidak pernah mendapat file setengah jadi
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=TEMP_PREFIX, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if pillow_format == 'JPEG':
+                _flatten(image).save(f, 'JPEG', quality=jpeg_quality, optimize=True, progressive=True)
+            else:
+                image.save(f, 'WEBP', quality=webp_quality, method=4)
+        # mkstemp membuat file 0600; file turunan harus dapat dibaca web server
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def render_derivatives(folder, nama_file, variants, webp_quality=80, jpeg_quality=82):
+    """Membuat turunan WebP dan JPEG tanpa membutuhkan konteks aplikasi.
+
+    Dipakai langsung oleh proses worker (lihat `image_worker`).
+
+    Args:
+        folder (str): Folder unggahan.
+        nama_file (str): Nama file asli di folder unggahan.
+        variants (list[tuple[str, int]]): Varian dan lebar maksimalnya, terurut dari yang terkecil.
+        webp_quality (int): Kualitas encoding WebP.
+        jpeg_quality (int): Kualitas encoding JPEG.
+
+    Returns:
+        list[str]: Nama varian yang berhasil dibuat, terurut dari yang terkecil.
+
+    Raises:
+        ValueError: Jika file tidak dapat dibaca sebagai gambar.
+    """
+    try:
+        with Image.open(os.path.join(folder, nama_file)) as source:
+            source.seek(0)
+            # Memutar sesuai orientasi EXIF agar turunan tidak miring
+            image = ImageOps.exif_transpose(source)
+            image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f'Gambar {nama_file} tidak dapat diproses: {e}') from e
+
+    created = []
+    for variant, width in variants:
+        resized = image.copy()
+        resized.thumbnail((width, width * 4), Image.LANCZOS)
+        for ext, pillow_format in DERIVATIVE_FORMATS:
+            _encode(resized, os.path.join(folder, variant_name(nama_file, variant, ext)), pillow_format,
+                    webp_quality, jpeg_quality)
+        created.append(variant)
+        if image.width <= width:
+            break
+    return created
+
+def render_stored_derivatives(storage, nama_file, variants, webp_quality=80, jpeg_quality=82):
+    """Membuat turunan untuk file di backend penyimpanan mana pun.
+
+    Backend lokal diproses langsung di foldernya. Backend jarak jauh (S3)
+    diproses di folder sementara: file asli diunduh, turunan dibuat, lalu
+    setiap turunan diunggah kembali ke backend.
+
+    Args:
+        storage (StorageBackend): Backend penyimpanan unggahan.
+        nama_file (str): Path relatif file asli.
+        variants (list[tuple[str, int]]): Varian dan lebar maksimalnya, terurut dari yang terkecil.
+        webp_quality (int): Kualitas encoding WebP.
+        jpeg_quality (int): Kualitas encoding JPEG.
+
+    Returns:
+        list[str]: Nama varian yang berhasil dibuat, terurut dari yang terkecil.
+
+    Raises:
+        ValueError: Jika file tidak dapat dibaca sebagai gambar.
+    """
+    settings = {'variants': variants, 'webp_quality': webp_quality, 'jpeg_quality': jpeg_quality}
+    if storage.local_folder is not None:
+        return render_derivatives(storage.local_folder, nama_file, **settings)
+
+    with tempfile.TemporaryDirectory() as staging:
+        source = os.path.join(staging, *nama_file.split('/'))
+        os.makedirs(os.path.dirname(source), exist_ok=True)
+        storage.download(nama_file, source)
+        created = render_derivatives(staging, nama_file, **settings)
+        for variant in created:
+            for ext, _ in DERIVATIVE_FORMATS:
+                name = variant_name(nama_file, variant, ext)
+                storage.put_file(name, os.path.join(staging, *name.split('/')))
+    return created
+
+def generate_derivatives(nama_file, folder=None):
+    """Membuat turunan WebP dan JPEG yang diperkecil untuk sebuah foto.
+
+    Setiap varian di `IMAGE_VARIANTS` dibuat dengan lebar maksimal sesuai
+    konfigurasinya, tanpa memperbesar gambar. Varian pertama yang mencapai
+    lebar gambar asli menjadi varian terakhir, karena varian yang lebih besar
+    akan berisi gambar yang sama.
+
+    Args:
+        nama_file (str): Nama file asli di folder unggahan.
+        folder (str | None): Folder lokal; default backend penyimpanan aktif.
+
+    Returns:
+        list[str]: Nama varian yang berhasil dibuat, terurut dari yang terkecil.
+
+    Raises:
+        ValueError: Jika file tidak dapat dibaca sebagai gambar.
+    """
+    if folder:
+        return render_derivatives(folder, nama_file, **derivative_settings())
+    from app.services.storage import get_storage
+    return render_stored_derivatives(get_storage(), nama_file, **derivative_settings())
+
+def normalize_settings():
+    """Mengambil pengaturan normalisasi file unggahan dari konfigurasi aplikasi.
+
+    Returns:
+        dict | None: Batas sisi terpanjang dan kualitas JPEG, atau None jika
+            normalisasi dimatikan (`UPLOAD_NORMALIZE`).
+    """
+    config = current_app.config
+    if not config.get('UPLOAD_NORMALIZE', True):
+        return None
+    return {
+        'max_dimension': config.get('UPLOAD_MAX_DIMENSION', 2560),
+        'jpeg_quality': config.get('UPLOAD_JPEG_QUALITY', 85),
+    }
+
+def _has_metadata(image):
+    """Memeriksa apakah gambar membawa metadata (EXIF, XMP, komentar, atau teks PNG)."""
+    if image.getexif() or any(key in image.info for key in _METADATA_KEYS):
+        return True
+    return bool(getattr(image, 'text', None))
+
+def normalize_upload(path, mime, max_dimension=2560, jpeg_quality=85, max_pixels=None):
+    """Menormalkan file unggahan sebelum disimpan, tanpa membutuhkan konteks aplikasi.
+
+    Orientasi EXIF diterapkan ke piksel, sisi terpanjang dibatasi
+    `max_dimension`, lalu gambar di-encode ulang tanpa metadata (EXIF termasuk
+    lokasi GPS, XMP, komentar); JPEG disimpan progresif. Profil warna ICC
+    dipertahankan. File asli dipakai apa adanya jika tidak perlu diperkecil,
+    tidak membawa metadata, dan hasil encode ulang tidak lebih kecil.
+    GIF animasi tidak diubah. Dimensi dan placeholder dihitung dari gambar
+    hasil normalisasi (lihat `inspect_image`).
+
+    Args:
+        path (str): File yang sudah divalidasi; ditimpa dengan hasil normalisasi.
+        mime (str): Tipe MIME terdeteksi (kunci `NORMALIZE_FORMATS`).
+        max_dimension (int): Batas sisi terpanjang (piksel).
+        jpeg_quality (int): Kualitas encoding JPEG.
+        max_pixels (int | None): Batas jumlah piksel yang boleh di-decode.
+
+    Returns:
+        dict: 'ukuran_asli' dan 'ukuran_file' (byte), 'durasi' (detik), 'diubah'
+            (True jika file ditimpa), 'lebar' dan 'tinggi' (piksel), serta 'placeholder'.
+
+    Raises:
+        ValueError: Jika file tidak dapat dibaca sebagai gambar atau resolusinya melebihi batas.
+    """
+    started = time.perf_counter()
+    original_size = os.path.getsize(path)
+    pillow_format = NORMALIZE_FORMATS[mime]
+    # Nama tetap diawali awalan file sementara sehingga sisa proses yang terputus ikut dibersihkan GC
+    output = f'{path}.norm'
+    changed = False
+    try:
+        with Image.open(path) as source:
+            _check_pixels(source, max_pixels)
+            if getattr(source, 'n_frames', 1) > 1:
+                # GIF animasi disimpan apa adanya; placeholder diambil dari frame pertama
+                details = _describe(source)
+            else:
+                metadata = _has_metadata(source)
+                scale = max_dimension / max(source.size)
+                if scale < 1 and pillow_format == 'JPEG':
+                    # Decoder JPEG dapat langsung memperkecil 1/2, 1/4, atau 1/8 sehingga jauh lebih cepat
+                    source.draft(source.mode, (int(source.width * scale), int(source.height * scale)))
+                image = ImageOps.exif_transpose(source)
+                image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+                # Sebagian encoder Pillow menulis ulang isi `info` (misalnya komentar GIF)
+                image.info = {key: value for key, value in image.info.items() if key in _RENDER_KEYS}
+                options = {'optimize': True}
+                if image.info.get('icc_profile'):
+                    options['icc_profile'] = image.info['icc_profile']
+                if pillow_format == 'JPEG':
+                    options.update(quality=jpeg_quality, progressive=True)
+                image.save(output, pillow_format, **options)
+                changed = scale < 1 or metadata or os.path.getsize(output) < original_size
+                details = _describe(image)
+        if changed:
+            os.chmod(output, 0o644)
+            os.replace(output, path)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f'Gambar tidak dapat diproses: {e}') from e
+    finally:
+        if os.path.exists(output):
+            os.remove(output)
+    return dict(
+        details,
+        ukuran_asli=original_size,
+        ukuran_file=os.path.getsize(path),
+        durasi=time.perf_counter() - started,
+        diubah=changed,
+    )
+
+def foto_sources(foto):
+    """Menyusun atribut `src`/`srcset` untuk menampilkan foto ulasan.
+
+    Foto tanpa turunan (misalnya belum di-backfill) ditampilkan dari file aslinya.
+
+    Args:
+        foto (FotoUlasan): Foto ulasan.
+
+    Returns:
+        dict: Kunci 'original', 'src', 'srcset' (JPEG), 'webp' (srcset WebP), dan 'sizes'.
+    """
+    from app.services.upload_store import upload_url
+
+    original = upload_url(foto.nama_file)
+    widths = current_app.config.get('IMAGE_VARIANTS', {})
+    variants = [v for v in (foto.varian or '').split(',') if v in widths]
+    if not variants:
+        return {'original': original, 'src': original, 'srcset': '', 'webp': '', 'sizes': GALLERY_SIZES}
+
+    def srcset(ext):
+        return ', '.join(
+            f"{upload_url(variant_name(foto.nama_file, v, ext))} {widths[v]}w"
+            for v in variants
+        )
+
+    return {
+        'original': original,
+        # Varian terbesar menjadi fallback untuk browser tanpa dukungan srcset
+        'src': upload_url(variant_name(foto.nama_file, variants[-1], 'jpg')),
+        'srcset': srcset('jpg'),
+        'webp': srcset('webp'),
+        'sizes': GALLERY_SIZES,
+    }
@@ -0,0 +1,307 @@
+import atexit
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import and_, or_, update
+from app import db
+from app.models.image_job import ImageJob
+from app.services.image_pipeline import derivative_settings, render_stored_derivatives
+from app.services.storage import get_storage
+
+# Kunci pengaman saat membuat instance processor pertama kali
+_init_lock = threading.Lock()
+
+class ImageProcessor:
+    """Process pool berbatas untuk membuat turunan foto di luar thread request.
+
+    Decode, resize, dan encode gambar bersifat CPU-bound sehingga dijalankan di
+    proses terpisah. Route cukup menyimpan foto beserta `ImageJob` lalu
+    menyerahkan job ke pool; hasilnya ditulis ke database oleh callback saat
+    worker selesai. Jumlah job yang mengantre dibatasi `max_pending`; job yang
+    tidak mendapat slot tetap berstatus 'pending' dan diambil kembali saat slot
+    kosong (lihat `redrive`), atau oleh `flask uploads process-images`.
+
+    Attributes:
+        workers (int): Jumlah proses worker.
+        max_pending (int): Jumlah maksimal job yang berjalan atau mengantre di pool.
+        max_attempts (int): Jumlah percobaan sebelum job dinyatakan gagal.
+        redrive_after (float): Umur minimal job 'pending' sebelum diambil ulang oleh `redrive`,
+            sekaligus lama lease job yang diklaim ulang (detik).
+    """
+
+    def __init__(self, app, workers=2, max_pending=32, max_attempts=3, redrive_after=120):
+        """Menginisialisasi processor tanpa langsung menjalankan proses worker.
+
+        Args:
+            app (Flask): Instance aplikasi untuk konteks database di callback.
+            workers (int): Jumlah proses worker.
+            max_pending (int): Batas job yang berjalan atau mengantre.
+            max_attempts (int): Jumlah percobaan maksimal per job.
+            redrive_after (float): Umur minimal job tertinggal yang diambil ulang (detik).
+        """
+        self.app = app
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.redrive_after = redrive_after
+
+        self._cond = threading.Condition()
+        self._executor = None
+        self._pending = 0
+        # ID job yang sedang berjalan atau mengantre di pool proses ini
+        self._inflight = set()
+
+        # Penghitung metrik
+        self._completed = 0
+        self._failed = 0
+        self._retried = 0
+        self._rejected = 0
+        self._process_total = 0.0
+
+    def _get_executor(self):
+        """Membuat process pool saat pertama kali dibutuhkan (pemanggil memegang `_cond`)."""
+        if self._executor is None:
+            # 'spawn' agar proses worker tidak mewarisi thread dan koneksi database dari proses web
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def submit(self, job_id, nama_file, reserved=False):
+        """Menyerahkan satu job ke process pool tanpa menunggu hasilnya.
+
+        Args:
+            job_id (int): ID `ImageJob`.
+            nama_file (str): Nama file foto di folder unggahan.
+            reserved (bool): Job sudah memegang slot (dipakai saat percobaan ulang).
+
+        Returns:
+            bool: True jika job masuk pool, False jika pool penuh atau sedang dihentikan.
+        """
+        with self.app.app_context():
+            settings = derivative_settings()
+            storage = get_storage()
+        with self._cond:
+            if not reserved and (self._pending >= self.max_pending or job_id in self._inflight):
+                self._rejected += 1
+                return False
+            try:
+                executor = self._get_executor()
+                future = executor.submit(_process_image, storage, nama_file, settings)
+            except RuntimeError:
+                # Pool sudah dihentikan (misalnya saat proses web berhenti)
+                self._rejected += 1
+                return False
+            if not reserved:
+                self._pending += 1
+                self._inflight.add(job_id)
+        future.add_done_callback(lambda f: self._finish(job_id, nama_file, f, executor))
+        return True
+
+    def redrive(self):
+        """Mengisi slot kosong dengan job 'pending' yang tertinggal.
+
+        Job tertinggal misalnya ditolak karena pool penuh atau ditinggalkan proses
+        web yang berhenti. Job diklaim dengan lease melalui satu pernyataan UPDATE
+        (seperti `claim_batch` pada outbox email) sehingga dua proses web tidak
+        mengambil job yang sama. Job yang belum pernah diklaim hanya diambil jika
+        lebih tua dari `redrive_after`, karena masih dipegang proses web yang
+        membuatnya; job yang sudah diklaim baru diambil lagi setelah lease-nya
+        lewat. Pool tidak dibuat hanya untuk job tertinggal, sehingga callback
+        saat `shutdown` tidak menghidupkan pool baru.
+
+        Returns:
+            int: Jumlah job yang diserahkan ulang ke pool.
+        """
+        with self._cond:
+            free = self.max_pending - self._pending
+            busy = set(self._inflight)
+            running = self._executor is not None
+        if free <= 0 or not running:
+            return 0
+        now = datetime.now(timezone.utc)
+        token = uuid.uuid4().hex
+        with self.app.app_context():
+            claimable = and_(
+                ImageJob.status == ImageJob.PENDING,
+                or_(and_(ImageJob.lease_until.is_(None), ImageJob.tanggal_dibuat <= now - timedelta(seconds=self.redrive_after)),
+                    ImageJob.lease_until < now),
+            )
+            if busy:
+                claimable = and_(claimable, ImageJob.id.notin_(busy))
+            candidate_ids = db.session.query(ImageJob.id).filter(claimable) \
+                .order_by(ImageJob.id).limit(free).scalar_subquery()
+            db.session.execute(
+                update(ImageJob)
+                .where(ImageJob.id.in_(candidate_ids), claimable)
+                .values(lease_token=token, lease_until=now + timedelta(seconds=self.redrive_after))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            jobs = [(job.id, job.foto.nama_file)
+                    for job in ImageJob.query.filter_by(lease_token=token).order_by(ImageJob.id)]
+        return sum(self.submit(job_id, nama_file) for job_id, nama_file in jobs)
+
+    def _finish(self, job_id, nama_file, future, executor=None):
+        """Callback saat worker selesai: menyimpan hasil atau menjadwalkan percobaan ulang.
+
+        Slot yang kosong setelah job selesai langsung diisi dengan job tertinggal.
+
+        Args:
+            job_id (int): ID `ImageJob`.
+            nama_file (str): Nama file foto.
+            future (Future): Future hasil `_process_image`.
+            executor (ProcessPoolExecutor | None): Pool yang menjalankan job.
+        """
+        retry = False
+        try:
+            with self.app.app_context():
+                job = db.session.get(ImageJob, job_id)
+                # Foto bisa saja sudah dihapus bersama ulasannya
+                if job is None:
+                    return
+                job.attempts += 1
+                error = future.exception()
+                if error is None:
+                    variants, elapsed = future.result()
+                    job.foto.varian = ','.join(variants)
+                    job.status = ImageJob.DONE
+                    job.last_error = None
+                    job.tanggal_selesai = datetime.now(timezone.utc)
+                    with self._cond:
+                        self._completed += 1
+                        self._process_total += elapsed
+                else:
+                    job.last_error = str(error)[:1000]
+                    # Gambar yang tidak dapat dibaca tidak akan berhasil jika dicoba ulang
+                    retry = not isinstance(error, ValueError) and job.attempts < self.max_attempts
+                    if isinstance(error, BrokenProcessPool):
+                        # Semua job di pool yang rusak gagal bersamaan; hanya pool itu yang dibuang,
+                        # bukan pool baru yang mungkin sudah dibuat oleh callback sebelumnya
+                        with self._cond:
+                            if self._executor is executor:
+                                self._executor = None
+                    if retry:
+                        # Memperpanjang lease agar proses web lain tidak mengklaim job yang dicoba ulang
+                        job.lease_until = datetime.now(timezone.utc) + timedelta(seconds=self.redrive_after)
+                    else:
+                        job.status = ImageJob.FAILED
+                        job.tanggal_selesai = datetime.now(timezone.utc)
+                    with self._cond:
+                        if retry:
+                            self._retried += 1
+                        else:
+                            self._failed += 1
+                    level = self.app.logger.warning if retry else self.app.logger.error
+                    level("Gagal memproses foto %s (percobaan %d%s): %s", nama_file, job.attempts,
+                          ', dicoba ulang' if retry else '', error)
+                db.session.commit()
+        finally:
+            # Percobaan ulang memakai slot yang sama agar `join` tidak selesai terlalu cepat
+            if not (retry and self.submit(job_id, nama_file, reserved=True)):
+                with self._cond:
+                    self._pending -= 1
+                    self._inflight.discard(job_id)
+                    self._cond.notify_all()
+                self.redrive()
+
+    def join(self, timeout=None):
+        """Menunggu sampai semua job di pool selesai diproses.
+
+        Args:
+            timeout (float | None): Batas waktu menunggu (detik).
+
+        Returns:
+            bool: True jika semua job selesai sebelum batas waktu.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def metrics(self):
+        """Mengembalikan metrik process pool.
+
+        Returns:
+            dict: Job yang mengantre, selesai, gagal, dicoba ulang, ditolak, dan rata-rata waktu proses.
+        """
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending,
+                'completed': self._completed,
+                'failed': self._failed,
+                'retried': self._retried,
+                'rejected': self._rejected,
+                'avg_process_ms': round(self._process_total / self._completed * 1000, 2) if self._completed else 0.0,
+            }
+
+    def shutdown(self, wait=True):
+        """Menghentikan process pool.
+
+        Args:
+            wait (bool): Menunggu job yang sedang berjalan selesai terlebih dahulu.
+        """
+        with self._cond:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+def _process_image(storage, nama_file, settings):
+    """Membuat turunan foto di proses worker.
+
+    Args:
+        storage (StorageBackend): Backend penyimpanan (di-pickle ke proses worker).
+        nama_file (str): Nama file foto.
+        settings (dict): Hasil `derivative_settings()`.
+
+    Returns:
+        tuple[list[str], float]: Varian yang dibuat dan lama pemrosesan (detik).
+    """
+    started = time.perf_counter()
+    variants = render_stored_derivatives(storage, nama_file, **settings)
+    return variants, time.perf_counter() - started
+
+def submit_jobs(jobs):
+    """Menyerahkan job yang sudah di-commit ke process pool.
+
+    Args:
+        jobs (Iterable[ImageJob]): Job berstatus 'pending'.
+
+    Slot yang masih tersisa diisi dengan job tertinggal, misalnya dari proses
+    web sebelumnya yang berhenti sebelum job-nya selesai.
+
+    Returns:
+        int: Jumlah job yang masuk pool.
+    """
+    processor = get_image_processor()
+    submitted = sum(processor.submit(job.id, job.foto.nama_file) for job in jobs)
+    return submitted + processor.redrive()
+
+def get_image_processor():
+    """Mengambil process pool pemrosesan foto milik aplikasi saat ini.
+
+    Processor dibuat sekali per aplikasi dan dihentikan otomatis saat proses berhenti.
+
+    Returns:
+        ImageProcessor: Instance processor untuk aplikasi saat ini.
+    """
+    app = current_app._get_current_object()
+    processor = app.extensions.get('image_processor')
+    if processor is None:
+        with _init_lock:
+            processor = app.extensions.get('image_processor')
+            if processor is None:
+                processor = ImageProcessor(
+                    app,
+                    workers=app.config.get('IMAGE_WORKERS', 2),
+                    max_pending=app.config.get('IMAGE_MAX_PENDING', 32),
+                    max_attempts=app.config.get('IMAGE_JOB_MAX_ATTEMPTS', 3),
+                    redrive_after=app.config.get('IMAGE_JOB_REDRIVE_AFTER', 120),
+                )
+                app.extensions['image_processor'] = processor
+                atexit.register(processor.shutdown)
+    return processor
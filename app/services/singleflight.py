@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - fcntl tidak tersedia di Windows
+    fcntl = None
+
+# Kunci pengaman saat membuat instance single-flight pertama kali
+_init_lock = threading.Lock()
+
+class _Call:
+    """Status satu panggilan yang sedang berlangsung untuk sebuah kunci."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Menggabungkan panggilan bersamaan dengan kunci yang sama menjadi satu panggilan.
+
+    Pemanggil pertama (leader) menjalankan fungsi, sedangkan pemanggil lain yang
+    datang selama fungsi masih berjalan menunggu dan menerima hasil yang sama.
+    Jika `lock_dir` diisi, leader juga berkoordinasi dengan proses worker lain
+    melalui file lock dan file hasil berumur pendek di direktori tersebut. Kunci
+    di-hash ke sejumlah tetap stripe sehingga jumlah file di direktori tidak
+    bertambah seiring banyaknya pertanyaan berbeda.
+
+    Attributes:
+        lock_dir (str | None): Direktori file lock lintas proses (None = hanya dalam proses).
+        result_ttl (float): Umur maksimal file hasil yang boleh dipakai proses lain (detik).
+        wait_timeout (float): Batas waktu menunggu leader atau file lock proses lain (detik).
+        stripes (int): Jumlah pasangan file lock dan file hasil di `lock_dir`.
+    """
+
+    def __init__(self, lock_dir=None, result_ttl=5, wait_timeout=35, stripes=64):
+        """Menginisialisasi tabel panggilan yang sedang berlangsung.
+
+        Args:
+            lock_dir (str | None): Direktori file lock lintas proses.
+            result_ttl (float): Umur maksimal file hasil (detik).
+            wait_timeout (float): Batas waktu menunggu leader atau file lock (detik).
+            stripes (int): Jumlah stripe file lock lintas proses.
+        """
+        self.lock_dir = lock_dir if fcntl is not None else None
+        self.result_ttl = result_ttl
+        self.wait_timeout = wait_timeout
+        self.stripes = max(1, stripes)
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._leaders = 0
+        self._shared = 0
+
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def do(self, key, fn):
+        """Menjalankan `fn` sekali untuk semua pemanggil bersamaan dengan kunci yang sama.
+
+        Args:
+            key (str): Kunci penggabungan, misalnya pertanyaan yang dinormalisasi.
+            fn (callable): Fungsi tanpa argumen yang menghasilkan nilai.
+
+        Pemanggil yang menunggu leader lebih lama dari `wait_timeout` menjalankan
+        `fn` sendiri agar tidak tertahan oleh leader yang macet.
+
+        Returns:
+            Any: Hasil dari `fn` (dijalankan sendiri atau milik leader).
+
+        Raises:
+            Exception: Exception yang dilempar `fn` diteruskan ke semua pemanggil.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._leaders += 1
+                leader = True
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                current_app.logger.warning('Leader single-flight melewati batas waktu, pertanyaan dijalankan sendiri.')
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if self.lock_dir:
+                call.result = self._do_across_processes(key, fn)
+            else:
+                call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def _do_across_processes(self, key, fn):
+        """Menjalankan `fn` dengan koordinasi file lock antar proses worker.
+
+        Proses yang mendapatkan lock setelah proses lain memakai file hasil yang
+        masih segar untuk kunci yang sama alih-alih memanggil `fn` lagi. Jika lock
+        tidak didapat sebelum `wait_timeout`, `fn` tetap dijalankan agar pemanggil
+        tidak tertahan. Kunci berbeda yang jatuh ke stripe yang sama hanya saling
+        menunggu dan tidak memakai hasil satu sama lain.
+
+        Args:
+            key (str): Kunci penggabungan.
+            fn (callable): Fungsi tanpa argumen yang menghasilkan nilai JSON-serializable.
+
+        Returns:
+            Any: Hasil dari `fn` atau dari file hasil proses lain.
+        """
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        stripe = f"stripe-{int(digest[:8], 16) % self.stripes}"
+        lock_path = os.path.join(self.lock_dir, stripe + '.lock')
+        result_path = os.path.join(self.lock_dir, stripe + '.json')
+
+        with open(lock_path, 'a') as lock_file:
+            deadline = time.monotonic() + self.wait_timeout
+            locked = False
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    locked = True
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        break
+                    time.sleep(0.05)
+
+            try:
+                # Memakai hasil proses lain yang baru saja selesai untuk kunci yang sama
+                cached = self._read_result(result_path)
+                if cached is not None and cached.get('key') == digest:
+                    with self._lock:
+                        self._shared += 1
+                    return cached['result']
+
+                result = fn()
+                if result is not None:
+                    self._write_result(result_path, digest, result)
+                return result
+            finally:
+                if locked:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_result(self, path):
+        """Membaca file hasil jika masih dalam batas `result_ttl`.
+
+        Args:
+            path (str): Path file hasil.
+
+        Returns:
+            dict | None: Isi file hasil, atau None jika tidak ada atau kedaluwarsa.
+        """
+        try:
+            if time.time() - os.path.getmtime(path) > self.result_ttl:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_result(self, path, digest, result):
+        """Menulis file hasil secara atomik (tulis ke file sementara lalu rename).
+
+        Args:
+            path (str): Path file hasil.
+            digest (str): Hash kunci pemilik hasil, untuk membedakan kunci dalam stripe yang sama.
+            result (Any): Nilai JSON-serializable yang akan dibagikan.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': digest, 'result': result}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            current_app.logger.warning('Gagal menulis hasil single-flight: %s', str(e))
+
+    def stats(self):
+        """Mengembalikan statistik penggabungan panggilan.
+
+        Returns:
+            dict: Jumlah panggilan leader, panggilan yang memakai hasil bersama, dan yang sedang berjalan.
+        """
+        with self._lock:
+            return {
+                'leaders': self._leaders,
+                'shared': self._shared,
+                'in_progress': len(self._calls),
+                'cross_process': bool(self.lock_dir),
+            }
+
+def get_singleflight():
+    """Mengambil instance single-flight chatbot milik aplikasi saat ini.
+
+    Returns:
+        SingleFlight: Instance single-flight untuk aplikasi saat ini.
+    """
+    app = current_app._get_current_object()
+    flight = app.extensions.get('chatbot_singleflight')
+    if flight is None:
+        with _init_lock:
+            flight = app.extensions.get('chatbot_singleflight')
+            if flight is None:
+                flight = SingleFlight(
+                    lock_dir=app.config.get('CHATBOT_SINGLEFLIGHT_DIR'),
+                    result_ttl=app.config.get('CHATBOT_SINGLEFLIGHT_RESULT_TTL', 5),
+                    wait_timeout=app.config.get('CHATBOT_SINGLEFLIGHT_WAIT', 35),
+                    stripes=app.config.get('CHATBOT_SINGLEFLIGHT_STRIPES', 64),
+                )
+                app.extensions['chatbot_singleflight'] = flight
+    return flight
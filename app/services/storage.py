@@ -0,0 +1,537 @@
+import mimetypes
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, url_for
+
+# Kunci pengaman saat membuat instance backend penyimpanan pertama kali
+_init_lock = threading.Lock()
+
+class StorageBackend:
+    """Antarmuka penyimpanan file unggahan.
+
+    Kunci (key) adalah path relatif dengan pemisah '/', sama dengan nilai
+    `FotoUlasan.nama_file`. Backend harus dapat di-pickle karena dikirim ke
+    proses worker pemrosesan foto.
+
+    Attributes:
+        local_folder (str | None): Folder lokal jika file tersimpan langsung di disk
+            proses ini; None untuk penyimpanan jarak jauh.
+        staging_dir (str | None): Folder untuk file sementara sebelum disimpan
+            (None berarti folder sementara sistem).
+        has_quarantine (bool): Backend memiliki area karantina untuk file yatim.
+    """
+
+    local_folder = None
+    staging_dir = None
+    has_quarantine = False
+
+    def put_file(self, key, path):
+        """Menyimpan file lokal ke `key`; file di `path` boleh dipindahkan atau dihapus.
+
+        Args:
+            key (str): Kunci tujuan.
+            path (str): Path file lokal.
+
+        Returns:
+            object | None: Penanda versi untuk `discard`, atau None jika backend
+                tidak dapat membatalkan penyimpanan dengan aman (termasuk jika
+                request lain sudah lebih dulu menyimpan file yang sama).
+        """
+        raise NotImplementedError
+
+    def sync(self, keys):
+        """Memastikan file yang baru disimpan tetap ada setelah crash (default tidak melakukan apa pun).
+
+        Args:
+            keys (Iterable[str]): Kunci file yang baru disimpan.
+        """
+
+    def discard(self, key, token):
+        """Membatalkan penyimpanan file selama file belum dipakai ulang oleh request lain.
+
+        Args:
+            key (str): Kunci file.
+            token (object | None): Nilai kembalian `put_file`.
+
+        Returns:
+            bool: True jika file dihapus.
+        """
+        return False
+
+    def touch(self, key):
+        """Menandai file sebagai baru dipakai jika sudah ada.
+
+        Args:
+            key (str): Kunci file.
+
+        Returns:
+            bool: True jika file sudah ada.
+        """
+        raise NotImplementedError
+
+    def download(self, key, path):
+        """Mengunduh file ke path lokal.
+
+        Args:
+            key (str): Kunci file.
+            path (str): Path tujuan di disk lokal.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Menghapus file; tidak error jika file tidak ada.
+
+        Args:
+            key (str): Kunci file.
+        """
+        raise NotImplementedError
+
+    def url(self, key):
+        """Membentuk URL publik untuk file.
+
+        Args:
+            key (str): Kunci file.
+
+        Returns:
+            str: URL yang dapat dipakai browser.
+        """
+        raise NotImplementedError
+
+    def modified(self, key):
+        """Mengembalikan waktu terakhir file diubah atau dipakai ulang (`touch`).
+
+        Args:
+            key (str): Kunci file.
+
+        Returns:
+            float | None: Waktu epoch, atau None jika file tidak ada.
+        """
+        raise NotImplementedError
+
+    def scan(self, quarantined=False):
+        """Menelusuri semua file secara bertahap tanpa memuat seluruh daftarnya ke memori.
+
+        Args:
+            quarantined (bool): Menelusuri area karantina, bukan file unggahan.
+
+        Yields:
+            tuple[str, float, int]: Kunci, waktu terakhir diubah (epoch), dan ukuran (byte).
+        """
+        raise NotImplementedError
+
+    def quarantine(self, key):
+        """Memindahkan file ke area karantina; waktu ubahnya menjadi waktu karantina.
+
+        Args:
+            key (str): Kunci file.
+        """
+        raise NotImplementedError
+
+    def delete_quarantined(self, key):
+        """Menghapus permanen file dari area karantina.
+
+        Args:
+            key (str): Kunci file di area karantina.
+        """
+        raise NotImplementedError
+
+class LocalStorage(StorageBackend):
+    """Penyimpanan di disk lokal, disajikan lewat `/static/uploads/`.
+
+    Attributes:
+        folder (str): Folder unggahan (`UPLOAD_FOLDER`).
+        quarantine_folder (str | None): Folder karantina, sebaiknya di luar folder statis.
+    """
+
+    def __init__(self, folder, fsync=True, quarantine_folder=None):
+        """Menginisialisasi penyimpanan lokal.
+
+        Args:
+            folder (str): Folder unggahan.
+            fsync (bool): Menulis file dan folder ke disk sebelum dianggap tersimpan.
+            quarantine_folder (str | None): Folder karantina file yatim (None berarti tanpa karantina).
+        """
+        self.folder = folder
+        self.fsync = fsync
+        self.quarantine_folder = quarantine_folder
+        self.has_quarantine = quarantine_folder is not None
+        self.local_folder = folder
+        # File sementara dibuat di folder yang sama agar dapat dipindahkan secara atomik
+        self.staging_dir = folder
+        try:
+            os.makedirs(folder, exist_ok=True)
+        except OSError:
+            # Unggahan berikutnya ditolak dengan pesan yang jelas oleh `StreamingUpload`
+            pass
+
+    def path(self, key):
+        """Mengembalikan path absolut untuk sebuah kunci."""
+        return os.path.join(self.folder, *key.split('/'))
+
+    def put_file(self, key, path):
+        target = self.path(key)
+        if self.fsync:
+            # Isi file harus sudah di disk sebelum rename agar tidak ada file kosong setelah crash
+            with open(path, 'rb') as f:
+                os.fsync(f.fileno())
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            # Hard link tidak menimpa file yang sudah ada: jika dua request menyimpan konten
+            # yang sama bersamaan, hanya satu yang memiliki file dan boleh menghapusnya saat rollback
+            os.link(path, target)
+        except FileExistsError:
+            # Dipakai ulang seperti pada `touch` sehingga rollback pemiliknya tidak menghapus file
+            self.touch(key)
+            return None
+        finally:
+            os.remove(path)
+        # mtime menjadi penanda versi: `touch` dari request lain akan mengubahnya
+        return os.stat(target).st_mtime_ns
+
+    def sync(self, keys):
+        if not self.fsync:
+            return
+        # Entri folder hasil rename di-fsync sekali per folder untuk semua file sekaligus
+        folders = set()
+        for key in keys:
+            parts = key.split('/')[:-1]
+            folders.update(os.path.join(self.folder, *parts[:depth]) for depth in range(len(parts) + 1))
+        for folder in sorted(folders, key=len, reverse=True):
+            fd = os.open(folder, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def discard(self, key, token):
+        path = self.path(key)
+        try:
+            if os.stat(path).st_mtime_ns != token:
+                return False
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def touch(self, key):
+        try:
+            # mtime diperbarui agar file tidak dihapus GC selama masa tenggang
+            os.utime(self.path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def download(self, key, path):
+        shutil.copyfile(self.path(key), path)
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key):
+        return url_for('static', filename='uploads/' + key)
+
+    def modified(self, key):
+        try:
+            return os.stat(self.path(key)).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def scan(self, quarantined=False):
+        root = self.quarantine_folder if quarantined else self.folder
+        if root is None:
+            return
+        skip = os.path.realpath(self.quarantine_folder) if self.quarantine_folder else None
+        for current, dirs, files in os.walk(root):
+            # Folder karantina di dalam folder unggahan tidak ikut ditelusuri sebagai unggahan
+            dirs[:] = sorted(d for d in dirs if os.path.realpath(os.path.join(current, d)) != skip)
+            rel = os.path.relpath(current, root)
+            for name in sorted(files):
+                try:
+                    st = os.stat(os.path.join(current, name))
+                except FileNotFoundError:
+                    continue
+                yield (name if rel == '.' else f"{rel.replace(os.sep, '/')}/{name}"), st.st_mtime, st.st_size
+
+    def quarantine(self, key):
+        target = os.path.join(self.quarantine_folder, *key.split('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            # shutil.move tetap berfungsi jika folder karantina berada di filesystem lain
+            shutil.move(self.path(key), target)
+        except FileNotFoundError:
+            return
+        os.utime(target)
+
+    def delete_quarantined(self, key):
+        try:
+            os.remove(os.path.join(self.quarantine_folder, *key.split('/')))
+        except FileNotFoundError:
+            pass
+
+def _is_missing(error):
+    """Memeriksa apakah error client S3 berarti objek tidak ditemukan."""
+    # ClientError dari botocore membawa kode error HTTP di atribut `response`
+    code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+    return code in ('404', 'NoSuchKey', 'NotFound')
+
+class S3Storage(StorageBackend):
+    """Penyimpanan di object storage yang kompatibel dengan S3 (AWS S3, MinIO, R2, dll.).
+
+    File besar diunggah dengan multipart upload sehingga tidak perlu dikirim
+    dalam satu request. URL dibentuk dari `public_url` jika bucket dapat
+    diakses publik (misalnya lewat CDN), atau berupa presigned URL.
+
+    Presigned URL berubah setiap kali ditandatangani sehingga browser tidak
+    dapat memakai cache `immutable` untuk URL yang selalu baru. URL yang sama
+    dipakai ulang selama separuh masa berlakunya agar halaman yang dibuka ulang
+    tetap memakai cache; untuk cache jangka panjang gunakan `public_url`.
+
+    Client boto3 dibuat saat pertama kali dipakai dan tidak ikut di-pickle,
+    sehingga backend dapat dikirim ke proses worker.
+
+    Attributes:
+        bucket (str): Nama bucket.
+        prefix (str): Awalan kunci objek di dalam bucket.
+        public_url (str | None): URL dasar publik untuk objek.
+        presign_expires (int): Masa berlaku presigned URL (detik).
+        multipart_threshold (int): Ukuran file (byte) mulai memakai multipart upload.
+        part_size (int): Ukuran setiap bagian multipart (byte, minimal 5 MiB di S3).
+        cache_control (str | None): Header `Cache-Control` untuk objek yang diunggah.
+        quarantine_prefix (str | None): Awalan kunci area karantina di bucket yang sama.
+    """
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None, access_key=None, secret_key=None,
+                 public_url=None, presign_expires=3600, multipart_threshold=8 * 1024 * 1024,
+                 part_size=8 * 1024 * 1024, cache_control=None, quarantine_prefix=None, client=None):
+        """Menginisialisasi backend S3 tanpa langsung membuat koneksi.
+
+        Args:
+            bucket (str): Nama bucket.
+            prefix (str): Awalan kunci objek.
+            endpoint_url (str | None): Endpoint S3-compatible (None untuk AWS).
+            region (str | None): Region bucket.
+            access_key (str | None): Access key ID.
+            secret_key (str | None): Secret access key.
+            public_url (str | None): URL dasar publik; None untuk memakai presigned URL.
+            presign_expires (int): Masa berlaku presigned URL (detik).
+            multipart_threshold (int): Ukuran file mulai memakai multipart upload (byte).
+            part_size (int): Ukuran setiap bagian multipart (byte).
+            cache_control (str | None): Header `Cache-Control` untuk objek.
+            quarantine_prefix (str | None): Awalan kunci karantina (None berarti tanpa karantina).
+            client (object | None): Client S3 yang sudah dibuat (misalnya untuk pengujian).
+        """
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.public_url = public_url.rstrip('/') if public_url else None
+        self.presign_expires = presign_expires
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self.cache_control = cache_control
+        self.quarantine_prefix = quarantine_prefix.strip('/') if quarantine_prefix else None
+        self.has_quarantine = self.quarantine_prefix is not None
+        self._client = client
+        self._urls = OrderedDict()
+        self._urls_lock = threading.Lock()
+
+    # Jumlah presigned URL maksimal yang disimpan untuk dipakai ulang
+    max_cached_urls = 4096
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_client'] = None
+        state['_urls'] = None
+        state['_urls_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._urls = OrderedDict()
+        self._urls_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Client boto3, dibuat saat pertama kali dibutuhkan."""
+        if self._client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError("UPLOAD_STORAGE='s3' membutuhkan paket boto3.") from e
+            self._client = boto3.client(
+                's3', endpoint_url=self.endpoint_url, region_name=self.region,
+                aws_access_key_id=self.access_key, aws_secret_access_key=self.secret_key,
+            )
+        return self._client
+
+    def _key(self, key):
+        return f'{self.prefix}/{key}' if self.prefix else key
+
+    def _extra_args(self, key):
+        """Metadata objek: tipe konten dan header cache."""
+        extra = {'ContentType': mimetypes.guess_type(key)[0] or 'application/octet-stream'}
+        if self.cache_control:
+            extra['CacheControl'] = self.cache_control
+        return extra
+
+    def put_file(self, key, path):
+        # Objek berbasis konten tidak pernah dihapus saat rollback (lihat `discard`):
+        # request lain mungkin sudah memakainya tanpa jejak yang dapat diperiksa
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            if size < self.multipart_threshold:
+                self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=f, **self._extra_args(key))
+            else:
+                self._multipart_upload(key, f)
+
+    def _multipart_upload(self, key, f):
+        """Mengunggah file besar per bagian; upload dibatalkan jika salah satu bagian gagal."""
+        upload = self.client.create_multipart_upload(Bucket=self.bucket, Key=self._key(key), **self._extra_args(key))
+        upload_id = upload['UploadId']
+        parts = []
+        try:
+            for number, chunk in enumerate(iter(lambda: f.read(self.part_size), b''), start=1):
+                result = self.client.upload_part(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                                                 PartNumber=number, Body=chunk)
+                parts.append({'PartNumber': number, 'ETag': result['ETag']})
+            self.client.complete_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id,
+                                                  MultipartUpload={'Parts': parts})
+        except Exception:
+            # Bagian yang sudah terunggah tetap ditagih jika upload tidak dibatalkan
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self._key(key), UploadId=upload_id)
+            raise
+
+    def touch(self, key):
+        # LastModified hanya berubah saat objek ditulis: salinan ke dirinya sendiri
+        # (S3 mewajibkan metadata baru) memperbaruinya tanpa mengunggah ulang isi,
+        # sehingga GC tidak menghapus objek yang baru saja dipakai ulang
+        try:
+            self.client.copy_object(Bucket=self.bucket, Key=self._key(key),
+                                    CopySource={'Bucket': self.bucket, 'Key': self._key(key)},
+                                    MetadataDirective='REPLACE', **self._extra_args(key))
+            return True
+        except Exception as e:
+            if _is_missing(e):
+                return False
+            raise
+
+    def download(self, key, path):
+        self.client.download_file(self.bucket, self._key(key), path)
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def url(self, key):
+        if self.public_url:
+            return f'{self.public_url}/{self._key(key)}'
+        now = time.monotonic()
+        with self._urls_lock:
+            cached = self._urls.get(key)
+            if cached is not None and cached[1] > now:
+                self._urls.move_to_end(key)
+                return cached[0]
+        url = self.client.generate_presigned_url('get_object', Params={'Bucket': self.bucket, 'Key': self._key(key)},
+                                                 ExpiresIn=self.presign_expires)
+        with self._urls_lock:
+            self._urls[key] = (url, now + self.presign_expires / 2)
+            self._urls.move_to_end(key)
+            while len(self._urls) > self.max_cached_urls:
+                self._urls.popitem(last=False)
+        return url
+
+    def modified(self, key):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))['LastModified'].timestamp()
+        except Exception as e:
+            if _is_missing(e):
+                return None
+            raise
+
+    def _quarantine_key(self, key):
+        return f'{self.quarantine_prefix}/{key}'
+
+    def scan(self, quarantined=False):
+        if quarantined and not self.has_quarantine:
+            return
+        base = self.quarantine_prefix if quarantined else self.prefix
+        start = f'{base}/' if base else ''
+        skip = None if quarantined or not self.has_quarantine else f'{self.quarantine_prefix}/'
+        # ListObjectsV2 mengembalikan paling banyak 1000 kunci per halaman secara berurutan
+        for page in self.client.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=start):
+            for obj in page.get('Contents', []):
+                if skip and obj['Key'].startswith(skip):
+                    continue
+                yield obj['Key'][len(start):], obj['LastModified'].timestamp(), obj['Size']
+
+    def quarantine(self, key):
+        # S3 tidak memiliki rename: objek disalin lalu yang asli dihapus
+        try:
+            self.client.copy_object(Bucket=self.bucket, Key=self._quarantine_key(key),
+                                    CopySource={'Bucket': self.bucket, 'Key': self._key(key)})
+        except Exception as e:
+            if _is_missing(e):
+                return
+            raise
+        self.delete(key)
+
+    def delete_quarantined(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._quarantine_key(key))
+
+def create_storage(config):
+    """Membuat backend penyimpanan sesuai konfigurasi.
+
+    Args:
+        config (Mapping): Konfigurasi aplikasi.
+
+    Returns:
+        StorageBackend: Backend 'local' atau 's3' sesuai `UPLOAD_STORAGE`.
+
+    Raises:
+        ValueError: Jika `UPLOAD_STORAGE` tidak dikenal.
+    """
+    kind = config.get('UPLOAD_STORAGE', 'local')
+    if kind == 'local':
+        return LocalStorage(config['UPLOAD_FOLDER'], fsync=config.get('UPLOAD_FSYNC', True),
+                            quarantine_folder=config.get('UPLOAD_QUARANTINE'))
+    if kind == 's3':
+        max_age = config.get('UPLOAD_CACHE_MAX_AGE', 31536000)
+        return S3Storage(
+            bucket=config['S3_BUCKET'],
+            prefix=config.get('S3_PREFIX', ''),
+            endpoint_url=config.get('S3_ENDPOINT_URL'),
+            region=config.get('S3_REGION'),
+            access_key=config.get('S3_ACCESS_KEY_ID'),
+            secret_key=config.get('S3_SECRET_ACCESS_KEY'),
+            public_url=config.get('S3_PUBLIC_URL'),
+            presign_expires=config.get('S3_PRESIGN_EXPIRES', 3600),
+            multipart_threshold=config.get('S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024),
+            part_size=config.get('S3_PART_SIZE', 8 * 1024 * 1024),
+            # Kunci objek berbasis konten sehingga aman di-cache tanpa revalidasi
+            cache_control=f'public, max-age={max_age}, immutable',
+            quarantine_prefix=config.get('UPLOAD_QUARANTINE'),
+        )
+    raise ValueError(f'UPLOAD_STORAGE tidak dikenal: {kind}')
+
+def get_storage():
+    """Mengambil backend penyimpanan unggahan milik aplikasi saat ini.
+
+    Returns:
+        StorageBackend: Backend yang dibuat sekali per aplikasi.
+    """
+    app = current_app._get_current_object()
+    storage = app.extensions.get('upload_storage')
+    if storage is None:
+        with _init_lock:
+            storage = app.extensions.get('upload_storage')
+            if storage is None:
+                storage = create_storage(app.config)
+                app.extensions['upload_storage'] = storage
+    return storage
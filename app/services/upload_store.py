@@ -0,0 +1,442 @@
+import hashlib
+import itertools
+import os
+import re
+import shutil
+import tempfile
+import time
+from flask import current_app, request
+from app import db
+from app.models.foto_ulasan import FotoUlasan
+from app.models.image_job import ImageJob
+from app.services.image_pipeline import DERIVATIVE_FORMATS, variant_name
+from app.services.storage import get_storage
+
+# Ukuran potongan saat membaca stream unggahan
+CHUNK_SIZE = 64 * 1024
+
+# Ekstensi kanonis per tipe MIME; nama file hanya ditentukan oleh konten
+MIME_EXTENSIONS = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/gif': '.gif'}
+
+# Nama file berbasis konten: SHA-256 (hex) + ekstensi, opsional diikuti nama varian turunan
+CONTENT_NAME = re.compile(r'^[0-9a-f]{64}(?:_[a-z]+)?\.(?:jpg|png|gif|webp)$')
+ORIGINAL_NAME = re.compile(r'^[0-9a-f]{64}\.(?:jpg|png|gif)$')
+
+# Nama file turunan: '<stem>_<varian>.<webp|jpg>' (lihat `variant_name`)
+DERIVATIVE_NAME = re.compile(r'^(?P<stem>.+)_[a-z]+\.(?:webp|jpg)$')
+
+# Awalan file sementara selama unggahan ditulis
+TEMP_PREFIX = '.upload-'
+
+# Nama file yang dapat langsung dipakai sebagai kunci shard (diawali 4 karakter hex)
+_HEX_PREFIX = re.compile(r'^[0-9a-f]{4}')
+
+def shard_path(name):
+    """Menentukan path bertingkat (dua level hex) untuk sebuah nama file.
+
+    Nama berbasis hash atau UUID memakai empat karakter pertamanya; nama lain
+    memakai hash dari namanya sehingga file tersebar merata di 65.536 folder.
+
+    Args:
+        name (str): Nama file tanpa folder, misalnya '<sha256>.jpg'.
+
+    Returns:
+        str: Path relatif terhadap folder unggahan, misalnya 'ab/cd/<sha256>.jpg'.
+    """
+    key = name[:4] if _HEX_PREFIX.match(name) else hashlib.sha256(name.encode()).hexdigest()[:4]
+    return f'{key[:2]}/{key[2:]}/{name}'
+
+def is_sharded(nama_file):
+    """Memeriksa apakah `nama_file` sudah berada di layout bertingkat.
+
+    Args:
+        nama_file (str): Nilai `FotoUlasan.nama_file`.
+
+    Returns:
+        bool: True jika file berada di dalam folder shard.
+    """
+    return '/' in nama_file
+
+def upload_path(nama_file, folder=None):
+    """Mengembalikan path absolut file unggahan.
+
+    Args:
+        nama_file (str): Path relatif file (layout bertingkat maupun lama).
+        folder (str | None): Folder unggahan (default folder penyimpanan lokal).
+
+    Returns:
+        str: Path absolut file di disk.
+    """
+    return os.path.join(folder or current_app.config['UPLOAD_FOLDER'], *nama_file.split('/'))
+
+def upload_url(nama_file):
+    """Membentuk URL publik file unggahan; dipakai oleh template dan `foto_sources`.
+
+    Args:
+        nama_file (str): Path relatif file (layout bertingkat maupun lama).
+
+    Returns:
+        str: URL dari backend penyimpanan aktif (lihat `storage.get_storage`).
+    """
+    return get_storage().url(nama_file)
+
+def store_stream(stream, ext, storage=None, prepare=None):
+    """Menyimpan stream unggahan dengan nama berdasarkan hash SHA-256 kontennya.
+
+    Stream dibaca per potongan sambil di-hash dan ditulis ke file sementara,
+    sehingga file besar tidak perlu dimuat utuh ke memori. Jika konten yang
+    sama sudah tersimpan, file sementara dibuang dan file lama dipakai ulang.
+
+    Args:
+        stream (IO[bytes]): Stream file yang diunggah.
+        ext (str): Ekstensi file termasuk titik, misalnya '.jpg'.
+        storage (StorageBackend | None): Backend tujuan (default `get_storage()`).
+        prepare (Callable[[str], None] | None): Lihat `commit_spooled`.
+
+    Returns:
+        tuple[str, object | None]: Path relatif file berbasis konten (misalnya
+            'ab/cd/<sha256>.jpg') dan penanda versi dari `commit_spooled`.
+    """
+    storage = storage or get_storage()
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=storage.staging_dir, prefix=TEMP_PREFIX, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                tmp.write(chunk)
+        # mkstemp membuat file 0600; file unggahan harus dapat dibaca web server
+        os.chmod(tmp_path, 0o644)
+
+        return commit_spooled(storage, tmp_path, digest.hexdigest(), ext, prepare)
+    finally:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+def commit_spooled(storage, tmp_path, hexdigest, ext, prepare=None):
+    """Memindahkan file sementara yang sudah di-hash ke lokasi berbasis kontennya.
+
+    Nama file ditentukan oleh hash konten yang diunggah, sehingga unggahan
+    ulang dikenali sebelum `prepare` dijalankan dan tidak diproses lagi.
+
+    Args:
+        storage (StorageBackend): Backend tujuan.
+        tmp_path (str): File sementara di `storage.staging_dir`; dapat dipindahkan oleh backend.
+        hexdigest (str): Hash SHA-256 konten (hex).
+        ext (str): Ekstensi file termasuk titik.
+        prepare (Callable[[str], None] | None): Dipanggil dengan `tmp_path` sebelum
+            file baru disimpan, misalnya untuk menormalkan isinya di tempat.
+
+    Returns:
+        tuple[str, object | None]: Path relatif file berbasis konten dan penanda
+            versi dari `put_file`; penanda None jika konten sudah tersimpan
+            sebelumnya sehingga file tidak boleh dihapus saat rollback.
+    """
+    nama_file = shard_path(hexdigest + ext)
+    # Konten yang sudah ada tidak disimpan ulang
+    if storage.touch(nama_file):
+        return nama_file, None
+    if prepare is not None:
+        prepare(tmp_path)
+    return nama_file, storage.put_file(nama_file, tmp_path)
+
+def discard_uploads(written, storage=None):
+    """Menghapus file yang ditulis oleh request yang gagal beserta turunannya.
+
+    Hanya file yang dibuat oleh request tersebut (penanda tidak None) dan
+    belum dipakai ulang oleh request lain sejak itu yang dihapus; file lain
+    dibiarkan untuk GC.
+
+    Args:
+        written (Iterable[tuple[str, object | None]]): Pasangan nama file dan penanda versi.
+        storage (StorageBackend | None): Backend penyimpanan (default `get_storage()`).
+
+    Returns:
+        int: Jumlah file asli yang dihapus.
+    """
+    storage = storage or get_storage()
+    removed = 0
+    for nama_file, token in written:
+        if token is None:
+            continue
+        # Turunan dihapus lebih dulu; file asli yang masih ada tetap dapat dibuat ulang turunannya
+        if storage.discard(nama_file, token):
+            for name in derivative_names(nama_file):
+                storage.delete(name)
+            removed += 1
+    return removed
+
+def reference_counts(names):
+    """Menghitung jumlah `FotoUlasan` yang merujuk setiap file.
+
+    Jumlah referensi selalu dihitung dari tabel foto sehingga tidak dapat
+    berbeda dari data sebenarnya.
+
+    Args:
+        names (Iterable[str]): Nama file yang diperiksa.
+
+    Returns:
+        dict[str, int]: Jumlah referensi per nama file (0 jika tidak dirujuk).
+    """
+    names = list(names)
+    counts = dict.fromkeys(names, 0)
+    if names:
+        rows = db.session.query(FotoUlasan.nama_file, db.func.count(FotoUlasan.id)) \
+            .filter(FotoUlasan.nama_file.in_(names)).group_by(FotoUlasan.nama_file)
+        counts.update(rows)
+    return counts
+
+def _local_folder(folder):
+    """Menentukan folder lokal untuk operasi pemeliharaan yang bekerja langsung di disk."""
+    folder = folder or get_storage().local_folder
+    if folder is None:
+        raise RuntimeError('Operasi ini hanya tersedia untuk penyimpanan lokal (UPLOAD_STORAGE=local).')
+    return folder
+
+def derivative_names(nama_file, variants=None):
+    """Mengembalikan path relatif semua turunan yang mungkin dimiliki sebuah file.
+
+    Args:
+        nama_file (str): Path relatif file asli.
+        variants (Iterable[str] | None): Nama varian (default semua `IMAGE_VARIANTS`).
+
+    Returns:
+        list[str]: Path relatif turunan WebP dan JPEG.
+    """
+    if variants is None:
+        variants = current_app.config.get('IMAGE_VARIANTS', {})
+    return [variant_name(nama_file, variant, ext) for variant in variants for ext, _ in DERIVATIVE_FORMATS]
+
+def _walk_uploads(folder):
+    """Menelusuri folder unggahan dan menghasilkan path relatif setiap file (terurut)."""
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        rel = os.path.relpath(root, folder)
+        for name in sorted(files):
+            yield name if rel == '.' else f"{rel.replace(os.sep, '/')}/{name}"
+
+def _batched(iterable, size):
+    """Membagi iterable menjadi list berukuran `size` tanpa memuat semuanya ke memori."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _has_referenced_original(stem):
+    """Memeriksa apakah ada foto yang merujuk file asli dengan stem tersebut, apa pun ekstensinya."""
+    pattern = re.sub(r'([\\%_])', r'\\\1', stem) + '.%'
+    return db.session.query(FotoUlasan.id).filter(FotoUlasan.nama_file.like(pattern, escape='\\')).first() is not None
+
+def collect_garbage(storage=None, grace_seconds=None, dry_run=False, batch_size=500, rate=None, quarantine=None):
+    """Menghapus atau mengarantina file unggahan yang tidak lagi dirujuk `FotoUlasan`.
+
+    Isi penyimpanan ditelusuri bertahap (`StorageBackend.scan`) dan setiap
+    kelompok `batch_size` file dibandingkan dengan `FotoUlasan.nama_file`
+    lewat satu query, sehingga daftar file maupun tabel foto tidak pernah
+    dimuat utuh ke memori. File turunan dianggap yatim jika file aslinya
+    tidak dirujuk, dan file sementara sisa unggahan terputus selalu yatim.
+
+    File hanya diproses jika tidak diubah selama masa tenggang. Masa tenggang
+    melindungi file yang baru disimpan oleh request yang belum commit,
+    termasuk unggahan ulang konten lama (lihat `store_stream`). Waktu ubah
+    diperiksa ulang setelah referensi sehingga unggahan yang terjadi di antara
+    keduanya tetap terlindungi.
+
+    Jika backend memiliki area karantina (`UPLOAD_QUARANTINE`), file yatim
+    dipindahkan ke sana dan baru dihapus permanen setelah
+    `UPLOAD_QUARANTINE_DAYS` pada eksekusi berikutnya.
+
+    Args:
+        storage (StorageBackend | None): Backend yang dibersihkan (default `get_storage()`).
+        grace_seconds (float | None): Masa tenggang (default `UPLOAD_GC_GRACE`).
+        dry_run (bool): Hanya melaporkan file yatim tanpa mengubah apa pun.
+        batch_size (int): Jumlah file per query referensi.
+        rate (float | None): Batas file yang dihapus/dikarantina per detik
+            (default `UPLOAD_GC_RATE`; 0 berarti tanpa batas).
+        quarantine (bool | None): Mengarantina alih-alih menghapus (default jika karantina tersedia).
+
+    Returns:
+        dict: Laporan berisi 'scanned' (jumlah file diperiksa), 'orphans' (kunci file yatim),
+            'bytes' (total ukurannya), 'quarantine' (file dikarantina), dan 'purged'
+            (file karantina yang dihapus permanen).
+
+    Raises:
+        RuntimeError: Jika karantina diminta tetapi `UPLOAD_QUARANTINE` belum diatur.
+    """
+    storage = storage or get_storage()
+    config = current_app.config
+    if grace_seconds is None:
+        grace_seconds = config.get('UPLOAD_GC_GRACE', 3600)
+    if rate is None:
+        rate = config.get('UPLOAD_GC_RATE', 0)
+    if quarantine is None:
+        quarantine = storage.has_quarantine
+    elif quarantine and not storage.has_quarantine:
+        raise RuntimeError('Karantina membutuhkan UPLOAD_QUARANTINE.')
+    # Foto lama memakai ekstensi dari nama file pengguna, bisa huruf besar maupun kecil
+    allowed = config.get('ALLOWED_EXTENSIONS', ())
+    extensions = sorted({f'.{e}' for e in allowed} | {f'.{e.upper()}' for e in allowed})
+    now = time.time()
+    cutoff = now - grace_seconds
+    report = {'scanned': 0, 'orphans': [], 'bytes': 0, 'quarantine': quarantine, 'purged': 0}
+
+    started = time.monotonic()
+    done = 0
+
+    def remove(action, key):
+        nonlocal done
+        action(key)
+        done += 1
+        if rate:
+            # Penghapusan diratakan agar disk dan database tidak terbebani saat jam sibuk
+            delay = started + done / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    def fresh(key):
+        mtime = storage.modified(key)
+        return mtime is not None and mtime >= cutoff
+
+    for batch in _batched(storage.scan(), batch_size):
+        report['scanned'] += len(batch)
+        candidates = []
+        for key, mtime, size in batch:
+            if mtime >= cutoff:
+                continue
+            if key.rsplit('/', 1)[-1].startswith(TEMP_PREFIX):
+                candidates.append((key, size, None, []))
+                continue
+            match = DERIVATIVE_NAME.match(key)
+            if match:
+                candidates.append((key, size, match['stem'], [match['stem'] + ext for ext in extensions]))
+            elif key.endswith(tuple(extensions)):
+                candidates.append((key, size, None, [key]))
+            # File lain (misalnya .gitkeep) bukan unggahan dan tidak disentuh
+
+        counts = reference_counts({owner for _, _, _, owners in candidates for owner in owners})
+        for key, size, stem, owners in candidates:
+            if any(counts[owner] for owner in owners):
+                continue
+            if stem is not None:
+                if _has_referenced_original(stem):
+                    continue
+                # File asli yang baru dipakai ulang belum tentu sudah dirujuk oleh commit-nya
+                if any(fresh(stem + ext) for ext in MIME_EXTENSIONS.values()):
+                    continue
+            elif owners:
+                mtime = storage.modified(key)
+                if mtime is None or mtime >= cutoff:
+                    continue
+            report['orphans'].append(key)
+            report['bytes'] += size
+            if not dry_run:
+                remove(storage.quarantine if quarantine else storage.delete, key)
+
+    if quarantine and not dry_run:
+        expiry = now - config.get('UPLOAD_QUARANTINE_DAYS', 7) * 86400
+        for key, mtime, _ in storage.scan(quarantined=True):
+            if mtime < expiry:
+                remove(storage.delete_quarantined, key)
+                report['purged'] += 1
+    return report
+
+def _link(src, dst):
+    """Membuat hard link `dst` ke `src`, atau menyalinnya jika berbeda filesystem.
+
+    mtime diperbarui karena lokasi baru belum dirujuk database sampai migrasi
+    commit; dengan mtime lama, GC yang berjalan bersamaan akan menganggapnya
+    file yatim yang sudah melewati masa tenggang.
+    """
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        # Nama yang sama berarti konten yang sama (nama berbasis hash atau UUID)
+        pass
+    except OSError:
+        shutil.copy2(src, dst)
+    os.utime(dst)
+
+def migrate_to_shards(batch_size=100, folder=None):
+    """Memindahkan file unggahan lama (datar) ke layout bertingkat tanpa downtime.
+
+    Setiap kelompok diproses dalam tiga langkah: file asli dan turunannya
+    ditautkan ke lokasi baru, `FotoUlasan.nama_file` diperbarui dan di-commit,
+    lalu file lama dihapus. Selama proses, halaman yang dirender dengan nama
+    lama maupun baru tetap dapat menampilkan fotonya. Foto yang turunannya
+    masih diproses dilewati dan dipindahkan pada eksekusi berikutnya.
+    Perintah aman dihentikan dan dijalankan ulang kapan saja.
+
+    Args:
+        batch_size (int): Jumlah nama file per commit.
+        folder (str | None): Folder unggahan (default folder penyimpanan lokal).
+
+    Returns:
+        dict: Jumlah file yang 'moved', 'missing' (tidak ada di disk), dan 'skipped'.
+    """
+    folder = _local_folder(folder)
+    totals = {'moved': 0, 'missing': 0, 'skipped': 0}
+    busy = db.session.query(FotoUlasan.nama_file).join(ImageJob) \
+        .filter(ImageJob.status == ImageJob.PENDING)
+    last = ''
+    while True:
+        names = [name for (name,) in db.session.query(FotoUlasan.nama_file).distinct()
+                 .filter(~FotoUlasan.nama_file.contains('/'), FotoUlasan.nama_file > last)
+                 .order_by(FotoUlasan.nama_file).limit(batch_size)]
+        if not names:
+            break
+        last = names[-1]
+        pending = {name for (name,) in busy.filter(FotoUlasan.nama_file.in_(names))}
+
+        linked = []
+        for name in names:
+            if name in pending:
+                totals['skipped'] += 1
+                continue
+            new_name = shard_path(name)
+            pairs = [(name, new_name)] + list(zip(derivative_names(name), derivative_names(new_name)))
+            src = upload_path(name, folder)
+            if not os.path.exists(src):
+                totals['missing'] += 1
+            for old_rel, new_rel in pairs:
+                old_path = upload_path(old_rel, folder)
+                if os.path.exists(old_path):
+                    _link(old_path, upload_path(new_rel, folder))
+                    linked.append(old_path)
+            FotoUlasan.query.filter_by(nama_file=name) \
+                .update({'nama_file': new_name}, synchronize_session=False)
+            totals['moved'] += 1
+        db.session.commit()
+
+        # File lama baru dihapus setelah semua baris merujuk lokasi baru
+        for path in linked:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    return totals
+
+def upload_cache_headers(response):
+    """Menambahkan header cache jangka panjang untuk file unggahan berbasis konten.
+
+    Nama file berbasis konten tidak pernah berganti isi, sehingga browser dan
+    CDN dapat menyimpannya tanpa revalidasi.
+
+    Args:
+        response (Response): Objek respons Flask.
+
+    Returns:
+        Response: Objek respons dengan header `Cache-Control` immutable untuk unggahan.
+    """
+    filename = (request.view_args or {}).get('filename', '') if request.endpoint == 'static' else ''
+    if response.status_code in (200, 304) and filename.startswith('uploads/') \
+            and CONTENT_NAME.match(filename.rsplit('/', 1)[-1]):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config.get('UPLOAD_CACHE_MAX_AGE', 31536000)
+        response.cache_control.immutable = True
+    return response
@@ -0,0 +1,203 @@
+import hashlib
+import os
+import tempfile
+import threading
+import magic
+from flask import Request, current_app
+from app.services.storage import get_storage
+from app.services.upload_store import MIME_EXTENSIONS, TEMP_PREFIX, commit_spooled
+
+# Jumlah byte awal yang dipakai untuk mendeteksi tipe MIME
+SNIFF_BYTES = 2048
+
+# Detektor MIME dipakai bersama karena membuka database libmagic cukup mahal
+_detector = None
+_init_lock = threading.Lock()
+
+def detect_mime(buffer):
+    """Mendeteksi tipe MIME dari beberapa byte awal file.
+
+    Instance `magic.Magic` dibuat sekali per proses; pemanggilannya sudah
+    dilindungi lock internal python-magic sehingga aman dipakai antar thread.
+
+    Args:
+        buffer (bytes): Byte awal file.
+
+    Returns:
+        str: Tipe MIME yang terdeteksi, misalnya 'image/jpeg'.
+    """
+    global _detector
+    if _detector is None:
+        with _init_lock:
+            if _detector is None:
+                _detector = magic.Magic(mime=True)
+    return _detector.from_buffer(buffer)
+
+class UploadBudget:
+    """Sisa kuota byte file untuk satu request.
+
+    Attributes:
+        remaining (int): Jumlah byte file yang masih boleh diterima.
+    """
+
+    def __init__(self, limit):
+        """Menginisialisasi kuota.
+
+        Args:
+            limit (int): Total byte file yang boleh diterima dalam satu request.
+        """
+        self.remaining = limit
+
+    def consume(self, size):
+        """Memakai kuota; mengembalikan False jika kuota habis."""
+        self.remaining -= size
+        return self.remaining >= 0
+
+class StreamingUpload:
+    """Tujuan tulis satu file multipart yang memvalidasi data selama diterima.
+
+    Werkzeug menulis potongan body request ke objek ini. Byte awal ditahan di
+    memori hingga cukup untuk deteksi MIME; file yang bukan gambar, melebihi
+    batas ukuran per file, atau melebihi kuota request langsung ditolak dan
+    potongan berikutnya dibuang tanpa disimpan. Data yang diterima di-hash
+    dan ditulis langsung ke folder staging backend penyimpanan, sehingga
+    `commit` cukup memindahkannya ke lokasi akhir.
+
+    Attributes:
+        mime (str | None): Tipe MIME yang terdeteksi.
+        error (str | None): Alasan penolakan, jika file ditolak.
+        size (int): Jumlah byte yang diterima.
+    """
+
+    def __init__(self, budget, max_file_size, staging_dir):
+        """Menyiapkan tujuan tulis tanpa membuat file sementara.
+
+        Args:
+            budget (UploadBudget): Kuota byte bersama untuk request ini.
+            max_file_size (int): Batas ukuran satu file (byte).
+            staging_dir (str | None): Folder file sementara (lihat `StorageBackend.staging_dir`).
+        """
+        self.budget = budget
+        self.max_file_size = max_file_size
+        self.staging_dir = staging_dir
+        self.mime = None
+        self.error = None
+        self.size = 0
+        self._head = bytearray()
+        self._digest = hashlib.sha256()
+        self._file = None
+        self._path = None
+
+    def _reject(self, message):
+        """Menolak file dan langsung membuang data yang sudah ditulis."""
+        self.error = message
+        self._head = None
+        self._discard()
+
+    def _discard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._path is not None:
+            try:
+                os.remove(self._path)
+            except FileNotFoundError:
+                pass
+            self._path = None
+
+    def _sniff(self):
+        self.mime = detect_mime(bytes(self._head[:SNIFF_BYTES]))
+        if self.mime not in MIME_EXTENSIONS:
+            self._reject(f'Tipe file tidak valid: terdeteksi {self.mime}. Hanya gambar yang diizinkan.')
+            return
+        head, self._head = bytes(self._head), None
+        self._append(head)
+
+    def _append(self, data):
+        try:
+            if self._file is None:
+                fd, self._path = tempfile.mkstemp(dir=self.staging_dir, prefix=TEMP_PREFIX, suffix='.tmp')
+                self._file = os.fdopen(fd, 'w+b')
+            self._digest.update(data)
+            self._file.write(data)
+        except OSError as e:
+            # Disk penuh atau folder staging tidak dapat ditulis: ditolak seperti file tidak valid, bukan error 500
+            current_app.logger.error('Gagal menulis file unggahan sementara ke %s: %s', self.staging_dir, e)
+            self._reject('Foto tidak dapat disimpan saat ini. Silakan coba lagi nanti.')
+
+    def write(self, data):
+        """Menerima satu potongan data dari parser multipart.
+
+        Args:
+            data (bytes): Potongan data file.
+
+        Returns:
+            int: Jumlah byte yang diterima (termasuk yang dibuang).
+        """
+        if self.error is not None:
+            return len(data)
+        self.size += len(data)
+        if self.size > self.max_file_size:
+            self._reject(f'Ukuran file melebihi batas {round(self.max_file_size / (1024 * 1024), 1):g} MB.')
+        elif not self.budget.consume(len(data)):
+            self._reject('Total ukuran foto dalam satu ulasan melebihi batas.')
+        elif self.mime is None:
+            self._head += data
+            if len(self._head) >= SNIFF_BYTES:
+                self._sniff()
+        else:
+            self._append(data)
+        return len(data)
+
+    def seek(self, offset, whence=0):
+        """Dipanggil Werkzeug setelah potongan terakhir; file kecil divalidasi di sini."""
+        if self.error is None and self.mime is None:
+            self._sniff()
+        if self._file is None:
+            return 0
+        return self._file.seek(offset, whence)
+
+    def read(self, size=-1):
+        return self._file.read(size) if self._file is not None else b''
+
+    def readline(self, size=-1):
+        return self._file.readline(size) if self._file is not None else b''
+
+    def tell(self):
+        return self._file.tell() if self._file is not None else 0
+
+    def commit(self, ext, storage=None, prepare=None):
+        """Memindahkan file yang sudah divalidasi ke lokasi berbasis kontennya.
+
+        Args:
+            ext (str): Ekstensi file termasuk titik.
+            storage (StorageBackend | None): Backend tujuan (default `get_storage()`).
+            prepare (Callable[[str], None] | None): Lihat `commit_spooled`.
+
+        Returns:
+            tuple[str, object | None]: Path relatif file dan penanda versi (lihat `commit_spooled`).
+        """
+        self._file.close()
+        self._file = None
+        # mkstemp membuat file 0600; file unggahan harus dapat dibaca web server
+        os.chmod(self._path, 0o644)
+        try:
+            return commit_spooled(storage or get_storage(), self._path, self._digest.hexdigest(), ext, prepare)
+        finally:
+            self._discard()
+
+    def close(self):
+        """Membersihkan file sementara yang tidak di-commit (dipanggil saat request selesai)."""
+        self._discard()
+
+class UploadRequest(Request):
+    """Request Flask yang memvalidasi file unggahan sambil body multipart dibaca."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Field file kosong (tidak ada file dipilih) tidak membutuhkan validasi
+        if not filename:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        budget = self.__dict__.get('_upload_budget')
+        if budget is None:
+            budget = self._upload_budget = UploadBudget(current_app.config['UPLOAD_MAX_REQUEST_SIZE'])
+        return StreamingUpload(budget, current_app.config['UPLOAD_MAX_FILE_SIZE'], get_storage().staging_dir)
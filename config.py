@@ -20,6 +20,40 @@ class Config:
         UPLOAD_FOLDER (str): Direktori penyimpanan file yang diunggah.
         ALLOWED_EXTENSIONS (set): Ekstensi file yang diizinkan untuk diunggah.
         MAX_CONTENT_LENGTH (int): Batas ukuran unggahan (dalam byte).
+        IMAGE_VARIANTS (dict): Varian turunan foto ulasan dan lebar maksimalnya (piksel).
+        IMAGE_WEBP_QUALITY (int): Kualitas encoding turunan WebP.
+        IMAGE_JPEG_QUALITY (int): Kualitas encoding turunan JPEG.
+        IMAGE_PROCESSING_MODE (str): Cara membuat turunan foto: 'pool' (process pool) atau 'sync' (di dalam request).
+        IMAGE_WORKERS (int): Jumlah proses worker pemrosesan foto.
+        IMAGE_MAX_PENDING (int): Jumlah job foto maksimal yang berjalan atau mengantre di process pool.
+        IMAGE_JOB_MAX_ATTEMPTS (int): Jumlah percobaan sebelum job foto dinyatakan gagal.
+        IMAGE_JOB_REDRIVE_AFTER (float): Umur job foto 'pending' sebelum diambil ulang saat pool punya slot kosong (detik).
+        UPLOAD_MAX_FILE_SIZE (int): Batas ukuran satu file unggahan (byte).
+        UPLOAD_MAX_REQUEST_SIZE (int): Batas total ukuran file unggahan dalam satu request (byte).
+        UPLOAD_SAVE_WORKERS (int): Jumlah thread untuk menyimpan beberapa foto sekaligus.
+        UPLOAD_FSYNC (bool): Menulis file unggahan ke disk (fsync) sebelum dianggap tersimpan.
+        UPLOAD_NORMALIZE (bool): Menormalkan foto unggahan (batas dimensi, tanpa metadata, encode ulang).
+        UPLOAD_MAX_DIMENSION (int): Batas sisi terpanjang foto unggahan (piksel).
+        UPLOAD_JPEG_QUALITY (int): Kualitas encoding ulang foto JPEG unggahan.
+        UPLOAD_MAX_PIXELS (int): Resolusi maksimal foto unggahan (piksel), diperiksa sebelum foto di-decode.
+        UPLOAD_DECODE_CONCURRENCY (int): Jumlah foto unggahan yang boleh di-decode bersamaan per proses.
+        UPLOAD_GC_GRACE (int): Masa tenggang (detik) sebelum file unggahan tanpa referensi boleh dihapus.
+        UPLOAD_GC_RATE (float): Batas file yang dihapus GC per detik (0 berarti tanpa batas).
+        UPLOAD_QUARANTINE (str | None): Folder (local) atau awalan kunci (s3) karantina file yatim;
+            kosong berarti file yatim langsung dihapus.
+        UPLOAD_QUARANTINE_DAYS (int): Lama file disimpan di karantina sebelum dihapus permanen (hari).
+        UPLOAD_CACHE_MAX_AGE (int): Masa cache (detik) untuk file unggahan berbasis konten.
+        UPLOAD_STORAGE (str): Backend penyimpanan unggahan: 'local' atau 's3'.
+        S3_BUCKET (str | None): Nama bucket untuk penyimpanan S3.
+        S3_PREFIX (str): Awalan kunci objek di dalam bucket.
+        S3_ENDPOINT_URL (str | None): Endpoint S3-compatible (MinIO, R2, dll.); kosong untuk AWS.
+        S3_REGION (str | None): Region bucket S3.
+        S3_ACCESS_KEY_ID (str | None): Access key untuk penyimpanan S3.
+        S3_SECRET_ACCESS_KEY (str | None): Secret key untuk penyimpanan S3.
+        S3_PUBLIC_URL (str | None): URL dasar publik bucket/CDN; kosong untuk memakai presigned URL.
+        S3_PRESIGN_EXPIRES (int): Masa berlaku presigned URL (detik); URL dipakai ulang selama separuh masa ini.
+        S3_MULTIPART_THRESHOLD (int): Ukuran file (byte) mulai memakai multipart upload.
+        S3_PART_SIZE (int): Ukuran setiap bagian multipart upload (byte).
         MAIL_SERVER (str): Server SMTP untuk pengiriman email.
         MAIL_PORT (int): Port server email.
         MAIL_USE_TLS (bool): Aktifkan TLS untuk koneksi email.
@@ -27,9 +61,57 @@ class Config:
         MAIL_USERNAME (str): Username autentikasi email.
         MAIL_PASSWORD (str): Password autentikasi email.
         MAIL_SENDER (tuple): Identitas pengirim email default.
+        MAIL_DELIVERY_MODE (str): Cara pengiriman email: 'queue' (antrean latar belakang), 'outbox' (tabel persisten) atau 'sync' (langsung).
+        MAIL_QUEUE_SIZE (int): Jumlah email maksimal di antrean sebelum dikirim langsung.
+        MAIL_MAX_RETRIES (int): Jumlah percobaan ulang untuk kegagalan SMTP sementara.
+        MAIL_RETRY_BACKOFF (float): Jeda dasar backoff eksponensial percobaan ulang (detik).
+        MAIL_DRAIN_TIMEOUT (float): Batas waktu menguras antrean email saat proses berhenti (detik).
+        MAIL_OUTBOX_BATCH_SIZE (int): Jumlah email outbox yang diklaim per kelompok.
+        MAIL_OUTBOX_LEASE (float): Lama lease email outbox sebelum boleh diklaim ulang (detik).
+        MAIL_OUTBOX_MAX_ATTEMPTS (int): Jumlah percobaan sebelum email outbox dipindahkan ke dead-letter.
+        MAIL_OUTBOX_BACKOFF (float): Jeda dasar backoff eksponensial email outbox (detik).
+        MAIL_OUTBOX_MAX_BACKOFF (float): Batas atas jeda backoff email outbox (detik).
+        MAIL_BULK_PER_CONNECTION (int): Jumlah email per koneksi SMTP sebelum koneksi dirotasi.
+        MAIL_BULK_RATE (float): Laju maksimal pengiriman email massal (pesan per detik, 0 = tanpa batas).
         BAD_WORDS_ID (list): Daftar kata terlarang untuk filtering konten.
         ALLOWED_EMAIL_DOMAINS (list): Domain email yang diizinkan.
         GEMINI_API_KEY (str): Kunci API untuk layanan Google Gemini.
+        GEMINI_POOL_SIZE (int): Jumlah koneksi keep-alive maksimal ke Gemini per proses.
+        GEMINI_CONNECT_TIMEOUT (float): Batas waktu membuka koneksi ke Gemini (detik).
+        GEMINI_READ_TIMEOUT (float): Batas waktu menunggu respons Gemini (detik).
+        GEMINI_MAX_RETRIES (int): Batas percobaan ulang untuk error koneksi dan status 429/5xx.
+        GEMINI_BACKOFF_FACTOR (float): Faktor backoff eksponensial antar percobaan ulang (detik).
+        GEMINI_BACKOFF_JITTER (float): Jitter acak maksimal yang ditambahkan ke backoff (detik).
+        GEMINI_API_BASE_URL (str): Alamat dasar Gemini API (dapat diarahkan ke server tiruan untuk uji beban).
+        CHATBOT_CACHE_SIZE (int): Jumlah jawaban chatbot maksimal di cache (0 untuk menonaktifkan).
+        CHATBOT_CACHE_TTL (int): Masa berlaku jawaban chatbot di cache (detik).
+        CATALOG_VERSION_FILE (str | None): File versi katalog bersama agar worker lain tahu katalog berubah (None untuk menonaktifkan).
+        CHATBOT_STREAM_MAX_CHARS (int): Panjang maksimal jawaban streaming sebelum dipotong.
+        CHATBOT_EXECUTOR_WORKERS (int): Jumlah thread yang memproses pertanyaan chatbot.
+        CHATBOT_MAX_IN_FLIGHT (int): Jumlah maksimal pertanyaan chatbot yang berjalan atau mengantre.
+        CHATBOT_PER_USER_LIMIT (int): Jumlah maksimal pertanyaan bersamaan per pengguna.
+        CHATBOT_DEADLINE (float): Batas waktu menunggu jawaban chatbot per request (detik).
+        CHATBOT_INTENT_MIN_CONFIDENCE (float): Keyakinan minimal agar pertanyaan dijawab dari katalog.
+        CHATBOT_INTENT_MAX_ITEMS (int): Jumlah item maksimal dalam jawaban dari katalog.
+        CHATBOT_SINGLEFLIGHT_DIR (str | None): Direktori file lock untuk menggabungkan pertanyaan antar worker.
+        CHATBOT_SINGLEFLIGHT_RESULT_TTL (float): Umur maksimal hasil bersama antar worker (detik).
+        CHATBOT_SINGLEFLIGHT_WAIT (float): Batas waktu menunggu thread atau worker lain yang sedang menanyakan hal sama (detik).
+        CHATBOT_SINGLEFLIGHT_STRIPES (int): Jumlah file lock lintas worker tempat pertanyaan di-hash.
+        GEMINI_BREAKER_WINDOW (float): Panjang sliding window circuit breaker Gemini (detik).
+        GEMINI_BREAKER_MIN_CALLS (int): Jumlah panggilan minimal sebelum circuit breaker mengevaluasi rasio.
+        GEMINI_BREAKER_FAILURE_RATE (float): Rasio panggilan gagal yang membuka circuit breaker.
+        GEMINI_BREAKER_SLOW_CALL (float): Durasi panggilan Gemini yang dianggap lambat (detik).
+        GEMINI_BREAKER_SLOW_RATE (float): Rasio panggilan lambat yang membuka circuit breaker.
+        GEMINI_BREAKER_OPEN_DURATION (float): Lama circuit breaker terbuka sebelum uji coba pemulihan (detik).
+        CHATBOT_CONTEXT_TOP_K (int): Jumlah cuplikan katalog teratas yang disisipkan ke prompt.
+        CHATBOT_CONTEXT_TOKEN_BUDGET (int): Batas perkiraan token untuk seluruh cuplikan katalog di prompt.
+        CHATBOT_CONTEXT_SNIPPET_CHARS (int): Panjang maksimal setiap cuplikan katalog (karakter).
+        CHATBOT_INDEX_MAX_AGE (float): Umur maksimal indeks katalog sebelum dibangun ulang penuh (detik).
+        CHATBOT_HISTORY_TURNS (int): Jumlah giliran percakapan terakhir yang disimpan per pengguna (0 = nonaktif).
+        CHATBOT_HISTORY_TOKEN_BUDGET (int): Batas perkiraan token riwayat sebelum giliran lama diringkas.
+        CHATBOT_HISTORY_MAX_CONVERSATIONS (int): Jumlah percakapan maksimal yang disimpan di memori.
+        CHATBOT_HISTORY_MAX_BYTES (int): Batas total ukuran riwayat percakapan di memori (byte).
+        CHATBOT_HISTORY_IDLE_TTL (float): Lama percakapan tidak aktif sebelum dibuang (detik).
     """
     # Mengaktifkan proteksi CSRF secara default
     WTF_CSRF_ENABLED = True
@@ -59,6 +141,43 @@ class Config:
     UPLOAD_FOLDER = os.path.join(basedir, 'app/static/uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # Batas ukuran file 10MB
+    UPLOAD_MAX_FILE_SIZE = int(os.environ.get('UPLOAD_MAX_FILE_SIZE') or MAX_CONTENT_LENGTH)
+    UPLOAD_MAX_REQUEST_SIZE = int(os.environ.get('UPLOAD_MAX_REQUEST_SIZE') or MAX_CONTENT_LENGTH)
+    UPLOAD_SAVE_WORKERS = int(os.environ.get('UPLOAD_SAVE_WORKERS') or 4)
+    UPLOAD_FSYNC = os.environ.get('UPLOAD_FSYNC', 'true').lower() in ['true', 'on', '1']
+    UPLOAD_NORMALIZE = os.environ.get('UPLOAD_NORMALIZE', 'true').lower() in ['true', 'on', '1']
+    UPLOAD_MAX_DIMENSION = int(os.environ.get('UPLOAD_MAX_DIMENSION') or 2560)
+    UPLOAD_JPEG_QUALITY = int(os.environ.get('UPLOAD_JPEG_QUALITY') or 85)
+    UPLOAD_MAX_PIXELS = int(os.environ.get('UPLOAD_MAX_PIXELS') or 50_000_000)
+    UPLOAD_DECODE_CONCURRENCY = int(os.environ.get('UPLOAD_DECODE_CONCURRENCY') or 2)
+    UPLOAD_GC_GRACE = int(os.environ.get('UPLOAD_GC_GRACE') or 3600)
+    UPLOAD_GC_RATE = float(os.environ.get('UPLOAD_GC_RATE') or 50)
+    UPLOAD_QUARANTINE = os.environ.get('UPLOAD_QUARANTINE')
+    UPLOAD_QUARANTINE_DAYS = int(os.environ.get('UPLOAD_QUARANTINE_DAYS') or 7)
+    UPLOAD_CACHE_MAX_AGE = 365 * 24 * 3600
+
+    # Backend penyimpanan unggahan; 's3' memungkinkan beberapa web node berbagi file
+    UPLOAD_STORAGE = os.environ.get('UPLOAD_STORAGE') or 'local'
+    S3_BUCKET = os.environ.get('S3_BUCKET')
+    S3_PREFIX = os.environ.get('S3_PREFIX') or 'uploads'
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL')
+    S3_REGION = os.environ.get('S3_REGION')
+    S3_ACCESS_KEY_ID = os.environ.get('S3_ACCESS_KEY_ID')
+    S3_SECRET_ACCESS_KEY = os.environ.get('S3_SECRET_ACCESS_KEY')
+    S3_PUBLIC_URL = os.environ.get('S3_PUBLIC_URL')
+    S3_PRESIGN_EXPIRES = int(os.environ.get('S3_PRESIGN_EXPIRES') or 3600)
+    S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+    S3_PART_SIZE = 8 * 1024 * 1024
+
+    # Konfigurasi turunan foto ulasan (thumbnail) yang dibuat saat unggah
+    IMAGE_VARIANTS = {'thumb': 320, 'medium': 960}
+    IMAGE_WEBP_QUALITY = int(os.environ.get('IMAGE_WEBP_QUALITY') or 80)
+    IMAGE_JPEG_QUALITY = int(os.environ.get('IMAGE_JPEG_QUALITY') or 82)
+    IMAGE_PROCESSING_MODE = os.environ.get('IMAGE_PROCESSING_MODE') or 'pool'
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS') or 2)
+    IMAGE_MAX_PENDING = int(os.environ.get('IMAGE_MAX_PENDING') or 32)
+    IMAGE_JOB_MAX_ATTEMPTS = int(os.environ.get('IMAGE_JOB_MAX_ATTEMPTS') or 3)
+    IMAGE_JOB_REDRIVE_AFTER = float(os.environ.get('IMAGE_JOB_REDRIVE_AFTER') or 120)
 
     # Konfigurasi email untuk fitur seperti konfirmasi akun dan reset password
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
@@ -69,6 +188,24 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_SENDER = ('Tim Lelana.id', os.environ.get('MAIL_USERNAME'))
 
+    # Konfigurasi antrean pengiriman email di latar belakang
+    MAIL_DELIVERY_MODE = os.environ.get('MAIL_DELIVERY_MODE') or 'queue'
+    MAIL_QUEUE_SIZE = int(os.environ.get('MAIL_QUEUE_SIZE') or 1000)
+    MAIL_MAX_RETRIES = int(os.environ.get('MAIL_MAX_RETRIES') or 3)
+    MAIL_RETRY_BACKOFF = float(os.environ.get('MAIL_RETRY_BACKOFF') or 2)
+    MAIL_DRAIN_TIMEOUT = float(os.environ.get('MAIL_DRAIN_TIMEOUT') or 10)
+
+    # Konfigurasi outbox email persisten (MAIL_DELIVERY_MODE=outbox)
+    MAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('MAIL_OUTBOX_BATCH_SIZE') or 50)
+    MAIL_OUTBOX_LEASE = float(os.environ.get('MAIL_OUTBOX_LEASE') or 120)
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('MAIL_OUTBOX_MAX_ATTEMPTS') or 5)
+    MAIL_OUTBOX_BACKOFF = float(os.environ.get('MAIL_OUTBOX_BACKOFF') or 30)
+    MAIL_OUTBOX_MAX_BACKOFF = float(os.environ.get('MAIL_OUTBOX_MAX_BACKOFF') or 3600)
+
+    # Konfigurasi pengiriman massal melalui koneksi SMTP yang dipakai ulang
+    MAIL_BULK_PER_CONNECTION = int(os.environ.get('MAIL_BULK_PER_CONNECTION') or 100)
+    MAIL_BULK_RATE = float(os.environ.get('MAIL_BULK_RATE') or 0)
+
     # Daftar kata-kata kasar dalam Bahasa Indonesia untuk filter konten
     _bad_words_str = os.environ.get('BAD_WORDS_ID', '')
     BAD_WORDS_ID = [word.strip() for word in _bad_words_str.split(',') if word.strip()]
@@ -80,6 +217,60 @@ class Config:
     # Kunci API untuk layanan eksternal
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 
+    # Konfigurasi klien HTTP untuk Gemini API (connection pool, timeout, dan retry)
+    GEMINI_POOL_SIZE = int(os.environ.get('GEMINI_POOL_SIZE') or 10)
+    GEMINI_CONNECT_TIMEOUT = float(os.environ.get('GEMINI_CONNECT_TIMEOUT') or 3.05)
+    GEMINI_READ_TIMEOUT = float(os.environ.get('GEMINI_READ_TIMEOUT') or 30)
+    GEMINI_MAX_RETRIES = int(os.environ.get('GEMINI_MAX_RETRIES') or 2)
+    GEMINI_BACKOFF_FACTOR = float(os.environ.get('GEMINI_BACKOFF_FACTOR') or 0.5)
+    GEMINI_BACKOFF_JITTER = float(os.environ.get('GEMINI_BACKOFF_JITTER') or 0.5)
+    GEMINI_API_BASE_URL = os.environ.get('GEMINI_API_BASE_URL') or 'https://generativelanguage.googleapis.com/v1beta'
+
+    # Konfigurasi cache jawaban chatbot (LRU dengan TTL)
+    CHATBOT_CACHE_SIZE = int(os.environ.get('CHATBOT_CACHE_SIZE') or 512)
+    CHATBOT_CACHE_TTL = int(os.environ.get('CHATBOT_CACHE_TTL') or 3600)
+    # File versi katalog yang dibagikan antar worker di host yang sama untuk invalidasi cache
+    CATALOG_VERSION_FILE = os.environ.get('CATALOG_VERSION_FILE') or os.path.join(basedir, 'catalog.version')
+    # Batas panjang jawaban streaming untuk menghentikan jawaban yang tidak terkendali
+    CHATBOT_STREAM_MAX_CHARS = int(os.environ.get('CHATBOT_STREAM_MAX_CHARS') or 4000)
+
+    # Konfigurasi executor chatbot (kapasitas, batas per pengguna, dan batas waktu)
+    CHATBOT_EXECUTOR_WORKERS = int(os.environ.get('CHATBOT_EXECUTOR_WORKERS') or 4)
+    CHATBOT_MAX_IN_FLIGHT = int(os.environ.get('CHATBOT_MAX_IN_FLIGHT') or 16)
+    CHATBOT_PER_USER_LIMIT = int(os.environ.get('CHATBOT_PER_USER_LIMIT') or 2)
+    CHATBOT_DEADLINE = float(os.environ.get('CHATBOT_DEADLINE') or 40)
+
+    # Konfigurasi router intent yang menjawab pertanyaan faktual dari katalog
+    CHATBOT_INTENT_MIN_CONFIDENCE = float(os.environ.get('CHATBOT_INTENT_MIN_CONFIDENCE') or 0.85)
+    CHATBOT_INTENT_MAX_ITEMS = int(os.environ.get('CHATBOT_INTENT_MAX_ITEMS') or 5)
+
+    # Konfigurasi penggabungan pertanyaan bersamaan (single-flight), lintas worker jika direktori diisi
+    CHATBOT_SINGLEFLIGHT_DIR = os.environ.get('CHATBOT_SINGLEFLIGHT_DIR')
+    CHATBOT_SINGLEFLIGHT_RESULT_TTL = float(os.environ.get('CHATBOT_SINGLEFLIGHT_RESULT_TTL') or 5)
+    CHATBOT_SINGLEFLIGHT_WAIT = float(os.environ.get('CHATBOT_SINGLEFLIGHT_WAIT') or 35)
+    CHATBOT_SINGLEFLIGHT_STRIPES = int(os.environ.get('CHATBOT_SINGLEFLIGHT_STRIPES') or 64)
+
+    # Konfigurasi circuit breaker Gemini (gagal cepat saat Gemini gangguan atau lambat)
+    GEMINI_BREAKER_WINDOW = float(os.environ.get('GEMINI_BREAKER_WINDOW') or 60)
+    GEMINI_BREAKER_MIN_CALLS = int(os.environ.get('GEMINI_BREAKER_MIN_CALLS') or 10)
+    GEMINI_BREAKER_FAILURE_RATE = float(os.environ.get('GEMINI_BREAKER_FAILURE_RATE') or 0.5)
+    GEMINI_BREAKER_SLOW_CALL = float(os.environ.get('GEMINI_BREAKER_SLOW_CALL') or 10)
+    GEMINI_BREAKER_SLOW_RATE = float(os.environ.get('GEMINI_BREAKER_SLOW_RATE') or 0.8)
+    GEMINI_BREAKER_OPEN_DURATION = float(os.environ.get('GEMINI_BREAKER_OPEN_DURATION') or 30)
+
+    # Konfigurasi indeks pencarian katalog untuk konteks prompt chatbot
+    CHATBOT_CONTEXT_TOP_K = int(os.environ.get('CHATBOT_CONTEXT_TOP_K') or 3)
+    CHATBOT_CONTEXT_TOKEN_BUDGET = int(os.environ.get('CHATBOT_CONTEXT_TOKEN_BUDGET') or 400)
+    CHATBOT_CONTEXT_SNIPPET_CHARS = int(os.environ.get('CHATBOT_CONTEXT_SNIPPET_CHARS') or 320)
+    CHATBOT_INDEX_MAX_AGE = float(os.environ.get('CHATBOT_INDEX_MAX_AGE') or 600)
+
+    # Konfigurasi riwayat percakapan chatbot per pengguna (dibatasi jumlah giliran, token, dan memori)
+    CHATBOT_HISTORY_TURNS = int(os.environ.get('CHATBOT_HISTORY_TURNS') or 6)
+    CHATBOT_HISTORY_TOKEN_BUDGET = int(os.environ.get('CHATBOT_HISTORY_TOKEN_BUDGET') or 600)
+    CHATBOT_HISTORY_MAX_CONVERSATIONS = int(os.environ.get('CHATBOT_HISTORY_MAX_CONVERSATIONS') or 2000)
+    CHATBOT_HISTORY_MAX_BYTES = int(os.environ.get('CHATBOT_HISTORY_MAX_BYTES') or 8 * 1024 * 1024)
+    CHATBOT_HISTORY_IDLE_TTL = float(os.environ.get('CHATBOT_HISTORY_IDLE_TTL') or 1800)
+
 class DevelopmentConfig(Config):
     """Konfigurasi untuk lingkungan pengembangan.
 
@@ -98,6 +289,14 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    # Email dikirim langsung agar pesan dapat diperiksa segera setelah request
+    MAIL_DELIVERY_MODE = 'sync'
+    # Turunan foto dibuat di dalam request agar hasilnya dapat diperiksa langsung
+    IMAGE_PROCESSING_MODE = 'sync'
+    # GC tidak dijeda agar pengujian tetap cepat
+    UPLOAD_GC_RATE = 0
+    # Versi katalog bersama hanya diaktifkan oleh pengujian yang membutuhkannya
+    CATALOG_VERSION_FILE = None
 
 class ProductionConfig(Config):
     """Konfigurasi untuk lingkungan produksi.
@@ -15,6 +15,8 @@ from app.models.paket_wisata import PaketWisata
 from app.models.itinerari import Itinerari
 from app.models.review import Review
 from app.models.foto_ulasan import FotoUlasan
+from app.models.email_outbox import EmailOutbox
+from app.models.image_job import ImageJob
 from flask_migrate import Migrate
 
 # Membuat instance aplikasi menggunakan konfigurasi dari environment variable atau default
@@ -34,7 +36,8 @@ def make_shell_context():
     """
     return dict(
         db=db, User=User, Wisata=Wisata, Event=Event, PaketWisata=PaketWisata,
-        Itinerari=Itinerari, Review=Review, FotoUlasan=FotoUlasan
+        Itinerari=Itinerari, Review=Review, FotoUlasan=FotoUlasan,
+        EmailOutbox=EmailOutbox, ImageJob=ImageJob
     )
 
 if __name__ == '__main__':
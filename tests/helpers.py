@@ -62,4 +62,32 @@ class AuthActions:
             'email': email,
             'password': password,
             'confirm_password': confirm_password
-        }, follow_redirects=True)
\ No newline at end of file
+        }, follow_redirects=True)
+
+
+def percentile(values, percent):
+    """Menghitung persentil dengan metode nearest-rank untuk laporan uji beban.
+
+    Args:
+        values (list[float]): Nilai yang sudah terurut.
+        percent (float): Persentil yang dicari (0-100).
+
+    Returns:
+        float: Nilai persentil, atau 0 jika daftar kosong.
+    """
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+
+def print_report(title, report):
+    """Mencetak ringkasan hasil uji beban.
+
+    Args:
+        title (str): Judul laporan.
+        report (dict): Metrik hasil uji beban.
+    """
+    print(f"\n\n--- {title} ---")
+    for key, value in report.items():
+        print(f"{key}: {value}")
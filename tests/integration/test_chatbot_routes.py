@@ -45,11 +45,108 @@ def test_ask_putri_valid_input(authenticated_client, monkeypatch):
     """
     monkeypatch.setattr(
         'app.routes.chatbot_routes.get_bot_response',
-        lambda _: "Ini adalah respons tiruan."
+        lambda *_: "Ini adalah respons tiruan."
     )
 
     response = authenticated_client.post('/api/chatbot/ask', json={'query': 'Halo'})
     assert response.status_code == 200
     json_data = response.get_json()
     assert 'response' in json_data
-    assert json_data['response'] == "Ini adalah respons tiruan."
\ No newline at end of file
+    assert json_data['response'] == "Ini adalah respons tiruan."
+
+def test_chatbot_metrics_requires_admin(authenticated_client):
+    """Menguji [GET /api/chatbot/metrics] - Ditolak untuk pengguna non-admin.
+
+    Args:
+        authenticated_client: Klien pengujian yang terautentikasi
+    """
+    response = authenticated_client.get('/api/chatbot/metrics')
+    assert response.status_code == 403
+
+
+def test_chatbot_metrics_as_admin(admin_client):
+    """Menguji [GET /api/chatbot/metrics] - Statistik cache tersedia untuk admin.
+
+    Args:
+        admin_client: Klien pengujian yang terautentikasi sebagai admin
+    """
+    response = admin_client.get('/api/chatbot/metrics')
+    assert response.status_code == 200
+    json_data = response.get_json()
+    assert 'hits' in json_data['cache']
+    assert 'misses' in json_data['cache']
+    assert json_data['breaker']['state'] == 'closed'
+
+
+def test_ask_putri_stream_sends_sse_events(authenticated_client, monkeypatch):
+    """Menguji [POST /api/chatbot/ask/stream] - Jawaban dikirim sebagai Server-Sent Events.
+
+    Args:
+        authenticated_client: Klien pengujian yang terautentikasi
+        monkeypatch: Fixture pytest untuk menyuntikkan dependensi
+    """
+    monkeypatch.setattr(
+        'app.routes.chatbot_routes.stream_bot_response',
+        lambda *_: iter(["Halo", " kak!"])
+    )
+
+    response = authenticated_client.post('/api/chatbot/ask/stream', json={'query': 'Halo'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    body = response.get_data(as_text=True)
+    assert 'data: {"delta": "Halo"}' in body
+    assert 'data: {"delta": " kak!"}' in body
+    assert body.endswith('event: done\ndata: {}\n\n')
+
+
+def test_ask_putri_stream_sends_error_event_when_interrupted(authenticated_client, monkeypatch):
+    """Menguji [POST /api/chatbot/ask/stream] - Jawaban yang terputus diakhiri event `error`, bukan `done`.
+
+    Args:
+        authenticated_client: Klien pengujian yang terautentikasi
+        monkeypatch: Fixture pytest untuk menyuntikkan dependensi
+    """
+    from app.services.chatbot_handler import StreamInterrupted
+
+    def interrupted(*_):
+        yield "Pantai Kuta "
+        raise StreamInterrupted('terputus')
+
+    monkeypatch.setattr('app.routes.chatbot_routes.stream_bot_response', interrupted)
+
+    response = authenticated_client.post('/api/chatbot/ask/stream', json={'query': 'Pantai terbaik?'})
+    body = response.get_data(as_text=True)
+
+    assert 'data: {"delta": "Pantai Kuta "}' in body
+    assert '\nevent: error\ndata: {"error": ' in body
+    assert 'event: done' not in body
+
+def test_ask_putri_stream_empty_input(authenticated_client):
+    """Menguji [POST /api/chatbot/ask/stream] dengan input kosong.
+
+    Args:
+        authenticated_client: Klien pengujian yang terautentikasi
+    """
+    response = authenticated_client.post('/api/chatbot/ask/stream', json={'query': ''})
+    assert response.status_code == 400
+
+
+def test_ask_putri_returns_503_when_saturated(app, authenticated_client, monkeypatch):
+    """Menguji [POST /api/chatbot/ask] - Respons 503 cepat ketika kapasitas chatbot penuh.
+
+    Args:
+        app: Instance aplikasi Flask
+        authenticated_client: Klien pengujian yang terautentikasi
+        monkeypatch: Fixture pytest untuk menyuntikkan dependensi
+    """
+    app.config['CHATBOT_MAX_IN_FLIGHT'] = 0
+    monkeypatch.setattr(
+        'app.routes.chatbot_routes.get_bot_response',
+        lambda *_: "Tidak boleh dipanggil."
+    )
+
+    response = authenticated_client.post('/api/chatbot/ask', json={'query': 'Halo'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    assert 'response' in response.get_json()
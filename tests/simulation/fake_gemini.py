@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGeminiServer:
+    """Server HTTP lokal yang meniru endpoint `generateContent` dan `streamGenerateContent` Gemini.
+
+    Dipakai untuk uji beban chatbot tanpa memanggil API sungguhan. Latensi,
+    tingkat error, dan perilaku streaming dapat diatur, dan server mencatat
+    jumlah permintaan serta koneksi TCP sehingga efek connection pooling dapat
+    diperiksa.
+
+    Attributes:
+        latency (float): Waktu tunggu sebelum respons dikirim (detik).
+        latency_jitter (float): Tambahan latensi acak maksimal (detik).
+        error_rate (float): Peluang (0-1) sebuah permintaan dijawab dengan HTTP 503.
+        stream_chunks (int): Jumlah potongan teks pada respons streaming.
+        chunk_delay (float): Jeda antar potongan streaming (detik).
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.05, latency_jitter=0.0, error_rate=0.0,
+                 stream_chunks=4, chunk_delay=0.01, seed=None):
+        """Menyiapkan server tanpa langsung menjalankannya.
+
+        Args:
+            host (str): Alamat yang didengarkan server.
+            port (int): Port server (0 = dipilih otomatis).
+            latency (float): Latensi dasar setiap respons (detik).
+            latency_jitter (float): Tambahan latensi acak maksimal (detik).
+            error_rate (float): Peluang permintaan dijawab dengan HTTP 503.
+            stream_chunks (int): Jumlah potongan teks pada respons streaming.
+            chunk_delay (float): Jeda antar potongan streaming (detik).
+            seed (int | None): Seed acak agar hasil dapat diulang.
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.stream_chunks = stream_chunks
+        self.chunk_delay = chunk_delay
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.connections = 0
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """str: Alamat dasar yang dapat dipakai sebagai `GEMINI_API_BASE_URL`."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1beta"
+
+    def start(self):
+        """Menjalankan server di thread latar belakang.
+
+        Returns:
+            FakeGeminiServer: Instance yang sama, agar dapat dirangkai.
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fake-gemini', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Menghentikan server dan menutup socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _next_outcome(self):
+        """Menentukan latensi dan apakah permintaan berikutnya gagal.
+
+        Returns:
+            tuple[float, bool]: Latensi (detik) dan status gagal.
+        """
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.latency_jitter)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return delay, failed
+
+    def _count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def _handler_class(self):
+        """Membuat kelas handler HTTP yang terikat ke instance server ini."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 agar klien dapat memakai ulang koneksi (keep-alive)
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                server._count_connection()
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                    prompt = body['contents'][0]['parts'][0]['text']
+                except (ValueError, KeyError, IndexError):
+                    self._send_json(400, {'error': {'code': 400, 'message': 'Body tidak valid.'}})
+                    return
+
+                delay, failed = server._next_outcome()
+                time.sleep(delay)
+                if failed:
+                    self._send_json(503, {'error': {'code': 503, 'message': 'Model sedang sibuk.'}})
+                    return
+
+                answer = server.answer_for(prompt)
+                if ':streamGenerateContent' in self.path:
+                    self._send_stream(answer)
+                elif ':generateContent' in self.path:
+                    self._send_json(200, _candidate(answer))
+                else:
+                    self._send_json(404, {'error': {'code': 404, 'message': 'Metode tidak dikenal.'}})
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, answer):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                # Tanpa Content-Length, akhir stream ditandai dengan menutup koneksi
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+
+                size = max(1, -(-len(answer) // max(1, server.stream_chunks)))
+                for start in range(0, len(answer), size):
+                    event = json.dumps(_candidate(answer[start:start + size]))
+                    self.wfile.write(f"data: {event}\r\n\r\n".encode('utf-8'))
+                    self.wfile.flush()
+                    time.sleep(server.chunk_delay)
+
+        return Handler
+
+    @staticmethod
+    def answer_for(prompt):
+        """Menghasilkan jawaban deterministik untuk sebuah prompt.
+
+        Args:
+            prompt (str): Prompt yang diterima.
+
+        Returns:
+            str: Jawaban tiruan yang sama untuk prompt yang sama.
+        """
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]
+        return f"Halo, ini jawaban uji dari Putri ({digest}). Semoga membantu liburanmu ya! 😊"
+
+
+def _candidate(text):
+    """Membungkus teks dalam struktur `GenerateContentResponse` Gemini."""
+    return {'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}}]}
+
+
+def main():
+    """Menjalankan server Gemini tiruan dari command line untuk uji beban manual."""
+    parser = argparse.ArgumentParser(description='Server Gemini tiruan untuk uji beban chatbot Lelana.id.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--jitter', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--chunks', type=int, default=8)
+    parser.add_argument('--chunk-delay', type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(args.host, args.port, latency=args.latency, latency_jitter=args.jitter,
+                              error_rate=args.error_rate, stream_chunks=args.chunks, chunk_delay=args.chunk_delay)
+    print(f"Server Gemini tiruan berjalan di {server.base_url} (set GEMINI_API_BASE_URL ke alamat ini).")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
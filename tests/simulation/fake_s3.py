@@ -0,0 +1,139 @@
+import hashlib
+import itertools
+import threading
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+
+class FakeClientError(Exception):
+    """Meniru `botocore.exceptions.ClientError` dengan atribut `response`."""
+
+    def __init__(self, code, operation):
+        super().__init__(f'{operation}: {code}')
+        self.response = {'Error': {'Code': code}}
+
+
+class FakeS3Client:
+    """Client S3 dalam memori yang meniru subset API client boto3.
+
+    Dipakai untuk menguji `S3Storage` tanpa jaringan maupun paket boto3.
+    Objek disimpan per (bucket, key) beserta metadatanya, dan setiap panggilan
+    dicatat di `calls` sehingga jalur single-put maupun multipart dapat diperiksa.
+
+    Attributes:
+        objects (dict): Objek tersimpan, kunci (bucket, key) ke dict 'Body' dan metadata.
+        calls (list[str]): Nama operasi yang dipanggil, berurutan.
+        fail_part (int | None): Nomor bagian multipart yang disimulasikan gagal.
+    """
+
+    def __init__(self, fail_part=None):
+        """Menyiapkan penyimpanan kosong.
+
+        Args:
+            fail_part (int | None): Nomor bagian multipart yang akan gagal diunggah.
+        """
+        self.objects = {}
+        self.calls = []
+        self.fail_part = fail_part
+        self._uploads = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _record(self, operation):
+        with self._lock:
+            self.calls.append(operation)
+
+    def put_object(self, Bucket, Key, Body, **extra):
+        self._record('put_object')
+        self.objects[(Bucket, Key)] = dict(extra, Body=Body.read(), LastModified=datetime.now(timezone.utc))
+        return {'ETag': hashlib.md5(self.objects[(Bucket, Key)]['Body']).hexdigest()}
+
+    def head_object(self, Bucket, Key):
+        self._record('head_object')
+        if (Bucket, Key) not in self.objects:
+            raise FakeClientError('404', 'HeadObject')
+        obj = self.objects[(Bucket, Key)]
+        return {'ContentLength': len(obj['Body']), 'ContentType': obj.get('ContentType'),
+                'LastModified': obj['LastModified']}
+
+    def download_file(self, Bucket, Key, Filename):
+        self._record('download_file')
+        if (Bucket, Key) not in self.objects:
+            raise FakeClientError('404', 'GetObject')
+        with open(Filename, 'wb') as f:
+            f.write(self.objects[(Bucket, Key)]['Body'])
+
+    def delete_object(self, Bucket, Key):
+        self._record('delete_object')
+        self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def copy_object(self, Bucket, Key, CopySource, MetadataDirective='COPY', **extra):
+        self._record('copy_object')
+        source = (CopySource['Bucket'], CopySource['Key'])
+        if source not in self.objects:
+            raise FakeClientError('NoSuchKey', 'CopyObject')
+        # Seperti S3, salinan ke dirinya sendiri hanya boleh jika metadata diganti
+        if source == (Bucket, Key) and MetadataDirective != 'REPLACE':
+            raise FakeClientError('InvalidRequest', 'CopyObject')
+        metadata = extra if MetadataDirective == 'REPLACE' else {
+            name: value for name, value in self.objects[source].items() if name not in ('Body', 'LastModified')}
+        self.objects[(Bucket, Key)] = dict(metadata, Body=self.objects[source]['Body'],
+                                           LastModified=datetime.now(timezone.utc))
+        return {}
+
+    def get_paginator(self, operation):
+        assert operation == 'list_objects_v2'
+        return _FakeListPaginator(self)
+
+    def create_multipart_upload(self, Bucket, Key, **extra):
+        self._record('create_multipart_upload')
+        upload_id = f'upload-{next(self._ids)}'
+        self._uploads[upload_id] = {'key': (Bucket, Key), 'extra': extra, 'parts': {}}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._record('upload_part')
+        if PartNumber == self.fail_part:
+            raise FakeClientError('500', 'UploadPart')
+        self._uploads[UploadId]['parts'][PartNumber] = Body
+        return {'ETag': hashlib.md5(Body).hexdigest()}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._record('complete_multipart_upload')
+        upload = self._uploads.pop(UploadId)
+        body = b''.join(upload['parts'][part['PartNumber']] for part in MultipartUpload['Parts'])
+        self.objects[(Bucket, Key)] = dict(upload['extra'], Body=body, LastModified=datetime.now(timezone.utc))
+        return {}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self._record('abort_multipart_upload')
+        self._uploads.pop(UploadId, None)
+        return {}
+
+    @property
+    def open_uploads(self):
+        """int: Jumlah multipart upload yang belum diselesaikan atau dibatalkan."""
+        return len(self._uploads)
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn):
+        self._record('generate_presigned_url')
+        return (f"https://s3.test/{Params['Bucket']}/{quote(Params['Key'])}"
+                f"?X-Amz-Expires={ExpiresIn}&X-Amz-Signature=fake")
+
+
+class _FakeListPaginator:
+    """Meniru paginator `list_objects_v2` dengan halaman kecil agar paginasi ikut teruji."""
+
+    page_size = 2
+
+    def __init__(self, client):
+        self.client = client
+
+    def paginate(self, Bucket, Prefix=''):
+        self.client._record('list_objects_v2')
+        keys = sorted(key for bucket, key in self.client.objects if bucket == Bucket and key.startswith(Prefix))
+        for start in range(0, len(keys), self.page_size):
+            yield {'Contents': [{'Key': key, 'Size': len(self.client.objects[(Bucket, key)]['Body']),
+                                 'LastModified': self.client.objects[(Bucket, key)]['LastModified']}
+                                for key in keys[start:start + self.page_size]]}
@@ -0,0 +1,239 @@
+import argparse
+import email
+import random
+import socketserver
+import threading
+import time
+
+
+class SmtpSink:
+    """Server SMTP lokal yang menerima dan mencatat email tanpa meneruskannya.
+
+    Dipakai untuk mengukur jalur pengiriman email tanpa server SMTP sungguhan.
+    Jeda handshake, jeda per pesan, tingkat kegagalan sementara (451), dan
+    penerima yang ditolak permanen (550) dapat diatur. Server mencatat jumlah
+    koneksi sehingga efek pemakaian ulang koneksi SMTP dapat diperiksa.
+
+    Attributes:
+        connect_delay (float): Jeda sebelum salam 220, meniru biaya handshake TLS dan AUTH (detik).
+        delay (float): Jeda sebelum balasan DATA untuk setiap pesan (detik).
+        error_rate (float): Peluang (0-1) sebuah pesan ditolak sementara dengan 451.
+        reject (set[str]): Alamat penerima yang selalu ditolak dengan 550.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, connect_delay=0.0, delay=0.0, error_rate=0.0,
+                 reject=(), seed=None):
+        """Menyiapkan server tanpa langsung menjalankannya.
+
+        Args:
+            host (str): Alamat yang didengarkan server.
+            port (int): Port server (0 = dipilih otomatis).
+            connect_delay (float): Jeda sebelum salam 220 (detik).
+            delay (float): Jeda sebelum balasan DATA (detik).
+            error_rate (float): Peluang pesan ditolak sementara.
+            reject (Iterable[str]): Alamat penerima yang selalu ditolak.
+            seed (int | None): Seed acak agar hasil dapat diulang.
+        """
+        self.connect_delay = connect_delay
+        self.delay = delay
+        self.error_rate = error_rate
+        self.reject = {address.lower() for address in reject}
+        self._random = random.Random(seed)
+        self._cond = threading.Condition()
+        self._messages = []
+        self.connections = 0
+        self.errors = 0
+
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        """str: Alamat server, untuk `MAIL_SERVER`."""
+        return self._server.server_address[0]
+
+    @property
+    def port(self):
+        """int: Port server, untuk `MAIL_PORT`."""
+        return self._server.server_address[1]
+
+    @property
+    def messages(self):
+        """list[dict]: Salinan pesan yang diterima (pengirim, penerima, dan isi mentah)."""
+        with self._cond:
+            return list(self._messages)
+
+    def subjects(self):
+        """Mengembalikan subjek semua pesan yang diterima.
+
+        Returns:
+            list[str]: Subjek pesan sesuai urutan diterima.
+        """
+        return [str(email.message_from_bytes(m['data']).get('Subject', '')) for m in self.messages]
+
+    def wait_for(self, count, timeout=10.0):
+        """Menunggu sampai sejumlah pesan diterima.
+
+        Args:
+            count (int): Jumlah pesan yang ditunggu.
+            timeout (float): Batas waktu menunggu (detik).
+
+        Returns:
+            bool: True jika jumlah pesan tercapai sebelum batas waktu.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self._messages) >= count, timeout)
+
+    def reset(self):
+        """Menghapus pesan dan penghitung yang sudah tercatat."""
+        with self._cond:
+            self._messages.clear()
+            self.connections = 0
+            self.errors = 0
+
+    def start(self):
+        """Menjalankan server di thread latar belakang.
+
+        Returns:
+            SmtpSink: Instance yang sama, agar dapat dirangkai.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name='smtp-sink', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Menghentikan server dan menutup socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count_connection(self):
+        with self._cond:
+            self.connections += 1
+
+    def _accept(self, mail_from, rcpt_tos, data):
+        """Menentukan hasil DATA dan mencatat pesan yang diterima.
+
+        Returns:
+            bool: True jika pesan diterima, False jika ditolak sementara.
+        """
+        time.sleep(self.delay)
+        with self._cond:
+            if self._random.random() < self.error_rate:
+                self.errors += 1
+                return False
+            self._messages.append({'mail_from': mail_from, 'rcpt_tos': rcpt_tos, 'data': data})
+            self._cond.notify_all()
+            return True
+
+    def _handler_class(self):
+        """Membuat kelas handler SMTP yang terikat ke instance server ini."""
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+
+            def reply(self, line):
+                self.wfile.write(line.encode('ascii') + b'\r\n')
+
+            def handle(self):
+                sink._count_connection()
+                time.sleep(sink.connect_delay)
+                self.reply('220 smtp-sink.lelana.local ESMTP')
+                mail_from, rcpt_tos = None, []
+
+                for raw in self.rfile:
+                    line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+                    verb, _, arg = line.partition(' ')
+                    verb = verb.upper()
+
+                    if verb == 'EHLO':
+                        self.reply('250-smtp-sink.lelana.local')
+                        self.reply('250-8BITMIME')
+                        self.reply('250 AUTH PLAIN LOGIN')
+                    elif verb == 'HELO':
+                        self.reply('250 smtp-sink.lelana.local')
+                    elif verb == 'AUTH':
+                        self.reply('235 2.7.0 Authentication successful')
+                    elif verb == 'MAIL':
+                        mail_from, rcpt_tos = _address(arg), []
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        address = _address(arg)
+                        if address.lower() in sink.reject:
+                            self.reply('550 5.1.1 Mailbox unavailable')
+                        else:
+                            rcpt_tos.append(address)
+                            self.reply('250 OK')
+                    elif verb == 'DATA':
+                        if not rcpt_tos:
+                            self.reply('503 5.5.1 No valid recipients')
+                            continue
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        data = self._read_data()
+                        if sink._accept(mail_from, rcpt_tos, data):
+                            self.reply('250 2.0.0 OK')
+                        else:
+                            self.reply('451 4.3.0 Temporary failure, try again later')
+                        mail_from, rcpt_tos = None, []
+                    elif verb == 'RSET':
+                        mail_from, rcpt_tos = None, []
+                        self.reply('250 OK')
+                    elif verb == 'NOOP':
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 5.5.2 Command not recognized')
+
+            def _read_data(self):
+                lines = []
+                for raw in self.rfile:
+                    if raw in (b'.\r\n', b'.\n'):
+                        break
+                    # Membalik dot-stuffing dari klien
+                    lines.append(raw[1:] if raw.startswith(b'..') else raw)
+                return b''.join(lines)
+
+        return Handler
+
+
+def _address(arg):
+    """Mengambil alamat dari argumen `MAIL FROM:<...>` atau `RCPT TO:<...>`."""
+    _, _, rest = arg.partition(':')
+    return rest.strip().split(' ')[0].strip('<>')
+
+
+def main():
+    """Menjalankan SMTP sink dari command line untuk uji beban manual."""
+    parser = argparse.ArgumentParser(description='SMTP sink lokal untuk uji beban email Lelana.id.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    parser.add_argument('--connect-delay', type=float, default=0.2)
+    parser.add_argument('--delay', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    sink = SmtpSink(args.host, args.port, connect_delay=args.connect_delay, delay=args.delay,
+                    error_rate=args.error_rate)
+    print(f"SMTP sink berjalan di {sink.host}:{sink.port} (set MAIL_SERVER/MAIL_PORT ke alamat ini, "
+          f"MAIL_USE_TLS=false, MAIL_USE_SSL=false).")
+    try:
+        sink._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink._server.server_close()
+        print(f"Diterima {len(sink.messages)} email melalui {sink.connections} koneksi.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+import pytest
+from app import create_app, db
+from app.models.user import User
+from app.services.chatbot_executor import get_chatbot_executor
+from app.services.chatbot_cache import get_response_cache
+from app.services.circuit_breaker import get_gemini_breaker
+from app.services.gemini_client import close_session
+from tests.helpers import AuthActions, percentile, print_report
+from tests.simulation.fake_gemini import FakeGeminiServer
+
+# Ukuran beban dapat dinaikkan lewat environment variable untuk uji beban manual
+LOAD_USERS = int(os.environ.get('LOADTEST_USERS') or 12)
+LOAD_REQUESTS_PER_USER = int(os.environ.get('LOADTEST_REQUESTS') or 5)
+LOAD_LATENCY = float(os.environ.get('LOADTEST_LATENCY') or 0.05)
+
+QUESTIONS = [
+    'ceritakan tentang curug cipendok',
+    'tips liburan hemat ke baturraden',
+    'kuliner khas banyumas yang wajib dicoba',
+    'bagaimana cara membuat itinerari di lelana',
+    'kapan waktu terbaik mendaki gunung slamet',
+    'oleh-oleh apa yang cocok dari purwokerto',
+]
+
+
+@pytest.fixture(scope='function')
+def app():
+    """Fixture untuk membuat aplikasi pengujian dengan pengguna simulasi yang sudah terkonfirmasi.
+
+    Returns:
+        Flask.app: Instance aplikasi Flask yang dikonfigurasi untuk pengujian
+    """
+    app = create_app('testing')
+    app.config.update(GEMINI_API_KEY='kunci-uji', GEMINI_MAX_RETRIES=0, CHATBOT_PER_USER_LIMIT=1)
+    with app.app_context():
+        db.create_all()
+        for i in range(LOAD_USERS):
+            user = User(username=f'beban_{i}', email=f'beban_{i}@lelana.my.id', is_confirmed=True)
+            user.password = 'Password123!'
+            db.session.add(user)
+        db.session.commit()
+        yield app
+        get_chatbot_executor().shutdown()
+        close_session()
+        db.session.remove()
+        db.drop_all()
+
+
+def run_chatbot_load(app, users, requests_per_user, questions=QUESTIONS):
+    """Menjalankan beban ke `/api/chatbot/ask` dari beberapa pengguna yang login bersamaan.
+
+    Setiap pengguna memakai klien sendiri, login terlebih dahulu, lalu mengirim
+    pertanyaan secara berurutan. Selama beban berjalan, metrik executor diambil
+    berkala untuk mengukur kejenuhan worker.
+
+    Args:
+        app: Instance aplikasi Flask
+        users (int): Jumlah pengguna bersamaan.
+        requests_per_user (int): Jumlah pertanyaan per pengguna.
+        questions (list[str]): Daftar pertanyaan yang dipakai bergiliran.
+
+    Returns:
+        dict: Throughput, latensi p50/p95/p99, jumlah status HTTP, dan kejenuhan executor.
+    """
+    clients = []
+    for i in range(users):
+        client = app.test_client()
+        AuthActions(client).login(f'beban_{i}@lelana.my.id', 'Password123!')
+        clients.append(client)
+
+    with app.app_context():
+        executor = get_chatbot_executor()
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    barrier = threading.Barrier(users + 1)
+    stop_sampling = threading.Event()
+    peak = {'in_flight': 0, 'queue_depth': 0}
+
+    def sample():
+        while not stop_sampling.is_set():
+            metrics = executor.metrics()
+            peak['in_flight'] = max(peak['in_flight'], metrics['in_flight'])
+            peak['queue_depth'] = max(peak['queue_depth'], metrics['queue_depth'])
+            time.sleep(0.005)
+
+    def user_session(index, client):
+        barrier.wait()
+        for n in range(requests_per_user):
+            question = questions[(index + n) % len(questions)]
+            started = time.perf_counter()
+            response = client.post('/api/chatbot/ask', json={'query': question})
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=user_session, args=(i, c)) for i, c in enumerate(clients)]
+    sampler = threading.Thread(target=sample, daemon=True)
+    for t in threads:
+        t.start()
+    sampler.start()
+
+    barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - started
+    stop_sampling.set()
+    sampler.join()
+
+    latencies.sort()
+    metrics = executor.metrics()
+    return {
+        'requests': len(latencies),
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(len(latencies) / duration, 2) if duration else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'statuses': statuses,
+        'peak_in_flight': peak['in_flight'],
+        'peak_queue_depth': peak['queue_depth'],
+        'saturation': round(peak['in_flight'] / metrics['max_in_flight'], 2) if metrics['max_in_flight'] else 1.0,
+        'executor': metrics,
+    }
+
+
+class TestChatbotLoad:
+    """Mengelompokkan uji beban chatbot terhadap server Gemini tiruan."""
+
+    def test_load_with_healthy_gemini(self, app):
+        """Menguji beban normal: semua jawaban sukses, cache dan pooling bekerja.
+
+        Args:
+            app: Instance aplikasi Flask
+        """
+        # Riwayat percakapan dimatikan agar efek cache dan pooling dapat diukur terpisah
+        app.config['CHATBOT_HISTORY_TURNS'] = 0
+        with FakeGeminiServer(latency=LOAD_LATENCY, latency_jitter=LOAD_LATENCY / 2, seed=1) as server:
+            app.config['GEMINI_API_BASE_URL'] = server.base_url
+            report = run_chatbot_load(app, LOAD_USERS, LOAD_REQUESTS_PER_USER)
+            report['gemini_requests'] = server.requests
+            report['gemini_connections'] = server.connections
+            with app.app_context():
+                report['cache'] = get_response_cache().stats()
+            print_report('UJI BEBAN CHATBOT (GEMINI SEHAT)', report)
+
+        assert report['requests'] == LOAD_USERS * LOAD_REQUESTS_PER_USER
+        assert set(report['statuses']) <= {200, 503}
+        assert report['statuses'].get(200, 0) > 0
+        # Pertanyaan berulang dilayani cache/single-flight, bukan panggilan Gemini baru
+        assert server.requests <= len(QUESTIONS)
+        # Koneksi ke Gemini dipakai ulang oleh connection pool
+        assert server.connections <= app.config['CHATBOT_EXECUTOR_WORKERS']
+
+    def test_load_with_failing_gemini_opens_breaker(self, app):
+        """Menguji beban saat Gemini selalu error: breaker terbuka dan pengguna tetap cepat dijawab.
+
+        Args:
+            app: Instance aplikasi Flask
+        """
+        app.config.update(GEMINI_BREAKER_MIN_CALLS=4, CHATBOT_CACHE_SIZE=0)
+        with FakeGeminiServer(latency=LOAD_LATENCY, error_rate=1.0, seed=2) as server:
+            app.config['GEMINI_API_BASE_URL'] = server.base_url
+            questions = [f'pertanyaan unik nomor {i}' for i in range(LOAD_USERS * LOAD_REQUESTS_PER_USER)]
+            report = run_chatbot_load(app, LOAD_USERS, LOAD_REQUESTS_PER_USER, questions)
+            report['gemini_requests'] = server.requests
+            with app.app_context():
+                report['breaker'] = get_gemini_breaker().stats()
+            print_report('UJI BEBAN CHATBOT (GEMINI GANGGUAN)', report)
+
+        assert set(report['statuses']) <= {200, 503}
+        assert report['breaker']['state'] == 'open'
+        assert report['breaker']['rejected'] > 0
+        # Setelah breaker terbuka, Gemini tidak lagi dibanjiri permintaan
+        assert server.requests < report['requests']
@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+import pytest
+from app import create_app, db
+from app.models.user import User
+from app.services.email_outbox import run_outbox_sender
+from app.services.email_queue import get_email_queue
+from config import TestingConfig, config
+from tests.helpers import AuthActions, percentile, print_report
+from tests.simulation.smtp_sink import SmtpSink
+
+# Ukuran beban dapat dinaikkan lewat environment variable untuk uji beban manual
+LOAD_USERS = int(os.environ.get('EMAIL_LOADTEST_USERS') or 10)
+SMTP_CONNECT_DELAY = float(os.environ.get('EMAIL_LOADTEST_CONNECT_DELAY') or 0.05)
+SMTP_DELAY = float(os.environ.get('EMAIL_LOADTEST_DELAY') or 0.1)
+
+
+@pytest.fixture(scope='function')
+def smtp_sink():
+    """Fixture untuk menjalankan SMTP sink lokal selama pengujian.
+
+    Yields:
+        SmtpSink: Server SMTP lokal yang mencatat email yang diterima.
+    """
+    with SmtpSink(connect_delay=SMTP_CONNECT_DELAY, delay=SMTP_DELAY, seed=3) as sink:
+        yield sink
+
+
+@pytest.fixture(scope='function')
+def app(smtp_sink, tmp_path, monkeypatch):
+    """Fixture untuk membuat aplikasi yang mengirim email sungguhan ke SMTP sink.
+
+    Database memakai file SQLite sementara karena pendaftaran bersamaan menulis
+    dari banyak thread, yang tidak aman pada satu koneksi SQLite in-memory.
+
+    Args:
+        smtp_sink: SMTP sink dari fixture `smtp_sink`.
+        tmp_path: Direktori sementara dari pytest.
+        monkeypatch: Fixture pytest untuk mendaftarkan konfigurasi sementara.
+
+    Returns:
+        Flask.app: Instance aplikasi Flask yang dikonfigurasi untuk pengujian
+    """
+    class EmailLoadConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'email_load.db'}"
+        MAIL_SERVER = smtp_sink.host
+        MAIL_PORT = smtp_sink.port
+        MAIL_USE_TLS = False
+        MAIL_USE_SSL = False
+        MAIL_USERNAME = None
+        MAIL_PASSWORD = None
+        MAIL_SENDER = ('Tim Lelana.id', 'noreply@lelana.my.id')
+        MAIL_SUPPRESS_SEND = False
+
+    monkeypatch.setitem(config, 'email-load', EmailLoadConfig)
+    app = create_app('email-load')
+    with app.app_context():
+        db.create_all()
+        yield app
+        get_email_queue().shutdown()
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+def run_registration_load(app, sink, mode, users):
+    """Mendaftarkan beberapa pengguna bersamaan lalu mengukur latensi dan laju email.
+
+    Setiap pengguna memakai klien sendiri dan mendaftar lewat `/auth/register`.
+    Waktu pengiriman dihitung dari awal beban sampai SMTP sink menerima semua
+    email konfirmasi. Pada mode 'outbox', pengirim outbox dijalankan setelah
+    semua request selesai, seperti proses `flask email send-outbox`.
+
+    Args:
+        app: Instance aplikasi Flask
+        sink (SmtpSink): SMTP sink penerima email.
+        mode (str): Nilai `MAIL_DELIVERY_MODE` yang diuji.
+        users (int): Jumlah pendaftaran bersamaan.
+
+    Returns:
+        dict: Latensi request p50/p95/p99, status HTTP, dan laju email per detik.
+    """
+    app.config['MAIL_DELIVERY_MODE'] = mode
+    sink.reset()
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    barrier = threading.Barrier(users + 1)
+
+    def register(index):
+        auth = AuthActions(app.test_client())
+        barrier.wait()
+        started = time.perf_counter()
+        response = auth.register(f'{mode}user{index}', f'{mode}_{index}@lelana.my.id', 'Password123!', 'Password123!')
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=register, args=(i,)) for i in range(users)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    requests_done = time.perf_counter() - started
+
+    if mode == 'outbox':
+        with app.app_context():
+            run_outbox_sender(once=True)
+    sink.wait_for(users, timeout=30)
+    emails_done = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'mode': mode,
+        'registrations': len(latencies),
+        'statuses': statuses,
+        'request_p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'request_p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'request_p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'registrations_per_s': round(users / requests_done, 2) if requests_done else 0.0,
+        'emails_delivered': len(sink.messages),
+        'emails_per_s': round(len(sink.messages) / emails_done, 2) if emails_done else 0.0,
+        'smtp_connections': sink.connections,
+    }
+
+
+class TestEmailLoad:
+    """Mengelompokkan uji beban jalur email pendaftaran terhadap SMTP sink lokal."""
+
+    def test_registration_email_paths(self, app, smtp_sink):
+        """Membandingkan mode pengiriman email pada jalur pendaftaran.
+
+        Mode 'sync' menjadi acuan; mode 'queue' dan 'outbox' tidak boleh membuat
+        request menunggu SMTP, dan semua mode harus mengirim setiap email konfirmasi.
+
+        Args:
+            app: Instance aplikasi Flask
+            smtp_sink: SMTP sink lokal
+        """
+        reports = {}
+        for mode in ('sync', 'queue', 'outbox'):
+            reports[mode] = run_registration_load(app, smtp_sink, mode, LOAD_USERS)
+            print_report(f'UJI BEBAN EMAIL PENDAFTARAN ({mode.upper()})', reports[mode])
+
+        for mode, report in reports.items():
+            assert report['statuses'] == {200: LOAD_USERS}, mode
+            assert report['emails_delivered'] == LOAD_USERS, mode
+
+        with app.app_context():
+            assert User.query.count() == LOAD_USERS * 3
+
+        # Request sinkron menunggu SMTP; mode antrean dan outbox tidak
+        assert reports['sync']['request_p50_ms'] >= (SMTP_CONNECT_DELAY + SMTP_DELAY) * 1000
+        assert reports['queue']['request_p50_ms'] < reports['sync']['request_p50_ms']
+        assert reports['outbox']['request_p50_ms'] < reports['sync']['request_p50_ms']
+        # Outbox mengirim satu kelompok melalui satu koneksi SMTP yang dipakai ulang
+        assert reports['outbox']['smtp_connections'] < reports['sync']['smtp_connections']
+
+    def test_sink_failure_injection_is_retried_by_outbox(self, app, smtp_sink):
+        """Menguji bahwa kegagalan sementara dari SMTP sink dicoba ulang oleh outbox.
+
+        Args:
+            app: Instance aplikasi Flask
+            smtp_sink: SMTP sink lokal
+        """
+        app.config.update(MAIL_OUTBOX_BACKOFF=0)
+        smtp_sink.delay = 0
+        smtp_sink.error_rate = 0.3
+        report = run_registration_load(app, smtp_sink, 'outbox', LOAD_USERS)
+        print_report('UJI BEBAN EMAIL OUTBOX (SMTP GANGGUAN)', report)
+
+        assert report['statuses'] == {200: LOAD_USERS}
+        assert smtp_sink.errors > 0
+        assert report['emails_delivered'] == LOAD_USERS
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import db
+from app.models.event import Event
+from app.models.paket_wisata import PaketWisata
+from app.services.catalog_answers import answer_from_catalog
+from app.services.chatbot_handler import get_bot_response
+
+
+def test_answer_event_this_week(app):
+    """Menguji intent event minggu ini hanya menampilkan event dalam rentang minggu berjalan.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        db.session.add_all([
+            Event(nama='Festival Kenthongan', tanggal=today, lokasi='Purwokerto', deskripsi='Musik tradisional.'),
+            Event(nama='Grebeg Suran', tanggal=today + timedelta(days=30), lokasi='Baturraden', deskripsi='Upacara adat.'),
+        ])
+        db.session.commit()
+
+        answer = answer_from_catalog("Event apa minggu ini?")
+
+        assert 'Festival Kenthongan' in answer
+        assert 'Grebeg Suran' not in answer
+
+
+def test_answer_paket_promosi(app):
+    """Menguji intent paket promosi hanya menampilkan paket yang dipromosikan.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        db.session.add_all([
+            PaketWisata(nama='Paket Curug Hopping', deskripsi='Tiga curug.', harga=150000, is_promoted=True),
+            PaketWisata(nama='Paket Biasa', deskripsi='Paket reguler.', harga=90000, is_promoted=False),
+        ])
+        db.session.commit()
+
+        answer = answer_from_catalog("paket promosi apa saja?")
+
+        assert 'Paket Curug Hopping' in answer
+        assert 'Rp150.000' in answer
+        assert 'Paket Biasa' not in answer
+
+
+def test_answer_wisata_kategori(app, wisata_fixture):
+    """Menguji intent wisata per kategori berdasarkan kategori yang ada di database.
+
+    Args:
+        app: Instance aplikasi Flask
+        wisata_fixture: Daftar objek Wisata contoh
+    """
+    with app.app_context():
+        answer = answer_from_catalog("wisata kategori alam")
+
+        assert 'Curug Cipendok' in answer
+        assert 'Baturraden' in answer
+
+
+def test_low_confidence_question_is_not_answered_locally(app, wisata_fixture):
+    """Menguji bahwa pertanyaan dengan banyak konteks tambahan diteruskan ke Gemini.
+
+    Args:
+        app: Instance aplikasi Flask
+        wisata_fixture: Daftar objek Wisata contoh
+    """
+    with app.app_context():
+        assert answer_from_catalog("wisata alam yang cocok untuk anak kecil dan lansia") is None
+        assert answer_from_catalog("cara membuat itinerari") is None
+
+
+@patch('app.services.chatbot_handler.call_gemini')
+def test_get_bot_response_skips_gemini_for_catalog_intent(mock_call_gemini, app, wisata_fixture):
+    """Menguji bahwa `get_bot_response` tidak memanggil Gemini untuk intent katalog.
+
+    Args:
+        mock_call_gemini: Mock untuk fungsi call_gemini
+        app: Instance aplikasi Flask
+        wisata_fixture: Daftar objek Wisata contoh
+    """
+    with app.app_context():
+        answer = get_bot_response("wisata kategori Alam")
+
+        assert 'Curug Cipendok' in answer
+        mock_call_gemini.assert_not_called()
@@ -0,0 +1,144 @@
+import time
+from unittest.mock import patch
+from app import db
+from app.models.wisata import Wisata
+from app.services.catalog_index import CatalogIndex, estimate_tokens, get_catalog_index, retrieve_context
+from app.services.chatbot_handler import get_bot_response
+
+
+def test_search_ranks_most_relevant_document_first():
+    """Menguji bahwa dokumen dengan token paling cocok berada di urutan teratas."""
+    index = CatalogIndex()
+    index.rebuild([
+        (('wisata', 1), 'Curug Cipendok air terjun tinggi di hutan pinus', 'Curug Cipendok'),
+        (('wisata', 2), 'Baturraden pemandian air panas dan taman', 'Baturraden'),
+        (('event', 1), 'Festival musik kenthongan di alun alun', 'Festival Kenthongan'),
+    ])
+
+    results = index.search('air terjun di hutan', k=2)
+
+    assert [key for key, _, _ in results][0] == ('wisata', 1)
+    assert all(score > 0 for _, score, _ in results)
+    assert index.search('zzz tidak ada', k=2) == []
+
+
+def test_upsert_and_remove_update_the_index_incrementally():
+    """Menguji bahwa dokumen yang diubah atau dihapus tidak lagi muncul dengan isi lama."""
+    index = CatalogIndex()
+    index.rebuild([(('wisata', 1), 'pantai pasir putih', 'Pantai')])
+
+    index.upsert(('wisata', 1), 'gunung berkabut', 'Gunung')
+    assert index.search('pantai') == []
+    assert index.search('gunung')[0][2] == 'Gunung'
+
+    index.remove(('wisata', 1))
+    assert index.search('gunung') == []
+    assert index.stats()['documents'] == 0
+    assert index.stats()['tombstones'] == 2
+
+
+def test_catalog_changes_refresh_index_after_commit(app):
+    """Menguji bahwa wisata baru dan perubahan deskripsi langsung tercermin di konteks.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        assert retrieve_context('telaga warna') == []
+
+        wisata = Wisata(nama='Telaga Sunyi', kategori='Alam', lokasi='Baturraden', deskripsi='Telaga warna yang jernih.')
+        db.session.add(wisata)
+        db.session.commit()
+        assert 'Telaga Sunyi' in retrieve_context('telaga warna')[0]
+
+        wisata.deskripsi = 'Danau kecil di kaki gunung.'
+        db.session.commit()
+        assert retrieve_context('jernih') == []
+        assert 'Danau kecil' in retrieve_context('danau')[0]
+        assert get_catalog_index().stats()['rebuilds'] == 1
+
+
+def test_catalog_change_in_other_worker_rebuilds_index(app, tmp_path):
+    """Menguji bahwa indeks dibangun ulang jika versi katalog bersama diubah worker lain.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk file versi katalog
+    """
+    version_file = tmp_path / 'catalog.version'
+    app.config['CATALOG_VERSION_FILE'] = str(version_file)
+    with app.app_context():
+        assert retrieve_context('telaga warna') == []
+
+        # Perubahan dari worker ini cukup dimuat ulang secara inkremental
+        db.session.add(Wisata(nama='Telaga Sunyi', kategori='Alam', lokasi='Baturraden', deskripsi='Telaga warna.'))
+        db.session.commit()
+        assert 'Telaga Sunyi' in retrieve_context('telaga warna')[0]
+        assert get_catalog_index().stats()['rebuilds'] == 1
+
+        # Worker lain menulis baris baru dan mengganti versi tanpa melalui proses ini
+        db.session.execute(db.text(
+            "INSERT INTO wisata (nama, kategori, lokasi, deskripsi) "
+            "VALUES ('Danau Biru', 'Alam', 'Banyumas', 'Danau kecil di kaki gunung.')"
+        ))
+        db.session.commit()
+        version_file.write_text('versi-dari-worker-lain')
+
+        assert 'Danau Biru' in retrieve_context('danau')[0]
+        assert get_catalog_index().stats()['rebuilds'] == 2
+
+def test_context_respects_token_budget(app):
+    """Menguji bahwa total cuplikan tidak melebihi anggaran token.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        db.session.add_all([
+            Wisata(nama=f'Curug {i}', kategori='Alam', lokasi='Banyumas', deskripsi='Air terjun ' + 'sejuk ' * 80)
+            for i in range(5)
+        ])
+        db.session.commit()
+        app.config['CHATBOT_CONTEXT_TOKEN_BUDGET'] = 100
+        app.config['CHATBOT_CONTEXT_SNIPPET_CHARS'] = 150
+
+        snippets = retrieve_context('air terjun')
+
+        assert len(snippets) == 2
+        assert sum(estimate_tokens(s) for s in snippets) <= 100
+        assert all(len(s) <= 151 for s in snippets)
+
+
+def test_prompt_includes_catalog_snippets(app, wisata_fixture):
+    """Menguji bahwa cuplikan katalog disisipkan ke prompt yang dikirim ke Gemini.
+
+    Args:
+        app: Instance aplikasi Flask
+        wisata_fixture: Daftar objek Wisata contoh
+    """
+    with app.app_context():
+        with patch('app.services.chatbot_handler.call_gemini', return_value='Jawaban') as mock_call:
+            get_bot_response('ceritakan tentang curug cipendok')
+
+        prompt = mock_call.call_args[0][0]
+        assert '[Wisata] Curug Cipendok (Alam, Banyumas): Air terjun.' in prompt
+
+
+def test_search_is_fast_on_large_catalog():
+    """Menguji bahwa pencarian pada puluhan ribu dokumen tetap dalam hitungan milidetik."""
+    words = [f'kata{i}' for i in range(3000)]
+    index = CatalogIndex()
+    index.rebuild(
+        (('wisata', i), ' '.join(words[(i * 7 + j * 13) % 3000] for j in range(40)), f'Dokumen {i}')
+        for i in range(30000)
+    )
+    index.search('kata1 kata2 kata3')
+
+    durations = []
+    for i in range(20):
+        started = time.perf_counter()
+        index.search(f'kata{i} kata{i + 100} kata{i + 200} pantai', k=3)
+        durations.append(time.perf_counter() - started)
+
+    durations.sort()
+    assert durations[len(durations) // 2] < 0.02
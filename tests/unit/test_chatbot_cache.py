@@ -0,0 +1,113 @@
+from unittest.mock import patch
+from app import create_app, db
+from app.models.wisata import Wisata
+from app.services.chatbot_cache import ResponseCache, normalize_query, get_response_cache
+from app.services.chatbot_handler import get_bot_response
+
+
+def test_normalize_query_folds_case_whitespace_and_repeats():
+    """Menguji bahwa variasi penulisan pertanyaan menghasilkan kunci cache yang sama."""
+    assert normalize_query("Wisata  alam di BALI apa ajaa??") == normalize_query("wisata alam di bali apa aja")
+
+
+def test_normalize_query_keeps_repeated_digits():
+    """Menguji bahwa pengulangan angka tidak dilipat sehingga nominal berbeda tidak berbagi jawaban."""
+    assert normalize_query("paket 100 ribu") != normalize_query("paket 10 ribu")
+    assert normalize_query("paket 100 ribuuu") == "paket 100 ribu"
+
+
+def test_response_cache_evicts_least_recently_used():
+    """Menguji bahwa entri yang paling lama tidak dipakai dibuang saat cache penuh."""
+    cache = ResponseCache(max_size=2, ttl=60)
+    cache.set('a', 'A')
+    cache.set('b', 'B')
+    cache.get('a')
+    cache.set('c', 'C')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+    assert cache.get('c') == 'C'
+
+
+def test_response_cache_expires_entries_after_ttl():
+    """Menguji bahwa entri kedaluwarsa dihitung sebagai miss dan dibuang."""
+    now = [100.0]
+    cache = ResponseCache(max_size=10, ttl=5, clock=lambda: now[0])
+    cache.set('a', 'A')
+    assert cache.get('a') == 'A'
+
+    now[0] += 6
+    assert cache.get('a') is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['size'] == 0
+
+
+@patch('app.services.chatbot_handler.call_gemini')
+def test_get_bot_response_serves_repeated_question_from_cache(mock_call_gemini, app):
+    """Menguji bahwa pertanyaan serupa hanya memanggil Gemini satu kali.
+
+    Args:
+        mock_call_gemini: Mock untuk fungsi call_gemini
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        mock_call_gemini.return_value = "Coba ke Curug Cipendok ya!"
+
+        first = get_bot_response("Wisata alam di Banyumas apa aja?")
+        second = get_bot_response("wisata alam di banyumas apa ajaa")
+
+        assert first == second == "Coba ke Curug Cipendok ya!"
+        mock_call_gemini.assert_called_once()
+        assert get_response_cache().stats()['hits'] == 1
+
+
+@patch('app.services.chatbot_handler.call_gemini')
+def test_catalog_change_invalidates_cache(mock_call_gemini, app):
+    """Menguji bahwa commit perubahan data wisata mengosongkan cache chatbot.
+
+    Args:
+        mock_call_gemini: Mock untuk fungsi call_gemini
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        mock_call_gemini.return_value = "Jawaban lama."
+        get_bot_response("wisata alam")
+        assert get_response_cache().stats()['size'] == 1
+
+        db.session.add(Wisata(nama='Telaga Sunyi', kategori='Alam', lokasi='Banyumas', deskripsi='Telaga jernih.'))
+        db.session.commit()
+
+        stats = get_response_cache().stats()
+        assert stats['size'] == 0
+        assert stats['invalidations'] == 1
+
+
+def test_catalog_change_in_other_worker_invalidates_cache(app, tmp_path):
+    """Menguji bahwa perubahan katalog dari worker lain mengosongkan cache melalui versi bersama.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk file versi katalog
+    """
+    version_file = str(tmp_path / 'catalog.version')
+    app.config['CATALOG_VERSION_FILE'] = version_file
+    other = create_app('testing')
+    other.config['CATALOG_VERSION_FILE'] = version_file
+
+    with other.app_context():
+        get_response_cache().set('wisata alam', 'Jawaban lama.')
+
+    with app.app_context():
+        get_response_cache().set('wisata alam', 'Jawaban lama.')
+        db.session.add(Wisata(nama='Telaga Sunyi', kategori='Alam', lokasi='Banyumas', deskripsi='Telaga jernih.'))
+        db.session.commit()
+        # Worker yang melakukan commit hanya mengosongkan cache satu kali
+        assert get_response_cache().stats()['invalidations'] == 1
+
+    with other.app_context():
+        cache = get_response_cache()
+        assert cache.get('wisata alam') is None
+        assert cache.stats()['invalidations'] == 1
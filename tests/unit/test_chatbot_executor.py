@@ -0,0 +1,74 @@
+import threading
+import pytest
+from flask import current_app
+from app.services.chatbot_executor import ChatbotExecutor, ExecutorSaturated, DeadlineExceeded
+
+
+def test_run_executes_inside_app_context(app):
+    """Menguji bahwa tugas dijalankan di thread lain dengan konteks aplikasi yang sama.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    executor = ChatbotExecutor(max_workers=1)
+    with app.app_context():
+        result = executor.run(lambda: (current_app.name, threading.current_thread().name))
+
+    assert result[0] == app.name
+    assert result[1].startswith('chatbot')
+    assert executor.metrics()['completed'] == 1
+    executor.shutdown()
+
+
+def test_run_rejects_when_user_limit_reached(app):
+    """Menguji bahwa pertanyaan bersamaan melebihi batas per pengguna langsung ditolak.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    executor = ChatbotExecutor(max_workers=2, max_in_flight=4, per_user_limit=1)
+    executor.acquire(user_id=7)
+
+    with app.app_context():
+        with pytest.raises(ExecutorSaturated):
+            executor.run(lambda: 'jawaban', user_id=7)
+        assert executor.run(lambda: 'jawaban', user_id=8) == 'jawaban'
+
+    executor.release(user_id=7)
+    assert executor.metrics()['rejected'] == 1
+    executor.shutdown()
+
+
+def test_run_rejects_when_in_flight_cap_reached(app):
+    """Menguji bahwa executor menolak tugas baru ketika kapasitas global penuh.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    executor = ChatbotExecutor(max_workers=1, max_in_flight=0)
+
+    with app.app_context():
+        with pytest.raises(ExecutorSaturated):
+            executor.run(lambda: 'jawaban')
+    executor.shutdown()
+
+
+def test_run_raises_when_deadline_exceeded(app):
+    """Menguji bahwa tugas yang terlalu lama menghasilkan `DeadlineExceeded`.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    executor = ChatbotExecutor(max_workers=1, deadline=0.05)
+    release = threading.Event()
+
+    with app.app_context():
+        with pytest.raises(DeadlineExceeded):
+            executor.run(release.wait, 5)
+
+    release.set()
+    executor.shutdown()
+
+    metrics = executor.metrics()
+    assert metrics['timeouts'] == 1
+    assert metrics['in_flight'] == 0
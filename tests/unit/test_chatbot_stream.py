@@ -0,0 +1,107 @@
+from unittest.mock import patch, MagicMock
+import pytest
+import requests
+from app.services.chatbot_cache import get_response_cache
+from app.services.chatbot_handler import stream_gemini, stream_bot_response, FALLBACK_MESSAGE, StreamInterrupted
+
+
+def _sse_response(lines):
+    """Membuat mock respons HTTP streaming yang mengembalikan baris SSE.
+
+    Args:
+        lines (list[str]): Baris-baris SSE yang akan dikembalikan oleh `iter_lines`.
+
+    Returns:
+        MagicMock: Mock respons yang dapat dipakai sebagai context manager.
+    """
+    resp = MagicMock()
+    resp.__enter__.return_value = resp
+    resp.iter_lines.return_value = iter(lines)
+    return resp
+
+
+def _chunk(text):
+    """Membentuk satu baris SSE berisi potongan GenerateContentResponse.
+
+    Args:
+        text (str): Potongan teks jawaban.
+
+    Returns:
+        str: Baris SSE.
+    """
+    return 'data: {"candidates": [{"content": {"parts": [{"text": "%s"}]}}]}' % text
+
+
+def test_stream_gemini_yields_text_chunks(app):
+    """Menguji bahwa `stream_gemini` mengurai event SSE menjadi potongan teks.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        app.config['GEMINI_API_KEY'] = 'kunci-rahasia'
+        mock_session = MagicMock()
+        mock_session.post.return_value = _sse_response([_chunk('Halo'), '', _chunk(' kak!')])
+
+        with patch('app.services.chatbot_handler.get_session', return_value=mock_session):
+            chunks = list(stream_gemini('prompt'))
+
+        assert chunks == ['Halo', ' kak!']
+        args, kwargs = mock_session.post.call_args
+        assert ':streamGenerateContent?alt=sse&' in args[0]
+        assert kwargs['stream'] is True
+
+
+@patch('app.services.chatbot_handler.stream_gemini')
+def test_stream_bot_response_truncates_runaway_answer(mock_stream, app):
+    """Menguji bahwa jawaban streaming dipotong pada batas karakter dan tidak di-cache.
+
+    Args:
+        mock_stream: Mock untuk fungsi stream_gemini
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        app.config['CHATBOT_STREAM_MAX_CHARS'] = 8
+        mock_stream.return_value = iter(['abcde', 'fghij', 'klmno'])
+
+        chunks = list(stream_bot_response('pertanyaan panjang'))
+
+        assert ''.join(chunks) == 'abcdefgh'
+        assert get_response_cache().stats()['size'] == 0
+
+
+@patch('app.services.chatbot_handler.stream_gemini')
+def test_stream_bot_response_falls_back_on_error(mock_stream, app):
+    """Menguji bahwa pesan fallback dikirim jika streaming gagal sebelum token pertama.
+
+    Args:
+        mock_stream: Mock untuk fungsi stream_gemini
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        mock_stream.side_effect = requests.exceptions.ConnectionError('putus')
+
+        assert list(stream_bot_response('halo')) == [FALLBACK_MESSAGE]
+
+
+@patch('app.services.chatbot_handler.stream_gemini')
+def test_stream_bot_response_does_not_cache_interrupted_answer(mock_stream, app):
+    """Menguji bahwa jawaban yang terputus di tengah streaming tidak disimpan ke cache.
+
+    Args:
+        mock_stream: Mock untuk fungsi stream_gemini
+        app: Instance aplikasi Flask
+    """
+    def interrupted(prompt):
+        yield 'Pantai Kuta '
+        raise requests.exceptions.ChunkedEncodingError('koneksi terputus')
+
+    with app.app_context():
+        mock_stream.side_effect = interrupted
+
+        chunks = []
+        with pytest.raises(StreamInterrupted):
+            for chunk in stream_bot_response('pantai terbaik di bali'):
+                chunks.append(chunk)
+        assert chunks == ['Pantai Kuta ']
+        assert get_response_cache().stats()['size'] == 0
@@ -0,0 +1,164 @@
+from unittest.mock import patch, MagicMock
+import pytest
+import requests
+from app.services.circuit_breaker import CircuitBreaker, get_gemini_breaker
+from app.services.chatbot_handler import call_gemini, get_bot_response, stream_bot_response, FALLBACK_MESSAGE
+
+
+class FakeClock:
+    """Jam palsu yang dapat dimajukan secara manual."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock, **kwargs):
+    """Membuat breaker kecil untuk pengujian."""
+    options = dict(window=60, min_calls=4, failure_rate=0.5, slow_call_duration=5,
+                   slow_call_rate=0.5, open_duration=30, clock=clock)
+    options.update(kwargs)
+    return CircuitBreaker('uji', **options)
+
+
+def test_breaker_opens_when_failure_rate_exceeded():
+    """Menguji bahwa breaker terbuka setelah rasio gagal melewati ambang batas."""
+    breaker = _breaker(FakeClock())
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1)
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() is False
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_breaker_opens_on_slow_calls():
+    """Menguji bahwa panggilan yang lambat juga dapat membuka breaker."""
+    breaker = _breaker(FakeClock())
+    for _ in range(4):
+        breaker.record_success(6)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_old_calls_leave_the_window():
+    """Menguji bahwa kegagalan di luar sliding window tidak lagi dihitung."""
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure(0.1)
+
+    clock.now = 61
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()['window_calls'] == 1
+
+
+def test_half_open_probe_closes_or_reopens():
+    """Menguji bahwa satu panggilan uji coba menentukan breaker tertutup atau terbuka lagi."""
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record_failure(0.1)
+
+    clock.now = 31
+    assert breaker.allow() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Hanya satu panggilan uji coba yang diizinkan bersamaan
+    assert breaker.allow() is False
+
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 62
+    assert breaker.allow() is True
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() is True
+
+
+def test_open_breaker_fails_fast_with_fallback(app):
+    """Menguji bahwa Gemini tidak dipanggil dan pengguna menerima pesan fallback saat breaker terbuka.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        app.config['GEMINI_API_KEY'] = 'kunci-uji'
+        breaker = get_gemini_breaker()
+        breaker.min_calls = 2
+        session = MagicMock()
+        session.post.side_effect = requests.exceptions.ConnectionError('down')
+
+        with patch('app.services.chatbot_handler.get_session', return_value=session):
+            assert call_gemini('halo') is None
+            assert call_gemini('halo') is None
+            assert breaker.state == CircuitBreaker.OPEN
+
+            assert get_bot_response('apa kabar putri') == FALLBACK_MESSAGE
+            assert list(stream_bot_response('ceritakan tentang bali')) == [FALLBACK_MESSAGE]
+
+        assert session.post.call_count == 2
+
+
+def test_client_errors_do_not_open_breaker(app):
+    """Menguji bahwa error 4xx (selain 429) tidak dihitung sebagai gangguan Gemini.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        app.config['GEMINI_API_KEY'] = 'kunci-uji'
+        breaker = get_gemini_breaker()
+        breaker.min_calls = 2
+        response = MagicMock(status_code=400)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError('bad request', response=response)
+        session = MagicMock()
+        session.post.return_value = response
+
+        with patch('app.services.chatbot_handler.get_session', return_value=session):
+            for _ in range(3):
+                assert call_gemini('halo') is None
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unexpected_error_releases_half_open_probe(app):
+    """Menguji bahwa error tak terduga saat panggilan uji coba tetap melepas slot half-open.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        app.config['GEMINI_API_KEY'] = 'kunci-uji'
+        clock = FakeClock()
+        breaker = app.extensions['gemini_breaker'] = _breaker(clock)
+        for _ in range(4):
+            breaker.record_failure(0.1)
+        response = MagicMock()
+        session = MagicMock()
+        session.post.return_value = response
+
+        with patch('app.services.chatbot_handler.get_session', return_value=session):
+            # Respons tanpa kandidat (`candidates: null`) dijawab dengan fallback
+            clock.now = 31
+            response.json.return_value = {'candidates': None}
+            assert call_gemini('halo') is None
+            assert breaker.state == CircuitBreaker.OPEN
+
+            clock.now = 62
+            response.json.side_effect = RuntimeError('respons aneh')
+            with pytest.raises(RuntimeError):
+                call_gemini('halo')
+            assert breaker.state == CircuitBreaker.OPEN
+
+            clock.now = 93
+            response.json.side_effect = None
+            response.json.return_value = {'candidates': [{'content': {'parts': [{'text': 'Halo!'}]}}]}
+            assert call_gemini('halo') == 'Halo!'
+            assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,110 @@
+from unittest.mock import patch
+from app.services.catalog_index import estimate_tokens
+from app.services.conversation_store import ConversationStore
+from app.services.chatbot_handler import get_bot_response
+
+
+class FakeClock:
+    """Jam palsu yang dapat dimajukan secara manual."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_store_keeps_last_turns_and_summarizes_older_ones():
+    """Menguji bahwa giliran di atas batas diringkas, bukan dibuang begitu saja."""
+    store = ConversationStore(max_turns=2, token_budget=1000)
+    for i in range(4):
+        store.append(1, f'pertanyaan {i}', f'Jawaban ke-{i}. Detail tambahan.')
+
+    summary, turns = store.history(1)
+
+    assert [q for q, _ in turns] == ['pertanyaan 2', 'pertanyaan 3']
+    assert summary == [
+        'Pengguna bertanya "pertanyaan 0", Putri menjawab: Jawaban ke-0.',
+        'Pengguna bertanya "pertanyaan 1", Putri menjawab: Jawaban ke-1.',
+    ]
+    assert store.stats()['compactions'] == 2
+
+
+def test_history_stays_within_token_budget():
+    """Menguji bahwa total token riwayat tetap di bawah anggaran meskipun jawaban panjang."""
+    store = ConversationStore(max_turns=10, token_budget=200)
+    for i in range(20):
+        store.append(1, f'pertanyaan {i}', 'kalimat panjang sekali ' * 30)
+
+    summary, turns = store.history(1)
+    total = sum(estimate_tokens(line) for line in summary) + \
+        sum(estimate_tokens(q) + estimate_tokens(a) for q, a in turns)
+
+    assert total <= 200
+    assert len(turns) >= 1
+
+
+def test_idle_and_lru_conversations_are_evicted():
+    """Menguji bahwa percakapan tidak aktif dan percakapan terlama dibuang sesuai batas."""
+    clock = FakeClock()
+    store = ConversationStore(max_conversations=2, idle_ttl=60, clock=clock)
+    store.append(1, 'a', 'b')
+    store.append(2, 'c', 'd')
+    store.history(1)
+    store.append(3, 'e', 'f')
+
+    assert store.history(2) == ([], [])
+    assert store.history(1)[1] == [('a', 'b')]
+
+    clock.now = 61
+    assert store.history(1) == ([], [])
+    assert store.stats()['evictions'] == 2
+
+
+def test_memory_cap_evicts_least_recently_used():
+    """Menguji bahwa total ukuran riwayat tidak melewati batas memori."""
+    store = ConversationStore(max_bytes=300)
+    for user_id in range(10):
+        store.append(user_id, 'pertanyaan', 'x' * 100)
+
+    assert store.stats()['bytes'] <= 300
+    assert store.history(9)[1]
+
+
+@patch('app.services.chatbot_handler.call_gemini')
+def test_follow_up_question_includes_history_and_skips_cache(mock_call_gemini, app):
+    """Menguji bahwa pertanyaan lanjutan menyertakan riwayat dan tidak memakai cache bersama.
+
+    Args:
+        mock_call_gemini: Mock untuk fungsi call_gemini
+        app: Instance aplikasi Flask
+    """
+    mock_call_gemini.side_effect = ['Curug Cipendok ada di Banyumas.', 'Tiket masuknya murah kok.', 'Jawaban baru.']
+    with app.app_context():
+        get_bot_response('ceritakan curug cipendok', 1)
+        get_bot_response('berapa harga tiketnya', 1)
+        # Pengguna lain tanpa riwayat tidak mendapat jawaban yang bergantung riwayat
+        assert get_bot_response('berapa harga tiketnya', 2) == 'Jawaban baru.'
+
+    follow_up_prompt = mock_call_gemini.call_args_list[1][0][0]
+    assert 'Pengguna: ceritakan curug cipendok' in follow_up_prompt
+    assert 'Putri: Curug Cipendok ada di Banyumas.' in follow_up_prompt
+    assert 'Percakapan terakhir' not in mock_call_gemini.call_args_list[2][0][0]
+
+
+@patch('app.services.chatbot_handler.call_gemini')
+def test_standalone_question_with_history_uses_shared_cache(mock_call_gemini, app):
+    """Menguji bahwa pertanyaan mandiri dari pengguna yang punya riwayat tetap memakai cache bersama.
+
+    Args:
+        mock_call_gemini: Mock untuk fungsi call_gemini
+        app: Instance aplikasi Flask
+    """
+    mock_call_gemini.side_effect = ['Curug Cipendok ada di Banyumas.', 'Coba Pantai Menganti di Kebumen.']
+    with app.app_context():
+        get_bot_response('ceritakan curug cipendok', 1)
+        get_bot_response('rekomendasi pantai di jawa tengah', 1)
+        assert get_bot_response('rekomendasi pantai di jawa tengah', 2) == 'Coba Pantai Menganti di Kebumen.'
+
+    assert mock_call_gemini.call_count == 2
+    assert 'Percakapan terakhir' not in mock_call_gemini.call_args_list[1][0][0]
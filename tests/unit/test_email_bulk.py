@@ -0,0 +1,145 @@
+import smtplib
+from unittest.mock import patch
+from flask_mail import Message
+from app import db, mail
+from app.models.user import User
+from app.services.email_bulk import BulkSender
+
+
+class FakeHost:
+    """Sesi SMTP tiruan yang mencatat QUIT."""
+
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    """Koneksi Flask-Mail tiruan dengan error yang dapat diinjeksi per pesan."""
+
+    def __init__(self, log, failures):
+        self.host = FakeHost()
+        self.log = log
+        self.failures = failures
+        self.sent = []
+
+    def __enter__(self):
+        return self
+
+    def send(self, message):
+        error = self.failures.pop(message.subject, None)
+        if error is not None:
+            raise error
+        self.sent.append(message.subject)
+        self.log.append((id(self), message.subject))
+
+
+def _messages(count):
+    """Membuat sejumlah pesan sederhana untuk pengujian."""
+    return [Message(f'Pesan {i}', sender='noreply@lelana.my.id', recipients=[f'user{i}@lelana.my.id'], html='<p>Hi</p>')
+            for i in range(count)]
+
+
+def _patched_connect(failures=None):
+    """Mengganti `mail.connect` dengan pembuat koneksi tiruan."""
+    log, connections = [], []
+    failures = {} if failures is None else failures
+
+    def connect():
+        connection = FakeConnection(log, failures)
+        connections.append(connection)
+        return connection
+
+    return patch('app.services.email_bulk.mail.connect', side_effect=connect), log, connections
+
+
+def test_reuses_connection_and_rotates_after_limit(app):
+    """Menguji bahwa banyak pesan dikirim lewat sedikit koneksi dan koneksi dirotasi setelah batas.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    patcher, log, connections = _patched_connect()
+    with app.app_context(), patcher:
+        with BulkSender(max_per_connection=4) as sender:
+            assert sender.send_many(_messages(10)) == []
+        stats = sender.stats()
+
+    assert len(log) == 10
+    assert [len(c.sent) for c in connections] == [4, 4, 2]
+    assert all(c.host.closed for c in connections)
+    assert stats['connections'] == 3
+    assert stats['sent'] == 10
+
+
+def test_stale_connection_is_replaced_and_message_retried(app):
+    """Menguji bahwa koneksi yang diputus server diganti dan pesan dicoba sekali lagi.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    refused = smtplib.SMTPRecipientsRefused({'user1@lelana.my.id': (550, b'no such user')})
+    patcher, log, connections = _patched_connect({
+        'Pesan 1': refused,
+        'Pesan 2': smtplib.SMTPServerDisconnected('putus'),
+    })
+    with app.app_context(), patcher:
+        with BulkSender(max_per_connection=0) as sender:
+            errors = sender.send_many(_messages(4))
+
+    # Penerima ditolak tidak merusak koneksi, sedangkan koneksi putus diganti
+    assert [e for _, e in errors] == [refused]
+    assert [subject for _, subject in log] == ['Pesan 0', 'Pesan 2', 'Pesan 3']
+    assert len(connections) == 2
+    assert sender.stats()['failed'] == 1
+
+
+def test_throttle_limits_send_rate(app):
+    """Menguji bahwa laju pengiriman dibatasi sesuai `rate`.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    patcher, _, _ = _patched_connect()
+    with app.app_context(), patcher:
+        with BulkSender(rate=5, clock=lambda: now[0], sleep=sleep) as sender:
+            sender.send_many(_messages(3))
+
+    assert sleeps == [0.2, 0.2]
+    assert sender.stats()['throttled_s'] == 0.4
+
+
+def test_reconfirm_command_sends_to_unconfirmed_users(app, test_user):
+    """Menguji perintah `flask email reconfirm` untuk pengguna yang belum terkonfirmasi.
+
+    Args:
+        app: Instance aplikasi Flask
+        test_user: Fixture pengguna terkonfirmasi
+    """
+    with app.app_context():
+        for i in range(3):
+            user = User(username=f'belum_{i}', email=f'belum_{i}@lelana.my.id')
+            user.password = 'Password123!'
+            db.session.add(user)
+        db.session.commit()
+
+    runner = app.test_cli_runner()
+    with mail.record_messages() as sent:
+        result = runner.invoke(args=['email', 'reconfirm', '--base-url', 'https://lelana.my.id', '--chunk-size', '2'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Terkirim: 3' in result.output
+    assert sorted(m.recipients[0] for m in sent) == [f'belum_{i}@lelana.my.id' for i in range(3)]
+    assert 'https://lelana.my.id/auth/confirm/' in sent[0].html
@@ -0,0 +1,218 @@
+import smtplib
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from sqlalchemy.exc import OperationalError
+from app import db, mail
+from app.models.email_outbox import EmailOutbox
+from app.models.user import User
+from app.services.email_outbox import claim_batch, deliver, outbox_stats, process_outbox
+
+
+def _add_outbox(count=1, **kwargs):
+    """Menambahkan email ke outbox untuk pengujian."""
+    rows = [
+        EmailOutbox(recipient=f'penerima{i}@lelana.my.id', sender='Tim Lelana.id <noreply@lelana.my.id>',
+                    subject=f'Uji {i}', html='<p>Halo</p>', **kwargs)
+        for i in range(count)
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+
+def test_registration_writes_outbox_in_same_transaction(app, auth, monkeypatch):
+    """Menguji bahwa email konfirmasi tersimpan ke outbox bersama pengguna baru, tanpa dikirim di request.
+
+    Args:
+        app: Instance aplikasi Flask
+        auth: Objek AuthActions untuk melakukan registrasi
+        monkeypatch: Fixture pytest untuk mencatat isi setiap commit
+    """
+    app.config['MAIL_DELIVERY_MODE'] = 'outbox'
+    original = db.session.commit
+    committed = []
+
+    def recording_commit():
+        committed.append(sorted(type(obj).__name__ for obj in db.session.new))
+        original()
+
+    monkeypatch.setattr(db.session, 'commit', recording_commit)
+    with mail.record_messages() as sent:
+        response = auth.register('outboxuser', 'outbox@lelana.my.id', 'NewPassword123!', 'NewPassword123!')
+        assert response.status_code == 200
+        assert sent == []
+    monkeypatch.undo()
+
+    # Pengguna sudah di-flush sebelum commit, sehingga hanya baris outbox yang masih baru
+    assert committed[0] == ['EmailOutbox']
+
+    with app.app_context():
+        user = User.query.filter_by(email='outbox@lelana.my.id').one()
+        row = EmailOutbox.query.filter_by(recipient=user.email).one()
+        assert row.status == EmailOutbox.PENDING
+        assert row.subject == 'Konfirmasi Akun Lelana.id Anda'
+        assert 'Tim Lelana.id' in row.sender
+
+
+def test_failed_registration_leaves_no_outbox(app, auth):
+    """Menguji bahwa rollback pendaftaran ikut membatalkan email di outbox.
+
+    Args:
+        app: Instance aplikasi Flask
+        auth: Objek AuthActions untuk melakukan registrasi
+    """
+    app.config['MAIL_DELIVERY_MODE'] = 'outbox'
+    with patch('app.routes.auth_routes.User.generate_confirmation_token', side_effect=RuntimeError('gagal')), \
+            pytest.raises(RuntimeError):
+        auth.register('gagaluser', 'gagal@lelana.my.id', 'NewPassword123!', 'NewPassword123!')
+
+    # Request yang gagal tidak pernah commit; sesi dibatalkan seperti saat teardown
+    db.session.rollback()
+    with app.app_context():
+        assert User.query.filter_by(email='gagal@lelana.my.id').first() is None
+        assert EmailOutbox.query.count() == 0
+
+
+def test_failed_registration_commit_sends_no_email(app, auth, monkeypatch):
+    """Menguji bahwa email konfirmasi tidak terkirim jika pengguna gagal disimpan.
+
+    Args:
+        app: Instance aplikasi Flask
+        auth: Objek AuthActions untuk melakukan registrasi
+        monkeypatch: Fixture pytest untuk menggagalkan commit
+    """
+    app.config['MAIL_DELIVERY_MODE'] = 'sync'
+
+    def failing_commit():
+        raise OperationalError('COMMIT', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(db.session, 'commit', failing_commit)
+    with mail.record_messages() as sent, pytest.raises(OperationalError):
+        auth.register('commituser', 'commit@lelana.my.id', 'NewPassword123!', 'NewPassword123!')
+    assert sent == []
+
+
+def test_process_outbox_sends_and_marks_sent(app):
+    """Menguji bahwa pengirim mengirim email yang siap lalu menandainya terkirim.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        _add_outbox(3)
+        with mail.record_messages() as sent:
+            result = process_outbox(batch_size=2)
+            assert result == {'sent': 2, 'retry': 0, 'dead': 0, 'claimed': 2}
+            process_outbox(batch_size=2)
+
+        assert sorted(m.recipients[0] for m in sent) == [f'penerima{i}@lelana.my.id' for i in range(3)]
+        assert outbox_stats() == {'pending': 0, 'sending': 0, 'sent': 3, 'dead': 0}
+        assert all(row.tanggal_terkirim is not None for row in EmailOutbox.query.all())
+
+
+def test_claims_are_exclusive_until_lease_expires(app):
+    """Menguji bahwa email yang sudah diklaim tidak diklaim ulang sebelum lease habis.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        _add_outbox(2)
+        first = claim_batch(batch_size=10, lease_seconds=60)
+        assert len(first) == 2
+        assert claim_batch(batch_size=10, lease_seconds=60) == []
+
+        # Mensimulasikan pengirim yang mati: lease sudah lewat sehingga email diklaim ulang
+        for row in first:
+            row.lease_until = datetime.now() - timedelta(seconds=1)
+        db.session.commit()
+        reclaimed = claim_batch(batch_size=10, lease_seconds=60)
+        assert sorted(r.id for r in reclaimed) == sorted(r.id for r in first)
+        assert all(r.attempts == 2 for r in reclaimed)
+
+
+def test_expired_lease_at_max_attempts_is_dead_lettered(app):
+    """Menguji bahwa email yang lease-nya habis pada batas percobaan tidak diklaim ulang.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    app.config['MAIL_OUTBOX_MAX_ATTEMPTS'] = 2
+    with app.app_context():
+        row, = _add_outbox(1, attempts=1)
+        assert len(claim_batch(lease_seconds=60)) == 1
+
+        # Pengirim mati saat mengirim percobaan terakhir
+        row = db.session.get(EmailOutbox, row.id)
+        row.lease_until = datetime.now() - timedelta(seconds=1)
+        db.session.commit()
+
+        assert claim_batch() == []
+        db.session.expire_all()
+        row = db.session.get(EmailOutbox, row.id)
+        assert row.status == EmailOutbox.DEAD
+        assert row.lease_token is None
+        assert outbox_stats()['dead'] == 1
+
+
+def test_transient_failure_is_retried_with_backoff(app):
+    """Menguji bahwa kegagalan sementara dijadwalkan ulang dengan backoff eksponensial.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    app.config.update(MAIL_OUTBOX_BACKOFF=30, MAIL_OUTBOX_MAX_ATTEMPTS=5)
+    with app.app_context():
+        row, = _add_outbox(1, attempts=2)
+        claimed = claim_batch()
+        before = datetime.now()
+        result = deliver(claimed, send=lambda msg: (_ for _ in ()).throw(smtplib.SMTPServerDisconnected('putus')))
+
+        assert result == {'sent': 0, 'retry': 1, 'dead': 0}
+        row = db.session.get(EmailOutbox, row.id)
+        assert row.status == EmailOutbox.PENDING
+        assert row.attempts == 3
+        assert row.last_error == 'putus'
+        # Percobaan ketiga menunggu 30 * 2**2 = 120 detik
+        delay = (row.next_attempt_at.replace(tzinfo=None) - before).total_seconds()
+        assert 110 < delay < 130
+        assert claim_batch() == []
+
+
+def test_dead_letter_after_max_attempts_or_permanent_error(app):
+    """Menguji bahwa email dipindahkan ke dead-letter setelah batas percobaan atau error permanen.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    app.config['MAIL_OUTBOX_MAX_ATTEMPTS'] = 3
+    refused = smtplib.SMTPRecipientsRefused({'penerima0@lelana.my.id': (550, b'no such user')})
+    with app.app_context():
+        exhausted, = _add_outbox(1, attempts=2)
+        with patch('flask_mail.Connection.send', side_effect=smtplib.SMTPServerDisconnected('putus')):
+            assert process_outbox()['dead'] == 1
+        assert db.session.get(EmailOutbox, exhausted.id).status == EmailOutbox.DEAD
+
+        permanent, = _add_outbox(1)
+        with patch('flask_mail.Connection.send', side_effect=refused):
+            assert process_outbox()['dead'] == 1
+        row = db.session.get(EmailOutbox, permanent.id)
+        assert row.status == EmailOutbox.DEAD
+        assert row.attempts == 1
+
+
+def test_send_outbox_command(app):
+    """Menguji perintah CLI `flask email send-outbox --once`.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        _add_outbox(2)
+    with mail.record_messages() as sent:
+        result = app.test_cli_runner().invoke(args=['email', 'send-outbox', '--once'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Terkirim: 2' in result.output
+    assert len(sent) == 2
@@ -0,0 +1,130 @@
+import smtplib
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from flask_mail import Message
+from app import mail
+from app.services.email_queue import EmailQueue, EmailQueueFull, get_email_queue
+from app.services.email_handler import send_email
+
+
+def _message(subject='Uji'):
+    """Membuat pesan email sederhana untuk pengujian."""
+    return Message(subject, sender='noreply@lelana.my.id', recipients=['penerima@lelana.my.id'], html='<p>Halo</p>')
+
+
+def test_queue_delivers_in_background(app):
+    """Menguji bahwa pesan di antrean dikirim oleh worker dan metrik diperbarui.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    queue = EmailQueue(app)
+    with mail.record_messages() as outbox:
+        queue.enqueue(_message())
+        assert queue.join(timeout=5)
+
+    assert [m.subject for m in outbox] == ['Uji']
+    metrics = queue.metrics()
+    assert metrics['sent'] == 1
+    assert metrics['queue_depth'] == 0
+    queue.shutdown()
+
+
+def test_transient_errors_are_retried_with_backoff(app):
+    """Menguji bahwa kegagalan sementara dicoba ulang dan kegagalan permanen tidak.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    queue = EmailQueue(app, max_retries=2, backoff=0.01)
+    refused = smtplib.SMTPRecipientsRefused({'penerima@lelana.my.id': (550, b'no such user')})
+    with patch('app.services.email_queue.mail.send',
+               side_effect=[smtplib.SMTPServerDisconnected('putus'), None, refused]) as mock_send:
+        queue.enqueue(_message('Sementara'))
+        assert queue.join(timeout=5)
+        queue.enqueue(_message('Permanen'))
+        assert queue.join(timeout=5)
+
+    assert mock_send.call_count == 3
+    metrics = queue.metrics()
+    assert metrics['sent'] == 1
+    assert metrics['retried'] == 1
+    assert metrics['failed'] == 1
+    queue.shutdown()
+
+
+def test_full_queue_rejects_new_messages(app):
+    """Menguji bahwa antrean berbatas menolak pesan saat penuh.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    release = threading.Event()
+    queue = EmailQueue(app, max_size=1)
+    with patch('app.services.email_queue.mail.send', side_effect=lambda msg: release.wait(5)):
+        queue.enqueue(_message('Pertama'))
+        # Menunggu worker mengambil pesan pertama agar antrean kosong kembali
+        while queue.metrics()['in_progress'] == 0:
+            time.sleep(0.01)
+        queue.enqueue(_message('Kedua'))
+        with pytest.raises(EmailQueueFull):
+            queue.enqueue(_message('Ketiga'))
+        release.set()
+        assert queue.join(timeout=5)
+
+    assert queue.metrics()['rejected'] == 1
+    queue.shutdown()
+
+
+def test_shutdown_drains_pending_messages(app):
+    """Menguji bahwa email yang masih menunggu backoff tetap dikirim saat antrean dihentikan.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    queue = EmailQueue(app, backoff=60)
+    with patch('app.services.email_queue.mail.send',
+               side_effect=[smtplib.SMTPServerDisconnected('putus'), None]) as mock_send:
+        queue.enqueue(_message())
+        while queue.metrics()['retried'] == 0:
+            time.sleep(0.01)
+        queue.shutdown(timeout=5)
+
+    assert mock_send.call_count == 2
+    assert queue.metrics()['sent'] == 1
+
+
+def test_send_email_does_not_wait_for_smtp_in_queue_mode(app):
+    """Menguji bahwa `send_email` langsung kembali walaupun SMTP lambat.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    mock_user = type('User', (object,), {'username': 'testuser'})()
+    with app.test_request_context():
+        app.config.update(MAIL_DELIVERY_MODE='queue', MAIL_SENDER='noreply@lelana.id', SERVER_NAME='localhost')
+        with patch('app.services.email_queue.mail.send', side_effect=lambda msg: time.sleep(0.5)) as mock_send:
+            started = time.monotonic()
+            send_email('penerima@example.com', 'Konfirmasi Akun', 'auth/email/confirm', user=mock_user, token='t')
+            assert time.monotonic() - started < 0.5
+
+            queue = get_email_queue()
+            assert queue.join(timeout=5)
+            assert mock_send.call_args[0][0].recipients == ['penerima@example.com']
+        queue.shutdown()
+
+
+def test_email_metrics_endpoint_for_admin(admin_client):
+    """Menguji [GET /admin/api/email/metrics] - Metrik antrean email tersedia untuk admin.
+
+    Args:
+        admin_client: Klien pengujian yang terautentikasi sebagai admin
+    """
+    response = admin_client.get('/admin/api/email/metrics')
+    assert response.status_code == 200
+    json_data = response.get_json()
+    assert json_data['mode'] == 'sync'
+    assert 'queue_depth' in json_data['queue']
+    assert 'avg_send_ms' in json_data['queue']
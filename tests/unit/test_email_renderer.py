@@ -0,0 +1,109 @@
+import pytest
+from types import SimpleNamespace
+from flask import render_template
+from jinja2 import ChoiceLoader, DictLoader
+from app.services.email_handler import build_messages
+from app.services.email_renderer import EmailRenderer, get_email_renderer
+
+
+def test_compiled_render_matches_jinja(app):
+    """Menguji bahwa kerangka terkompilasi menghasilkan HTML yang sama dengan render Jinja.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    renderer = EmailRenderer()
+    user = SimpleNamespace(username='Budi <b>&</b> "Ani"')
+    with app.test_request_context(base_url='https://lelana.my.id'):
+        for template in ('auth/email/confirm', 'auth/email/reset_password'):
+            for token in ('abc.DEF-_1', 'token dengan spasi/dan?tanya'):
+                expected = render_template(template + '.html', user=user, token=token)
+                assert renderer.render(template, user=user, token=token) == expected
+
+    stats = renderer.stats()
+    assert stats['compiled'] == 2
+    assert stats['misses'] == 2
+    assert stats['hits'] == 4
+
+
+def test_shell_is_cached_per_base_url(app):
+    """Menguji bahwa kerangka dibuat terpisah untuk setiap URL dasar.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    renderer = EmailRenderer()
+    user = SimpleNamespace(username='budi')
+    with app.test_request_context(base_url='https://lelana.my.id'):
+        first = renderer.render('auth/email/confirm', user=user, token='t1')
+    with app.test_request_context(base_url='http://localhost:5000'):
+        second = renderer.render('auth/email/confirm', user=user, token='t1')
+
+    assert 'https://lelana.my.id/auth/confirm/t1' in first
+    assert 'http://localhost:5000/auth/confirm/t1' in second
+    assert renderer.stats()['misses'] == 2
+
+
+def test_unverifiable_template_falls_back_to_jinja(app):
+    """Menguji bahwa field yang diubah filter tidak dikompilasi dan tetap dirender lewat Jinja.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    app.jinja_env.loader = ChoiceLoader([DictLoader({'uji/email/upper.html': 'Halo {{ user.username|upper }}'}),
+                                         app.jinja_env.loader])
+    renderer = EmailRenderer({'uji/email/upper': {'user.username': 'text'}})
+    with app.test_request_context():
+        assert renderer.render('uji/email/upper', user=SimpleNamespace(username='budi')) == 'Halo BUDI'
+        assert renderer.render('uji/email/upper', user=SimpleNamespace(username='ani')) == 'Halo ANI'
+
+    stats = renderer.stats()
+    assert stats['compiled'] == 0
+    assert stats['fallbacks'] == 2
+
+
+def test_build_messages_renders_batch(app):
+    """Menguji API batch untuk membuat banyak pesan dari satu template.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    recipients = [(f'user{i}@lelana.my.id', {'user': SimpleNamespace(username=f'user{i}'), 'token': f'tok{i}'})
+                  for i in range(5)]
+    with app.test_request_context():
+        messages = build_messages('Konfirmasi', 'auth/email/confirm', recipients)
+        stats = get_email_renderer().stats()
+
+    assert [m.recipients for m in messages] == [[to] for to, _ in recipients]
+    assert all(f'tok{i}' in m.html and f'user{i}' in m.html for i, m in enumerate(messages))
+    assert stats['misses'] == 1
+    assert stats['hits'] == 5
+
+
+def test_compiled_shells_are_bounded(app):
+    """Menguji bahwa header Host yang berbeda-beda tidak membuat cache kerangka tumbuh tanpa batas.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    renderer = EmailRenderer(max_entries=2)
+    user = SimpleNamespace(username='budi')
+    for i in range(5):
+        with app.test_request_context(base_url=f'http://host{i}.contoh'):
+            assert f'http://host{i}.contoh/auth/confirm/t1' in renderer.render('auth/email/confirm', user=user, token='t1')
+
+    assert renderer.stats()['compiled'] == 2
+    assert renderer.stats()['misses'] == 5
+
+
+def test_undeclared_template_variable_fails_loudly(app):
+    """Menguji bahwa variabel template yang tidak terdaftar sebagai field menimbulkan error, bukan string kosong.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    app.jinja_env.loader = ChoiceLoader([DictLoader({'uji/email/kode.html': 'Halo {{ user.username }}, kode {{ kode }}'}),
+                                         app.jinja_env.loader])
+    renderer = EmailRenderer({'uji/email/kode': {'user.username': 'text'}})
+    with app.test_request_context(), pytest.raises(ValueError, match='kode'):
+        renderer.render('uji/email/kode', user=SimpleNamespace(username='budi'), kode='1234')
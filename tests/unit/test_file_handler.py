@@ -0,0 +1,155 @@
+import io
+import os
+import threading
+import time
+import pytest
+from PIL import Image
+from sqlalchemy.exc import OperationalError
+from werkzeug.datastructures import FileStorage
+from app import db
+from app.models.foto_ulasan import FotoUlasan
+from app.services.file_handler import save_pictures
+from app.services.storage import LocalStorage
+from tests.unit.test_upload_stream import _noisy_jpeg
+
+
+def _walk(folder):
+    """Mengembalikan semua file di bawah folder (path relatif)."""
+    return sorted(os.path.relpath(os.path.join(root, name), folder)
+                  for root, _, files in os.walk(folder) for name in files)
+
+
+def _pictures(*blobs):
+    """Membuat objek unggahan dari beberapa isi file."""
+    return [FileStorage(stream=io.BytesIO(blob), filename=f'foto{i}.jpg') for i, blob in enumerate(blobs)]
+
+
+def test_photos_are_saved_in_parallel_with_one_sync(app, tmp_path, monkeypatch):
+    """Menguji bahwa beberapa foto disimpan bersamaan dan folder di-fsync sekali untuk semuanya.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk pengujian
+        monkeypatch: Fixture pytest untuk memperlambat penyimpanan
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    original = LocalStorage.put_file
+    threads = set()
+    synced = []
+
+    def slow_put(self, key, path):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.2)
+        return original(self, key, path)
+
+    monkeypatch.setattr(LocalStorage, 'put_file', slow_put)
+    monkeypatch.setattr(LocalStorage, 'sync', lambda self, keys: synced.append(sorted(keys)))
+
+    started = time.perf_counter()
+    names = save_pictures(_pictures(_noisy_jpeg(), _noisy_jpeg(), _noisy_jpeg()))
+    elapsed = time.perf_counter() - started
+
+    assert len(set(names)) == 3
+    assert elapsed < 0.5
+    assert len(threads) > 1
+    assert synced == [sorted(names)]
+
+
+def test_failed_save_removes_files_written_by_the_same_call(app, tmp_path, monkeypatch):
+    """Menguji rollback file saat salah satu foto gagal disimpan.
+
+    File yang sudah ada sebelumnya (dipakai ulang) tidak ikut dihapus.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk pengujian
+        monkeypatch: Fixture pytest untuk menggagalkan penyimpanan
+    """
+    # File rusak dikenali dari ukurannya, sehingga isinya tidak boleh diubah normalisasi
+    app.config.update(UPLOAD_FOLDER=str(tmp_path), UPLOAD_NORMALIZE=False)
+    existing = _noisy_jpeg()
+    [existing_name] = save_pictures(_pictures(existing))
+    broken = _noisy_jpeg()
+    original = LocalStorage.put_file
+
+    def failing_put(self, key, path):
+        # File ini gagal setelah file lain selesai ditulis
+        if os.path.getsize(path) == len(broken):
+            time.sleep(0.1)
+            raise OSError('disk penuh')
+        return original(self, key, path)
+
+    monkeypatch.setattr(LocalStorage, 'put_file', failing_put)
+    with pytest.raises(OSError):
+        save_pictures(_pictures(_noisy_jpeg(), existing, broken))
+
+    assert _walk(tmp_path) == [existing_name]
+
+
+def test_review_commit_failure_discards_new_files(app, authenticated_client, wisata_fixture, tmp_path, monkeypatch):
+    """Menguji bahwa kegagalan commit ulasan menghapus foto dan turunan yang baru ditulis.
+
+    Args:
+        app: Instance aplikasi Flask
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+        monkeypatch: Fixture pytest untuk menggagalkan commit
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+
+    def failing_commit():
+        raise OperationalError('COMMIT', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(db.session, 'commit', failing_commit)
+    buffer = io.BytesIO()
+    Image.new('RGB', (1200, 900), (10, 120, 60)).save(buffer, 'JPEG')
+    with pytest.raises(OperationalError):
+        authenticated_client.post(f'/wisata/detail/{wisata_fixture[0].id}', data={
+            'rating': 5,
+            'komentar': 'Indah',
+            'foto': [(io.BytesIO(buffer.getvalue()), 'a.jpg'), (io.BytesIO(_noisy_jpeg()), 'b.jpg')],
+        }, content_type='multipart/form-data')
+    monkeypatch.undo()
+
+    assert FotoUlasan.query.count() == 0
+    assert _walk(tmp_path) == []
+
+
+def test_discard_keeps_file_reused_by_another_request(tmp_path):
+    """Menguji bahwa file yang sudah dipakai ulang request lain tidak dihapus saat rollback.
+
+    Args:
+        tmp_path: Path sementara untuk pengujian
+    """
+    storage = LocalStorage(str(tmp_path), fsync=False)
+    source = tmp_path / 'sementara'
+    source.write_bytes(b'isi')
+    token = storage.put_file('ab/cd/abcd.jpg', str(source))
+
+    time.sleep(0.01)
+    assert storage.touch('ab/cd/abcd.jpg')
+    assert not storage.discard('ab/cd/abcd.jpg', token)
+    assert (tmp_path / 'ab/cd/abcd.jpg').exists()
+
+
+def test_concurrent_save_of_same_content_has_one_owner(tmp_path):
+    """Menguji bahwa dua request yang menyimpan konten sama bersamaan tidak saling menimpa atau menghapus file.
+
+    Args:
+        tmp_path: Path sementara untuk pengujian
+    """
+    storage = LocalStorage(str(tmp_path), fsync=False)
+    first, second = tmp_path / 'sementara1', tmp_path / 'sementara2'
+    first.write_bytes(b'isi')
+    second.write_bytes(b'isi')
+
+    token = storage.put_file('ab/cd/abcd.jpg', str(first))
+    time.sleep(0.01)
+    assert storage.put_file('ab/cd/abcd.jpg', str(second)) is None
+    assert not first.exists() and not second.exists()
+
+    # Rollback salah satu request tidak menghapus file yang dirujuk request lainnya
+    assert not storage.discard('ab/cd/abcd.jpg', None)
+    assert not storage.discard('ab/cd/abcd.jpg', token)
+    assert _walk(tmp_path) == ['ab/cd/abcd.jpg']
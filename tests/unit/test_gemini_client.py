@@ -0,0 +1,79 @@
+from unittest.mock import patch, MagicMock
+from app.services import gemini_client
+from app.services.chatbot_handler import call_gemini
+
+
+def test_get_session_is_reused(app):
+    """Menguji bahwa `get_session` mengembalikan sesi HTTP yang sama antar pemanggilan.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        gemini_client.close_session()
+        first = gemini_client.get_session()
+        second = gemini_client.get_session()
+
+        assert first is second
+
+
+def test_get_session_applies_pool_and_retry_config(app):
+    """Menguji bahwa ukuran pool dan kebijakan retry diambil dari konfigurasi.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        app.config['GEMINI_POOL_SIZE'] = 4
+        app.config['GEMINI_MAX_RETRIES'] = 3
+        session = gemini_client.get_session()
+
+        adapter = session.get_adapter('https://generativelanguage.googleapis.com')
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 3
+        assert 429 in adapter.max_retries.status_forcelist
+        assert 'POST' in adapter.max_retries.allowed_methods
+        gemini_client.close_session()
+
+
+def test_config_change_does_not_close_session_in_use(app):
+    """Menguji bahwa sesi lama tidak ditutup saat konfigurasi berubah karena thread lain mungkin masih memakainya.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        gemini_client.close_session()
+        old = gemini_client.get_session()
+        old.close = MagicMock()
+
+        app.config['GEMINI_POOL_SIZE'] = 3
+        new = gemini_client.get_session()
+
+        assert new is not old
+        old.close.assert_not_called()
+        gemini_client.close_session()
+
+def test_call_gemini_uses_pooled_session_with_timeout(app):
+    """Menguji bahwa `call_gemini` memakai sesi bersama beserta timeout per fase.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        app.config['GEMINI_API_KEY'] = 'kunci-rahasia'
+        app.config['GEMINI_CONNECT_TIMEOUT'] = 2
+        app.config['GEMINI_READ_TIMEOUT'] = 15
+
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = {"candidates": [{"content": {"parts": [{"text": "Halo!"}]}}]}
+        mock_session = MagicMock()
+        mock_session.post.return_value = mock_resp
+
+        with patch('app.services.chatbot_handler.get_session', return_value=mock_session):
+            result = call_gemini("test prompt")
+
+        assert result == "Halo!"
+        _, kwargs = mock_session.post.call_args
+        assert kwargs['timeout'] == (2, 15)
+        assert kwargs['json'] == {"contents": [{"parts": [{"text": "test prompt"}]}]}
@@ -0,0 +1,372 @@
+import io
+import os
+import threading
+import time
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+from app import db
+from app.models.foto_ulasan import FotoUlasan
+from app.models.review import Review
+from app.services import file_handler
+from app.services.image_pipeline import (foto_sources, generate_derivatives, normalize_upload, render_derivatives,
+                                         variant_name)
+
+
+def _image_bytes(size=(1600, 1200), fmt='JPEG', mode='RGB'):
+    """Membuat gambar uji dalam memori."""
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 120, 40) if mode == 'RGB' else (200, 120, 40, 128)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def _write_image(folder, name, **kwargs):
+    """Menulis gambar uji ke folder unggahan."""
+    with open(os.path.join(folder, name), 'wb') as f:
+        f.write(_image_bytes(**kwargs))
+
+
+def test_generate_derivatives_creates_resized_variants(app, tmp_path):
+    """Menguji bahwa turunan WebP dan JPEG dibuat dengan lebar sesuai varian.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    _write_image(tmp_path, 'foto.jpg')
+
+    assert generate_derivatives('foto.jpg') == ['thumb', 'medium']
+    for variant, width in (('thumb', 320), ('medium', 960)):
+        for ext in ('webp', 'jpg'):
+            with Image.open(tmp_path / variant_name('foto.jpg', variant, ext)) as image:
+                assert image.width == width
+                assert image.height == width * 3 // 4
+
+
+def test_small_image_is_not_upscaled(app, tmp_path):
+    """Menguji bahwa gambar kecil hanya mendapat satu varian tanpa diperbesar.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    _write_image(tmp_path, 'kecil.png', size=(200, 100), fmt='PNG', mode='RGBA')
+
+    assert generate_derivatives('kecil.png') == ['thumb']
+    with Image.open(tmp_path / 'kecil_thumb.jpg') as image:
+        assert image.size == (200, 100)
+        assert image.mode == 'RGB'
+
+
+def test_decompression_bomb_is_rejected_as_invalid_image(tmp_path, monkeypatch):
+    """Menguji bahwa gambar di atas batas piksel Pillow dilaporkan sebagai gambar tidak valid.
+
+    Args:
+        tmp_path: Path sementara untuk pengujian
+        monkeypatch: Fixture pytest untuk menurunkan batas piksel
+    """
+    _write_image(tmp_path, 'bom.png', size=(400, 300), fmt='PNG')
+    # Di atas dua kali batas, Pillow menolak dengan DecompressionBombError
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 50_000)
+
+    with pytest.raises(ValueError):
+        render_derivatives(str(tmp_path), 'bom.png', [('thumb', 320)])
+    assert os.listdir(tmp_path) == ['bom.png']
+
+
+def test_foto_sources_builds_srcset(app):
+    """Menguji atribut srcset untuk foto dengan dan tanpa turunan.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.test_request_context():
+        sources = foto_sources(FotoUlasan(nama_file='abc.jpg', varian='thumb,medium'))
+        assert sources['original'] == '/static/uploads/abc.jpg'
+        assert sources['src'] == '/static/uploads/abc_medium.jpg'
+        assert sources['webp'] == '/static/uploads/abc_thumb.webp 320w, /static/uploads/abc_medium.webp 960w'
+        assert sources['srcset'].startswith('/static/uploads/abc_thumb.jpg 320w')
+
+        legacy = foto_sources(FotoUlasan(nama_file='lama.jpg'))
+        assert legacy['src'] == legacy['original'] == '/static/uploads/lama.jpg'
+        assert legacy['srcset'] == ''
+
+
+def test_review_upload_creates_derivatives_and_srcset(app, authenticated_client, wisata_fixture, tmp_path):
+    """Menguji bahwa unggahan foto ulasan membuat turunan dan halaman detail memakai srcset.
+
+    Args:
+        app: Instance aplikasi Flask
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    wisata_item = wisata_fixture[0]
+    response = authenticated_client.post(f'/wisata/detail/{wisata_item.id}', data={
+        'rating': 5,
+        'komentar': 'Airnya jernih sekali!',
+        'foto': [(io.BytesIO(_image_bytes()), 'curug.jpg')],
+    }, content_type='multipart/form-data', follow_redirects=True)
+
+    assert response.status_code == 200
+    foto = FotoUlasan.query.one()
+    assert foto.varian == 'thumb,medium'
+    assert os.path.exists(tmp_path / variant_name(foto.nama_file, 'thumb', 'webp'))
+    assert b'type="image/webp"' in response.data
+    assert variant_name(foto.nama_file, 'thumb', 'webp').encode() in response.data
+
+
+def test_backfill_derivatives_command(app, wisata_fixture, test_user, tmp_path):
+    """Menguji perintah `flask uploads backfill-derivatives` untuk foto lama.
+
+    Args:
+        app: Instance aplikasi Flask
+        wisata_fixture: Fixture wisata untuk pengujian
+        test_user: Fixture pengguna untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    user, _ = test_user
+    _write_image(tmp_path, 'lama.jpg')
+    with open(tmp_path / 'rusak.jpg', 'wb') as f:
+        f.write(b'bukan gambar')
+    review = Review(rating=4, komentar='Bagus', user_id=user.id, wisata_id=wisata_fixture[0].id)
+    db.session.add(review)
+    db.session.add_all([FotoUlasan(nama_file='lama.jpg', review=review),
+                        FotoUlasan(nama_file='rusak.jpg', review=review)])
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['uploads', 'backfill-derivatives', '--batch-size', '1'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Diproses: 1, gagal: 1' in result.output
+    assert FotoUlasan.query.filter_by(nama_file='lama.jpg').one().varian == 'thumb,medium'
+    assert FotoUlasan.query.filter_by(nama_file='rusak.jpg').one().varian is None
+
+
+
+def test_backfill_derivatives_renders_shared_file_once(app, wisata_fixture, test_user, tmp_path, monkeypatch):
+    """Menguji bahwa file yang dirujuk beberapa foto hanya dirender sekali secara atomik.
+
+    Args:
+        app: Instance aplikasi Flask
+        wisata_fixture: Fixture wisata untuk pengujian
+        test_user: Fixture pengguna untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+        monkeypatch: Fixture untuk mengganti fungsi
+    """
+    from app.services import image_pipeline
+
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    user, _ = test_user
+    _write_image(tmp_path, 'bersama.jpg')
+    reviews = [Review(rating=4, komentar='Bagus', user_id=user.id, wisata_id=wisata.id) for wisata in wisata_fixture[:2]]
+    db.session.add_all(reviews)
+    db.session.add_all([FotoUlasan(nama_file='bersama.jpg', review=review) for review in reviews])
+    db.session.commit()
+    calls = []
+    original = image_pipeline.generate_derivatives
+    monkeypatch.setattr(image_pipeline, 'generate_derivatives', lambda name: calls.append(name) or original(name))
+
+    result = app.test_cli_runner().invoke(args=['uploads', 'backfill-derivatives'])
+
+    assert result.exit_code == 0, result.output
+    assert calls == ['bersama.jpg']
+    assert 'Diproses: 1, gagal: 0' in result.output
+    assert [foto.varian for foto in FotoUlasan.query.all()] == ['thumb,medium', 'thumb,medium']
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.upload-')]
+    assert oct(os.stat(tmp_path / variant_name('bersama.jpg', 'thumb', 'webp')).st_mode & 0o777) == oct(0o644)
+
+def _phone_photo(size=(4000, 3000)):
+    """Membuat foto JPEG besar dengan EXIF orientasi dan lokasi GPS seperti dari kamera ponsel."""
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x8825] = {1: 'S', 2: (6.0, 10.0, 0.0), 3: 'E', 4: (106.0, 49.0, 0.0)}
+    buffer = io.BytesIO()
+    Image.linear_gradient('L').resize(size).convert('RGB').save(buffer, 'JPEG', quality=95, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def test_normalize_upload_caps_size_and_strips_metadata(tmp_path):
+    """Menguji bahwa foto besar diputar, diperkecil, dibuang metadatanya, dan disimpan progresif.
+
+    Args:
+        tmp_path: Path sementara untuk pengujian
+    """
+    path = tmp_path / 'foto.jpg'
+    path.write_bytes(_phone_photo())
+
+    stats = normalize_upload(str(path), 'image/jpeg', max_dimension=2000, jpeg_quality=80)
+
+    assert stats['diubah']
+    assert stats['ukuran_asli'] > stats['ukuran_file'] == path.stat().st_size
+    assert stats['durasi'] > 0
+    with Image.open(path) as image:
+        # Orientasi 6 (diputar 90°) sudah diterapkan ke piksel
+        assert image.size == (1500, 2000)
+        assert not image.getexif()
+        assert image.info.get('progressive')
+    assert os.listdir(tmp_path) == ['foto.jpg']
+
+
+def test_normalize_upload_keeps_clean_files(tmp_path):
+    """Menguji bahwa file kecil tanpa metadata dan GIF animasi tidak diubah.
+
+    Args:
+        tmp_path: Path sementara untuk pengujian
+    """
+    png = tmp_path / 'ikon.png'
+    Image.new('RGBA', (64, 64), (10, 20, 30, 128)).save(png, optimize=True)
+    frames = [Image.new('RGB', (32, 32), color) for color in ((255, 0, 0), (0, 0, 255))]
+    gif = tmp_path / 'animasi.gif'
+    frames[0].save(gif, save_all=True, append_images=frames[1:], comment=b'halo')
+    before = {path: path.read_bytes() for path in (png, gif)}
+
+    assert not normalize_upload(str(png), 'image/png')['diubah']
+    assert not normalize_upload(str(gif), 'image/gif')['diubah']
+    assert {path: path.read_bytes() for path in (png, gif)} == before
+
+
+def test_review_upload_records_normalization(app, authenticated_client, wisata_fixture, tmp_path):
+    """Menguji normalisasi foto ulasan end-to-end beserta statistiknya.
+
+    Foto yang diunggah ulang memakai file yang sudah ada tanpa dinormalkan lagi.
+
+    Args:
+        app: Instance aplikasi Flask
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    photo = _phone_photo()
+    for _ in range(2):
+        response = authenticated_client.post(f'/wisata/detail/{wisata_fixture[0].id}', data={
+            'rating': 5,
+            'komentar': 'Pemandangan indah',
+            'foto': [(io.BytesIO(photo), 'IMG_0001.JPG')],
+        }, content_type='multipart/form-data', follow_redirects=True)
+        assert response.status_code == 200
+
+    first, second = FotoUlasan.query.order_by(FotoUlasan.id).all()
+    assert first.nama_file == second.nama_file
+    assert first.ukuran_asli == len(photo)
+    assert first.ukuran_file == os.path.getsize(tmp_path / first.nama_file) < len(photo) // 5
+    assert first.durasi_normalisasi_ms is not None
+    assert second.ukuran_asli is None
+    with Image.open(tmp_path / first.nama_file) as image:
+        assert max(image.size) == app.config['UPLOAD_MAX_DIMENSION']
+        assert not image.getexif()
+        assert (first.lebar, first.tinggi) == image.size
+
+    # Unggahan ulang memakai dimensi dan placeholder dari foto sebelumnya
+    assert (second.lebar, second.tinggi, second.placeholder) == (first.lebar, first.tinggi, first.placeholder)
+    assert first.placeholder.startswith('data:image/jpeg;base64,')
+    assert len(first.placeholder) < 2048
+    assert f'width="{first.lebar}" height="{first.tinggi}"'.encode() in response.data
+    assert f"url('{first.placeholder}')".encode() in response.data
+
+
+def test_undecodable_image_is_rejected(app, authenticated_client, wisata_fixture, tmp_path):
+    """Menguji bahwa file dengan header JPEG tetapi isi rusak ditolak tanpa tersimpan.
+
+    Args:
+        app: Instance aplikasi Flask
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    broken = _image_bytes()[:600] + os.urandom(4096)
+    response = authenticated_client.post(f'/wisata/detail/{wisata_fixture[0].id}', data={
+        'rating': 5,
+        'komentar': 'Rusak',
+        'foto': [(io.BytesIO(broken), 'rusak.jpg')],
+    }, content_type='multipart/form-data', follow_redirects=True)
+
+    assert b'Gambar tidak dapat diproses' in response.data
+    assert FotoUlasan.query.count() == 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_oversized_resolution_is_rejected_before_decoding(app, authenticated_client, wisata_fixture, tmp_path):
+    """Menguji bahwa foto di atas `UPLOAD_MAX_PIXELS` ditolak dari header-nya, baik dinormalkan maupun tidak.
+
+    Args:
+        app: Instance aplikasi Flask
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config.update(UPLOAD_FOLDER=str(tmp_path), UPLOAD_MAX_PIXELS=1_000_000)
+    for normalize in (True, False):
+        app.config['UPLOAD_NORMALIZE'] = normalize
+        response = authenticated_client.post(f'/wisata/detail/{wisata_fixture[0].id}', data={
+            'rating': 5,
+            'komentar': 'Panorama',
+            'foto': [(io.BytesIO(_image_bytes((1600, 1200), 'PNG')), 'panorama.png')],
+        }, content_type='multipart/form-data', follow_redirects=True)
+
+        assert b'Resolusi foto terlalu besar (1600x1200 piksel); maksimal 1 megapiksel.' in response.data
+    assert FotoUlasan.query.count() == 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_concurrent_decodes_are_bounded(app, tmp_path, monkeypatch):
+    """Menguji bahwa jumlah foto yang dinormalkan bersamaan dibatasi `UPLOAD_DECODE_CONCURRENCY`.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk pengujian
+        monkeypatch: Fixture pytest untuk memperlambat normalisasi
+    """
+    app.config.update(UPLOAD_FOLDER=str(tmp_path), UPLOAD_DECODE_CONCURRENCY=1, UPLOAD_SAVE_WORKERS=4)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow_normalize(path, mime, **settings):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return normalize_upload(path, mime, **settings)
+
+    monkeypatch.setattr(file_handler, 'normalize_upload', slow_normalize)
+    pictures = [FileStorage(stream=io.BytesIO(_image_bytes((100 + i, 100))), filename=f'{i}.jpg') for i in range(4)]
+    assert len(set(file_handler.save_pictures(pictures))) == 4
+    assert peak[0] == 1
+
+
+def test_backfill_placeholders_command(app, wisata_fixture, test_user, tmp_path):
+    """Menguji perintah `flask uploads backfill-placeholders` untuk foto lama.
+
+    Setiap file cukup dibaca sekali untuk semua foto yang merujuknya, dan
+    dimensinya memperhitungkan orientasi EXIF.
+
+    Args:
+        app: Instance aplikasi Flask
+        wisata_fixture: Fixture wisata untuk pengujian
+        test_user: Fixture pengguna untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    (tmp_path / 'lama.jpg').write_bytes(_phone_photo((400, 300)))
+    review = Review(rating=4, komentar='Bagus', user_id=test_user[0].id, wisata_id=wisata_fixture[0].id)
+    db.session.add_all([review, FotoUlasan(nama_file='lama.jpg', review=review),
+                        FotoUlasan(nama_file='lama.jpg', review=review),
+                        FotoUlasan(nama_file='hilang.jpg', review=review)])
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['uploads', 'backfill-placeholders', '--batch-size', '1'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Diproses: 1, gagal: 1' in result.output
+    rows = FotoUlasan.query.filter_by(nama_file='lama.jpg').all()
+    assert {(foto.lebar, foto.tinggi) for foto in rows} == {(300, 400)}
+    assert all(foto.placeholder.startswith('data:image/jpeg;base64,') for foto in rows)
+    assert FotoUlasan.query.filter_by(nama_file='hilang.jpg').one().placeholder is None
@@ -0,0 +1,267 @@
+import io
+import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import pytest
+from PIL import Image
+from app import db
+from app.models.foto_ulasan import FotoUlasan
+from app.models.image_job import ImageJob
+from app.models.review import Review
+from app.services.image_worker import ImageProcessor, get_image_processor
+
+
+def _image_bytes(size=(1600, 1200)):
+    """Membuat gambar JPEG uji dalam memori."""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (30, 140, 90)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def pool_app(app, tmp_path):
+    """Fixture untuk mengaktifkan pemrosesan foto lewat process pool.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk folder unggahan
+
+    Yields:
+        Flask.app: Aplikasi dengan `IMAGE_PROCESSING_MODE` bernilai 'pool'.
+    """
+    app.config.update(IMAGE_PROCESSING_MODE='pool', UPLOAD_FOLDER=str(tmp_path), IMAGE_WORKERS=1)
+    yield app
+    processor = app.extensions.pop('image_processor', None)
+    if processor is not None:
+        processor.shutdown()
+
+
+def _add_foto(user, wisata, nama_file):
+    """Menyimpan satu foto ulasan beserta job-nya."""
+    review = Review(rating=4, komentar='Bagus', user_id=user.id, wisata_id=wisata.id)
+    foto = FotoUlasan(nama_file=nama_file, review=review)
+    job = ImageJob(foto=foto)
+    db.session.add_all([review, foto, job])
+    db.session.commit()
+    return job
+
+
+def test_review_upload_is_processed_off_request(pool_app, authenticated_client, wisata_fixture, tmp_path):
+    """Menguji bahwa request ulasan selesai sebelum turunan dibuat oleh process pool.
+
+    Args:
+        pool_app: Aplikasi dengan mode 'pool'
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    wisata_item = wisata_fixture[0]
+    with patch.object(ImageProcessor, 'submit', return_value=False):
+        response = authenticated_client.post(f'/wisata/detail/{wisata_item.id}', data={
+            'rating': 5,
+            'komentar': 'Pemandangannya indah!',
+            'foto': [(io.BytesIO(_image_bytes()), 'bukit.jpg')],
+        }, content_type='multipart/form-data', follow_redirects=True)
+
+    assert response.status_code == 200
+    foto = FotoUlasan.query.one()
+    assert foto.varian is None
+    assert foto.job.status == ImageJob.PENDING
+    # Selama turunan belum ada, galeri menampilkan file asli
+    assert f'src="/static/uploads/{foto.nama_file}"'.encode() in response.data
+
+    processor = get_image_processor()
+    assert processor.submit(foto.job.id, foto.nama_file)
+    assert processor.join(60)
+
+    db.session.expire_all()
+    foto = FotoUlasan.query.one()
+    assert foto.varian == 'thumb,medium'
+    assert foto.job.status == ImageJob.DONE
+    assert os.path.exists(tmp_path / f"{os.path.splitext(foto.nama_file)[0]}_thumb.webp")
+    assert processor.metrics()['completed'] == 1
+
+
+def test_unreadable_image_fails_without_retry(pool_app, test_user, wisata_fixture, tmp_path):
+    """Menguji bahwa file yang bukan gambar langsung gagal tanpa dicoba ulang.
+
+    Args:
+        pool_app: Aplikasi dengan mode 'pool'
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    (tmp_path / 'rusak.jpg').write_bytes(b'bukan gambar')
+    job = _add_foto(test_user[0], wisata_fixture[0], 'rusak.jpg')
+
+    processor = get_image_processor()
+    assert processor.submit(job.id, 'rusak.jpg')
+    assert processor.join(60)
+
+    db.session.expire_all()
+    job = db.session.get(ImageJob, job.id)
+    assert job.status == ImageJob.FAILED
+    assert job.attempts == 1
+    assert 'tidak dapat diproses' in job.last_error
+    assert processor.metrics()['retried'] == 0
+
+
+def test_transient_failure_is_retried(pool_app, test_user, wisata_fixture):
+    """Menguji bahwa kegagalan sementara dicoba ulang hingga batas percobaan.
+
+    Args:
+        pool_app: Aplikasi dengan mode 'pool'
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+    """
+    job = _add_foto(test_user[0], wisata_fixture[0], 'foto.jpg')
+    processor = ImageProcessor(pool_app, max_pending=1, max_attempts=2)
+    processor._pending = 1
+    resubmitted = []
+
+    def fake_submit(job_id, nama_file, reserved=False):
+        resubmitted.append(reserved)
+        return True
+
+    failed = Future()
+    failed.set_exception(OSError('disk penuh'))
+    with patch.object(processor, 'submit', side_effect=fake_submit):
+        processor._finish(job.id, 'foto.jpg', failed)
+    # Percobaan ulang memakai slot yang sama sehingga job tetap dihitung berjalan
+    assert resubmitted == [True]
+    assert processor.metrics()['pending'] == 1
+    assert db.session.get(ImageJob, job.id).status == ImageJob.PENDING
+
+    processor._finish(job.id, 'foto.jpg', failed)
+    db.session.expire_all()
+    job = db.session.get(ImageJob, job.id)
+    assert job.status == ImageJob.FAILED
+    assert job.attempts == 2
+    metrics = processor.metrics()
+    assert (metrics['pending'], metrics['failed'], metrics['retried']) == (0, 1, 1)
+
+
+class FakeExecutor:
+    """Pengganti process pool yang hanya mencatat job yang diserahkan."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, storage, nama_file, settings):
+        self.submitted.append(nama_file)
+        return Future()
+
+
+def test_free_slot_redrives_stale_pending_jobs(pool_app, test_user, wisata_fixture):
+    """Menguji bahwa slot yang kosong diisi job 'pending' lama yang tidak pernah masuk pool.
+
+    Args:
+        pool_app: Aplikasi dengan mode 'pool'
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+    """
+    done = _add_foto(test_user[0], wisata_fixture[0], 'selesai.jpg')
+    stale = _add_foto(test_user[0], wisata_fixture[0], 'tertinggal.jpg')
+    _add_foto(test_user[0], wisata_fixture[0], 'baru.jpg')
+    stale.tanggal_dibuat = datetime.now(timezone.utc) - timedelta(minutes=10)
+    db.session.commit()
+
+    processor = ImageProcessor(pool_app, max_pending=2, redrive_after=60)
+    processor._executor = executor = FakeExecutor()
+    assert processor.submit(done.id, 'selesai.jpg')
+    assert not processor.submit(done.id, 'selesai.jpg')
+
+    finished = Future()
+    finished.set_result((['thumb'], 0.01))
+    processor._finish(done.id, 'selesai.jpg', finished, executor)
+
+    # Job baru mungkin masih dipegang proses web lain, sehingga hanya job lama yang diambil
+    assert executor.submitted == ['selesai.jpg', 'tertinggal.jpg']
+    assert processor.metrics()['pending'] == 1
+    assert processor.redrive() == 0
+
+
+def test_redrive_claims_stale_job_with_lease(pool_app, test_user, wisata_fixture):
+    """Menguji bahwa job tertinggal hanya diklaim satu proses web sampai lease-nya lewat.
+
+    Args:
+        pool_app: Aplikasi dengan mode 'pool'
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+    """
+    stale = _add_foto(test_user[0], wisata_fixture[0], 'tertinggal.jpg')
+    stale.tanggal_dibuat = datetime.now(timezone.utc) - timedelta(minutes=10)
+    db.session.commit()
+
+    first = ImageProcessor(pool_app, max_pending=2, redrive_after=60)
+    second = ImageProcessor(pool_app, max_pending=2, redrive_after=60)
+    first._executor = first_executor = FakeExecutor()
+    second._executor = second_executor = FakeExecutor()
+
+    assert first.redrive() == 1
+    assert second.redrive() == 0
+    assert first_executor.submitted == ['tertinggal.jpg']
+    assert second_executor.submitted == []
+
+    # Proses pertama berhenti; setelah lease lewat job boleh diklaim proses lain
+    db.session.expire_all()
+    stale = db.session.get(ImageJob, stale.id)
+    assert stale.lease_until is not None
+    stale.lease_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.session.commit()
+    assert second.redrive() == 1
+    assert second_executor.submitted == ['tertinggal.jpg']
+
+def test_broken_pool_only_resets_its_own_executor(pool_app, test_user, wisata_fixture):
+    """Menguji bahwa callback dari pool yang rusak tidak membuang pool pengganti.
+
+    Args:
+        pool_app: Aplikasi dengan mode 'pool'
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+    """
+    job = _add_foto(test_user[0], wisata_fixture[0], 'foto.jpg')
+    processor = ImageProcessor(pool_app, max_attempts=1)
+    broken, replacement = FakeExecutor(), FakeExecutor()
+    failed = Future()
+    failed.set_exception(BrokenProcessPool('worker mati'))
+
+    processor._executor = replacement
+    processor._pending = 1
+    processor._finish(job.id, 'foto.jpg', failed, broken)
+    assert processor._executor is replacement
+
+    processor._pending = 1
+    processor._finish(job.id, 'foto.jpg', failed, replacement)
+    assert processor._executor is None
+
+
+def test_process_images_command(pool_app, test_user, wisata_fixture, tmp_path):
+    """Menguji perintah `flask uploads process-images` untuk job yang tertunda dan gagal.
+
+    Args:
+        pool_app: Aplikasi dengan mode 'pool'
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    (tmp_path / 'tertunda.jpg').write_bytes(_image_bytes())
+    (tmp_path / 'gagal.jpg').write_bytes(_image_bytes((400, 300)))
+    _add_foto(test_user[0], wisata_fixture[0], 'tertunda.jpg')
+    failed = _add_foto(test_user[0], wisata_fixture[0], 'gagal.jpg')
+    failed.status = ImageJob.FAILED
+    failed.attempts = 3
+    db.session.commit()
+
+    runner = pool_app.test_cli_runner()
+    result = runner.invoke(args=['uploads', 'process-images', '--timeout', '60'])
+    assert result.exit_code == 0, result.output
+    assert 'Selesai: 1, gagal: 0' in result.output
+
+    result = runner.invoke(args=['uploads', 'process-images', '--retry-failed', '--timeout', '60'])
+    assert result.exit_code == 0, result.output
+    db.session.expire_all()
+    assert ImageJob.query.filter_by(status=ImageJob.DONE).count() == 2
+    assert FotoUlasan.query.filter_by(nama_file='gagal.jpg').one().varian == 'thumb,medium'
@@ -0,0 +1,143 @@
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from app.services.singleflight import SingleFlight
+from app.services.chatbot_handler import get_bot_response
+
+
+def _run_concurrently(count, target):
+    """Menjalankan `target` di beberapa thread sekaligus dan mengumpulkan hasilnya.
+
+    Args:
+        count (int): Jumlah thread.
+        target (callable): Fungsi tanpa argumen yang dijalankan setiap thread.
+
+    Returns:
+        list: Hasil dari setiap thread.
+    """
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_calls_share_single_execution():
+    """Menguji bahwa panggilan bersamaan dengan kunci sama hanya menjalankan fungsi sekali."""
+    flight = SingleFlight()
+    calls = []
+
+    def slow_fn():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'jawaban'
+
+    results = _run_concurrently(5, lambda: flight.do('kunci', slow_fn))
+
+    assert results == ['jawaban'] * 5
+    assert len(calls) == 1
+    assert flight.stats()['shared'] == 4
+
+
+def test_errors_are_propagated_to_waiting_callers():
+    """Menguji bahwa exception dari leader diteruskan ke semua pemanggil."""
+    flight = SingleFlight()
+
+    def failing_fn():
+        time.sleep(0.1)
+        raise RuntimeError('gagal')
+
+    def call():
+        try:
+            flight.do('kunci', failing_fn)
+        except RuntimeError as e:
+            return str(e)
+
+    assert _run_concurrently(3, call) == ['gagal'] * 3
+    assert flight.stats()['in_progress'] == 0
+
+
+def test_cross_process_result_file_is_reused(tmp_path, app):
+    """Menguji bahwa hasil yang ditulis worker lain dipakai ulang selama masih segar.
+
+    Args:
+        tmp_path: Path sementara untuk pengujian
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        first = SingleFlight(lock_dir=str(tmp_path), result_ttl=5)
+        second = SingleFlight(lock_dir=str(tmp_path), result_ttl=5)
+
+        assert first.do('kunci', lambda: 'dari worker pertama') == 'dari worker pertama'
+        assert second.do('kunci', lambda: pytest.fail('tidak boleh dipanggil')) == 'dari worker pertama'
+
+
+
+def test_cross_process_files_are_bounded_by_stripes(tmp_path, app):
+    """Menguji bahwa banyak pertanyaan berbeda tidak menambah file di direktori lock tanpa batas.
+
+    Args:
+        tmp_path: Path sementara untuk pengujian
+        app: Instance aplikasi Flask
+    """
+    with app.app_context():
+        first = SingleFlight(lock_dir=str(tmp_path), result_ttl=5, stripes=4)
+        second = SingleFlight(lock_dir=str(tmp_path), result_ttl=5, stripes=4)
+        for i in range(50):
+            assert first.do(f'pertanyaan {i}', lambda i=i: f'jawaban {i}') == f'jawaban {i}'
+
+        assert len(list(tmp_path.iterdir())) <= 8
+        # Hasil kunci lain di stripe yang sama tidak boleh dipakai
+        assert second.do('pertanyaan baru', lambda: 'jawaban baru') == 'jawaban baru'
+
+
+def test_waiting_caller_runs_fn_after_wait_timeout(app):
+    """Menguji bahwa pemanggil yang menunggu leader macet menjalankan fungsi sendiri setelah batas waktu.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    flight = SingleFlight(wait_timeout=0.2)
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do('kunci', lambda: release.wait(5) and 'leader'))
+    leader.start()
+    while flight.stats()['in_progress'] == 0:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    with app.app_context():
+        assert flight.do('kunci', lambda: 'sendiri') == 'sendiri'
+    assert time.monotonic() - started < 2
+
+    release.set()
+    leader.join()
+
+@patch('app.services.chatbot_handler.call_gemini')
+def test_get_bot_response_coalesces_identical_questions(mock_call_gemini, app):
+    """Menguji bahwa pertanyaan identik yang datang bersamaan hanya memanggil Gemini sekali.
+
+    Args:
+        mock_call_gemini: Mock untuk fungsi call_gemini
+        app: Instance aplikasi Flask
+    """
+    def slow_gemini(prompt):
+        time.sleep(0.2)
+        return 'Jawaban promo.'
+
+    mock_call_gemini.side_effect = slow_gemini
+
+    def ask():
+        with app.app_context():
+            return get_bot_response('promo lebaran ada apa?')
+
+    assert _run_concurrently(4, ask) == ['Jawaban promo.'] * 4
+    assert mock_call_gemini.call_count == 1
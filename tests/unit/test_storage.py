@@ -0,0 +1,205 @@
+import io
+import pickle
+from datetime import datetime, timedelta, timezone
+import pytest
+from PIL import Image
+from app import db
+from app.models.foto_ulasan import FotoUlasan
+from app.models.review import Review
+from app.services.storage import LocalStorage, S3Storage, create_storage, get_storage
+from app.services.upload_store import collect_garbage, store_stream
+from tests.simulation.fake_s3 import FakeClientError, FakeS3Client
+
+
+def _jpeg_bytes(size=(1200, 900)):
+    """Membuat gambar JPEG uji dalam memori."""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (90, 60, 200)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def s3_app(app):
+    """Fixture aplikasi yang menyimpan unggahan ke S3 tiruan.
+
+    Args:
+        app: Instance aplikasi Flask
+
+    Yields:
+        tuple[Flask, FakeS3Client]: Aplikasi dan client S3 tiruannya.
+    """
+    client = FakeS3Client()
+    app.config.update(UPLOAD_STORAGE='s3', S3_BUCKET='lelana', S3_PUBLIC_URL='https://cdn.lelana.test/')
+    storage = create_storage(app.config)
+    storage._client = client
+    app.extensions['upload_storage'] = storage
+    yield app, client
+
+
+def test_create_storage_selects_backend(app, tmp_path):
+    """Menguji pemilihan backend dari konfigurasi.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    assert isinstance(get_storage(), LocalStorage)
+    assert get_storage().local_folder == str(tmp_path)
+
+    s3 = create_storage(dict(app.config, UPLOAD_STORAGE='s3', S3_BUCKET='lelana'))
+    assert isinstance(s3, S3Storage)
+    assert s3.prefix == 'uploads'
+    assert s3.cache_control == 'public, max-age=31536000, immutable'
+
+    with pytest.raises(ValueError):
+        create_storage(dict(app.config, UPLOAD_STORAGE='ftp'))
+
+
+def test_s3_store_deduplicates_and_sets_metadata(s3_app):
+    """Menguji unggahan ke S3 dengan metadata dan tanpa unggahan ulang untuk konten yang sama.
+
+    Args:
+        s3_app: Aplikasi dengan penyimpanan S3 tiruan
+    """
+    app, client = s3_app
+    data = _jpeg_bytes()
+
+    name, token = store_stream(io.BytesIO(data), '.jpg')
+    # Objek S3 tidak pernah dihapus saat rollback sehingga tidak ada penanda versi
+    assert token is None
+    assert store_stream(io.BytesIO(data), '.jpg') == (name, None)
+
+    obj = client.objects[('lelana', f'uploads/{name}')]
+    assert obj['Body'] == data
+    assert obj['ContentType'] == 'image/jpeg'
+    assert 'immutable' in obj['CacheControl']
+    assert client.calls.count('put_object') == 1
+
+
+def test_s3_reuse_refreshes_last_modified(s3_app):
+    """Menguji bahwa konten yang dipakai ulang mendapat LastModified baru agar tidak dihapus GC.
+
+    Args:
+        s3_app: Aplikasi dengan penyimpanan S3 tiruan
+    """
+    app, client = s3_app
+    data = _jpeg_bytes()
+    name, _ = store_stream(io.BytesIO(data), '.jpg')
+    obj = client.objects[('lelana', f'uploads/{name}')]
+    obj['LastModified'] = datetime.now(timezone.utc) - timedelta(hours=2)
+
+    assert store_stream(io.BytesIO(data), '.jpg') == (name, None)
+    obj = client.objects[('lelana', f'uploads/{name}')]
+    assert datetime.now(timezone.utc) - obj['LastModified'] < timedelta(minutes=1)
+    assert (obj['Body'], obj['ContentType']) == (data, 'image/jpeg')
+    assert 'immutable' in obj['CacheControl']
+    assert collect_garbage(grace_seconds=3600)['orphans'] == []
+    assert not get_storage().touch('ab/cd/tidak-ada.jpg')
+
+
+def test_s3_multipart_upload_and_abort(tmp_path):
+    """Menguji multipart upload untuk file besar dan pembatalan saat bagian gagal.
+
+    Args:
+        tmp_path: Path sementara untuk pengujian
+    """
+    source = tmp_path / 'besar.bin'
+    source.write_bytes(bytes(range(256)) * 40)
+
+    client = FakeS3Client()
+    storage = S3Storage('lelana', multipart_threshold=4096, part_size=4096, client=client)
+    storage.put_file('ab/cd/besar.bin', str(source))
+    assert client.calls.count('upload_part') == 3
+    assert client.objects[('lelana', 'ab/cd/besar.bin')]['Body'] == source.read_bytes()
+
+    failing = FakeS3Client(fail_part=2)
+    storage = S3Storage('lelana', multipart_threshold=4096, part_size=4096, client=failing)
+    with pytest.raises(FakeClientError):
+        storage.put_file('ab/cd/besar.bin', str(source))
+    assert 'abort_multipart_upload' in failing.calls
+    assert failing.open_uploads == 0
+    assert not failing.objects
+
+
+def test_s3_urls_and_pickling():
+    """Menguji URL publik, presigned URL, dan pickling tanpa client.
+
+    Presigned URL dipakai jika bucket tidak memiliki URL publik.
+    """
+    client = FakeS3Client()
+    public = S3Storage('lelana', prefix='uploads', public_url='https://cdn.lelana.test/', client=client)
+    assert public.url('ab/cd/x.jpg') == 'https://cdn.lelana.test/uploads/ab/cd/x.jpg'
+
+    private = S3Storage('lelana', presign_expires=600, client=client)
+    assert private.url('ab/cd/x.jpg') == 'https://s3.test/lelana/ab/cd/x.jpg?X-Amz-Expires=600&X-Amz-Signature=fake'
+    # URL yang sama dipakai ulang agar browser dapat memakai cache-nya
+    private.url('ab/cd/x.jpg')
+    assert client.calls.count('generate_presigned_url') == 1
+    private._urls['ab/cd/x.jpg'] = ('kedaluwarsa', 0)
+    assert private.url('ab/cd/x.jpg') != 'kedaluwarsa'
+
+    restored = pickle.loads(pickle.dumps(private))
+    assert restored._client is None
+    assert restored.bucket == 'lelana'
+    assert not restored._urls
+
+
+def test_review_upload_to_s3_renders_backend_urls(s3_app, authenticated_client, wisata_fixture):
+    """Menguji alur unggah ulasan end-to-end dengan penyimpanan S3.
+
+    File asli dan turunannya harus tersimpan di bucket, dan halaman detail
+    memakai URL dari backend, bukan `/static/uploads/`.
+
+    Args:
+        s3_app: Aplikasi dengan penyimpanan S3 tiruan
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+    """
+    app, client = s3_app
+    wisata_item = wisata_fixture[0]
+    response = authenticated_client.post(f'/wisata/detail/{wisata_item.id}', data={
+        'rating': 4,
+        'komentar': 'Sejuk dan asri',
+        'foto': [(io.BytesIO(_jpeg_bytes()), 'asri.jpg')],
+    }, content_type='multipart/form-data', follow_redirects=True)
+
+    assert response.status_code == 200
+    foto = FotoUlasan.query.one()
+    assert foto.varian == 'thumb,medium'
+    stem = foto.nama_file.rsplit('.', 1)[0]
+    keys = {key for _, key in client.objects}
+    assert keys == {f'uploads/{foto.nama_file}'} | {
+        f'uploads/{stem}_{v}.{ext}' for v in ('thumb', 'medium') for ext in ('webp', 'jpg')}
+    assert f'https://cdn.lelana.test/uploads/{stem}_thumb.webp'.encode() in response.data
+    assert b'/static/uploads/' not in response.data
+
+
+def test_s3_garbage_collection_quarantines_orphans(s3_app, test_user, wisata_fixture):
+    """Menguji GC pada bucket S3: daftar objek dibaca per halaman dan objek yatim dikarantina.
+
+    Args:
+        s3_app: Aplikasi dengan penyimpanan S3 tiruan
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+    """
+    app, client = s3_app
+    storage = get_storage()
+    storage.quarantine_prefix, storage.has_quarantine = 'karantina', True
+    kept, _ = store_stream(io.BytesIO(_jpeg_bytes()), '.jpg')
+    orphan, _ = store_stream(io.BytesIO(_jpeg_bytes((64, 64))), '.jpg')
+    review = Review(rating=5, komentar='Indah', user_id=test_user[0].id, wisata_id=wisata_fixture[0].id)
+    db.session.add_all([review, FotoUlasan(nama_file=kept, review=review)])
+    db.session.commit()
+    past = datetime.now(timezone.utc) - timedelta(hours=2)
+    for obj in client.objects.values():
+        obj['LastModified'] = past
+
+    result = app.test_cli_runner().invoke(args=['uploads', 'gc', '--dry-run'])
+    assert result.exit_code == 0
+    assert f'{orphan}\nDiperiksa: 2, akan dikarantina: 1' in result.output
+    assert len(client.objects) == 2
+
+    report = collect_garbage(grace_seconds=3600)
+    assert report['orphans'] == [orphan]
+    assert set(client.objects) == {('lelana', f'uploads/{kept}'), ('lelana', f'karantina/{orphan}')}
@@ -0,0 +1,284 @@
+import base64
+import hashlib
+import io
+import os
+import time
+import pytest
+from flask import Response
+from werkzeug.datastructures import FileStorage
+from app import db
+from app.models.foto_ulasan import FotoUlasan
+from app.models.review import Review
+from app.services.file_handler import save_pictures
+from app.models.image_job import ImageJob
+from app.services import upload_store
+from app.services.upload_store import (_walk_uploads, collect_garbage, migrate_to_shards, reference_counts,
+                                       shard_path, upload_cache_headers, upload_url)
+
+PNG_BYTES = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+
+def _picture(filename):
+    """Membuat objek unggahan PNG 1x1 dengan nama file tertentu."""
+    return FileStorage(stream=io.BytesIO(PNG_BYTES), filename=filename, content_type='image/png')
+
+
+def _age(path, seconds):
+    """Memundurkan mtime sebuah file."""
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_identical_uploads_are_stored_once(app, tmp_path):
+    """Menguji bahwa konten yang sama mendapat satu nama file berbasis hash.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+
+    names = save_pictures([_picture('a.png'), _picture('salinan.PNG'), _picture('tanpa-ekstensi')])
+
+    digest = hashlib.sha256(PNG_BYTES).hexdigest()
+    expected = f'{digest[:2]}/{digest[2:4]}/{digest}.png'
+    assert names == [expected] * 3
+    assert list(_walk_uploads(tmp_path)) == [expected]
+    assert (tmp_path / expected).read_bytes() == PNG_BYTES
+
+
+def test_garbage_collection_respects_references_and_grace(app, test_user, wisata_fixture, tmp_path):
+    """Menguji bahwa GC hanya menghapus file tanpa referensi yang melewati masa tenggang.
+
+    Args:
+        app: Instance aplikasi Flask
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    referenced, orphan, fresh = ('a' * 64 + '.jpg', 'b' * 64 + '.jpg', 'c' * 64 + '.png')
+    for name in (referenced, orphan, fresh, 'b' * 64 + '_thumb.webp', 'lama-uuid.jpg', '.upload-x.tmp'):
+        (tmp_path / name).write_bytes(b'x')
+        if name != fresh:
+            _age(tmp_path / name, 7200)
+
+    review = Review(rating=5, komentar='Indah', user_id=test_user[0].id, wisata_id=wisata_fixture[0].id)
+    db.session.add_all([review, FotoUlasan(nama_file=referenced, review=review),
+                        FotoUlasan(nama_file=referenced, review=review)])
+    db.session.commit()
+    assert reference_counts([referenced, orphan]) == {referenced: 2, orphan: 0}
+
+    report = collect_garbage(grace_seconds=3600, dry_run=True)
+    assert sorted(report['orphans']) == sorted(['.upload-x.tmp', orphan, 'b' * 64 + '_thumb.webp', 'lama-uuid.jpg'])
+    assert report['scanned'] == 6
+    assert report['bytes'] == 4
+    assert len(os.listdir(tmp_path)) == 6
+
+    collect_garbage(grace_seconds=3600)
+    assert sorted(os.listdir(tmp_path)) == sorted([referenced, fresh])
+
+
+def test_garbage_collection_handles_derivatives(app, test_user, wisata_fixture, tmp_path):
+    """Menguji penentuan file turunan yatim berdasarkan file aslinya.
+
+    Turunan dipertahankan selama file aslinya dirujuk (termasuk foto lama
+    berekstensi huruf besar) atau baru saja dipakai ulang oleh request yang
+    belum commit. File yang bukan gambar tidak pernah disentuh.
+
+    Args:
+        app: Instance aplikasi Flask
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    legacy, reused, stray = 'ab/cd/abcd-lama.JPG', 'cc/cc/' + 'c' * 64 + '.jpg', 'dd/dd/' + 'd' * 64
+    files = [legacy, 'ab/cd/abcd-lama_thumb.webp', reused, 'cc/cc/' + 'c' * 64 + '_medium.jpg',
+             stray + '_thumb.webp', stray + '_medium.jpg', '.gitkeep']
+    for name in files:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_bytes(b'x')
+        # File asli yang dipakai ulang baru saja disentuh oleh `store_stream`
+        if name != reused:
+            _age(tmp_path / name, 7200)
+
+    review = Review(rating=5, komentar='Indah', user_id=test_user[0].id, wisata_id=wisata_fixture[0].id)
+    db.session.add_all([review, FotoUlasan(nama_file=legacy, review=review)])
+    db.session.commit()
+
+    report = collect_garbage(grace_seconds=3600, batch_size=2)
+    assert report['scanned'] == len(files)
+    assert report['orphans'] == [stray + '_medium.jpg', stray + '_thumb.webp']
+    assert sorted(_walk_uploads(tmp_path)) == sorted(set(files) - set(report['orphans']))
+
+
+def test_garbage_collection_quarantines_and_purges(app, tmp_path):
+    """Menguji karantina file yatim dan penghapusan permanen setelah masa simpannya.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk pengujian
+    """
+    uploads, quarantine = tmp_path / 'uploads', tmp_path / 'karantina'
+    app.config.update(UPLOAD_FOLDER=str(uploads), UPLOAD_QUARANTINE=str(quarantine), UPLOAD_QUARANTINE_DAYS=7)
+    orphan = 'ee/ee/' + 'e' * 64 + '.png'
+    (uploads / 'ee/ee').mkdir(parents=True)
+    (uploads / orphan).write_bytes(b'x')
+    _age(uploads / orphan, 7200)
+
+    report = collect_garbage(grace_seconds=3600)
+    assert report['quarantine'] and report['orphans'] == [orphan]
+    assert not (uploads / orphan).exists()
+    assert (quarantine / orphan).exists()
+
+    # Berkas baru dihapus permanen setelah melewati masa simpan karantina
+    assert collect_garbage(grace_seconds=3600)['purged'] == 0
+    _age(quarantine / orphan, 8 * 86400)
+    assert collect_garbage(grace_seconds=3600)['purged'] == 1
+    assert not (quarantine / orphan).exists()
+
+
+def test_garbage_collection_is_rate_limited(app, tmp_path, monkeypatch):
+    """Menguji bahwa penghapusan dijeda sesuai batas file per detik.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk pengujian
+        monkeypatch: Fixture pytest untuk mencatat jeda
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    for char in 'abcd':
+        (tmp_path / f'{char * 64}.gif').write_bytes(b'x')
+        _age(tmp_path / f'{char * 64}.gif', 7200)
+    delays = []
+    monkeypatch.setattr(time, 'sleep', delays.append)
+
+    report = collect_garbage(grace_seconds=3600, rate=10)
+    assert len(report['orphans']) == 4
+    assert list(_walk_uploads(tmp_path)) == []
+    # Waktu tidak berjalan selama `sleep` diganti, sehingga jeda bertambah 1/rate per file
+    assert delays == pytest.approx([0.1, 0.2, 0.3, 0.4], abs=0.05)
+
+
+def test_content_addressed_uploads_are_cached_immutably(app):
+    """Menguji header cache untuk file unggahan berbasis konten.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    with app.test_request_context(f"/static/uploads/{'d' * 64}_thumb.webp"):
+        response = upload_cache_headers(Response())
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == 31536000
+
+    with app.test_request_context('/static/uploads/lama-uuid.jpg'):
+        assert not upload_cache_headers(Response()).cache_control.immutable
+
+
+def test_reposted_photo_reuses_file_and_derivatives(app, authenticated_client, wisata_fixture, tmp_path):
+    """Menguji bahwa foto yang diunggah ulang memakai file dan turunan yang sudah ada.
+
+    Args:
+        app: Instance aplikasi Flask
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    for wisata_item in wisata_fixture[:2]:
+        response = authenticated_client.post(f'/wisata/detail/{wisata_item.id}', data={
+            'rating': 5,
+            'komentar': 'Foto yang sama',
+            'foto': [(io.BytesIO(PNG_BYTES), 'foto.png')],
+        }, content_type='multipart/form-data')
+        assert response.status_code == 302
+
+    fotos = FotoUlasan.query.all()
+    assert len(fotos) == 2
+    assert fotos[0].nama_file == fotos[1].nama_file
+    assert fotos[0].varian == fotos[1].varian == 'thumb'
+    # Satu file asli ditambah turunan WebP dan JPEG
+    assert len(list(_walk_uploads(tmp_path))) == 3
+
+
+def test_shard_path_uses_two_hex_levels(app):
+    """Menguji pembentukan path bertingkat dan URL file unggahan.
+
+    Args:
+        app: Instance aplikasi Flask
+    """
+    assert shard_path('abcdef.jpg') == 'ab/cd/abcdef.jpg'
+    # Nama yang tidak diawali hex disebar berdasarkan hash namanya
+    assert shard_path('Foto Lama.jpg').endswith('/Foto Lama.jpg')
+    assert len(shard_path('Foto Lama.jpg').split('/')) == 3
+    with app.test_request_context():
+        assert upload_url('ab/cd/abcdef.jpg') == '/static/uploads/ab/cd/abcdef.jpg'
+
+
+def test_migrate_to_shards_moves_files_and_rows(app, test_user, wisata_fixture, tmp_path):
+    """Menguji migrasi file datar ke layout bertingkat beserta turunannya.
+
+    Args:
+        app: Instance aplikasi Flask
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    for name in ('1234-uuid.jpg', '1234-uuid_thumb.webp', '1234-uuid_thumb.jpg', 'ffff-proses.jpg'):
+        (tmp_path / name).write_bytes(name.encode())
+
+    review = Review(rating=5, komentar='Indah', user_id=test_user[0].id, wisata_id=wisata_fixture[0].id)
+    proses = FotoUlasan(nama_file='ffff-proses.jpg', review=review)
+    db.session.add_all([review, proses, ImageJob(foto=proses),
+                        FotoUlasan(nama_file='1234-uuid.jpg', varian='thumb', review=review),
+                        FotoUlasan(nama_file='1234-uuid.jpg', varian='thumb', review=review),
+                        FotoUlasan(nama_file='hilang.jpg', review=review)])
+    db.session.commit()
+
+    totals = migrate_to_shards(batch_size=1)
+
+    assert totals == {'moved': 2, 'missing': 1, 'skipped': 1}
+    db.session.expire_all()
+    assert sorted(f.nama_file for f in FotoUlasan.query) == sorted(
+        ['12/34/1234-uuid.jpg', '12/34/1234-uuid.jpg', shard_path('hilang.jpg'), 'ffff-proses.jpg'])
+    assert sorted(_walk_uploads(tmp_path)) == [
+        '12/34/1234-uuid.jpg', '12/34/1234-uuid_thumb.jpg', '12/34/1234-uuid_thumb.webp', 'ffff-proses.jpg']
+    assert (tmp_path / '12/34/1234-uuid_thumb.webp').read_bytes() == b'1234-uuid_thumb.webp'
+
+    # Menjalankan ulang tidak mengubah apa pun selain foto yang masih diproses
+    assert migrate_to_shards()['moved'] == 0
+
+
+def test_garbage_collection_during_migration_keeps_new_paths(app, test_user, wisata_fixture, tmp_path, monkeypatch):
+    """Menguji bahwa GC yang berjalan di tengah migrasi tidak menghapus lokasi baru yang belum di-commit.
+
+    Args:
+        app: Instance aplikasi Flask
+        test_user: Fixture pengguna untuk pengujian
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+        monkeypatch: Fixture pytest untuk menjalankan GC di antara link dan commit
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    (tmp_path / '1234-uuid.jpg').write_bytes(b'foto lama')
+    _age(tmp_path / '1234-uuid.jpg', 7200)
+    review = Review(rating=5, komentar='Indah', user_id=test_user[0].id, wisata_id=wisata_fixture[0].id)
+    db.session.add_all([review, FotoUlasan(nama_file='1234-uuid.jpg', review=review)])
+    db.session.commit()
+
+    original = upload_store._link
+    reports = []
+
+    def link_then_gc(src, dst):
+        original(src, dst)
+        reports.append(collect_garbage(grace_seconds=3600))
+
+    monkeypatch.setattr(upload_store, '_link', link_then_gc)
+    assert migrate_to_shards()['moved'] == 1
+
+    assert reports[0]['orphans'] == []
+    assert list(_walk_uploads(tmp_path)) == ['12/34/1234-uuid.jpg']
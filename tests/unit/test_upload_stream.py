@@ -0,0 +1,161 @@
+import io
+import os
+import pytest
+from PIL import Image
+from app.models.foto_ulasan import FotoUlasan
+from app.services import upload_stream
+from app.services.upload_stream import detect_mime
+
+
+def _noisy_jpeg(size=(400, 400)):
+    """Membuat JPEG berisi noise agar ukurannya tidak mengecil karena kompresi."""
+    buffer = io.BytesIO()
+    Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3)).save(buffer, 'JPEG', quality=95)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def spool_spy(app, tmp_path, monkeypatch):
+    """Fixture untuk mencatat file sementara staging yang dibuat selama unggahan.
+
+    File sementara turunan gambar ditulis di folder shard tujuan, sehingga
+    hanya file di akar folder unggahan yang dicatat.
+
+    Args:
+        app: Instance aplikasi Flask
+        tmp_path: Path sementara untuk folder unggahan
+        monkeypatch: Fixture pytest untuk mengganti `tempfile.mkstemp`
+
+    Returns:
+        list[str]: Path file sementara yang dibuat oleh `StreamingUpload`.
+    """
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    created = []
+    original = upload_stream.tempfile.mkstemp
+
+    def mkstemp(*args, **kwargs):
+        fd, path = original(*args, **kwargs)
+        if os.path.dirname(path) == str(tmp_path):
+            created.append(path)
+        return fd, path
+
+    monkeypatch.setattr(upload_stream.tempfile, 'mkstemp', mkstemp)
+    return created
+
+
+def _post_review(client, wisata, files):
+    """Mengirim ulasan dengan foto sebagai multipart/form-data."""
+    return client.post(f'/wisata/detail/{wisata.id}', data={
+        'rating': 5,
+        'komentar': 'Ulasan dengan foto',
+        'foto': [(io.BytesIO(data), name) for name, data in files],
+    }, content_type='multipart/form-data', follow_redirects=True)
+
+
+def test_valid_upload_is_spooled_once_and_committed(spool_spy, authenticated_client, wisata_fixture, tmp_path):
+    """Menguji bahwa foto valid ditulis sekali ke staging lalu dipindahkan ke lokasi akhirnya.
+
+    Args:
+        spool_spy: Catatan file sementara
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    response = _post_review(authenticated_client, wisata_fixture[0], [('foto.jpg', _noisy_jpeg())])
+
+    assert response.status_code == 200
+    foto = FotoUlasan.query.one()
+    assert os.path.exists(tmp_path / foto.nama_file)
+    assert len(spool_spy) == 1
+    assert not os.path.exists(spool_spy[0])
+
+
+def test_non_image_is_rejected_without_spooling(spool_spy, authenticated_client, wisata_fixture, tmp_path):
+    """Menguji bahwa file bukan gambar ditolak dari byte awalnya tanpa disimpan ke disk.
+
+    Args:
+        spool_spy: Catatan file sementara
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    junk = b'<?php echo "bukan gambar"; ?>\n' * 100000
+    response = _post_review(authenticated_client, wisata_fixture[0], [('foto.jpg', junk)])
+
+    assert b'Tipe file tidak valid' in response.data
+    assert FotoUlasan.query.count() == 0
+    assert spool_spy == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_per_file_and_per_request_budgets(app, spool_spy, authenticated_client, wisata_fixture, tmp_path):
+    """Menguji batas ukuran per file dan per request; data yang sudah ditulis langsung dibuang.
+
+    Args:
+        app: Instance aplikasi Flask
+        spool_spy: Catatan file sementara
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    photo = _noisy_jpeg()
+    app.config.update(UPLOAD_MAX_FILE_SIZE=len(photo) - 1)
+    response = _post_review(authenticated_client, wisata_fixture[0], [('besar.jpg', photo)])
+    assert b'Ukuran file melebihi batas' in response.data
+
+    app.config.update(UPLOAD_MAX_FILE_SIZE=len(photo), UPLOAD_MAX_REQUEST_SIZE=len(photo) * 2 - 1)
+    response = _post_review(authenticated_client, wisata_fixture[0], [('a.jpg', photo), ('b.jpg', photo)])
+    assert b'Total ukuran foto' in response.data
+
+    assert FotoUlasan.query.count() == 0
+    assert spool_spy and not any(os.path.exists(path) for path in spool_spy)
+    assert os.listdir(tmp_path) == []
+
+
+def test_mime_detector_is_shared():
+    """Menguji bahwa detektor MIME dibuat sekali dan dipakai ulang."""
+    assert detect_mime(_noisy_jpeg((8, 8))) == 'image/jpeg'
+    detector = upload_stream._detector
+    assert detect_mime(b'teks biasa') == 'text/plain'
+    assert upload_stream._detector is detector
+
+
+def test_missing_upload_folder_is_created(app, authenticated_client, wisata_fixture, tmp_path):
+    """Menguji bahwa unggahan tetap berhasil jika folder unggahan belum ada.
+
+    Args:
+        app: Instance aplikasi Flask
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+    """
+    folder = tmp_path / 'belum' / 'ada'
+    app.config['UPLOAD_FOLDER'] = str(folder)
+    buffer = io.BytesIO()
+    Image.new('RGBA', (64, 64), (10, 20, 30, 128)).save(buffer, 'PNG')
+    response = _post_review(authenticated_client, wisata_fixture[0], [('foto.png', buffer.getvalue())])
+
+    assert response.status_code == 200
+    assert os.path.exists(folder / FotoUlasan.query.one().nama_file)
+
+
+def test_staging_write_error_rejects_upload(spool_spy, authenticated_client, wisata_fixture, tmp_path, monkeypatch):
+    """Menguji bahwa kegagalan menulis file sementara ditolak dengan pesan, bukan error 500.
+
+    Args:
+        spool_spy: Catatan file sementara
+        authenticated_client: Klien pengujian yang terautentikasi
+        wisata_fixture: Fixture wisata untuk pengujian
+        tmp_path: Path sementara untuk pengujian
+        monkeypatch: Fixture pytest untuk menggagalkan `tempfile.mkstemp`
+    """
+    def full_disk(*args, **kwargs):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(upload_stream.tempfile, 'mkstemp', full_disk)
+    response = _post_review(authenticated_client, wisata_fixture[0], [('foto.jpg', _noisy_jpeg())])
+
+    assert response.status_code == 200
+    assert b'Foto tidak dapat disimpan saat ini' in response.data
+    assert FotoUlasan.query.count() == 0
+    assert os.listdir(tmp_path) == []